@@ -0,0 +1,28 @@
+"""Add entity_definitions.generation for runtime model cache keys.
+
+ModelCache used to key generated models by an MD5 of the serialized
+definition, recomputed (with the definition, fields and relationships loaded)
+on every request. The cache is now keyed by (tenant, entity, generation);
+DataModelService bumps the counter on publish, migration and rollback.
+
+revision = "pg_entity_definition_generation"
+down_revision = "pg_workflow_module_records"
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = "pg_entity_definition_generation"
+down_revision = "pg_workflow_module_records"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "entity_definitions",
+        sa.Column("generation", sa.Integer(), nullable=False, server_default="1"),
+    )
+
+
+def downgrade():
+    op.drop_column("entity_definitions", "generation")
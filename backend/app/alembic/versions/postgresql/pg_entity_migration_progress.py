@@ -0,0 +1,32 @@
+"""Add online execution state to entity_migrations.
+
+executed_by records who queued the migration (the worker publishes the entity
+on their behalf); progress holds the online step plan, the current step and the
+backfill cursor; heartbeat_at lets workers re-queue migrations of a dead worker.
+
+revision = "pg_entity_migration_progress"
+down_revision = "pg_report_rollups"
+"""
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision = "pg_entity_migration_progress"
+down_revision = "pg_report_rollups"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "entity_migrations",
+        sa.Column("executed_by", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=True),
+    )
+    op.add_column("entity_migrations", sa.Column("progress", postgresql.JSONB(), nullable=True))
+    op.add_column("entity_migrations", sa.Column("heartbeat_at", sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    op.drop_column("entity_migrations", "heartbeat_at")
+    op.drop_column("entity_migrations", "progress")
+    op.drop_column("entity_migrations", "executed_by")
@@ -0,0 +1,42 @@
+"""Add background export job columns to report_executions.
+
+Async exports are queued as report_executions rows: dedup_key lets identical
+requests attach to a pending/running job (one per key, enforced by a partial
+unique index), progress_rows/heartbeat_at report progress and let workers
+reclaim jobs whose worker died, completed_at records when the artifact was
+written.
+
+revision = "pg_report_export_jobs"
+down_revision = "pg_entity_definition_generation"
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = "pg_report_export_jobs"
+down_revision = "pg_entity_definition_generation"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("report_executions", sa.Column("dedup_key", sa.String(64), nullable=True))
+    op.add_column("report_executions", sa.Column("progress_rows", sa.Integer(), nullable=True))
+    op.add_column("report_executions", sa.Column("heartbeat_at", sa.DateTime(), nullable=True))
+    op.add_column("report_executions", sa.Column("completed_at", sa.DateTime(), nullable=True))
+    op.create_index("ix_report_executions_dedup_key", "report_executions", ["dedup_key"])
+    op.create_index(
+        "uq_report_executions_active_export",
+        "report_executions",
+        ["tenant_id", "dedup_key"],
+        unique=True,
+        postgresql_where=sa.text("status IN ('pending', 'running') AND dedup_key IS NOT NULL"),
+    )
+
+
+def downgrade():
+    op.drop_index("uq_report_executions_active_export", table_name="report_executions")
+    op.drop_index("ix_report_executions_dedup_key", table_name="report_executions")
+    op.drop_column("report_executions", "completed_at")
+    op.drop_column("report_executions", "heartbeat_at")
+    op.drop_column("report_executions", "progress_rows")
+    op.drop_column("report_executions", "dedup_key")
@@ -0,0 +1,44 @@
+"""Add report_rollups.
+
+One row per report whose query_config has a rollup section: the summary
+table that backs it, the spec it was built from, and the watermark up to
+which changes of the base table have been folded in.
+
+revision = "pg_report_rollups"
+down_revision = "pg_report_export_jobs"
+"""
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision = "pg_report_rollups"
+down_revision = "pg_report_export_jobs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "report_rollups",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("tenant_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("report_definition_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("report_definitions.id"), nullable=False),
+        sa.Column("table_name", sa.String(63), nullable=False),
+        sa.Column("spec_hash", sa.String(64), nullable=True),
+        sa.Column("status", sa.String(50), nullable=True),
+        sa.Column("watermark", sa.DateTime(), nullable=True),
+        sa.Column("row_count", sa.Integer(), nullable=True),
+        sa.Column("last_refreshed_at", sa.DateTime(), nullable=True),
+        sa.Column("refresh_duration_ms", sa.Integer(), nullable=True),
+        sa.Column("error_message", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.UniqueConstraint("report_definition_id", name="uq_report_rollups_report_definition_id"),
+    )
+    op.create_index("ix_report_rollups_id", "report_rollups", ["id"])
+    op.create_index("ix_report_rollups_tenant_id", "report_rollups", ["tenant_id"])
+
+
+def downgrade():
+    op.drop_index("ix_report_rollups_tenant_id", table_name="report_rollups")
+    op.drop_index("ix_report_rollups_id", table_name="report_rollups")
+    op.drop_table("report_rollups")
@@ -0,0 +1,184 @@
+"""
+Artifact Storage - files produced by background jobs (report exports, ...)
+
+Artifacts are written once from a stream of byte chunks and read back in
+byte ranges, so downloads can be resumed with HTTP ``Range`` requests.
+Two backends are available, selected with ``ARTIFACT_STORAGE``:
+
+* ``local``: files under ``ARTIFACT_LOCAL_DIR`` (written to a ``.part`` file
+  and renamed when complete, so readers never see a partial artifact);
+* ``s3``: an S3-compatible bucket (``ARTIFACT_S3_*``); needs boto3.
+  Credentials come from the standard AWS environment/config chain.
+"""
+
+import logging
+import os
+import tempfile
+from typing import Iterable, Iterator, Optional, Tuple
+
+from .config import get_settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import boto3
+
+    BOTO3_AVAILABLE = True
+except ImportError:
+    BOTO3_AVAILABLE = False
+
+_CHUNK_BYTES = 64 * 1024
+
+
+class ArtifactStorage:
+    """Interface shared by the artifact backends; keys are relative, '/'-separated paths."""
+
+    def save(self, key: str, chunks: Iterable[bytes]) -> int:
+        """Write ``chunks`` to ``key`` and return the artifact size in bytes."""
+        raise NotImplementedError
+
+    def size(self, key: str) -> Optional[int]:
+        """Size of the artifact in bytes, or None if it does not exist."""
+        raise NotImplementedError
+
+    def read_range(self, key: str, start: int, end: int) -> Iterator[bytes]:
+        """Yield bytes ``start``..``end`` (inclusive) of the artifact."""
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        """Remove the artifact if it exists."""
+        raise NotImplementedError
+
+
+class LocalArtifactStorage(ArtifactStorage):
+    """Artifacts as files under a root directory"""
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+
+    def _path(self, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, key))
+        if not path.startswith(self.root + os.sep):
+            raise ValueError(f"Artifact key escapes storage root: {key}")
+        return path
+
+    def save(self, key: str, chunks: Iterable[bytes]) -> int:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        partial = f"{path}.part"
+        size = 0
+        try:
+            with open(partial, "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                    size += len(chunk)
+            os.replace(partial, path)
+        except BaseException:
+            if os.path.exists(partial):
+                os.remove(partial)
+            raise
+        return size
+
+    def size(self, key: str) -> Optional[int]:
+        path = self._path(key)
+        return os.path.getsize(path) if os.path.exists(path) else None
+
+    def read_range(self, key: str, start: int, end: int) -> Iterator[bytes]:
+        with open(self._path(key), "rb") as f:
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = f.read(min(_CHUNK_BYTES, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+    def delete(self, key: str) -> None:
+        path = self._path(key)
+        if os.path.exists(path):
+            os.remove(path)
+
+
+class S3ArtifactStorage(ArtifactStorage):
+    """Artifacts as objects in an S3-compatible bucket"""
+
+    def __init__(self, bucket: str, prefix: str = "", endpoint_url: Optional[str] = None):
+        if not BOTO3_AVAILABLE:
+            raise ImportError("boto3 is required for S3 artifact storage. Install with: pip install boto3")
+        self._s3 = boto3.client("s3", endpoint_url=endpoint_url or None)
+        self._bucket = bucket
+        self._prefix = prefix.strip("/")
+
+    def _key(self, key: str) -> str:
+        return f"{self._prefix}/{key}" if self._prefix else key
+
+    def save(self, key: str, chunks: Iterable[bytes]) -> int:
+        # Spool to disk so upload_fileobj can do a bounded-memory multipart upload
+        with tempfile.TemporaryFile() as tmp:
+            for chunk in chunks:
+                tmp.write(chunk)
+            size = tmp.tell()
+            tmp.seek(0)
+            self._s3.upload_fileobj(tmp, self._bucket, self._key(key))
+        return size
+
+    def size(self, key: str) -> Optional[int]:
+        try:
+            return self._s3.head_object(Bucket=self._bucket, Key=self._key(key))["ContentLength"]
+        except self._s3.exceptions.ClientError:
+            return None
+
+    def read_range(self, key: str, start: int, end: int) -> Iterator[bytes]:
+        response = self._s3.get_object(Bucket=self._bucket, Key=self._key(key), Range=f"bytes={start}-{end}")
+        yield from response["Body"].iter_chunks(_CHUNK_BYTES)
+
+    def delete(self, key: str) -> None:
+        self._s3.delete_object(Bucket=self._bucket, Key=self._key(key))
+
+
+def parse_byte_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Resolve a single-range ``Range: bytes=...`` header against an artifact size
+
+    Supports ``start-end``, open-ended ``start-`` and suffix ``-length`` forms.
+
+    Returns:
+        Inclusive (start, end), or None when the whole artifact should be sent
+        (no header, or a form this server ignores such as multiple ranges)
+
+    Raises:
+        ValueError: The range cannot be satisfied (respond 416)
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    first, _, last = header[len("bytes=") :].strip().partition("-")
+    try:
+        if first:
+            start, end = int(first), min(int(last), size - 1) if last else size - 1
+        else:
+            start, end = max(size - int(last), 0), size - 1
+    except ValueError:
+        raise ValueError(f"Invalid range: {header}")
+    if start < 0 or start >= size or end < start:
+        raise ValueError(f"Unsatisfiable range: {header}")
+    return start, end
+
+
+_storage: Optional[ArtifactStorage] = None
+
+
+def get_artifact_storage() -> ArtifactStorage:
+    """Get the artifact storage backend configured by ``ARTIFACT_STORAGE``"""
+    global _storage
+    if _storage is None:
+        settings = get_settings()
+        if settings.ARTIFACT_STORAGE == "s3":
+            _storage = S3ArtifactStorage(
+                bucket=settings.ARTIFACT_S3_BUCKET,
+                prefix=settings.ARTIFACT_S3_PREFIX,
+                endpoint_url=settings.ARTIFACT_S3_ENDPOINT_URL,
+            )
+        else:
+            _storage = LocalArtifactStorage(settings.ARTIFACT_LOCAL_DIR)
+    return _storage
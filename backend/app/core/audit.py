@@ -1,14 +1,21 @@
 import asyncio
 import json
 import uuid
-from typing import Any, Dict, Optional
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional, Tuple
 
 from fastapi import Request
+from sqlalchemy import event, insert
 from sqlalchemy.orm import Session
 
 from app.models.audit import AuditLog
 from app.models.user import User
 
+from .audit_writer import get_audit_writer
+from .config import get_settings
+
+settings = get_settings()
+
 
 def create_audit_log(
     db: Session,
@@ -21,9 +28,45 @@ def create_audit_log(
     request: Optional[Request] = None,
     status: str = "success",
     error_message: Optional[str] = None,
+    sync: bool = False,
 ):
-    """Create an audit log entry"""
+    """Create an audit log entry
+
+    The row is queued for the background ``AuditWriter`` and written in a
+    batch shortly after. Pass ``sync=True`` (or list the action in
+    ``AUDIT_SYNC_ACTIONS``) for security events that must be durable before
+    the response; those are committed in ``db`` as before.
+
+    Code that relied on this function committing its own pending changes keeps
+    working: if ``db`` holds uncommitted writes they are still committed here.
+    """
+    audit_log = _build_audit_log(
+        action, user, entity_type, entity_id, changes, context_info, request, status, error_message
+    )
+
+    if sync or not settings.AUDIT_ASYNC_ENABLED or action in settings.audit_sync_actions:
+        db.add(audit_log)
+        db.commit()
+        return audit_log
+
+    _enqueue(db, audit_log)
+    if has_uncommitted_writes(db):
+        db.commit()
 
+    return audit_log
+
+
+def _build_audit_log(
+    action: str,
+    user: Optional[User],
+    entity_type: Optional[str],
+    entity_id: Optional[str],
+    changes: Optional[Dict[str, Any]],
+    context_info: Optional[Dict[str, Any]],
+    request: Optional[Request],
+    status: str,
+    error_message: Optional[str],
+) -> AuditLog:
     # Extract request info
     ip_address = None
     user_agent = None
@@ -31,8 +74,7 @@ def create_audit_log(
         ip_address = request.client.host if request.client else None
         user_agent = request.headers.get("user-agent")
 
-    # Create log entry
-    audit_log = AuditLog(
+    return AuditLog(
         id=str(uuid.uuid4()),
         user_id=str(user.id) if user else None,
         user_email=user.email if user else None,
@@ -47,12 +89,91 @@ def create_audit_log(
         request_id=str(uuid.uuid4()),
         status=status,
         error_message=error_message,
+        # Event time, not the (later) batch insert time
+        created_at=datetime.utcnow(),
     )
 
-    db.add(audit_log)
+
+def _enqueue(db: Session, audit_log: AuditLog):
+    row = {column.key: getattr(audit_log, column.key) for column in AuditLog.__table__.columns}
+    try:
+        bind = db.get_bind()
+    except Exception:
+        bind = None
+    get_audit_writer().submit(row, bind=bind)
+
+
+# ----------------------------------------------------------------------
+# Uncommitted-write tracking (see create_audit_log)
+# ----------------------------------------------------------------------
+
+_HAS_WRITES = "audit_has_uncommitted_writes"
+
+
+def has_uncommitted_writes(db: Session) -> bool:
+    """Whether ``db`` has pending ORM changes, or flushed / executed writes not yet committed"""
+    return bool(db.new or db.dirty or db.deleted or db.info.get(_HAS_WRITES))
+
+
+def _mark_flushed(session, flush_context):
+    session.info[_HAS_WRITES] = True
+
+
+def _mark_executed(orm_execute_state):
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info[_HAS_WRITES] = True
+
+
+def _clear_writes(session):
+    session.info.pop(_HAS_WRITES, None)
+
+
+event.listen(Session, "after_flush", _mark_flushed)
+event.listen(Session, "do_orm_execute", _mark_executed)
+event.listen(Session, "after_commit", _clear_writes)
+event.listen(Session, "after_rollback", _clear_writes)
+
+
+def create_audit_logs_bulk(
+    db: Session,
+    action: str,
+    entries: Iterable[Tuple[Optional[str], Optional[Dict[str, Any]]]],
+    user: Optional[User] = None,
+    entity_type: Optional[str] = None,
+    status: str = "success",
+) -> int:
+    """Create many audit log entries with one multi-row INSERT and one commit.
+
+    ``entries`` is an iterable of ``(entity_id, changes)`` pairs that share the
+    same action, user and entity type (e.g. one bulk import batch). Returns the
+    number of rows written.
+    """
+    user_id = str(user.id) if user else None
+    user_email = user.email if user else None
+    tenant_id = str(user.tenant_id) if user and user.tenant_id else None
+
+    rows = [
+        {
+            "id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "user_email": user_email,
+            "tenant_id": tenant_id,
+            "action": action,
+            "entity_type": entity_type,
+            "entity_id": str(entity_id) if entity_id else None,
+            "changes": json.dumps(changes, default=str) if changes else None,
+            "request_id": str(uuid.uuid4()),
+            "status": status,
+        }
+        for entity_id, changes in entries
+    ]
+    if not rows:
+        return 0
+
+    db.execute(insert(AuditLog), rows)
     db.commit()
 
-    return audit_log
+    return len(rows)
 
 
 def compute_diff(before: Dict[str, Any], after: Dict[str, Any]) -> Dict[str, Any]:
@@ -98,16 +219,13 @@ def audit_action(action: str, entity_type: Optional[str] = None):
 
                 return result
             except Exception as e:
-                # Log failure
+                # Log failure without committing whatever the failed call left in the session
                 if db and current_user:
-                    create_audit_log(
-                        db=db,
-                        action=action,
-                        user=current_user,
-                        entity_type=entity_type,
-                        request=request,
-                        status="failure",
-                        error_message=str(e),
+                    _enqueue(
+                        db,
+                        _build_audit_log(
+                            action, current_user, entity_type, None, None, None, request, "failure", str(e)
+                        ),
                     )
                 raise
 
@@ -0,0 +1,323 @@
+"""
+Audit Writer - batched, off-request persistence of audit log rows
+
+``create_audit_log`` hands rows to ``AuditWriter`` instead of committing them
+in the caller's session. A background thread drains the bounded in-process
+queue and writes every ``AUDIT_BATCH_SIZE`` rows or ``AUDIT_FLUSH_INTERVAL_MS``,
+whichever comes first, as one multi-row INSERT per batch (executemany, which
+SQLAlchemy turns into batched ``INSERT ... VALUES`` on PostgreSQL).
+
+When the database is slow or failing, rows are not dropped: a full queue or a
+failed batch is appended (fsync'd) to an NDJSON spill file, which is replayed
+into the database once writes succeed again. Every worker process of a host
+shares the spill file: appends and the hand-over to replay take an exclusive
+``flock`` on ``<spill>.lock``, and only the process holding ``<spill>.replay.lock``
+replays. Queue depth, written / spilled /
+dropped rows and batch latency are exported as Prometheus metrics (when
+prometheus-client is installed) and via ``stats()``.
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DataError, IntegrityError
+
+from app.models.audit import AuditLog
+
+from .config import get_settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    from prometheus_client import Counter, Gauge, Histogram
+
+    _QUEUE_DEPTH = Gauge("audit_queue_depth", "Audit rows waiting to be written")
+    _ROWS = Counter("audit_rows_total", "Audit rows by outcome", ["outcome"])  # written, spilled, dropped
+    _BATCH_SECONDS = Histogram("audit_batch_write_seconds", "Time to write one audit batch")
+except Exception:  # prometheus-client not installed or metrics already registered
+    _QUEUE_DEPTH = _ROWS = _BATCH_SECONDS = None
+
+try:
+    import fcntl
+except ImportError:  # not POSIX: only the in-process lock applies
+    fcntl = None
+
+_Item = Tuple[Optional[Engine], Dict[str, Any]]
+
+
+class AuditWriter:
+    """
+    Bounded queue + background flusher for AuditLog rows
+
+    Thread-safe; one global instance per worker process.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 500,
+        flush_interval_ms: int = 200,
+        max_queue_size: int = 10000,
+        spill_path: str = "audit_spill.ndjson",
+    ):
+        """
+        Initialize audit writer
+
+        Args:
+            batch_size: Maximum rows per INSERT
+            flush_interval_ms: Maximum time a row waits in the queue before its batch is written
+            max_queue_size: Queue bound; rows beyond it go to the spill file
+            spill_path: NDJSON file for rows that could not be queued or written
+        """
+        self._batch_size = max(batch_size, 1)
+        self._flush_interval = flush_interval_ms / 1000.0
+        self._queue: "queue.Queue[_Item]" = queue.Queue(maxsize=max_queue_size)
+        self._spill_path = spill_path
+        self._spill_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._atexit_registered = False
+        self._counts = {"written": 0, "spilled": 0, "dropped": 0}
+
+    def submit(self, row: Dict[str, Any], bind: Optional[Engine] = None) -> None:
+        """
+        Queue one audit row (never blocks the caller)
+
+        Args:
+            row: AuditLog column values
+            bind: Engine to write to (defaults to the primary engine)
+        """
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((bind, row))
+        except queue.Full:
+            logger.warning("Audit queue full, spilling row to disk")
+            self._spill([row])
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """
+        Wait until every queued row has been written or spilled
+
+        Returns:
+            True if the queue drained within ``timeout``
+        """
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() >= deadline or self._thread is None or not self._thread.is_alive():
+                return False
+            time.sleep(0.01)
+        return True
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Drain the queue and stop the flusher thread (application shutdown)."""
+        thread = self._thread
+        if thread is None:
+            return
+        self.flush(timeout)
+        self._stopping.set()
+        thread.join(timeout)
+        self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and row counters"""
+        return {
+            "queue_depth": self._queue.qsize(),
+            "queue_capacity": self._queue.maxsize,
+            "spill_file_bytes": os.path.getsize(self._spill_path) if os.path.exists(self._spill_path) else 0,
+            **self._counts,
+        }
+
+    # ------------------------------------------------------------------
+    # Flusher thread
+    # ------------------------------------------------------------------
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+                self._thread.start()
+                if not self._atexit_registered:
+                    atexit.register(self.stop)
+                    self._atexit_registered = True
+
+    def _run(self):
+        while not (self._stopping.is_set() and self._queue.empty()):
+            try:
+                batch = self._next_batch()
+                if _QUEUE_DEPTH is not None:
+                    _QUEUE_DEPTH.set(self._queue.qsize())
+                if batch:
+                    self._write_batch(batch)
+                elif os.path.exists(self._spill_path) or os.path.exists(f"{self._spill_path}.replay"):
+                    self._replay_spill()
+            except Exception:
+                # Keep the flusher alive; queued rows and the spill file are retried
+                logger.exception("Audit writer loop failed")
+                self._stopping.wait(max(self._flush_interval, 1.0))
+
+    def _next_batch(self) -> List[_Item]:
+        try:
+            batch = [self._queue.get(timeout=self._flush_interval)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self._flush_interval
+        while len(batch) < self._batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _write_batch(self, batch: List[_Item]):
+        by_bind: Dict[Optional[Engine], List[Dict[str, Any]]] = {}
+        for bind, row in batch:
+            by_bind.setdefault(bind, []).append(row)
+        try:
+            for bind, rows in by_bind.items():
+                try:
+                    self._insert(bind, rows)
+                except Exception as e:
+                    logger.error(f"Audit batch write failed ({len(rows)} rows), spilling to disk: {e}")
+                    self._spill(rows)
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+    def _insert(self, bind: Optional[Engine], rows: List[Dict[str, Any]]):
+        if bind is None:
+            from .db import engine as bind
+
+        start = time.perf_counter()
+        with bind.begin() as conn:
+            conn.execute(insert(AuditLog), rows)
+        if _BATCH_SECONDS is not None:
+            _BATCH_SECONDS.observe(time.perf_counter() - start)
+        self._count("written", len(rows))
+
+    # ------------------------------------------------------------------
+    # Spill file
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def _file_lock(self, path: str, blocking: bool = True):
+        """
+        Exclusive flock on ``path`` across worker processes
+
+        Yields False (lock not taken) when ``blocking`` is off and another process holds it.
+        """
+        with open(path, "a") as f:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    yield False
+                    return
+            yield True
+
+    def _spill(self, rows: List[Dict[str, Any]]):
+        try:
+            with (
+                self._spill_lock,
+                self._file_lock(f"{self._spill_path}.lock"),
+                open(self._spill_path, "a", encoding="utf-8") as f,
+            ):
+                for row in rows:
+                    f.write(json.dumps(row, default=str) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self._count("spilled", len(rows))
+        except OSError as e:
+            logger.error(f"Audit spill to {self._spill_path} failed, {len(rows)} rows lost: {e}")
+            self._count("dropped", len(rows))
+
+    def _replay_spill(self):
+        with self._file_lock(f"{self._spill_path}.replay.lock", blocking=False) as locked:
+            if locked:
+                self._replay_locked()
+            else:
+                # Another worker process is replaying
+                self._stopping.wait(max(self._flush_interval, 1.0))
+
+    def _replay_locked(self):
+        replay_path = f"{self._spill_path}.replay"
+        with self._spill_lock, self._file_lock(f"{self._spill_path}.lock"):
+            if not os.path.exists(replay_path):
+                if not os.path.exists(self._spill_path):
+                    return
+                os.replace(self._spill_path, replay_path)
+
+        with open(replay_path, encoding="utf-8") as f:
+            rows = [self._decode(line) for line in f if line.strip()]
+        start = 0
+        try:
+            for start in range(0, len(rows), self._batch_size):
+                chunk = rows[start : start + self._batch_size]
+                try:
+                    self._insert(None, chunk)
+                except (IntegrityError, DataError):
+                    self._insert_each(chunk)
+        except Exception as e:
+            # Keep the unwritten tail; retried after the next idle interval
+            logger.warning(f"Audit spill replay failed, will retry: {e}")
+            with open(replay_path, "w", encoding="utf-8") as f:
+                for row in rows[start:]:
+                    f.write(json.dumps(row, default=str) + "\n")
+            self._stopping.wait(max(self._flush_interval, 1.0))
+            return
+        os.remove(replay_path)
+        logger.info(f"Replayed {len(rows)} spilled audit rows")
+
+    def _insert_each(self, rows: List[Dict[str, Any]]):
+        """Row-by-row fallback so one invalid row cannot block the spill file forever."""
+        for row in rows:
+            try:
+                self._insert(None, [row])
+            except (IntegrityError, DataError) as e:
+                logger.error(f"Rejected spilled audit row {row.get('id')}: {e}")
+                with open(f"{self._spill_path}.rejected", "a", encoding="utf-8") as f:
+                    f.write(json.dumps(row, default=str) + "\n")
+                self._count("dropped", 1)
+
+    @staticmethod
+    def _decode(line: str) -> Dict[str, Any]:
+        row = json.loads(line)
+        if row.get("created_at"):
+            row["created_at"] = datetime.fromisoformat(row["created_at"])
+        return row
+
+    def _count(self, outcome: str, n: int):
+        self._counts[outcome] += n
+        if _ROWS is not None:
+            _ROWS.labels(outcome).inc(n)
+
+
+_settings = get_settings()
+
+# Global audit writer instance
+audit_writer = AuditWriter(
+    batch_size=_settings.AUDIT_BATCH_SIZE,
+    flush_interval_ms=_settings.AUDIT_FLUSH_INTERVAL_MS,
+    max_queue_size=_settings.AUDIT_QUEUE_MAX_SIZE,
+    spill_path=_settings.AUDIT_SPILL_PATH,
+)
+
+
+def get_audit_writer() -> AuditWriter:
+    """Get the global audit writer instance"""
+    return audit_writer
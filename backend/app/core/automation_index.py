@@ -0,0 +1,171 @@
+"""
+Automation Trigger Index - database-event rules by (tenant, entity, event)
+
+Every nocode create/update/delete asks which automation rules fire for
+``entity.event``. Instead of loading all active rules and filtering their
+``trigger_config`` in Python on each write, the index compiles the rules
+visible to a tenant (its own plus platform-level ones) once into a dict keyed
+by (entity_name, event) and answers from memory afterwards.
+
+``AutomationService`` invalidates a tenant's entry whenever a rule is created,
+updated, toggled or deleted (platform rules invalidate every tenant); with
+Redis available the invalidation is broadcast to the other workers. A TTL
+bounds staleness for deployments without Redis.
+"""
+
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import RLock
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models.automation import AutomationRule
+
+from .config import get_settings
+from .redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "automation_index_invalidations"
+PLATFORM = "platform"
+ALL_TENANTS = "*"
+
+
+@dataclass(frozen=True)
+class TriggerRule:
+    """The parts of an AutomationRule needed to dispatch it"""
+
+    id: Any
+    name: str
+    tenant_id: Any
+    is_async: bool
+
+
+_TenantIndex = Dict[Tuple[str, str], List[TriggerRule]]
+
+
+class AutomationTriggerIndex:
+    """
+    Thread-safe per-tenant index of active database-trigger rules
+
+    Entries are LRU-bounded by tenant count and expire after ``ttl_seconds``.
+    """
+
+    def __init__(self, ttl_seconds: int = 300, max_tenants: int = 10000):
+        """
+        Initialize trigger index
+
+        Args:
+            ttl_seconds: Time-to-live of a tenant's compiled index
+            max_tenants: Maximum number of tenants kept (LRU eviction)
+        """
+        self._entries: "OrderedDict[str, Tuple[float, _TenantIndex]]" = OrderedDict()
+        self._lock = RLock()
+        self._ttl = ttl_seconds
+        self._max_tenants = max_tenants
+        self._generation = 0
+        self._subscribed = False
+
+    def rules_for(self, db: Session, tenant_id: Optional[Any], entity_name: str, event: str) -> List[TriggerRule]:
+        """
+        Active rules that fire for ``entity_name``.``event`` in ``tenant_id``
+
+        Args:
+            db: Session used to compile the tenant's index on a miss
+            tenant_id: Tenant of the record (None for platform-level data)
+            entity_name: Nocode entity name
+            event: onCreate, onUpdate or onDelete
+
+        Returns:
+            Matching rules in execution order
+        """
+        self._ensure_subscribed()
+        key = str(tenant_id) if tenant_id else PLATFORM
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                return entry[1].get((entity_name, event), [])
+            generation = self._generation
+
+        index = self._build(db, tenant_id)
+        with self._lock:
+            # Skip storing if an invalidation ran while we were building
+            if generation == self._generation:
+                self._entries[key] = (time.monotonic() + self._ttl, index)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self._max_tenants:
+                    self._entries.popitem(last=False)
+        return index.get((entity_name, event), [])
+
+    def invalidate(self, tenant_id: Optional[Any] = None, broadcast: bool = True):
+        """
+        Drop compiled indexes
+
+        Args:
+            tenant_id: Tenant whose rules changed; None (platform rule) drops every tenant
+            broadcast: Also notify other workers through Redis pub/sub
+        """
+        key = str(tenant_id) if tenant_id else ALL_TENANTS
+        with self._lock:
+            self._generation += 1
+            if key == ALL_TENANTS:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+        if broadcast:
+            get_redis().publish(INVALIDATION_CHANNEL, key)
+
+    @staticmethod
+    def _build(db: Session, tenant_id: Optional[Any]) -> _TenantIndex:
+        query = db.query(
+            AutomationRule.id,
+            AutomationRule.name,
+            AutomationRule.tenant_id,
+            AutomationRule.trigger_config,
+            AutomationRule.is_async,
+        ).filter(
+            AutomationRule.trigger_type == "database",
+            AutomationRule.is_active == True,
+            AutomationRule.is_deleted == False,
+        )
+        if tenant_id:
+            query = query.filter(
+                (AutomationRule.tenant_id == tenant_id)  # tenant-scope-ok (own + platform rules)
+                | AutomationRule.tenant_id.is_(None)
+            )
+        else:
+            query = query.filter(AutomationRule.tenant_id.is_(None))
+
+        index: _TenantIndex = {}
+        for row in query.order_by(AutomationRule.execution_order, AutomationRule.created_at):
+            config = row.trigger_config or {}
+            entity_name, event = config.get("entity_name"), config.get("event")
+            if entity_name and event:
+                index.setdefault((entity_name, event), []).append(
+                    TriggerRule(id=row.id, name=row.name, tenant_id=row.tenant_id, is_async=bool(row.is_async))
+                )
+        return index
+
+    def _ensure_subscribed(self):
+        if not self._subscribed:
+            self._subscribed = True
+            if not get_redis().subscribe(INVALIDATION_CHANNEL, self._on_remote_invalidation):
+                self._subscribed = False
+
+    def _on_remote_invalidation(self, key: str):
+        self.invalidate(None if key == ALL_TENANTS else key, broadcast=False)
+
+
+_settings = get_settings()
+
+# Global trigger index instance
+automation_trigger_index = AutomationTriggerIndex(ttl_seconds=_settings.AUTOMATION_TRIGGER_INDEX_TTL_SECONDS)
+
+
+def get_automation_trigger_index() -> AutomationTriggerIndex:
+    """Get the global automation trigger index instance"""
+    return automation_trigger_index
@@ -1,5 +1,5 @@
 from functools import lru_cache
-from typing import List, Optional
+from typing import Dict, FrozenSet, List, Optional
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -22,6 +22,18 @@ class Settings(BaseSettings):
 
     # Database
     SQLALCHEMY_DATABASE_URL: str = "sqlite:///./app.db"
+    # Async driver URL for get_async_db; derived from SQLALCHEMY_DATABASE_URL when unset
+    SQLALCHEMY_ASYNC_DATABASE_URL: Optional[str] = None
+    # Connection pool (per engine, per worker process)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30  # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # seconds before a connection is replaced
+    DB_POOL_PRE_PING: bool = True
+    DB_CONNECT_TIMEOUT: int = 10
+    DB_STATEMENT_TIMEOUT_MS: int = 0  # PostgreSQL statement_timeout, 0 = server default
+    # Read replicas / per-role engines, e.g. "read=postgresql+psycopg2://...,reporting=postgresql+psycopg2://..."
+    DB_ROLE_URLS: str = ""
 
     # CORS
     ALLOWED_ORIGINS: str = "*"
@@ -32,6 +44,13 @@ class Settings(BaseSettings):
     REDIS_PORT: int = 6379
     REDIS_DB: int = 0
     REDIS_PASSWORD: Optional[str] = None
+    REDIS_MAX_CONNECTIONS: int = 50
+    REDIS_SOCKET_TIMEOUT: float = 1.0
+
+    # Token revocation: in-process bloom filter of revoked JTIs (answers "not
+    # revoked" without a round trip), re-synced from token_blacklist periodically
+    TOKEN_REVOCATION_SYNC_SECONDS: int = 10
+    TOKEN_REVOCATION_BLOOM_CAPACITY: int = 100000
 
     # Rate Limiting
     RATE_LIMIT_ENABLED: bool = True
@@ -47,6 +66,109 @@ class Settings(BaseSettings):
     # Monitoring
     ENABLE_METRICS: bool = False
 
+    # Audit log pipeline: rows are queued and batch-inserted by a background writer
+    AUDIT_ASYNC_ENABLED: bool = True
+    AUDIT_BATCH_SIZE: int = 500
+    AUDIT_FLUSH_INTERVAL_MS: int = 200
+    AUDIT_QUEUE_MAX_SIZE: int = 10000
+    AUDIT_SPILL_PATH: str = "audit_spill.ndjson"
+    # Actions always written synchronously in the caller's transaction
+    AUDIT_SYNC_ACTIONS: str = (
+        "change_password,password_reset_confirm,admin_password_reset,mfa_disable,sessions_terminated_all,"
+        "role.create,role.update,role.delete,assign_permissions_to_role,remove_permission_from_role,"
+        "bulk_update_role_permissions,assign_roles_to_group"
+    )
+
+    # Dynamic data bulk operations: rows written (and committed) per transaction
+    DYNAMIC_BULK_BATCH_SIZE: int = 1000
+
+    # Automation: database-trigger rules indexed per tenant; with the queue enabled,
+    # async rules run in the automation worker instead of the request
+    AUTOMATION_TRIGGER_INDEX_TTL_SECONDS: int = 300
+    AUTOMATION_QUEUE_ENABLED: bool = False
+    AUTOMATION_WORKER_INPROCESS: bool = False
+    AUTOMATION_WORKER_POLL_SECONDS: float = 2.0
+    AUTOMATION_WORKER_BATCH_SIZE: int = 20
+
+    # RBAC permission cache: compiled per-user permission sets (in-process LRU, optional Redis tier)
+    PERMISSION_CACHE_TTL_SECONDS: int = 300
+    PERMISSION_CACHE_MAX_ENTRIES: int = 10000
+    PERMISSION_CACHE_REDIS: bool = False
+
+    # Runtime model cache (generated SQLAlchemy models per tenant/entity/generation)
+    MODEL_CACHE_MAX_ENTRIES: int = 1000
+    MODEL_CACHE_REVALIDATE_SECONDS: int = 60
+
+    # Schema catalog: per-schema snapshot of table columns/indexes (pg_catalog), reloaded after this
+    # many seconds and dropped when DataModelService runs migration DDL
+    SCHEMA_CATALOG_TTL_SECONDS: int = 300
+
+    # Entity lookups: option lists of lookups with at most LOOKUP_MEMORY_MAX_OPTIONS rows are kept
+    # in memory (LRU of LOOKUP_MEMORY_MAX_ENTRIES lists) until the source entity's data changes;
+    # larger lookups page and search in SQL on expression indexes built when the lookup is saved
+    LOOKUP_MEMORY_MAX_OPTIONS: int = 5000
+    LOOKUP_MEMORY_MAX_ENTRIES: int = 500
+    LOOKUP_SEARCH_INDEXES: bool = True
+
+    # Report result cache: in-process LRU -> Redis -> report_cache table, single-flight loads,
+    # stale results served for REPORT_CACHE_STALE_SECONDS while a background refresh runs
+    REPORT_CACHE_TTL_SECONDS: int = 3600
+    REPORT_CACHE_STALE_SECONDS: int = 300
+    REPORT_CACHE_MAX_ENTRIES: int = 500
+    REPORT_CACHE_MAX_ROWS: int = 10000
+    REPORT_CACHE_REDIS: bool = True
+    REPORT_CACHE_HIT_FLUSH_SECONDS: float = 10.0
+    # Compiled report query plans kept per worker (one per report definition version)
+    REPORT_PLAN_CACHE_MAX_ENTRIES: int = 1000
+    # Report rollups (query_config.rollup) re-scan rows whose watermark is within this many
+    # seconds of the last refresh, so rows committed late by concurrent transactions are picked up
+    REPORT_ROLLUP_WATERMARK_LAG_SECONDS: int = 300
+    # Rows fetched per server-side cursor round trip (and per streamed chunk) for report exports
+    REPORT_EXPORT_CHUNK_SIZE: int = 1000
+    # Background export jobs (POST /reports/execute/export?mode=async): worker threads started in
+    # the API process (0 = run app.workers.report_export_worker standalone), poll interval and the
+    # heartbeat age after which a running job is considered abandoned and re-queued
+    REPORT_EXPORT_WORKERS: int = 2
+    REPORT_EXPORT_POLL_SECONDS: float = 5.0
+    REPORT_EXPORT_STALE_SECONDS: int = 600
+
+    # Scheduled jobs (SchedulerEngine): handler threads per process, jobs running at once across all
+    # replicas (per-tenant limits come from scheduler_configs.max_concurrent_jobs), the cap of the
+    # exponential retry backoff and how soon a retry that found no free slot is tried again
+    SCHEDULER_WORKER_THREADS: int = 10
+    SCHEDULER_MAX_CONCURRENT_JOBS: int = 20
+    SCHEDULER_RETRY_MAX_DELAY_SECONDS: int = 3600
+    SCHEDULER_SLOT_WAIT_SECONDS: int = 30
+
+    # Nocode entity migrations (POST /data-model/migrations/{id}/execute) run online in a worker:
+    # threads started in the API process (0 = run app.workers.entity_migration_worker standalone),
+    # poll interval and the heartbeat age after which a running migration is re-queued and resumed
+    ENTITY_MIGRATION_WORKERS: int = 1
+    ENTITY_MIGRATION_POLL_SECONDS: float = 5.0
+    ENTITY_MIGRATION_STALE_SECONDS: int = 300
+    # Each DDL statement waits at most this long for its table lock, then backs off and retries
+    # (so it never queues ahead of tenant traffic); the step fails after this many retries
+    ENTITY_MIGRATION_LOCK_TIMEOUT_MS: int = 2000
+    ENTITY_MIGRATION_LOCK_RETRIES: int = 10
+    # Backfills of new columns update this many rows per transaction, pausing between batches
+    ENTITY_MIGRATION_BATCH_SIZE: int = 5000
+    ENTITY_MIGRATION_BATCH_PAUSE_SECONDS: float = 0.1
+
+    # Dashboard renders (POST /dashboards/{id}/render): report queries run concurrently on a
+    # shared pool of this many threads, each holding one database connection while it runs
+    DASHBOARD_RENDER_WORKERS: int = 4
+
+    # Artifact storage for generated files (report exports): "local" or "s3"
+    ARTIFACT_STORAGE: str = "local"
+    ARTIFACT_LOCAL_DIR: str = "artifacts"
+    ARTIFACT_S3_BUCKET: str = ""
+    ARTIFACT_S3_PREFIX: str = ""
+    ARTIFACT_S3_ENDPOINT_URL: Optional[str] = None
+
+    # Authenticated principal cache, keyed by (user_id, token iat)
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 30
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", case_sensitive=True, extra="ignore")
 
     @property
@@ -56,6 +178,21 @@ class Settings(BaseSettings):
             return ["*"]
         return [origin.strip() for origin in self.ALLOWED_ORIGINS.split(",")]
 
+    @property
+    def audit_sync_actions(self) -> FrozenSet[str]:
+        """Parse AUDIT_SYNC_ACTIONS into a set"""
+        return frozenset(action.strip() for action in self.AUDIT_SYNC_ACTIONS.split(",") if action.strip())
+
+    @property
+    def db_role_urls(self) -> Dict[str, str]:
+        """Parse DB_ROLE_URLS ("role=url,role=url") into a dict"""
+        urls = {}
+        for item in self.DB_ROLE_URLS.split(","):
+            role, sep, url = item.partition("=")
+            if sep and role.strip() and url.strip():
+                urls[role.strip()] = url.strip()
+        return urls
+
     @property
     def redis_url_computed(self) -> Optional[str]:
         """Compute Redis URL from components if not explicitly set"""
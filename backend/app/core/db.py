@@ -1,7 +1,303 @@
+"""
+Database engines and sessions
+
+- ``engine`` / ``SessionLocal``: the primary (read-write) sync engine used by
+  ``get_db``. Pool sizing, overflow, checkout timeout, recycle, pre-ping and
+  the PostgreSQL statement timeout come from ``config.py`` (``DB_*``).
+- Role engines: ``DB_ROLE_URLS`` maps a role name (e.g. ``read``,
+  ``reporting``) to a replica URL. ``get_db_for_role(role)`` builds a
+  dependency for it; unknown or unconfigured roles use the primary.
+- Async: ``get_async_engine()`` / ``get_async_sessionmaker()`` and the
+  ``get_async_db`` dependency, for routes that should not block the event loop
+  (asyncpg / aiosqlite / aiomysql, derived from the sync URL unless
+  ``SQLALCHEMY_ASYNC_DATABASE_URL`` is set). Created lazily, so the async
+  driver is only required once something uses it.
+
+Every pooled engine reports checkout wait time and pool saturation to
+Prometheus (when prometheus-client is installed) and via ``pool_status()``.
+"""
+
+import logging
+import time
+from threading import Lock
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Dict, Iterator
+
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from .config import SQLALCHEMY_DATABASE_URL, get_settings
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+PRIMARY_ROLE = "primary"
+
+try:
+    from prometheus_client import Gauge, Histogram
+
+    _CHECKOUT_WAIT = Histogram(
+        "db_pool_checkout_wait_seconds",
+        "Time spent waiting for a pooled database connection",
+        ["engine"],
+        buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+    )
+    _CHECKED_OUT = Gauge("db_pool_checked_out", "Connections currently checked out", ["engine"])
+    _SATURATION = Gauge("db_pool_saturation", "Checked-out connections / (pool_size + max_overflow)", ["engine"])
+except Exception:  # prometheus-client not installed or metrics already registered
+    _CHECKOUT_WAIT = _CHECKED_OUT = _SATURATION = None
+
+
+# ============================================================================
+# Pool instrumentation
+# ============================================================================
+
+
+def _saturation(pool) -> float:
+    return pool.checkedout() / max(pool.size() + max(pool._max_overflow, 0), 1)
+
+
+class _InstrumentedPoolMixin:
+    """
+    Reports checkout wait time and checked-out/saturation gauges
+
+    The metrics label is the pool's logging name (the engine role), which
+    unlike instance attributes survives ``Pool.recreate()``.
+    """
+
+    @property
+    def metrics_label(self) -> str:
+        return self._orig_logging_name or PRIMARY_ROLE
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            if _CHECKOUT_WAIT is not None:
+                _CHECKOUT_WAIT.labels(self.metrics_label).observe(time.perf_counter() - start)
+                self._report_usage()
+
+    def _do_return_conn(self, record):
+        super()._do_return_conn(record)
+        if _CHECKED_OUT is not None:
+            self._report_usage()
+
+    def _report_usage(self):
+        _CHECKED_OUT.labels(self.metrics_label).set(self.checkedout())
+        _SATURATION.labels(self.metrics_label).set(_saturation(self))
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    """QueuePool with checkout wait and saturation metrics"""
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool with checkout wait and saturation metrics"""
+
+
+# ============================================================================
+# Engine construction
+# ============================================================================
+
+
+def _is_memory_sqlite(url) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def _engine_kwargs(url: str, role: str, asynchronous: bool = False) -> Dict[str, Any]:
+    """Pool and connect options for ``url`` from the DB_* settings."""
+    parsed = make_url(url)
+    kwargs: Dict[str, Any] = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+    if _is_memory_sqlite(parsed):
+        # SingletonThreadPool/StaticPool: sizing options do not apply
+        return kwargs
+
+    kwargs.update(
+        poolclass=InstrumentedAsyncQueuePool if asynchronous else InstrumentedQueuePool,
+        pool_logging_name=role,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+    )
+
+    backend, driver = parsed.get_backend_name(), parsed.get_driver_name()
+    connect_args: Dict[str, Any] = {}
+    if backend == "postgresql":
+        if driver == "asyncpg":
+            connect_args["timeout"] = settings.DB_CONNECT_TIMEOUT
+            if settings.DB_STATEMENT_TIMEOUT_MS:
+                connect_args["server_settings"] = {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}
+        else:
+            connect_args["connect_timeout"] = settings.DB_CONNECT_TIMEOUT
+            if settings.DB_STATEMENT_TIMEOUT_MS:
+                connect_args["options"] = f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+    elif backend == "mysql":
+        connect_args["connect_timeout"] = settings.DB_CONNECT_TIMEOUT
+    if connect_args:
+        kwargs["connect_args"] = connect_args
+    return kwargs
+
+
+def create_db_engine(url: str, role: str = PRIMARY_ROLE) -> Engine:
+    """
+    Create a sync engine for ``url`` with the configured pool options
+
+    Args:
+        url: SQLAlchemy database URL
+        role: Engine role, used as the metrics label
+
+    Returns:
+        Engine
+    """
+    return create_engine(url, future=True, **_engine_kwargs(url, role))
 
-from .config import SQLALCHEMY_DATABASE_URL
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL, pool_pre_ping=True, future=True)
+def async_database_url(url: str) -> str:
+    """Derive the async-driver URL for a sync URL (psycopg2 -> asyncpg, ...)."""
+    parsed = make_url(url)
+    drivers = {"postgresql": "asyncpg", "sqlite": "aiosqlite", "mysql": "aiomysql"}
+    backend = parsed.get_backend_name()
+    if backend not in drivers:
+        return url
+    return parsed.set(drivername=f"{backend}+{drivers[backend]}").render_as_string(hide_password=False)
+
+
+engine = create_db_engine(SQLALCHEMY_DATABASE_URL)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+
+
+# ============================================================================
+# Per-role (replica) engines
+# ============================================================================
+
+_role_sessionmakers: Dict[str, sessionmaker] = {PRIMARY_ROLE: SessionLocal}
+_role_lock = Lock()
+
+
+def get_sessionmaker(role: str = PRIMARY_ROLE) -> sessionmaker:
+    """
+    Session factory for a database role (created on first use)
+
+    Args:
+        role: Role name from DB_ROLE_URLS; unconfigured roles use the primary
+
+    Returns:
+        sessionmaker bound to the role's engine
+    """
+    factory = _role_sessionmakers.get(role)
+    if factory is not None:
+        return factory
+
+    url = settings.db_role_urls.get(role)
+    if not url:
+        return SessionLocal
+
+    with _role_lock:
+        if role not in _role_sessionmakers:
+            _role_sessionmakers[role] = sessionmaker(
+                bind=create_db_engine(url, role), autoflush=False, autocommit=False, future=True
+            )
+            logger.info(f"Database engine created for role '{role}'")
+        return _role_sessionmakers[role]
+
+
+def get_db_for_role(role: str) -> Callable[[], Iterator[Session]]:
+    """
+    Build a FastAPI dependency yielding a session on the ``role`` engine
+
+    Usage::
+
+        db: Session = Depends(get_db_for_role("read"))
+    """
+
+    def _get_db() -> Iterator[Session]:
+        db = get_sessionmaker(role)()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    return _get_db
+
+
+# ============================================================================
+# Async engine
+# ============================================================================
+
+_async_engine = None
+_async_sessionmaker = None
+_async_lock = Lock()
+
+
+def get_async_engine():
+    """The primary AsyncEngine (created on first use)"""
+    global _async_engine
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import create_async_engine
+
+        with _async_lock:
+            if _async_engine is None:
+                url = settings.SQLALCHEMY_ASYNC_DATABASE_URL or async_database_url(SQLALCHEMY_DATABASE_URL)
+                _async_engine = create_async_engine(
+                    url, **_engine_kwargs(url, f"{PRIMARY_ROLE}_async", asynchronous=True)
+                )
+    return _async_engine
+
+
+def get_async_sessionmaker():
+    """async_sessionmaker bound to the primary AsyncEngine"""
+    global _async_sessionmaker
+    if _async_sessionmaker is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+
+        _async_sessionmaker = async_sessionmaker(get_async_engine(), autoflush=False, expire_on_commit=False)
+    return _async_sessionmaker
+
+
+async def get_async_db() -> AsyncIterator["AsyncSession"]:
+    """FastAPI dependency yielding an AsyncSession (the async counterpart of get_db)"""
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+
+async def dispose_engines():
+    """Close every pool (application shutdown)."""
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    for factory in list(_role_sessionmakers.values()):
+        factory.kw["bind"].dispose()
+
+
+# ============================================================================
+# Introspection
+# ============================================================================
+
+
+def pool_status() -> Dict[str, Dict[str, Any]]:
+    """
+    Snapshot of every pooled engine
+
+    Returns:
+        {role: {size, checked_out, overflow, saturation}} for QueuePool engines
+    """
+    pools: Dict[str, Any] = {role: factory.kw["bind"].pool for role, factory in _role_sessionmakers.items()}
+    if _async_engine is not None:
+        pools[f"{PRIMARY_ROLE}_async"] = _async_engine.sync_engine.pool
+
+    status: Dict[str, Dict[str, Any]] = {}
+    for role, pool in pools.items():
+        if not isinstance(pool, QueuePool):
+            continue
+        status[role] = {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+            "saturation": round(_saturation(pool), 3),
+        }
+    return status
@@ -4,29 +4,15 @@ from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.orm import Session
 
-from ..models.token_blacklist import TokenBlacklist
 from ..models.user import User
 from .auth import decode_token
-from .db import SessionLocal
+from .db import SessionLocal, get_async_db, get_db_for_role  # noqa: F401 — re-exported for routers
+from .permission_cache import CompiledPermissions, get_user_permissions
+from .principal import CurrentUser, Principal, principal_cache
+from .token_revocation import revocation_checker
 
 security = HTTPBearer()
 
-import os as _os
-
-
-def _is_token_revoked_redis(jti: str) -> bool:
-    """Check token blacklist in Redis. Returns False if Redis unavailable."""
-    try:
-        import redis as _redis
-
-        _url = _os.environ.get("REDIS_URL", "")
-        if not _url:
-            return False
-        _r = _redis.from_url(_url, socket_timeout=0.1, socket_connect_timeout=0.1)
-        return bool(_r.get(f"blacklist:{jti}"))
-    except Exception:
-        return False
-
 
 def get_db():
     db = SessionLocal()
@@ -42,6 +28,11 @@ def get_current_user(
     """
     Extract and validate current user from JWT token.
     Tenant ID is now securely extracted from the JWT payload only.
+
+    Returns a ``CurrentUser`` proxy built from the cached principal for this
+    token (see ``app.core.principal``): the User row is only SELECTed on a
+    cache miss or when a route touches a field beyond id / tenant_id / email /
+    is_superuser / is_active.
     """
     token = credentials.credentials
     payload = decode_token(token)
@@ -53,13 +44,11 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    # Check if token is blacklisted (revoked): Redis first, DB fallback
+    # Check if token is blacklisted (revoked): in-process bloom filter, then
+    # pooled Redis, then DB for the few JTIs the filter cannot rule out
     jti = payload.get("jti")
     if jti:
-        revoked = _is_token_revoked_redis(jti)
-        if not revoked:
-            revoked = bool(db.query(TokenBlacklist).filter(TokenBlacklist.jti == jti).first())
-        if revoked:
+        if revocation_checker.is_revoked(jti, db):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Token has been revoked",
@@ -70,19 +59,27 @@ def get_current_user(
     if not user_id:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=401, detail="User not found")
+    iat = payload.get("iat")
+    user = None
+    principal = principal_cache.get(user_id, iat)
+    if principal is None:
+        user = db.query(User).filter(User.id == user_id).first()
+        if not user:
+            raise HTTPException(status_code=401, detail="User not found")
+        principal = Principal.from_user(user)
 
-    if not user.is_active:
+    if not principal.is_active:
         raise HTTPException(status_code=403, detail="Inactive user")
 
     # Validate tenant_id from JWT matches user's tenant
     token_tenant_id = payload.get("tenant_id")
-    if user.tenant_id and token_tenant_id and str(token_tenant_id) != str(user.tenant_id):
+    if principal.tenant_id and token_tenant_id and str(token_tenant_id) != str(principal.tenant_id):
         raise HTTPException(status_code=401, detail="Token tenant mismatch - please re-authenticate")
 
-    return user
+    if user is not None:
+        principal_cache.set(user_id, iat, principal)
+
+    return CurrentUser(principal, db, user)
 
 
 async def get_current_user_optional(
@@ -147,22 +144,15 @@ def matches_permission(granted_codes, required_code: str) -> bool:
     containing ``*`` is treated as a literal segment value (so callers cannot accidentally
     over-grant by passing a wildcard to ``require_permission``).
 
-    Hot path: literal ``in`` check first (O(1) on a set). Wildcard scan only runs when
-    the literal lookup misses. Per epic-21 story 4.2.1, target is p95 < 5 ms for users
-    with up to 200 permissions -- trivially met by this implementation.
+    Hot path: pass the ``CompiledPermissions`` from ``get_user_permissions`` -- its
+    wildcard grants are pre-split and decisions memoized, so a repeated check is one
+    dict lookup. A plain set/list of codes is compiled on the fly.
     """
-    if required_code in granted_codes:
-        return True
-    required_segments = required_code.split(":")
-    for granted in granted_codes:
-        if "*" not in granted:
-            continue
-        granted_segments = granted.split(":")
-        if len(granted_segments) != len(required_segments):
-            continue
-        if all(g == "*" or g == r for g, r in zip(granted_segments, required_segments)):
+    if not isinstance(granted_codes, CompiledPermissions):
+        if required_code in granted_codes:
             return True
-    return False
+        granted_codes = CompiledPermissions(granted_codes)
+    return granted_codes.matches(required_code)
 
 
 def has_permission(permission: str):
@@ -172,6 +162,8 @@ def has_permission(permission: str):
 
     Wildcards on the granted side are honored -- e.g. a user with ``*:*:platform``
     granted satisfies any required code at platform scope. See ``matches_permission``.
+    The user's permission set comes from the RBAC permission cache
+    (``app.core.permission_cache``), so a check costs no queries once warm.
 
     Args:
         permission: Permission code to check (e.g., "users:create:tenant")
@@ -184,9 +176,7 @@ def has_permission(permission: str):
         if current_user.is_superuser:
             return current_user
 
-        user_permissions = current_user.get_permissions() if hasattr(current_user, "get_permissions") else set()
-
-        if not matches_permission(user_permissions, permission):
+        if not get_user_permissions(current_user).matches(permission):
             raise HTTPException(status_code=403, detail=f"Permission '{permission}' required")
         return current_user
 
@@ -210,9 +200,9 @@ def has_any_permission(permissions: List[str]):
         if current_user.is_superuser:
             return current_user
 
-        user_permissions = current_user.get_permissions() if hasattr(current_user, "get_permissions") else set()
+        user_permissions = get_user_permissions(current_user)
 
-        if not any(matches_permission(user_permissions, perm) for perm in permissions):
+        if not any(user_permissions.matches(perm) for perm in permissions):
             raise HTTPException(status_code=403, detail=f"One of these permissions required: {', '.join(permissions)}")
         return current_user
 
@@ -224,7 +214,7 @@ def has_role(role_code: str):
     Dependency to check if user has a specific role.
 
     RBAC Consistency: Roles are assigned through groups only.
-    Uses User.get_roles() which returns roles from group membership.
+    Roles come from the cached group-membership resolution (same rules as User.get_roles()).
 
     Args:
         role_code: Role code to check (e.g., "tenant_admin", "manager")
@@ -239,7 +229,7 @@ def has_role(role_code: str):
             return current_user
 
         # Get user roles from RBAC system (via groups)
-        user_role_codes = current_user.get_roles() if hasattr(current_user, "get_roles") else set()
+        user_role_codes = get_user_permissions(current_user).roles
 
         if role_code not in user_role_codes:
             raise HTTPException(status_code=403, detail=f"Role '{role_code}' required")
@@ -5,10 +5,15 @@ This module provides utilities to construct dynamic queries based on runtime cri
 for nocode entities.
 """
 
+import base64
+import json
 import logging
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
 from typing import Any, Dict, List, Optional, Tuple, Type
 
-from sqlalchemy import and_, asc, desc, func, or_
+from sqlalchemy import and_, asc, desc, false, func, or_, tuple_
 from sqlalchemy.orm import Query
 
 logger = logging.getLogger(__name__)
@@ -22,9 +27,12 @@ class DynamicQueryBuilder:
     - Complex filters with AND/OR operators
     - Multiple field sorting
     - Global text search across multiple fields
-    - Pagination
+    - Pagination (OFFSET/LIMIT or keyset cursors, with exact/estimated/no counts)
     """
 
+    # Total-count strategies for list endpoints
+    COUNT_MODES = ("exact", "estimated", "none")
+
     # Operator mapping
     OPERATORS = {
         "eq": lambda field, value: field == value,
@@ -255,7 +263,9 @@ class DynamicQueryBuilder:
 
         return searchable_fields
 
-    def apply_pagination(self, query: Query, page: int = 1, page_size: int = 25) -> Tuple[Query, int, int]:
+    def apply_pagination(
+        self, query: Query, page: int = 1, page_size: int = 25, count_mode: str = "exact"
+    ) -> Tuple[Query, Optional[int], Optional[int]]:
         """
         Apply pagination to query
 
@@ -263,15 +273,17 @@ class DynamicQueryBuilder:
             query: SQLAlchemy Query object
             page: Page number (1-indexed)
             page_size: Number of items per page
+            count_mode: 'exact' (COUNT(*)), 'estimated' (planner statistics) or 'none'
 
         Returns:
-            Tuple of (paginated_query, total_count, total_pages)
+            Tuple of (paginated_query, total_count, total_pages);
+            total_count and total_pages are None when count_mode is 'none'
         """
         # Get total count before pagination
-        total_count = query.count()
+        total_count = self.count(query, count_mode)
 
         # Calculate total pages
-        total_pages = (total_count + page_size - 1) // page_size
+        total_pages = (total_count + page_size - 1) // page_size if total_count is not None else None
 
         # Apply pagination
         offset = (page - 1) * page_size
@@ -279,6 +291,231 @@ class DynamicQueryBuilder:
 
         return paginated_query, total_count, total_pages
 
+    def count(self, query: Query, count_mode: str = "exact") -> Optional[int]:
+        """
+        Count the rows a query would return using the requested strategy
+
+        Args:
+            query: SQLAlchemy Query object (filters applied, no LIMIT/OFFSET)
+            count_mode: 'exact', 'estimated' or 'none'
+
+        Returns:
+            Row count, or None for 'none'
+        """
+        if count_mode not in self.COUNT_MODES:
+            raise ValueError(f"Invalid count mode '{count_mode}'. Must be one of: {', '.join(self.COUNT_MODES)}")
+
+        if count_mode == "none":
+            return None
+        if count_mode == "estimated":
+            return self.estimate_count(query)
+        return query.count()
+
+    def estimate_count(self, query: Query) -> int:
+        """
+        Estimate the row count of a query from planner statistics
+
+        On PostgreSQL this reads the top-level "Plan Rows" of
+        ``EXPLAIN (FORMAT JSON)``, which the planner derives from
+        ``pg_class.reltuples`` and column statistics, so no rows are scanned.
+        Other dialects have no comparable statistics and fall back to an exact
+        COUNT(*).
+
+        Args:
+            query: SQLAlchemy Query object (filters applied, no LIMIT/OFFSET)
+
+        Returns:
+            Estimated row count
+        """
+        session = query.session
+        dialect = session.get_bind().dialect
+        if dialect.name != "postgresql":
+            return query.count()
+
+        try:
+            # Literal binds + driver-level execution: EXPLAIN cannot take bound
+            # parameters through text(), and the driver un-doubles '%' literals.
+            compiled = query.statement.compile(dialect=dialect, compile_kwargs={"literal_binds": True})
+            plan = session.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}").scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]["Plan"]["Plan Rows"])
+        except Exception as e:
+            logger.warning(f"Count estimate failed, falling back to exact count: {e}")
+            session.rollback()
+            return query.count()
+
+    # ------------------------------------------------------------------
+    # Keyset (cursor) pagination
+    # ------------------------------------------------------------------
+
+    def apply_keyset(
+        self,
+        query: Query,
+        model: Type,
+        sort: List[Tuple[str, str]],
+        cursor: Optional[str],
+        page_size: int = 25,
+    ) -> Query:
+        """
+        Apply keyset pagination: ORDER BY the sort keys plus the primary key,
+        seek past the cursor position, and LIMIT page_size + 1 so the caller can
+        tell whether another page exists without counting.
+
+        The seek is ``WHERE (sort_col, id) > (:v, :id)`` when all keys share a
+        direction and are non-nullable (the form a composite index serves
+        directly); otherwise an equivalent expanded OR chain that follows
+        PostgreSQL's default NULL ordering (ASC NULLS LAST, DESC NULLS FIRST).
+
+        Args:
+            query: SQLAlchemy Query object (filters applied, unsorted)
+            model: SQLAlchemy model class
+            sort: List of (field_name, direction) tuples
+            cursor: Opaque cursor from encode_cursor(), or None for the first page
+            page_size: Number of items per page
+
+        Returns:
+            Modified Query object
+        """
+        keys = self.keyset_keys(model, sort)
+
+        if cursor:
+            token = self.decode_cursor(cursor)
+            if token.get("k") != [[name, direction] for name, direction, _ in keys]:
+                raise ValueError("Cursor does not match the requested sort order")
+            seek = self._build_seek_clause(keys, token.get("v") or [])
+            query = query.filter(seek)
+
+        for _, direction, column in keys:
+            order = desc(column) if direction == "desc" else asc(column)
+            if self._is_nullable(column):
+                # Spell out the NULL placement the seek clause assumes; SQLite
+                # and MySQL default to the opposite of PostgreSQL.
+                order = order.nulls_first() if direction == "desc" else order.nulls_last()
+            query = query.order_by(order)
+
+        return query.limit(page_size + 1)
+
+    def keyset_keys(self, model: Type, sort: List[Tuple[str, str]]) -> List[Tuple[str, str, Any]]:
+        """
+        Resolve the (name, direction, column) keyset for a sort spec
+
+        Unknown sort fields are skipped (as in apply_sort) and the primary key is
+        appended as a unique tie-breaker in the direction of the leading key.
+        """
+        keys = []
+        for field_name, direction in sort or []:
+            if not hasattr(model, field_name):
+                logger.warning(f"Sort field '{field_name}' not found in model, skipping")
+                continue
+            keys.append((field_name, "desc" if direction.lower() == "desc" else "asc", getattr(model, field_name)))
+
+        tie_direction = keys[0][1] if keys else "asc"
+        for pk_column in model.__table__.primary_key.columns:
+            if pk_column.name not in {name for name, _, _ in keys}:
+                keys.append((pk_column.name, tie_direction, getattr(model, pk_column.name)))
+
+        return keys
+
+    def build_cursor(self, keys: List[Tuple[str, str, Any]], record) -> str:
+        """Build the cursor that resumes after ``record`` for the given keyset."""
+        return self.encode_cursor(
+            [[name, direction] for name, direction, _ in keys], [getattr(record, name) for name, _, _ in keys]
+        )
+
+    def _build_seek_clause(self, keys: List[Tuple[str, str, Any]], values: List[Any]):
+        """Build the WHERE clause selecting rows strictly after the cursor position."""
+        if len(values) != len(keys):
+            raise ValueError("Malformed cursor")
+
+        directions = {direction for _, direction, _ in keys}
+        nullable = any(self._is_nullable(column) for _, _, column in keys)
+        if len(directions) == 1 and not nullable and None not in values:
+            columns = tuple_(*[column for _, _, column in keys])
+            bound = tuple_(*values)
+            return columns < bound if directions == {"desc"} else columns > bound
+
+        clauses = []
+        for i, (_, direction, column) in enumerate(keys):
+            prefix = [column_j.is_(None) if v is None else column_j == v for (_, _, column_j), v in zip(keys, values)]
+            after = self._after_clause(column, direction, values[i])
+            clauses.append(and_(*prefix[:i], after))
+        return or_(*clauses)
+
+    @staticmethod
+    def _after_clause(column, direction: str, value: Any):
+        """Rows whose value in one key column sorts strictly after ``value``."""
+        if direction == "desc":
+            # DESC NULLS FIRST: nulls come before every value
+            return column.isnot(None) if value is None else column < value
+        # ASC NULLS LAST: nothing sorts after NULL, NULLs sort after every value
+        if value is None:
+            return false()
+        if DynamicQueryBuilder._is_nullable(column):
+            return or_(column > value, column.is_(None))
+        return column > value
+
+    @staticmethod
+    def _is_nullable(column) -> bool:
+        """Whether a keyset column can hold NULL (primary keys never do)."""
+        return getattr(column, "nullable", True) and not column.primary_key
+
+    @staticmethod
+    def encode_cursor(sort_keys: List[List[str]], values: List[Any]) -> str:
+        """
+        Encode a keyset position into an opaque, URL-safe cursor token
+
+        Args:
+            sort_keys: [[field, direction], ...] the cursor is valid for
+            values: The last row's value for each key
+
+        Returns:
+            Cursor string
+        """
+
+        def tag(value):
+            if isinstance(value, datetime):
+                return {"$dt": value.isoformat()}
+            if isinstance(value, date):
+                return {"$d": value.isoformat()}
+            if isinstance(value, Decimal):
+                return {"$dec": str(value)}
+            if isinstance(value, uuid.UUID):
+                return {"$uuid": str(value)}
+            return value
+
+        payload = json.dumps({"k": sort_keys, "v": [tag(v) for v in values]}, separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Dict[str, Any]:
+        """
+        Decode a cursor produced by encode_cursor
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+
+        def untag(value):
+            if isinstance(value, dict) and len(value) == 1:
+                ((tag, raw),) = value.items()
+                if tag == "$dt":
+                    return datetime.fromisoformat(raw)
+                if tag == "$d":
+                    return date.fromisoformat(raw)
+                if tag == "$dec":
+                    return Decimal(raw)
+                if tag == "$uuid":
+                    return uuid.UUID(raw)
+            return value
+
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            token = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+            return {"k": token["k"], "v": [untag(v) for v in token["v"]]}
+        except Exception:
+            raise ValueError("Invalid cursor")
+
     def build_list_query(
         self,
         model: Type,
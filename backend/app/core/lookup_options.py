@@ -0,0 +1,201 @@
+"""
+Lookup Option Cache - in-memory option lists of small entity lookups
+
+Dropdowns backed by a small entity (countries, statuses, cost centres) are
+read far more often than their rows change. The cache keeps the complete,
+sorted option list of such a lookup per (configuration version, scope,
+parent value) so paging and typeahead are answered from memory; lookups with
+more than ``max_options`` rows are remembered as too large and always go to
+the database.
+
+Entries are indexed by the (tenant, entity) whose rows they were built from.
+``DynamicEntityService`` calls ``entity_changed`` after every committed write,
+which drops the entries of that tenant and entity in this worker and, with
+Redis available, in every other worker through pub/sub. "Too large" markers
+survive data changes (a big table rarely shrinks below the threshold) and
+expire with the lookup's ``cache_ttl_seconds`` like every other entry.
+"""
+
+import json
+import logging
+import time
+from collections import OrderedDict
+from threading import RLock
+from typing import Any, Dict, Hashable, List, Optional, Set, Tuple
+
+from .config import get_settings
+from .redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "lookup_option_invalidations"
+PLATFORM = "platform"
+
+# One option: (item dict as returned by the API, lowercased searchable texts)
+Option = Tuple[Dict[str, Any], Tuple[str, ...]]
+_Slot = Tuple[str, str]  # (tenant_id, entity_name)
+
+
+class LookupOptionCache:
+    """
+    Thread-safe LRU cache of complete lookup option lists
+
+    An entry is either a list of options or None, meaning the lookup has more
+    than ``max_options`` rows and must be queried in SQL.
+    """
+
+    def __init__(self, max_entries: int = 500, max_options: int = 5000):
+        """
+        Initialize lookup option cache
+
+        Args:
+            max_entries: Maximum number of cached option lists (least recently used are evicted)
+            max_options: Largest option list kept in memory
+        """
+        self._entries: "OrderedDict[Hashable, Tuple[float, _Slot, Optional[List[Option]]]]" = OrderedDict()
+        self._by_slot: Dict[_Slot, Set[Hashable]] = {}
+        self._lock = RLock()
+        self._max_entries = max_entries
+        self.max_options = max_options
+        self._generation = 0
+        self._subscribed = False
+
+    @property
+    def generation(self) -> int:
+        """Invalidation counter; pass it back to ``set`` to drop lists built before a data change"""
+        return self._generation
+
+    def get(self, key: Hashable) -> Tuple[bool, Optional[List[Option]]]:
+        """
+        Look up an option list
+
+        Returns:
+            (hit, options); options is None on a hit for a lookup that is too large
+        """
+        self._ensure_subscribed()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            if entry[0] <= time.monotonic():
+                self._remove(key)
+                return False, None
+            self._entries.move_to_end(key)
+            return True, entry[2]
+
+    def set(
+        self,
+        key: Hashable,
+        tenant_id: Optional[Any],
+        entity_name: str,
+        options: Optional[List[Option]],
+        ttl_seconds: int,
+        generation: int,
+    ):
+        """
+        Store an option list (or a too-large marker when ``options`` is None)
+
+        Args:
+            key: Cache key (configuration version, scope and parent value)
+            tenant_id: Tenant whose rows the list was built from (None if not tenant-scoped)
+            entity_name: Source entity of the lookup
+            options: Sorted options, or None if the lookup exceeds ``max_options``
+            ttl_seconds: Lifetime of the entry
+            generation: ``generation`` read before the rows were loaded
+        """
+        slot = (str(tenant_id) if tenant_id else PLATFORM, entity_name)
+        with self._lock:
+            # A data change committed while the rows were loading makes the list stale
+            if options is not None and generation != self._generation:
+                return
+            self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl_seconds, slot, options)
+            self._by_slot.setdefault(slot, set()).add(key)
+            while len(self._entries) > self._max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def entity_changed(self, tenant_id: Optional[Any], entity_name: str, broadcast: bool = True):
+        """
+        Drop the option lists built from an entity's rows
+
+        Args:
+            tenant_id: Tenant whose rows changed; None (platform-level rows) drops every tenant
+            entity_name: Entity that was written
+            broadcast: Also notify other workers through Redis pub/sub
+        """
+        tenant_key = str(tenant_id) if tenant_id else None
+        with self._lock:
+            self._generation += 1
+            # Unscoped (platform) lists span every tenant's rows
+            slots = [
+                s
+                for s in self._by_slot
+                if s[1] == entity_name and (tenant_key is None or s[0] in (tenant_key, PLATFORM))
+            ]
+            for slot in slots:
+                for key in list(self._by_slot.get(slot, ())):
+                    if self._entries[key][2] is not None:
+                        self._remove(key)
+        if broadcast:
+            get_redis().publish(INVALIDATION_CHANNEL, json.dumps({"tenant_id": tenant_key, "entity_name": entity_name}))
+
+    def invalidate_lookup(self, lookup_id: Any):
+        """Drop every entry of one lookup configuration (keys start with its id)"""
+        lookup_id = str(lookup_id)
+        with self._lock:
+            for key in [k for k in self._entries if isinstance(k, tuple) and k and k[0] == lookup_id]:
+                self._remove(key)
+
+    def clear(self):
+        """Drop all entries"""
+        with self._lock:
+            self._entries.clear()
+            self._by_slot.clear()
+            self._generation += 1
+
+    def get_stats(self) -> dict:
+        """Get cache statistics"""
+        with self._lock:
+            large = sum(1 for entry in self._entries.values() if entry[2] is None)
+            return {
+                "total_entries": len(self._entries),
+                "too_large": large,
+                "max_entries": self._max_entries,
+                "max_options": self.max_options,
+            }
+
+    def _remove(self, key: Hashable):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            keys = self._by_slot.get(entry[1])
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_slot[entry[1]]
+
+    def _ensure_subscribed(self):
+        if not self._subscribed:
+            self._subscribed = True
+            if not get_redis().subscribe(INVALIDATION_CHANNEL, self._on_remote_invalidation):
+                self._subscribed = False
+
+    def _on_remote_invalidation(self, message: str):
+        try:
+            payload = json.loads(message)
+        except ValueError:
+            logger.warning(f"Ignoring malformed lookup option invalidation: {message!r}")
+            return
+        self.entity_changed(payload.get("tenant_id"), payload.get("entity_name"), broadcast=False)
+
+
+_settings = get_settings()
+
+# Global lookup option cache instance
+lookup_option_cache = LookupOptionCache(
+    max_entries=_settings.LOOKUP_MEMORY_MAX_ENTRIES, max_options=_settings.LOOKUP_MEMORY_MAX_OPTIONS
+)
+
+
+def get_lookup_option_cache() -> LookupOptionCache:
+    """Get the global lookup option cache instance"""
+    return lookup_option_cache
@@ -3,211 +3,247 @@ Model Cache - Caches runtime-generated SQLAlchemy models
 
 This module provides a thread-safe cache for dynamically generated SQLAlchemy models.
 Models are cached per entity per tenant to avoid regenerating them on every request.
+
+Entries are keyed by (tenant, entity, generation), where generation is the
+``EntityDefinition.generation`` stamp that ``DataModelService`` bumps on
+publish, migration and rollback. A lookup is a dict access: no database round
+trip and no hashing of the definition. Bumping a generation invalidates the
+(tenant, entity) entries in this worker after commit and, with Redis available,
+in every other worker through pub/sub. Without Redis, other workers notice the
+new generation when an entry is revalidated (one-column SELECT, at most every
+``MODEL_CACHE_REVALIDATE_SECONDS``).
 """
 
-import hashlib
 import json
-from datetime import datetime, timedelta
+import logging
+import time
+from collections import OrderedDict
 from threading import RLock
-from typing import Dict, Optional, Type
+from typing import Dict, Hashable, Optional, Set, Tuple, Type
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from .config import get_settings
+from .redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "model_cache_invalidations"
+
+_Slot = Tuple[str, str]  # (tenant_id, entity_name)
 
 
 class ModelCache:
     """
-    Thread-safe cache for runtime-generated SQLAlchemy models
+    Thread-safe LRU cache for runtime-generated SQLAlchemy models
 
-    Cache Key Format: {tenant_id}:{entity_name}:{version_hash}
+    Cache Key Format: (tenant_id, entity_name, generation)
     - tenant_id: UUID of the tenant (or 'platform' for platform-level entities)
     - entity_name: Name of the entity
-    - version_hash: MD5 hash of entity definition (to detect changes)
+    - generation: Generation stamp of the entity definition the model was built from
+
+    Only the newest generation of a (tenant, entity) pair is kept. Per-tenant
+    and per-entity indexes make selective invalidation O(entries removed).
     """
 
-    def __init__(self, ttl_minutes: int = 60):
+    def __init__(self, max_entries: int = 1000, revalidate_seconds: int = 60):
         """
         Initialize model cache
 
         Args:
-            ttl_minutes: Time-to-live in minutes (default: 60)
-                        After TTL, cached models will be regenerated
+            max_entries: Maximum number of cached models (least recently used are evicted)
+            revalidate_seconds: Age after which a hit should be checked against the
+                                stored generation (0 = check on every hit)
         """
-        self._cache: Dict[str, dict] = {}
+        self._entries: "OrderedDict[_Slot, Tuple[Hashable, Type, float]]" = OrderedDict()
+        self._by_tenant: Dict[str, Set[_Slot]] = {}
+        self._by_entity: Dict[str, Set[_Slot]] = {}
         self._lock = RLock()
-        self._ttl = timedelta(minutes=ttl_minutes)
+        self._max_entries = max_entries
+        self._revalidate_seconds = revalidate_seconds
+        self._hits = 0
+        self._misses = 0
+        self._subscribed = False
 
-    def get(self, tenant_id: str, entity_name: str, entity_def_hash: str) -> Optional[Type]:
+    def get(self, tenant_id: str, entity_name: str, generation: Optional[Hashable] = None) -> Optional[Type]:
         """
-        Get cached model if exists and not expired
+        Get cached model
 
         Args:
             tenant_id: Tenant ID (or 'platform')
             entity_name: Entity name
-            entity_def_hash: Hash of entity definition
+            generation: If provided, only a model built from this generation is returned
 
         Returns:
             Cached SQLAlchemy model class or None
         """
-        cache_key = self._build_key(tenant_id, entity_name, entity_def_hash)
-
+        self._ensure_subscribed()
+        slot = (tenant_id, entity_name)
         with self._lock:
-            if cache_key not in self._cache:
-                return None
-
-            entry = self._cache[cache_key]
-
-            # Check if expired
-            if self._is_expired(entry):
-                del self._cache[cache_key]
+            entry = self._entries.get(slot)
+            if entry is None or (generation is not None and entry[0] != generation):
+                self._misses += 1
                 return None
+            self._entries.move_to_end(slot)
+            self._hits += 1
+            return entry[1]
 
-            return entry["model"]
-
-    def set(self, tenant_id: str, entity_name: str, entity_def_hash: str, model: Type):
+    def set(self, tenant_id: str, entity_name: str, generation: Hashable, model: Type):
         """
-        Cache a model
+        Cache a model (replaces any older generation for the same tenant and entity)
 
         Args:
             tenant_id: Tenant ID (or 'platform')
             entity_name: Entity name
-            entity_def_hash: Hash of entity definition
+            generation: Generation stamp of the entity definition
             model: SQLAlchemy model class to cache
         """
-        cache_key = self._build_key(tenant_id, entity_name, entity_def_hash)
-
+        slot = (tenant_id, entity_name)
         with self._lock:
-            self._cache[cache_key] = {
-                "model": model,
-                "created_at": datetime.utcnow(),
-                "tenant_id": tenant_id,
-                "entity_name": entity_name,
-                "hash": entity_def_hash,
-            }
+            self._entries[slot] = (generation, model, time.monotonic())
+            self._entries.move_to_end(slot)
+            self._by_tenant.setdefault(tenant_id, set()).add(slot)
+            self._by_entity.setdefault(entity_name, set()).add(slot)
+            while len(self._entries) > self._max_entries:
+                oldest, _ = self._entries.popitem(last=False)
+                self._unindex(oldest)
+
+    def generation_of(self, tenant_id: str, entity_name: str) -> Optional[Hashable]:
+        """Generation of the cached model for (tenant, entity), or None"""
+        entry = self._entries.get((tenant_id, entity_name))
+        return entry[0] if entry else None
+
+    def needs_revalidation(self, tenant_id: str, entity_name: str) -> bool:
+        """Whether the cached entry is older than the revalidation interval"""
+        entry = self._entries.get((tenant_id, entity_name))
+        return entry is None or time.monotonic() - entry[2] >= self._revalidate_seconds
+
+    def mark_validated(self, tenant_id: str, entity_name: str):
+        """Record that the cached generation was confirmed current"""
+        slot = (tenant_id, entity_name)
+        with self._lock:
+            entry = self._entries.get(slot)
+            if entry is not None:
+                self._entries[slot] = (entry[0], entry[1], time.monotonic())
 
-    def invalidate(self, tenant_id: Optional[str] = None, entity_name: Optional[str] = None):
+    def invalidate(self, tenant_id: Optional[str] = None, entity_name: Optional[str] = None, broadcast: bool = False):
         """
         Invalidate cached models
 
         Args:
             tenant_id: If provided, invalidate only this tenant's models
             entity_name: If provided, invalidate only this entity's models
+            broadcast: Also notify other workers through Redis pub/sub
         """
         with self._lock:
             if tenant_id is None and entity_name is None:
-                # Clear entire cache
-                self._cache.clear()
-                return
+                self._entries.clear()
+                self._by_tenant.clear()
+                self._by_entity.clear()
+            else:
+                if tenant_id is not None and entity_name is not None:
+                    slots = {(tenant_id, entity_name)}
+                elif tenant_id is not None:
+                    slots = set(self._by_tenant.get(tenant_id, ()))
+                else:
+                    slots = set(self._by_entity.get(entity_name, ()))
+                for slot in slots:
+                    if self._entries.pop(slot, None) is not None:
+                        self._unindex(slot)
+
+        if broadcast:
+            get_redis().publish(INVALIDATION_CHANNEL, json.dumps({"tenant_id": tenant_id, "entity_name": entity_name}))
 
-            # Selective invalidation
-            keys_to_delete = []
-            for key, entry in self._cache.items():
-                should_delete = True
+    def get_stats(self) -> dict:
+        """Get cache statistics"""
+        with self._lock:
+            return {
+                "total_entries": len(self._entries),
+                "max_entries": self._max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "tenants": {tenant: len(slots) for tenant, slots in self._by_tenant.items()},
+                "revalidate_seconds": self._revalidate_seconds,
+            }
 
-                if tenant_id and entry["tenant_id"] != tenant_id:
-                    should_delete = False
+    def _unindex(self, slot: _Slot):
+        tenant_id, entity_name = slot
+        for index, key in ((self._by_tenant, tenant_id), (self._by_entity, entity_name)):
+            slots = index.get(key)
+            if slots is not None:
+                slots.discard(slot)
+                if not slots:
+                    del index[key]
 
-                if entity_name and entry["entity_name"] != entity_name:
-                    should_delete = False
+    def _ensure_subscribed(self):
+        if not self._subscribed:
+            self._subscribed = True
+            if not get_redis().subscribe(INVALIDATION_CHANNEL, self._on_remote_invalidation):
+                self._subscribed = False
 
-                if should_delete:
-                    keys_to_delete.append(key)
+    def _on_remote_invalidation(self, message: str):
+        try:
+            payload = json.loads(message)
+        except ValueError:
+            logger.warning(f"Ignoring malformed model cache invalidation: {message!r}")
+            return
+        self.invalidate(payload.get("tenant_id"), payload.get("entity_name"), broadcast=False)
 
-            for key in keys_to_delete:
-                del self._cache[key]
 
-    def cleanup_expired(self):
-        """Remove all expired entries from cache"""
-        with self._lock:
-            keys_to_delete = []
-            for key, entry in self._cache.items():
-                if self._is_expired(entry):
-                    keys_to_delete.append(key)
+_settings = get_settings()
 
-            for key in keys_to_delete:
-                del self._cache[key]
+# Global model cache instance
+_model_cache = ModelCache(
+    max_entries=_settings.MODEL_CACHE_MAX_ENTRIES,
+    revalidate_seconds=_settings.MODEL_CACHE_REVALIDATE_SECONDS,
+)
 
-    def get_stats(self) -> dict:
-        """Get cache statistics"""
-        with self._lock:
-            total = len(self._cache)
-            expired = sum(1 for entry in self._cache.values() if self._is_expired(entry))
 
-            # Group by tenant
-            tenants = {}
-            for entry in self._cache.values():
-                tenant_id = entry["tenant_id"]
-                if tenant_id not in tenants:
-                    tenants[tenant_id] = 0
-                tenants[tenant_id] += 1
+def get_model_cache() -> ModelCache:
+    """Get the global model cache instance"""
+    return _model_cache
 
-            return {
-                "total_entries": total,
-                "active_entries": total - expired,
-                "expired_entries": expired,
-                "tenants": tenants,
-                "ttl_minutes": self._ttl.total_seconds() / 60,
-            }
 
-    def _build_key(self, tenant_id: str, entity_name: str, entity_def_hash: str) -> str:
-        """Build cache key"""
-        return f"{tenant_id}:{entity_name}:{entity_def_hash}"
+# ----------------------------------------------------------------------
+# Generation bumps (applied to the cache once the transaction commits)
+# ----------------------------------------------------------------------
 
-    def _is_expired(self, entry: dict) -> bool:
-        """Check if cache entry is expired"""
-        age = datetime.utcnow() - entry["created_at"]
-        return age > self._ttl
+_PENDING_INVALIDATIONS = "model_cache_pending_invalidations"
 
-    @staticmethod
-    def hash_entity_definition(entity_def: dict) -> str:
-        """
-        Create a hash of entity definition
 
-        This hash changes when entity structure changes, triggering cache invalidation
+def bump_generation(db: Session, entity_def) -> None:
+    """
+    Advance an entity definition's generation
 
-        Args:
-            entity_def: EntityDefinition as dict
+    The increment is done in SQL so concurrent bumps never collide. Cached
+    models for the entity are dropped (here and, via Redis, in other workers)
+    when ``db`` commits; platform-level entities are dropped for every tenant.
 
-        Returns:
-            MD5 hash string
-        """
-        # Extract only fields that affect model structure
-        relevant_fields = {
-            "name": entity_def.get("name"),
-            "table_name": entity_def.get("table_name"),
-            "schema_name": entity_def.get("schema_name"),
-            "fields": [
-                {
-                    "name": f.get("name"),
-                    "field_type": f.get("field_type"),
-                    "db_column_name": f.get("db_column_name"),
-                    "is_required": f.get("is_required"),
-                    "is_primary_key": f.get("is_primary_key"),
-                    "is_unique": f.get("is_unique"),
-                    "max_length": f.get("max_length"),
-                    "precision": f.get("precision"),
-                    "scale": f.get("scale"),
-                }
-                for f in entity_def.get("fields", [])
-            ],
-            "relationships": [
-                {
-                    "name": r.get("name"),
-                    "type": r.get("relationship_type"),
-                    "target_entity": r.get("target_entity"),
-                }
-                for r in entity_def.get("relationships", [])
-            ],
-        }
-
-        # Sort to ensure consistent hashing
-        json_str = json.dumps(relevant_fields, sort_keys=True)
-
-        # Create MD5 hash
-        return hashlib.md5(json_str.encode()).hexdigest()
+    Args:
+        db: Session the change is made in
+        entity_def: EntityDefinition being published, migrated or rolled back
+    """
+    from app.models.data_model import EntityDefinition
 
+    db.query(EntityDefinition).filter(EntityDefinition.id == entity_def.id).update(
+        {EntityDefinition.generation: EntityDefinition.generation + 1}, synchronize_session=False
+    )
+    db.expire(entity_def, ["generation"])
+    tenant_id = str(entity_def.tenant_id) if entity_def.tenant_id else None
+    db.info.setdefault(_PENDING_INVALIDATIONS, set()).add((tenant_id, entity_def.name))
 
-# Global model cache instance
-_model_cache = ModelCache(ttl_minutes=60)
 
+def _on_after_commit(session):
+    for tenant_id, entity_name in session.info.pop(_PENDING_INVALIDATIONS, ()):
+        _model_cache.invalidate(tenant_id, entity_name, broadcast=True)
+        logger.info(f"Model cache invalidated for entity={entity_name}, tenant={tenant_id or 'all'}")
 
-def get_model_cache() -> ModelCache:
-    """Get the global model cache instance"""
-    return _model_cache
+
+def _on_after_soft_rollback(session, previous_transaction):
+    if not previous_transaction.nested:
+        session.info.pop(_PENDING_INVALIDATIONS, None)
+
+
+event.listen(Session, "after_commit", _on_after_commit)
+event.listen(Session, "after_soft_rollback", _on_after_soft_rollback)
@@ -0,0 +1,378 @@
+"""
+Permission Cache - compiled RBAC permission sets per user
+
+``User.get_permissions()`` walks user_groups -> group -> group_roles -> role ->
+role_permissions -> permission through lazy loads, which costs dozens of
+SELECTs on every authorized request. This module resolves a user's role and
+permission codes with one joined SELECT, compiles them into a
+``CompiledPermissions`` matcher and caches the result at two levels:
+
+* request scope: stashed on the ``User`` instance, so repeated checks in one
+  request (dependency + menu filtering, ...) are a single attribute read;
+* cross-request: an in-process LRU with TTL keyed by user id, optionally
+  backed by Redis (``PERMISSION_CACHE_REDIS``) so workers share loads.
+
+Entries are stamped with an RBAC version. Any committed change to groups,
+roles, permissions or their junction rows bumps the version (see the session
+listener at the bottom of this module), which retires every cached entry at
+once. With Redis enabled the version is shared between processes and
+re-read at most once per ``VERSION_POLL_SECONDS``.
+"""
+
+import json
+import logging
+import time
+from collections import OrderedDict
+from threading import RLock
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import and_, event, select
+from sqlalchemy.orm import Session, object_session
+from sqlalchemy.orm.exc import UnmappedInstanceError
+
+from app.models.group import Group
+from app.models.permission import Permission
+from app.models.rbac_junctions import GroupRole, RolePermission, UserGroup
+from app.models.role import Role
+
+from .config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on memoized match decisions per compiled set; required codes come
+# from route declarations and menu rows, so this is rarely reached.
+_MAX_DECISIONS = 1024
+
+_REQUEST_ATTR = "_compiled_permissions"
+_VERSION_KEY = "rbac:version"
+
+
+class CompiledPermissions:
+    """
+    Immutable permission/role set with a precompiled wildcard matcher
+
+    Behaves like the ``set`` returned by ``User.get_permissions()`` for
+    membership and iteration, and adds ``matches()`` which honours ``*``
+    segments on the granted side (see ``dependencies.matches_permission``).
+    Wildcard grants are split into segment tuples once, grouped by segment
+    count, and match decisions are memoized per required code.
+    """
+
+    __slots__ = ("codes", "roles", "_wildcards", "_decisions")
+
+    def __init__(self, codes: Iterable[str], roles: Iterable[str] = ()):
+        self.codes: FrozenSet[str] = frozenset(codes)
+        self.roles: FrozenSet[str] = frozenset(roles)
+
+        wildcards: Dict[int, List[Tuple[Optional[str], ...]]] = {}
+        for code in self.codes:
+            if "*" in code:
+                segments = tuple(None if s == "*" else s for s in code.split(":"))
+                wildcards.setdefault(len(segments), []).append(segments)
+        self._wildcards = wildcards
+        self._decisions: Dict[str, bool] = {}
+
+    def __contains__(self, code) -> bool:
+        return code in self.codes
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.codes)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def matches(self, required_code: str) -> bool:
+        """Return True if any granted code (literal or wildcard) satisfies ``required_code``."""
+        decision = self._decisions.get(required_code)
+        if decision is None:
+            decision = self._match(required_code)
+            if len(self._decisions) < _MAX_DECISIONS:
+                self._decisions[required_code] = decision
+        return decision
+
+    def _match(self, required_code: str) -> bool:
+        if required_code in self.codes:
+            return True
+        if not self._wildcards:
+            return False
+        required = required_code.split(":")
+        for pattern in self._wildcards.get(len(required), ()):
+            if all(g is None or g == r for g, r in zip(pattern, required)):
+                return True
+        return False
+
+
+def load_permissions(user) -> CompiledPermissions:
+    """
+    Resolve a user's active role and permission codes (User -> Group -> Role ->
+    Permission, same rules as ``User.get_permissions``) in one query.
+
+    Falls back to the model methods for users not attached to a session.
+    ``CurrentUser`` proxies are resolved through their request session without
+    loading the User row.
+    """
+    from .principal import CurrentUser
+
+    if isinstance(user, CurrentUser):
+        session = user.db_session
+    else:
+        try:
+            session = object_session(user)
+        except UnmappedInstanceError:
+            session = None
+    if session is None:
+        codes = user.get_permissions() if hasattr(user, "get_permissions") else set()
+        roles = user.get_roles() if hasattr(user, "get_roles") else set()
+        return CompiledPermissions(codes, roles)
+
+    stmt = (
+        select(Role.code, Permission.code)
+        .select_from(UserGroup)
+        .join(Group, and_(Group.id == UserGroup.group_id, Group.is_active.is_(True)))
+        .join(GroupRole, GroupRole.group_id == Group.id)
+        .join(Role, and_(Role.id == GroupRole.role_id, Role.is_active.is_(True)))
+        .outerjoin(RolePermission, RolePermission.role_id == Role.id)
+        .outerjoin(Permission, and_(Permission.id == RolePermission.permission_id, Permission.is_active.is_(True)))
+        .where(UserGroup.user_id == user.id)
+    )
+    roles, codes = set(), set()
+    for role_code, permission_code in session.execute(stmt):
+        roles.add(role_code)
+        if permission_code:
+            codes.add(permission_code)
+    return CompiledPermissions(codes, roles)
+
+
+class PermissionCache:
+    """
+    Thread-safe LRU + TTL cache of CompiledPermissions keyed by user id
+
+    Cache Key Format: {user_id} -> (rbac_version, expires_at, compiled)
+    An entry is served only while its version equals the current RBAC version
+    and its TTL has not elapsed; the TTL bounds staleness for changes made
+    outside this process when Redis is not configured.
+    """
+
+    VERSION_POLL_SECONDS = 1.0
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: int = 300, use_redis: bool = False):
+        """
+        Initialize permission cache
+
+        Args:
+            max_entries: Maximum number of users kept in process (LRU eviction)
+            ttl_seconds: Time-to-live of an entry in seconds
+            use_redis: Share entries and the RBAC version through Redis
+        """
+        self._entries: "OrderedDict[str, Tuple[Tuple[int, int], float, CompiledPermissions]]" = OrderedDict()
+        self._lock = RLock()
+        self._max_entries = max_entries
+        self._ttl = ttl_seconds
+        self._use_redis = use_redis
+        self._local_version = 0
+        self._shared_version = 0
+        self._shared_checked_at = 0.0
+        self._hits = 0
+        self._misses = 0
+
+    # ------------------------------------------------------------------
+    # Versioning
+    # ------------------------------------------------------------------
+
+    @property
+    def version(self) -> Tuple[int, int]:
+        """Current RBAC version stamp: (shared Redis counter, local counter)."""
+        if self._use_redis:
+            now = time.monotonic()
+            if now - self._shared_checked_at >= self.VERSION_POLL_SECONDS:
+                self._shared_checked_at = now
+                redis = self._redis()
+                if redis is not None:
+                    raw = redis.get_cache(_VERSION_KEY)
+                    self._shared_version = int(raw) if raw else 0
+        return (self._shared_version, self._local_version)
+
+    def bump_version(self):
+        """Retire every cached entry (called after RBAC data changes)."""
+        with self._lock:
+            self._local_version += 1
+            self._entries.clear()
+        if self._use_redis:
+            redis = self._redis()
+            if redis is not None and redis.increment_cache(_VERSION_KEY) is not None:
+                self._shared_checked_at = 0.0
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    def get(self, user) -> CompiledPermissions:
+        """
+        Get the compiled permissions of ``user``, loading them on a miss
+
+        Args:
+            user: User instance
+
+        Returns:
+            CompiledPermissions for the user
+        """
+        version = self.version
+        stashed = getattr(user, "__dict__", {}).get(_REQUEST_ATTR)
+        if stashed is not None and stashed[0] == version:
+            return stashed[1]
+
+        key = str(user.id)
+        compiled = self._get_local(key, version)
+        if compiled is None:
+            compiled = self._get_shared(key, version)
+            if compiled is None:
+                compiled = load_permissions(user)
+                self._set_shared(key, version, compiled)
+            self._set_local(key, version, compiled)
+
+        try:
+            setattr(user, _REQUEST_ATTR, (version, compiled))
+        except AttributeError:
+            pass
+        return compiled
+
+    def invalidate(self, user_id: Optional[str] = None):
+        """
+        Drop cached entries in this process
+
+        Args:
+            user_id: If provided, drop only this user's entry
+        """
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(str(user_id), None)
+
+    def get_stats(self) -> dict:
+        """Get cache statistics"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self._max_entries,
+                "ttl_seconds": self._ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "version": list(self.version),
+                "redis": self._use_redis,
+            }
+
+    def _get_local(self, key: str, version) -> Optional[CompiledPermissions]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version or entry[1] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[2]
+
+    def _set_local(self, key: str, version, compiled: CompiledPermissions):
+        with self._lock:
+            if version != (self._shared_version, self._local_version):
+                # A bump happened while loading; don't resurrect stale data.
+                return
+            self._entries[key] = (version, time.monotonic() + self._ttl, compiled)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    # ------------------------------------------------------------------
+    # Redis tier
+    # ------------------------------------------------------------------
+
+    def _redis(self):
+        from .redis_client import get_redis
+
+        redis = get_redis()
+        return redis if redis.is_available else None
+
+    @staticmethod
+    def _shared_key(key: str, version) -> str:
+        # Only the shared counter is part of the key: the local counter is
+        # meaningless to other processes.
+        return f"rbac:perms:{version[0]}:{key}"
+
+    def _get_shared(self, key: str, version) -> Optional[CompiledPermissions]:
+        if not self._use_redis:
+            return None
+        redis = self._redis()
+        raw = redis.get_cache(self._shared_key(key, version)) if redis is not None else None
+        if not raw:
+            return None
+        try:
+            payload = json.loads(raw)
+            return CompiledPermissions(payload["p"], payload["r"])
+        except (ValueError, KeyError, TypeError):
+            return None
+
+    def _set_shared(self, key: str, version, compiled: CompiledPermissions):
+        if not self._use_redis:
+            return
+        redis = self._redis()
+        if redis is not None:
+            payload = json.dumps({"p": sorted(compiled.codes), "r": sorted(compiled.roles)})
+            redis.set_cache(self._shared_key(key, version), payload, ttl=self._ttl)
+
+
+_settings = get_settings()
+
+# Global permission cache instance
+permission_cache = PermissionCache(
+    max_entries=_settings.PERMISSION_CACHE_MAX_ENTRIES,
+    ttl_seconds=_settings.PERMISSION_CACHE_TTL_SECONDS,
+    use_redis=_settings.PERMISSION_CACHE_REDIS,
+)
+
+
+def get_permission_cache() -> PermissionCache:
+    """Get the global permission cache instance"""
+    return permission_cache
+
+
+def get_user_permissions(user) -> CompiledPermissions:
+    """Compiled permissions of ``user`` from the global cache."""
+    return permission_cache.get(user)
+
+
+# ----------------------------------------------------------------------
+# RBAC version bumps
+# ----------------------------------------------------------------------
+# Any flushed write to these tables (rbac router, module install/provisioning,
+# seeds) marks the session; the version is bumped only once the transaction
+# commits, so a concurrent reload can never cache pre-commit data under the new
+# version.
+
+_RBAC_MODELS = (Group, Role, Permission, UserGroup, GroupRole, RolePermission)
+_CHANGED_FLAG = "rbac_changed"
+
+
+def _on_after_flush(session, flush_context):
+    for state_set in (session.new, session.dirty, session.deleted):
+        for obj in state_set:
+            if isinstance(obj, _RBAC_MODELS):
+                session.info[_CHANGED_FLAG] = True
+                return
+
+
+def _on_after_commit(session):
+    if session.info.pop(_CHANGED_FLAG, False):
+        permission_cache.bump_version()
+
+
+def _on_after_soft_rollback(session, previous_transaction):
+    # A savepoint rollback leaves earlier flushes of the outer transaction in place
+    if not previous_transaction.nested:
+        session.info.pop(_CHANGED_FLAG, None)
+
+
+event.listen(Session, "after_flush", _on_after_flush)
+event.listen(Session, "after_commit", _on_after_commit)
+event.listen(Session, "after_soft_rollback", _on_after_soft_rollback)
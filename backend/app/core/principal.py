@@ -0,0 +1,246 @@
+"""
+Principal Cache - authenticated principal without a User SELECT per request
+
+``get_current_user`` used to load the ``User`` row on every authenticated
+request just to check ``is_active`` and the tenant claim. The fields the
+authorization path needs are few and rarely change, so they are cached as an
+immutable ``Principal`` keyed by (user_id, token iat) with a short TTL.
+
+Routes still receive something that behaves like the ORM ``User``: a
+``CurrentUser`` proxy serves the principal fields directly and loads the full
+row from the request's session on first access to anything else (including
+attribute writes), so existing code keeps working and only pays for the SELECT
+when it actually needs the row. Use ``orm_user()`` where a real mapped instance
+is required (``db.refresh``, relationship assignment).
+
+Entries are dropped when a ``User`` row is updated or deleted (session
+listener below) and when ``SessionManager`` terminates sessions; with Redis
+available the invalidation is broadcast to the other workers.
+"""
+
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import RLock
+from typing import Any, Hashable, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models.user import User
+
+from .config import get_settings
+from .permission_cache import CompiledPermissions, get_user_permissions
+from .redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "principal_invalidations"
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Slim, immutable view of an authenticated user"""
+
+    id: Any
+    tenant_id: Any
+    email: str
+    is_superuser: bool
+    is_active: bool
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            tenant_id=user.tenant_id,
+            email=user.email,
+            is_superuser=bool(user.is_superuser),
+            is_active=bool(user.is_active),
+        )
+
+
+class CurrentUser:
+    """
+    Request-bound stand-in for the authenticated ``User``
+
+    ``id``, ``tenant_id``, ``email``, ``is_superuser`` and ``is_active`` come
+    from the cached principal; every other attribute read or write is
+    delegated to the ORM row, loaded once from ``db_session`` on demand.
+    """
+
+    _PRINCIPAL_FIELDS = frozenset(("id", "tenant_id", "email", "is_superuser", "is_active"))
+
+    def __init__(self, principal: Principal, db: Session, user: Optional[User] = None):
+        object.__setattr__(self, "_principal", principal)
+        object.__setattr__(self, "_db", db)
+        object.__setattr__(self, "_user", user)
+
+    @property
+    def principal(self) -> Principal:
+        return self._principal
+
+    @property
+    def db_session(self) -> Session:
+        return self._db
+
+    @property
+    def permissions(self) -> CompiledPermissions:
+        """Compiled permissions from the RBAC permission cache (version-checked on every read)."""
+        return get_user_permissions(self)
+
+    @property
+    def user(self) -> User:
+        """The full ORM row (loaded from the request session on first access)."""
+        if self._user is None:
+            user = self._db.get(User, self._principal.id)
+            if user is None:
+                raise LookupError(f"User {self._principal.id} no longer exists")
+            object.__setattr__(self, "_user", user)
+        return self._user
+
+    def __getattribute__(self, name: str):
+        if name in CurrentUser._PRINCIPAL_FIELDS:
+            # Once the row is loaded it wins: it reflects writes made in this request
+            user = object.__getattribute__(self, "_user")
+            source = user if user is not None else object.__getattribute__(self, "_principal")
+            return getattr(source, name)
+        return object.__getattribute__(self, name)
+
+    def __getattr__(self, name: str):
+        # Only reached for names the proxy itself does not define
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return getattr(self.user, name)
+
+    def __setattr__(self, name: str, value):
+        if name.startswith("_"):
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self.user, name, value)
+
+    def __repr__(self):
+        return f"<CurrentUser(id={self._principal.id}, tenant_id={self._principal.tenant_id})>"
+
+
+def orm_user(user) -> User:
+    """Return the mapped ``User`` behind ``user`` (a CurrentUser proxy or a User)."""
+    return user.user if isinstance(user, CurrentUser) else user
+
+
+class PrincipalCache:
+    """
+    Thread-safe LRU + TTL cache of Principals keyed by (user_id, token iat)
+
+    Keying on iat means a freshly issued token never reuses an entry built for
+    an older one; user-level invalidation drops every token's entry.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: int = 30):
+        """
+        Initialize principal cache
+
+        Args:
+            max_entries: Maximum number of (user, token) entries (LRU eviction)
+            ttl_seconds: Time-to-live of an entry in seconds
+        """
+        self._entries: "OrderedDict[Tuple[str, Hashable], Tuple[float, Principal]]" = OrderedDict()
+        self._lock = RLock()
+        self._max_entries = max_entries
+        self._ttl = ttl_seconds
+        self._subscribed = False
+
+    def get(self, user_id: str, iat: Hashable) -> Optional[Principal]:
+        """Get a cached principal, or None if missing or expired"""
+        self._ensure_subscribed()
+        key = (str(user_id), iat)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, user_id: str, iat: Hashable, principal: Principal):
+        """Cache a principal"""
+        if self._ttl <= 0:
+            return
+        key = (str(user_id), iat)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self._ttl, principal)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: Optional[str] = None, broadcast: bool = True):
+        """
+        Drop cached principals
+
+        Args:
+            user_id: If provided, drop only this user's entries
+            broadcast: Also notify other workers through Redis pub/sub
+        """
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                user_id = str(user_id)
+                for key in [k for k in self._entries if k[0] == user_id]:
+                    del self._entries[key]
+        if broadcast and user_id is not None:
+            get_redis().publish(INVALIDATION_CHANNEL, user_id)
+
+    def _ensure_subscribed(self):
+        if not self._subscribed:
+            self._subscribed = True
+            if not get_redis().subscribe(INVALIDATION_CHANNEL, self._on_remote_invalidation):
+                self._subscribed = False
+
+    def _on_remote_invalidation(self, user_id: str):
+        self.invalidate(user_id, broadcast=False)
+
+
+_settings = get_settings()
+
+# Global principal cache instance
+principal_cache = PrincipalCache(
+    max_entries=_settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+    ttl_seconds=_settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+
+def get_principal_cache() -> PrincipalCache:
+    """Get the global principal cache instance"""
+    return principal_cache
+
+
+# ----------------------------------------------------------------------
+# Invalidation on User writes (deactivation, password change, tenant move, ...)
+# ----------------------------------------------------------------------
+
+_CHANGED_USERS = "principal_users_changed"
+
+
+def _on_after_flush(session, flush_context):
+    for state_set in (session.dirty, session.deleted):
+        for obj in state_set:
+            if isinstance(obj, User) and obj.id is not None:
+                session.info.setdefault(_CHANGED_USERS, set()).add(str(obj.id))
+
+
+def _on_after_commit(session):
+    for user_id in session.info.pop(_CHANGED_USERS, ()):
+        principal_cache.invalidate(user_id)
+
+
+def _on_after_soft_rollback(session, previous_transaction):
+    if not previous_transaction.nested:
+        session.info.pop(_CHANGED_USERS, None)
+
+
+event.listen(Session, "after_flush", _on_after_flush)
+event.listen(Session, "after_commit", _on_after_commit)
+event.listen(Session, "after_soft_rollback", _on_after_soft_rollback)
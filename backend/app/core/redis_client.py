@@ -1,4 +1,5 @@
-from typing import Optional
+import time
+from typing import Callable, Optional
 
 import redis
 
@@ -10,10 +11,23 @@ settings = get_settings()
 
 
 class RedisClient:
-    """Redis client wrapper for token revocation and caching"""
+    """Redis client wrapper for token revocation and caching
+
+    All callers share one connection pool (``REDIS_MAX_CONNECTIONS``). Health is
+    re-checked with PING at most every ``HEALTH_CHECK_SECONDS`` instead of on
+    every call, and a failed connect is not retried for ``RECONNECT_BACKOFF_SECONDS``
+    so an unreachable Redis costs the request path nothing.
+    """
+
+    HEALTH_CHECK_SECONDS = 5.0
+    RECONNECT_BACKOFF_SECONDS = 30.0
 
     def __init__(self):
         self._client: Optional[redis.Redis] = None
+        self._pool: Optional[redis.ConnectionPool] = None
+        self._healthy_until = 0.0
+        self._last_connect_attempt: Optional[float] = None
+        self._pubsub_threads = []
 
     def connect(self) -> bool:
         """
@@ -26,38 +40,63 @@ class RedisClient:
             logger.warning("Redis not configured, token revocation will be disabled")
             return False
 
+        now = time.monotonic()
+        if self._last_connect_attempt is not None and now - self._last_connect_attempt < self.RECONNECT_BACKOFF_SECONDS:
+            return False
+        self._last_connect_attempt = now
+
         try:
-            self._client = redis.from_url(
+            self._pool = redis.ConnectionPool.from_url(
                 settings.redis_url_computed,
                 decode_responses=True,
-                socket_connect_timeout=5,
+                max_connections=settings.REDIS_MAX_CONNECTIONS,
+                socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+                socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
             )
+            self._client = redis.Redis(connection_pool=self._pool)
             # Test connection
             self._client.ping()
+            self._healthy_until = now + self.HEALTH_CHECK_SECONDS
             logger.info("Successfully connected to Redis")
             return True
         except Exception as e:
             logger.error(f"Failed to connect to Redis: {e}")
             self._client = None
+            self._pool = None
             return False
 
     def disconnect(self):
         """Disconnect from Redis"""
+        for thread in self._pubsub_threads:
+            thread.stop()
+        self._pubsub_threads = []
         if self._client:
             self._client.close()
+            self._client = None
+            if self._pool:
+                self._pool.disconnect()
+                self._pool = None
             logger.info("Disconnected from Redis")
 
     @property
     def is_available(self) -> bool:
-        """Check if Redis is available"""
-        if not self._client:
+        """Check if Redis is available (connects lazily, PINGs at most every HEALTH_CHECK_SECONDS)"""
+        if not self._client and not self.connect():
             return False
+        now = time.monotonic()
+        if now < self._healthy_until:
+            return True
         try:
             self._client.ping()
+            self._healthy_until = now + self.HEALTH_CHECK_SECONDS
             return True
-        except:
+        except Exception:
             return False
 
+    def _mark_unhealthy(self):
+        """Force a PING before the next use after a failed command"""
+        self._healthy_until = 0.0
+
     def revoke_token(self, token_jti: str, expires_in: int) -> bool:
         """
         Revoke a JWT token by adding it to the revocation list.
@@ -74,8 +113,8 @@ class RedisClient:
             return False
 
         try:
-            key = f"revoked_token:{token_jti}"
-            self._client.setex(key, expires_in, "revoked")
+            key = f"blacklist:{token_jti}"
+            self._client.setex(key, expires_in, "1")
             logger.info(f"Token revoked: {token_jti}")
             return True
         except Exception as e:
@@ -97,10 +136,11 @@ class RedisClient:
             return False
 
         try:
-            key = f"revoked_token:{token_jti}"
+            key = f"blacklist:{token_jti}"
             return self._client.exists(key) > 0
         except Exception as e:
             logger.error(f"Failed to check token revocation: {e}")
+            self._mark_unhealthy()
             # If Redis fails, allow the token (fail open)
             return False
 
@@ -145,6 +185,182 @@ class RedisClient:
             logger.error(f"Failed to get cache: {e}")
             return None
 
+    def increment_cache(self, key: str) -> Optional[int]:
+        """
+        Atomically increment a cached counter.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            The new value, or None if Redis is unavailable
+        """
+        if not self.is_available:
+            return None
+
+        try:
+            return self._client.incr(f"cache:{key}")
+        except Exception as e:
+            logger.error(f"Failed to increment cache: {e}")
+            return None
+
+    # Trim expired holders, then take a slot if fewer than ``limit`` remain (atomic)
+    _ACQUIRE_SLOT_SCRIPT = """
+    redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[1])
+    if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[2]) then
+        return 0
+    end
+    redis.call('ZADD', KEYS[1], ARGV[4], ARGV[3])
+    if redis.call('TTL', KEYS[1]) < tonumber(ARGV[5]) then
+        redis.call('EXPIRE', KEYS[1], ARGV[5])
+    end
+    return 1
+    """
+
+    def acquire_lock(self, key: str, owner: str, ttl_seconds: float) -> Optional[bool]:
+        """
+        Take a lock that expires on its own (SET NX PX).
+
+        Args:
+            key: Lock name
+            owner: Value identifying the holder
+            ttl_seconds: Lifetime of the lock
+
+        Returns:
+            True if taken, False if held by someone else, None if Redis is unavailable
+        """
+        if not self.is_available:
+            return None
+
+        try:
+            return bool(self._client.set(f"lock:{key}", owner, nx=True, px=max(int(ttl_seconds * 1000), 1)))
+        except Exception as e:
+            logger.error(f"Failed to acquire lock {key}: {e}")
+            self._mark_unhealthy()
+            return None
+
+    def acquire_slot(self, key: str, member: str, limit: int, ttl_seconds: float) -> Optional[bool]:
+        """
+        Take one of ``limit`` shared slots (a distributed counting semaphore).
+
+        Holders are kept in a sorted set scored by expiry, so slots of a
+        process that died without releasing them free up after ``ttl_seconds``.
+
+        Args:
+            key: Semaphore name
+            member: Unique holder id (pass it to ``release_slot``)
+            limit: Number of slots
+            ttl_seconds: Lifetime of the slot
+
+        Returns:
+            True if taken, False if all slots are held, None if Redis is unavailable
+        """
+        if not self.is_available:
+            return None
+
+        now = time.time()
+        try:
+            taken = self._client.eval(
+                self._ACQUIRE_SLOT_SCRIPT,
+                1,
+                f"slots:{key}",
+                now,
+                limit,
+                member,
+                now + ttl_seconds,
+                max(int(ttl_seconds), 1),
+            )
+            return bool(taken)
+        except Exception as e:
+            logger.error(f"Failed to acquire slot {key}: {e}")
+            self._mark_unhealthy()
+            return None
+
+    def release_slot(self, key: str, member: str) -> bool:
+        """
+        Release a slot taken with ``acquire_slot``.
+
+        Returns:
+            True if successful, False otherwise
+        """
+        if not self.is_available:
+            return False
+
+        try:
+            self._client.zrem(f"slots:{key}", member)
+            return True
+        except Exception as e:
+            logger.error(f"Failed to release slot {key}: {e}")
+            self._mark_unhealthy()
+            return False
+
+    def publish(self, channel: str, message: str) -> bool:
+        """
+        Publish a message on a pub/sub channel.
+
+        Args:
+            channel: Channel name
+            message: Message payload
+
+        Returns:
+            True if successful, False otherwise
+        """
+        if not self.is_available:
+            return False
+
+        try:
+            self._client.publish(channel, message)
+            return True
+        except Exception as e:
+            logger.error(f"Failed to publish to {channel}: {e}")
+            self._mark_unhealthy()
+            return False
+
+    def subscribe(self, channel: str, handler: Callable[[str], None]) -> bool:
+        """
+        Call ``handler(message)`` for every message on ``channel`` from a daemon thread.
+
+        The thread survives a lost connection: it reconnects (the pub/sub
+        resubscribes on connect) once a second until Redis is back.
+        Messages published meanwhile are not delivered.
+
+        Args:
+            channel: Channel name
+            handler: Callback receiving the message payload
+
+        Returns:
+            True if the subscription thread was started, False otherwise
+        """
+        if not self.is_available:
+            return False
+
+        def _dispatch(message):
+            try:
+                handler(message["data"])
+            except Exception as e:
+                logger.error(f"Subscriber for {channel} failed: {e}")
+
+        def _reconnect(error, pubsub, thread):
+            # Without a handler the worker thread exits and the subscription is silently gone
+            logger.warning(f"Subscription to {channel} lost, reconnecting: {error}")
+            self._mark_unhealthy()
+            time.sleep(1.0)
+            try:
+                pubsub.connection.disconnect()
+                pubsub.connection.connect()
+                logger.info(f"Resubscribed to {channel}")
+            except Exception as e:
+                logger.debug(f"Reconnect for {channel} failed, retrying: {e}")
+
+        try:
+            pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(**{channel: _dispatch})
+            self._pubsub_threads.append(pubsub.run_in_thread(sleep_time=1.0, daemon=True, exception_handler=_reconnect))
+            return True
+        except Exception as e:
+            logger.error(f"Failed to subscribe to {channel}: {e}")
+            return False
+
     def delete_cache(self, key: str) -> bool:
         """
         Delete a cached value.
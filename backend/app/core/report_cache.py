@@ -0,0 +1,383 @@
+"""
+Report Cache - tiered report result cache with single-flight refresh
+
+``ReportService.execute_report`` used to read ``report_cache`` rows and commit
+a ``hit_count`` update on every hit, so each cache read was a database write.
+Results are now looked up in three tiers:
+
+1. an in-process LRU (per worker, no I/O);
+2. Redis (shared between workers, when available);
+3. the ``report_cache`` table (survives restarts and Redis flushes).
+
+A hit in a lower tier is promoted into the tiers above it. Hit counts are
+accumulated in memory and written to ``report_cache.hit_count`` by a
+background thread every ``REPORT_CACHE_HIT_FLUSH_SECONDS``.
+
+Misses go through a single-flight gate: concurrent requests for the same key
+in one process share one query execution. Entries stay servable for
+``REPORT_CACHE_STALE_SECONDS`` after they expire; a stale hit is returned
+immediately while one background refresh recomputes the result.
+
+Results are normalized to plain JSON types before caching so every tier
+returns the same shape; callers must treat them as read-only.
+"""
+
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from threading import RLock
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from sqlalchemy import bindparam, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.models.report import ReportCache
+
+from .config import get_settings
+from .redis_client import get_redis
+from .scope import apply_tenant_scope_by_id
+
+logger = logging.getLogger(__name__)
+
+Result = Dict[str, Any]
+Loader = Callable[[Session], Result]
+
+_REDIS_PREFIX = "report:"
+_EPOCH = datetime(1970, 1, 1)
+
+
+class _Flight:
+    """One in-progress computation that concurrent callers wait on"""
+
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[Result] = None
+        self.error: Optional[BaseException] = None
+
+
+class ReportResultCache:
+    """
+    Thread-safe three-tier cache of report results keyed by cache key
+
+    Cache Key Format: report_{tenant_id}_{report_id}_{sha256(version, parameters)}
+    In-process entry: key -> (result, fresh_until, stale_until), wall-clock seconds
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: int = 3600,
+        stale_seconds: int = 300,
+        max_entries: int = 500,
+        max_rows: int = 10000,
+        hit_flush_seconds: float = 10.0,
+        use_redis: bool = True,
+        wait_timeout_seconds: float = 60.0,
+    ):
+        """
+        Initialize report result cache
+
+        Args:
+            ttl_seconds: How long a computed result is fresh
+            stale_seconds: How long after expiry a result may still be served while it is refreshed
+            max_entries: Maximum in-process entries (LRU eviction)
+            max_rows: Results with more rows are not kept in memory or Redis (database tier only)
+            hit_flush_seconds: Interval at which accumulated hit counts are written to the database
+            use_redis: Use Redis as the shared second tier
+            wait_timeout_seconds: How long a caller waits on another caller's computation
+                before running the query itself
+        """
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self._max_entries = max_entries
+        self._max_rows = max_rows
+        self._hit_flush_seconds = hit_flush_seconds
+        self._use_redis = use_redis
+        self._wait_timeout = wait_timeout_seconds
+
+        self._entries: "OrderedDict[str, Tuple[Result, float, float]]" = OrderedDict()
+        self._flights: Dict[str, _Flight] = {}
+        self._lock = RLock()
+
+        self._pending_hits: Dict[Tuple[Engine, str], int] = {}
+        self._hits_lock = threading.Lock()
+        self._flusher: Optional[threading.Thread] = None
+        self._refresh_pool: Optional[ThreadPoolExecutor] = None
+
+        self._stats = {"memory_hits": 0, "redis_hits": 0, "db_hits": 0, "stale_hits": 0, "misses": 0, "loads": 0}
+
+    def get_or_load(self, db: Session, tenant_id, report_id, key: str, loader: Loader) -> Tuple[Result, bool]:
+        """
+        Return the cached result for ``key``, computing it with ``loader`` on a miss
+
+        Args:
+            db: Request session; its engine is used for the database tier
+            tenant_id: Tenant the result belongs to
+            report_id: Report definition ID
+            key: Cache key (see ``ReportService._generate_cache_key``)
+            loader: Computes the result from a session; must not rely on objects
+                loaded in ``db`` because stale refreshes run on another thread
+
+        Returns:
+            (result, served_from_cache)
+        """
+        bind = db.get_bind()
+        now = time.time()
+
+        entry = self._lookup(db, tenant_id, report_id, key, now)
+        if entry is not None:
+            result, fresh_until, _ = entry
+            self._record_hit(bind, key)
+            if now >= fresh_until:
+                self._count("stale_hits")
+                self._refresh_in_background(bind, tenant_id, report_id, key, loader)
+            return result, True
+
+        self._count("misses")
+        return self._single_flight(key, lambda: self._load(db, tenant_id, report_id, key, loader)), False
+
+    def invalidate(self, key_prefix: str = ""):
+        """
+        Drop in-process entries whose key starts with ``key_prefix`` (all when empty)
+
+        Redis and database entries are not touched; keys embed the report
+        definition's version, so edited reports miss naturally.
+        """
+        with self._lock:
+            for key in [k for k in self._entries if k.startswith(key_prefix)]:
+                del self._entries[key]
+
+    def flush_hits(self):
+        """Write accumulated hit counts to ``report_cache.hit_count``."""
+        with self._hits_lock:
+            pending, self._pending_hits = self._pending_hits, {}
+        by_bind: Dict[Engine, list] = {}
+        for (bind, key), hits in pending.items():
+            by_bind.setdefault(bind, []).append({"k": key, "n": hits})
+
+        stmt = (
+            update(ReportCache)
+            .where(ReportCache.cache_key == bindparam("k"))
+            .values(hit_count=ReportCache.hit_count + bindparam("n"))
+        )
+        for bind, params in by_bind.items():
+            try:
+                with bind.begin() as conn:
+                    conn.execute(stmt, params)
+            except Exception as e:
+                logger.warning(f"Failed to flush {len(params)} report cache hit counts: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        with self._lock:
+            return {"size": len(self._entries), "max_entries": self._max_entries, **self._stats}
+
+    # ------------------------------------------------------------------
+    # Tiers
+    # ------------------------------------------------------------------
+
+    def _lookup(self, db: Session, tenant_id, report_id, key: str, now: float):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now < entry[2]:
+                    self._entries.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    return entry
+                del self._entries[key]
+
+        entry = self._redis_get(key, now)
+        if entry is not None:
+            self._count("redis_hits")
+            self._remember(key, entry)
+            return entry
+
+        entry = self._db_get(db, tenant_id, report_id, key, now)
+        if entry is not None:
+            self._count("db_hits")
+            self._remember(key, entry)
+            self._redis_set(key, entry, now)
+        return entry
+
+    def _remember(self, key: str, entry: Tuple[Result, float, float]):
+        if len(entry[0].get("data") or ()) > self._max_rows:
+            return
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def _redis_get(self, key: str, now: float):
+        if not self._use_redis:
+            return None
+        raw = get_redis().get_cache(_REDIS_PREFIX + key)
+        if not raw:
+            return None
+        try:
+            payload = json.loads(raw)
+        except ValueError:
+            return None
+        if now >= payload["stale_until"]:
+            return None
+        return payload["result"], payload["fresh_until"], payload["stale_until"]
+
+    def _redis_set(self, key: str, entry: Tuple[Result, float, float], now: float):
+        result, fresh_until, stale_until = entry
+        if not self._use_redis or len(result.get("data") or ()) > self._max_rows:
+            return
+        ttl = int(stale_until - now) + 1
+        if ttl > 0:
+            payload = {"result": result, "fresh_until": fresh_until, "stale_until": stale_until}
+            get_redis().set_cache(_REDIS_PREFIX + key, json.dumps(payload), ttl=ttl)
+
+    def _db_get(self, db: Session, tenant_id, report_id, key: str, now: float):
+        if tenant_id is None:
+            return None  # report_cache rows are tenant-scoped
+        stale_cutoff = datetime.utcfromtimestamp(now) - timedelta(seconds=self.stale_seconds)
+        row = (
+            apply_tenant_scope_by_id(db.query(ReportCache.cached_data, ReportCache.expires_at), ReportCache, tenant_id)
+            .filter(
+                ReportCache.report_definition_id == report_id,
+                ReportCache.cache_key == key,
+                ReportCache.expires_at > stale_cutoff,
+            )
+            .first()
+        )
+        if row is None or row.cached_data is None:
+            return None
+        fresh_until = (row.expires_at - _EPOCH).total_seconds()
+        return row.cached_data, fresh_until, fresh_until + self.stale_seconds
+
+    def _db_set(self, bind: Engine, tenant_id, report_id, key: str, result: Result, fresh_until: float):
+        if tenant_id is None:
+            return
+        expires_at = datetime.utcfromtimestamp(fresh_until)
+        with Session(bind=bind) as session:
+            entry = session.query(ReportCache).filter(ReportCache.cache_key == key).first()
+            if entry is None:
+                entry = ReportCache(
+                    id=uuid.uuid4(),
+                    tenant_id=tenant_id,
+                    report_definition_id=report_id,
+                    cache_key=key,
+                    parameters_hash=key.rsplit("_", 1)[-1],
+                    hit_count=0,
+                )
+                session.add(entry)
+            entry.cached_data = result
+            entry.row_count = result.get("row_count", 0)
+            entry.expires_at = expires_at
+            session.commit()
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def _load(self, db: Session, tenant_id, report_id, key: str, loader: Loader) -> Result:
+        result = _jsonable(loader(db))
+        self._count("loads")
+        now = time.time()
+        entry = (result, now + self.ttl_seconds, now + self.ttl_seconds + self.stale_seconds)
+        self._remember(key, entry)
+        self._redis_set(key, entry, now)
+        try:
+            self._db_set(db.get_bind(), tenant_id, report_id, key, result, entry[1])
+        except Exception as e:
+            # The result is still served from the upper tiers
+            logger.warning(f"Failed to persist report cache entry {key}: {e}")
+        return result
+
+    def _single_flight(self, key: str, compute: Callable[[], Result]) -> Result:
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            if flight.done.wait(self._wait_timeout):
+                if flight.error is not None:
+                    raise flight.error
+                return flight.result
+            logger.warning(f"Timed out waiting for report computation {key}, running it separately")
+            return compute()
+
+        try:
+            flight.result = compute()
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def _refresh_in_background(self, bind: Engine, tenant_id, report_id, key: str, loader: Loader):
+        with self._lock:
+            if key in self._flights:
+                return
+            if self._refresh_pool is None:
+                self._refresh_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="report-cache-refresh")
+
+        def _refresh():
+            with Session(bind=bind) as session:
+                try:
+                    self._single_flight(key, lambda: self._load(session, tenant_id, report_id, key, loader))
+                except Exception as e:
+                    logger.warning(f"Background refresh of report cache entry {key} failed: {e}")
+
+        self._refresh_pool.submit(_refresh)
+
+    # ------------------------------------------------------------------
+    # Hit counts
+    # ------------------------------------------------------------------
+
+    def _record_hit(self, bind: Engine, key: str):
+        with self._hits_lock:
+            self._pending_hits[(bind, key)] = self._pending_hits.get((bind, key), 0) + 1
+        if self._flusher is None or not self._flusher.is_alive():
+            with self._hits_lock:
+                if self._flusher is None or not self._flusher.is_alive():
+                    self._flusher = threading.Thread(target=self._flush_loop, name="report-cache-hits", daemon=True)
+                    self._flusher.start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self._hit_flush_seconds)
+            self.flush_hits()
+
+    def _count(self, stat: str):
+        with self._lock:
+            self._stats[stat] += 1
+
+
+def _jsonable(result: Result) -> Result:
+    """Round-trip through JSON so dates/decimals/UUIDs look the same in every tier"""
+    return json.loads(json.dumps(result, default=str))
+
+
+_settings = get_settings()
+
+# Global report result cache instance
+report_cache = ReportResultCache(
+    ttl_seconds=_settings.REPORT_CACHE_TTL_SECONDS,
+    stale_seconds=_settings.REPORT_CACHE_STALE_SECONDS,
+    max_entries=_settings.REPORT_CACHE_MAX_ENTRIES,
+    max_rows=_settings.REPORT_CACHE_MAX_ROWS,
+    hit_flush_seconds=_settings.REPORT_CACHE_HIT_FLUSH_SECONDS,
+    use_redis=_settings.REPORT_CACHE_REDIS,
+)
+
+
+def get_report_cache() -> ReportResultCache:
+    """Get the global report result cache instance"""
+    return report_cache
@@ -0,0 +1,303 @@
+"""
+Schema Catalog - process-wide cache of physical table metadata
+
+Report validation, lookup queries, migration diffing and runtime model
+generation all need the real columns (and sometimes indexes) of a table.
+Querying ``information_schema`` for each of them is slow on large catalogs,
+so this module keeps a snapshot per database schema, keyed by (schema, table).
+
+A snapshot is loaded in bulk: one ``pg_catalog`` query returns the columns of
+every table and view in the schema; indexes are loaded the same way the first
+time they are asked for. Snapshots expire after ``SCHEMA_CATALOG_TTL_SECONDS``
+(catching DDL made outside the application, e.g. Alembic) and are dropped when
+``DataModelService`` runs migration DDL: ``invalidate_after_commit`` drops the
+schema here once the transaction commits and, with Redis available, in every
+other worker through pub/sub.
+
+Column info mirrors ``information_schema.columns`` (``data_type`` upper-cased,
+``ARRAY`` / ``USER-DEFINED`` for arrays and custom types) so callers comparing
+types keep working. Non-PostgreSQL databases fall back to SQLAlchemy inspection.
+"""
+
+import json
+import logging
+import time
+from threading import Lock, RLock
+from typing import Any, Dict, FrozenSet, Optional
+
+from sqlalchemy import event, inspect, text
+from sqlalchemy.orm import Session
+
+from .config import get_settings
+from .redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "schema_catalog_invalidations"
+
+_COLUMNS_SQL = text("""
+    SELECT
+        c.relname AS table_name,
+        a.attname AS column_name,
+        CASE
+            WHEN t.typcategory = 'A' THEN 'ARRAY'
+            WHEN t.typtype = 'd' THEN format_type(t.typbasetype, NULL)
+            WHEN t.typtype IN ('e', 'c', 'r', 'm') THEN 'USER-DEFINED'
+            ELSE format_type(a.atttypid, NULL)
+        END AS data_type,
+        NOT a.attnotnull AS is_nullable,
+        pg_get_expr(d.adbin, d.adrelid) AS column_default,
+        CASE
+            WHEN a.atttypid IN ('varchar'::regtype, 'bpchar'::regtype) AND a.atttypmod > 0 THEN a.atttypmod - 4
+        END AS character_maximum_length
+    FROM pg_catalog.pg_attribute a
+    JOIN pg_catalog.pg_class c ON c.oid = a.attrelid
+    JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+    JOIN pg_catalog.pg_type t ON t.oid = a.atttypid
+    LEFT JOIN pg_catalog.pg_attrdef d ON d.adrelid = a.attrelid AND d.adnum = a.attnum
+    WHERE n.nspname = :schema
+      AND c.relkind IN ('r', 'p', 'v', 'm', 'f')
+      AND a.attnum > 0
+      AND NOT a.attisdropped
+    ORDER BY c.relname, a.attnum
+""")
+
+_INDEXES_SQL = text("""
+    SELECT
+        t.relname AS table_name,
+        i.relname AS index_name,
+        a.attname AS column_name,
+        ix.indisunique AS is_unique
+    FROM pg_catalog.pg_index ix
+    JOIN pg_catalog.pg_class t ON t.oid = ix.indrelid
+    JOIN pg_catalog.pg_class i ON i.oid = ix.indexrelid
+    JOIN pg_catalog.pg_namespace n ON n.oid = t.relnamespace
+    CROSS JOIN LATERAL unnest(ix.indkey::int2[]) WITH ORDINALITY AS k(attnum, position)
+    JOIN pg_catalog.pg_attribute a ON a.attrelid = t.oid AND a.attnum = k.attnum
+    WHERE n.nspname = :schema
+      AND t.relkind IN ('r', 'p')
+    ORDER BY t.relname, i.relname, k.position
+""")
+
+
+class _SchemaSnapshot:
+    """Metadata of every table in one schema, as loaded at ``loaded_at``"""
+
+    __slots__ = ("columns", "column_names", "indexes", "loaded_at")
+
+    def __init__(self, columns: Dict[str, Dict[str, Dict[str, Any]]]):
+        self.columns = columns
+        self.column_names: Dict[str, FrozenSet[str]] = {table: frozenset(cols) for table, cols in columns.items()}
+        self.indexes: Optional[Dict[str, Dict[str, Dict[str, Any]]]] = None
+        self.loaded_at = time.monotonic()
+
+
+class SchemaCatalog:
+    """
+    Thread-safe cache of table columns and indexes, keyed by (schema, table)
+
+    Returned mappings are shared between callers and must not be modified.
+    A table that is not in the snapshot does not exist (empty result).
+    """
+
+    def __init__(self, ttl_seconds: int = 300):
+        """
+        Initialize schema catalog
+
+        Args:
+            ttl_seconds: Age after which a schema snapshot is reloaded (0 = never cache)
+        """
+        self._ttl_seconds = ttl_seconds
+        self._snapshots: Dict[str, _SchemaSnapshot] = {}
+        self._lock = RLock()
+        self._load_locks: Dict[str, Lock] = {}
+        self._loads = 0
+        self._hits = 0
+        self._subscribed = False
+
+    def get_columns(self, db: Session, table_name: str, schema: str = "public") -> Dict[str, Dict[str, Any]]:
+        """
+        Columns of a table: name -> {data_type, is_nullable, column_default, character_maximum_length}
+
+        Returns an empty mapping if the table does not exist.
+        """
+        return self._snapshot(db, schema).columns.get(table_name, {})
+
+    def get_column_names(self, db: Session, table_name: str, schema: str = "public") -> FrozenSet[str]:
+        """Column names of a table (empty if the table does not exist)"""
+        return self._snapshot(db, schema).column_names.get(table_name, frozenset())
+
+    def get_indexes(self, db: Session, table_name: str, schema: str = "public") -> Dict[str, Dict[str, Any]]:
+        """Indexes of a table: name -> {columns (in key order), is_unique}"""
+        snapshot = self._snapshot(db, schema)
+        if snapshot.indexes is None:
+            with self._load_lock(schema):
+                if snapshot.indexes is None:
+                    snapshot.indexes = self._load_indexes(db, schema)
+        return snapshot.indexes.get(table_name, {})
+
+    def table_exists(self, db: Session, table_name: str, schema: str = "public") -> bool:
+        """Whether the table (or view) exists"""
+        return table_name in self._snapshot(db, schema).columns
+
+    def invalidate(self, schema: Optional[str] = None, broadcast: bool = False):
+        """
+        Drop cached metadata
+
+        Args:
+            schema: If provided, drop only this schema's snapshot
+            broadcast: Also notify other workers through Redis pub/sub
+        """
+        with self._lock:
+            if schema is None:
+                self._snapshots.clear()
+            else:
+                self._snapshots.pop(schema, None)
+
+        if broadcast:
+            get_redis().publish(INVALIDATION_CHANNEL, json.dumps({"schema": schema}))
+
+    def get_stats(self) -> dict:
+        """Get catalog statistics"""
+        with self._lock:
+            return {
+                "schemas": {schema: len(snap.columns) for schema, snap in self._snapshots.items()},
+                "loads": self._loads,
+                "hits": self._hits,
+                "ttl_seconds": self._ttl_seconds,
+            }
+
+    def _snapshot(self, db: Session, schema: str) -> _SchemaSnapshot:
+        self._ensure_subscribed()
+        snapshot = self._fresh(schema)
+        if snapshot is not None:
+            return snapshot
+        # One loader per schema; concurrent callers wait for its result
+        with self._load_lock(schema):
+            snapshot = self._fresh(schema)
+            if snapshot is None:
+                snapshot = _SchemaSnapshot(self._load_columns(db, schema))
+                with self._lock:
+                    self._snapshots[schema] = snapshot
+                    self._loads += 1
+            return snapshot
+
+    def _fresh(self, schema: str) -> Optional[_SchemaSnapshot]:
+        with self._lock:
+            snapshot = self._snapshots.get(schema)
+            if snapshot is None or time.monotonic() - snapshot.loaded_at >= self._ttl_seconds:
+                return None
+            self._hits += 1
+            return snapshot
+
+    def _load_lock(self, schema: str) -> Lock:
+        with self._lock:
+            return self._load_locks.setdefault(schema, Lock())
+
+    @staticmethod
+    def _load_columns(db: Session, schema: str) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        tables: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        if db.get_bind().dialect.name != "postgresql":
+            inspector, schema = inspect(db.connection()), _inspect_schema(db, schema)
+            for table in inspector.get_table_names(schema=schema) + inspector.get_view_names(schema=schema):
+                tables[table] = {
+                    col["name"]: {
+                        "data_type": str(col["type"]).upper(),
+                        "is_nullable": bool(col.get("nullable", True)),
+                        "column_default": col.get("default"),
+                        "character_maximum_length": getattr(col["type"], "length", None),
+                    }
+                    for col in inspector.get_columns(table, schema=schema)
+                }
+            return tables
+
+        for row in db.execute(_COLUMNS_SQL, {"schema": schema}):
+            tables.setdefault(row.table_name, {})[row.column_name] = {
+                "data_type": row.data_type.upper(),
+                "is_nullable": row.is_nullable,
+                "column_default": row.column_default,
+                "character_maximum_length": row.character_maximum_length,
+            }
+        return tables
+
+    @staticmethod
+    def _load_indexes(db: Session, schema: str) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        tables: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        if db.get_bind().dialect.name != "postgresql":
+            inspector, schema = inspect(db.connection()), _inspect_schema(db, schema)
+            for table in inspector.get_table_names(schema=schema):
+                tables[table] = {
+                    idx["name"]: {"columns": list(idx["column_names"]), "is_unique": bool(idx["unique"])}
+                    for idx in inspector.get_indexes(table, schema=schema)
+                }
+            return tables
+
+        for row in db.execute(_INDEXES_SQL, {"schema": schema}):
+            index = tables.setdefault(row.table_name, {}).setdefault(
+                row.index_name, {"columns": [], "is_unique": row.is_unique}
+            )
+            index["columns"].append(row.column_name)
+        return tables
+
+    def _ensure_subscribed(self):
+        if not self._subscribed:
+            self._subscribed = True
+            if not get_redis().subscribe(INVALIDATION_CHANNEL, self._on_remote_invalidation):
+                self._subscribed = False
+
+    def _on_remote_invalidation(self, message: str):
+        try:
+            payload = json.loads(message)
+        except ValueError:
+            logger.warning(f"Ignoring malformed schema catalog invalidation: {message!r}")
+            return
+        self.invalidate(payload.get("schema"), broadcast=False)
+
+
+def _inspect_schema(db: Session, schema: str) -> Optional[str]:
+    # SQLite has no "public" schema; its default schema is "main"
+    return None if schema == "public" and db.get_bind().dialect.name == "sqlite" else schema
+
+
+_settings = get_settings()
+
+# Global schema catalog instance
+_schema_catalog = SchemaCatalog(ttl_seconds=_settings.SCHEMA_CATALOG_TTL_SECONDS)
+
+
+def get_schema_catalog() -> SchemaCatalog:
+    """Get the global schema catalog instance"""
+    return _schema_catalog
+
+
+# ----------------------------------------------------------------------
+# DDL invalidation (applied once the transaction commits)
+# ----------------------------------------------------------------------
+
+_PENDING_INVALIDATIONS = "schema_catalog_pending_invalidations"
+
+
+def invalidate_after_commit(db: Session, schema: str = "public") -> None:
+    """
+    Drop the cached metadata of ``schema`` when ``db`` commits
+
+    Call this next to any DDL run through ``db``. PostgreSQL DDL is
+    transactional, so dropping the snapshot earlier could let another request
+    reload the old definition before the change is visible.
+    """
+    db.info.setdefault(_PENDING_INVALIDATIONS, set()).add(schema)
+
+
+def _on_after_commit(session):
+    for schema in session.info.pop(_PENDING_INVALIDATIONS, ()):
+        _schema_catalog.invalidate(schema, broadcast=True)
+        logger.info(f"Schema catalog invalidated for schema={schema}")
+
+
+def _on_after_soft_rollback(session, previous_transaction):
+    if not previous_transaction.nested:
+        session.info.pop(_PENDING_INVALIDATIONS, None)
+
+
+event.listen(Session, "after_commit", _on_after_commit)
+event.listen(Session, "after_soft_rollback", _on_after_soft_rollback)
@@ -14,6 +14,7 @@ from typing import List, Optional
 from sqlalchemy.orm import Session
 
 from app.core.config import ACCESS_TOKEN_EXPIRE_MIN
+from app.core.principal import principal_cache
 from app.core.security_config import SecurityConfigService
 from app.models.user import User
 from app.models.user_session import UserSession
@@ -164,6 +165,7 @@ class SessionManager:
         if session:
             session.revoked_at = datetime.utcnow()
             self.db.commit()
+            principal_cache.invalidate(session.user_id)
             return True
 
         return False
@@ -199,6 +201,7 @@ class SessionManager:
             revoked_count += 1
 
         self.db.commit()
+        principal_cache.invalidate(user.id)
         return revoked_count
 
     def revoke_all_trusted_devices(self, user: User, reason: Optional[str] = None) -> int:
@@ -0,0 +1,186 @@
+"""
+Token Revocation - revoked-JTI checks for get_current_user
+
+Every authenticated request has to prove its access token was not revoked
+(logout). Checking Redis or the ``token_blacklist`` table each time costs a
+network round trip per request even though almost no token is ever revoked.
+
+``RevocationChecker`` keeps a bloom filter of the currently revoked JTIs in
+process. A JTI the filter has never seen is definitely not revoked, so the
+common case is answered in memory. Only filter hits (real revocations and the
+~0.1% false positives) fall through to the exact check: the pooled
+``RedisClient`` first, then the ``token_blacklist`` table.
+
+The filter is rebuilt from ``token_blacklist`` (unexpired rows only) every
+``TOKEN_REVOCATION_SYNC_SECONDS``. Revocations in this process are added
+immediately; with Redis available they are also published on a pub/sub channel
+so every other worker adds them immediately too.
+"""
+
+import hashlib
+import logging
+import math
+import time
+from datetime import datetime
+from threading import Lock
+from typing import Iterable, Optional, Set
+
+from sqlalchemy.orm import Session
+
+from ..models.token_blacklist import TokenBlacklist
+from .config import get_settings
+from .redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+REVOCATION_CHANNEL = "token_revocations"
+
+
+class BloomFilter:
+    """
+    Fixed-size bloom filter over strings
+
+    Sized for ``capacity`` items at ``error_rate`` false positives; never gives
+    false negatives. Bit positions use double hashing of one BLAKE2b digest.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(capacity, 1)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, item: str):
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+class RevocationChecker:
+    """
+    Bloom-filter negative cache in front of the exact revocation checks
+
+    Thread-safe; one global instance serves all requests of a worker.
+    """
+
+    def __init__(self, sync_seconds: int = 10, capacity: int = 100000):
+        """
+        Initialize revocation checker
+
+        Args:
+            sync_seconds: Maximum age of the filter before it is rebuilt from token_blacklist
+            capacity: Expected number of concurrently revoked (unexpired) tokens
+        """
+        self._sync_seconds = sync_seconds
+        self._capacity = capacity
+        self._filter: Optional[BloomFilter] = None
+        self._synced_at = 0.0
+        self._sync_lock = Lock()
+        self._refresh_lock = Lock()
+        self._added_during_sync: Set[str] = set()
+        self._subscribed = False
+
+    def is_revoked(self, jti: str, db: Session) -> bool:
+        """
+        Check whether a token has been revoked
+
+        Args:
+            jti: The JWT ID (jti) claim from the token
+            db: Database session used for the filter sync and the exact fallback
+
+        Returns:
+            True if the token is revoked
+        """
+        bloom = self._current_filter(db)
+        if bloom is not None and jti not in bloom:
+            return False
+        return self._is_revoked_exact(jti, db)
+
+    def revoke(self, jti: str, expires_in: int) -> None:
+        """
+        Record a revocation already committed to token_blacklist
+
+        Adds the JTI to this worker's filter, mirrors it into Redis for the
+        exact check and publishes it to the other workers (Redis failures are
+        non-fatal: the periodic sync picks the row up from the database).
+
+        Args:
+            jti: The JWT ID (jti) claim from the token
+            expires_in: Seconds until the token expires
+        """
+        self._add(jti)
+        if expires_in <= 0:
+            return
+        redis = get_redis()
+        if redis.revoke_token(jti, expires_in):
+            redis.publish(REVOCATION_CHANNEL, jti)
+
+    def load(self, jtis: Iterable[str]) -> None:
+        """Replace the filter with one containing exactly ``jtis`` (plus concurrent additions)."""
+        bloom = BloomFilter(self._capacity)
+        for jti in jtis:
+            bloom.add(jti)
+        with self._sync_lock:
+            for jti in self._added_during_sync:
+                bloom.add(jti)
+            self._added_during_sync.clear()
+            self._filter = bloom
+            self._synced_at = time.monotonic()
+
+    def _add(self, jti: str):
+        with self._sync_lock:
+            self._added_during_sync.add(jti)
+            if self._filter is not None:
+                self._filter.add(jti)
+
+    def _current_filter(self, db: Session) -> Optional[BloomFilter]:
+        if self._filter is not None and time.monotonic() - self._synced_at < self._sync_seconds:
+            return self._filter
+        if not self._refresh_lock.acquire(blocking=False):
+            # Another request is rebuilding; the previous filter (if any) is
+            # at most one sync interval stale.
+            return self._filter
+        try:
+            self._ensure_subscribed()
+            rows = db.query(TokenBlacklist.jti).filter(TokenBlacklist.expires_at > datetime.utcnow()).all()
+            self.load(row[0] for row in rows)
+            return self._filter
+        except Exception as e:
+            logger.warning(f"Revocation filter sync failed, using exact checks: {e}")
+            db.rollback()
+            return None
+        finally:
+            self._refresh_lock.release()
+
+    def _ensure_subscribed(self):
+        if not self._subscribed:
+            self._subscribed = get_redis().subscribe(REVOCATION_CHANNEL, self._add)
+
+    @staticmethod
+    def _is_revoked_exact(jti: str, db: Session) -> bool:
+        # Redis first, DB fallback
+        if get_redis().is_token_revoked(jti):
+            return True
+        return bool(db.query(TokenBlacklist.jti).filter(TokenBlacklist.jti == jti).first())
+
+
+_settings = get_settings()
+
+# Global revocation checker instance
+revocation_checker = RevocationChecker(
+    sync_seconds=_settings.TOKEN_REVOCATION_SYNC_SECONDS,
+    capacity=_settings.TOKEN_REVOCATION_BLOOM_CAPACITY,
+)
+
+
+def get_revocation_checker() -> RevocationChecker:
+    """Get the global revocation checker instance"""
+    return revocation_checker
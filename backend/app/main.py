@@ -184,6 +184,53 @@ async def lifespan(app: FastAPI):
             notification_worker = None
             notification_worker_thread = None
 
+    # Optional in-process automation worker (queued database-trigger rules)
+    automation_worker = None
+    automation_worker_thread = None
+    if settings_instance.AUTOMATION_WORKER_INPROCESS:
+        try:
+            import threading
+
+            from app.workers.automation_worker import from_settings as automation_worker_from_settings
+
+            automation_worker = automation_worker_from_settings()
+            automation_worker_thread = threading.Thread(
+                target=automation_worker.run,
+                kwargs={"setup_signals": False},
+                daemon=True,
+                name="automation-worker",
+            )
+            automation_worker_thread.start()
+            logger.info("automation-worker started in-process (AUTOMATION_WORKER_INPROCESS=true)")
+        except Exception as e:
+            logger.error(f"Failed to start in-process automation worker: {e}", exc_info=True)
+            automation_worker = None
+            automation_worker_thread = None
+
+    # Optional in-process report export worker threads (?mode=async exports)
+    report_export_worker = None
+    if settings_instance.REPORT_EXPORT_WORKERS > 0:
+        try:
+            from app.workers.report_export_worker import from_settings as report_export_worker_from_settings
+
+            report_export_worker = report_export_worker_from_settings()
+            report_export_worker.start()
+        except Exception as e:
+            logger.error(f"Failed to start in-process report export worker: {e}", exc_info=True)
+            report_export_worker = None
+
+    # Optional in-process entity migration worker threads (online nocode schema changes)
+    entity_migration_worker = None
+    if settings_instance.ENTITY_MIGRATION_WORKERS > 0:
+        try:
+            from app.workers.entity_migration_worker import from_settings as entity_migration_worker_from_settings
+
+            entity_migration_worker = entity_migration_worker_from_settings()
+            entity_migration_worker.start()
+        except Exception as e:
+            logger.error(f"Failed to start in-process entity migration worker: {e}", exc_info=True)
+            entity_migration_worker = None
+
     # Install ORM tenant-scope listener (T-22.005).
     # Installed LAST in startup — after tenant_scoped_session is live on all
     # tenant routes (T-22.009) — to prevent HTTP 500 storms on unscoped requests.
@@ -217,6 +264,25 @@ async def lifespan(app: FastAPI):
             notification_worker_thread.join(timeout=10)
             if notification_worker_thread.is_alive():
                 logger.warning("notification-worker did not stop within 10s; leaving as daemon")
+    if automation_worker is not None:
+        logger.info("Stopping in-process automation-worker")
+        automation_worker.stop()
+        if automation_worker_thread is not None:
+            automation_worker_thread.join(timeout=10)
+    if report_export_worker is not None:
+        logger.info("Stopping in-process report-export-worker")
+        report_export_worker.stop(timeout=10)
+    if entity_migration_worker is not None:
+        logger.info("Stopping in-process entity-migration-worker")
+        entity_migration_worker.stop(timeout=10)
+
+    from app.core.audit_writer import get_audit_writer
+    from app.core.db import dispose_engines
+    from app.core.report_cache import get_report_cache
+
+    get_audit_writer().stop()
+    get_report_cache().flush_hits()
+    await dispose_engines()
 
 
 # Create FastAPI app with API versioning
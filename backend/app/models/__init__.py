@@ -109,6 +109,7 @@ from .report import (
     ReportCache,
     ReportDefinition,
     ReportExecution,
+    ReportRollup,
     ReportSchedule,
     ReportTemplate,
 )
@@ -198,6 +199,7 @@ __all__ = [
     # Report system
     "ReportDefinition",
     "ReportExecution",
+    "ReportRollup",
     "ReportSchedule",
     "ReportTemplate",
     "ReportCache",
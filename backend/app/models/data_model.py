@@ -94,6 +94,9 @@ class EntityDefinition(Base):
 
     # Versioning
     version = Column(Integer, default=1)
+    # Monotonic cache stamp for runtime models; bumped on publish/migrate/rollback
+    # (unlike version, it never goes back, so a rolled-back model is never reused)
+    generation = Column(Integer, default=1, server_default="1", nullable=False)
     parent_version_id = Column(GUID, ForeignKey("entity_definitions.id"), nullable=True)
 
     # Audit fields
@@ -458,10 +461,16 @@ class EntityMigration(Base):
     down_script = Column(Text)  # SQL to rollback migration
 
     # Execution
-    status = Column(String(50), default="pending")  # 'pending', 'running', 'completed', 'failed', 'rolled_back'
+    # 'pending', 'queued', 'running', 'completed', 'failed', 'rolled_back'
+    status = Column(String(50), default="pending")
     executed_at = Column(DateTime)
     execution_time_ms = Column(Integer)
     error_message = Column(Text)
+    executed_by = Column(GUID, ForeignKey("users.id"))
+
+    # Online execution: step plan, current step and backfill cursor; refreshed by the migration worker
+    progress = Column(JSONB)
+    heartbeat_at = Column(DateTime)
 
     # Metadata
     changes = Column(JSONB)  # Detailed change log
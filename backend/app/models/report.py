@@ -5,7 +5,7 @@ Report models for the reporting system.
 import enum
 from datetime import datetime
 
-from sqlalchemy import JSON, Boolean, Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import JSON, Boolean, Column, DateTime, ForeignKey, Index, Integer, String, Text, text
 from sqlalchemy.orm import relationship
 
 from app.models import Base
@@ -33,6 +33,7 @@ class ExportFormat(str, enum.Enum):
     EXCEL_RAW = "excel_raw"
     CSV = "csv"
     JSON = "json"
+    NDJSON = "ndjson"
     HTML = "html"
 
 
@@ -137,9 +138,28 @@ class ReportExecution(Base):
     export_file_path = Column(String(500), nullable=True)
     export_file_size = Column(Integer, nullable=True)
 
+    # Background export jobs (app.services.report_export_jobs): rows written so far,
+    # last progress time (stale jobs are abandoned) and the key duplicate requests attach by
+    dedup_key = Column(String(64), nullable=True, index=True)
+    progress_rows = Column(Integer, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    completed_at = Column(DateTime, nullable=True)
+
     # Relationships
     report_definition = relationship("ReportDefinition", back_populates="executions")
 
+    __table_args__ = (
+        # At most one pending/running export per identical request (see ReportExportJobService.submit)
+        Index(
+            "uq_report_executions_active_export",
+            "tenant_id",
+            "dedup_key",
+            unique=True,
+            postgresql_where=text("status IN ('pending', 'running') AND dedup_key IS NOT NULL"),
+            sqlite_where=text("status IN ('pending', 'running') AND dedup_key IS NOT NULL"),
+        ),
+    )
+
 
 class ReportSchedule(Base):
     """Report scheduling configuration."""
@@ -228,3 +248,28 @@ class ReportCache(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     expires_at = Column(DateTime, nullable=False)
     hit_count = Column(Integer, default=0)
+
+
+class ReportRollup(Base):
+    """Materialized rollup table of a report (see app.services.report_rollup)."""
+
+    __tablename__ = "report_rollups"
+    __tenant_scoped__ = True
+
+    id = Column(GUID, primary_key=True, index=True)
+    tenant_id = Column(GUID, nullable=False, index=True)
+    report_definition_id = Column(GUID, ForeignKey("report_definitions.id"), nullable=False, unique=True)
+
+    # Summary table and the rollup spec it was built from (sha256 of dimensions/measures/bucket)
+    table_name = Column(String(63), nullable=False)
+    spec_hash = Column(String(64), nullable=True)
+
+    # Refresh state
+    status = Column(String(50), default="pending")  # pending, ready, failed
+    watermark = Column(DateTime, nullable=True)  # Highest watermark column value folded in
+    row_count = Column(Integer, nullable=True)
+    last_refreshed_at = Column(DateTime, nullable=True)
+    refresh_duration_ms = Column(Integer, nullable=True)
+    error_message = Column(Text, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -1,5 +1,6 @@
 import logging
 import secrets
+import time
 from datetime import datetime, timedelta
 from typing import Optional
 
@@ -23,10 +24,12 @@ from app.core.dependencies import get_current_user, get_db
 from app.core.lockout_manager import LockoutManager
 from app.core.password_history import PasswordHistoryService
 from app.core.password_validator import PasswordValidator
+from app.core.principal import orm_user
 
 # Import security services
 from app.core.security_config import SecurityConfigService
 from app.core.session_manager import SessionManager
+from app.core.token_revocation import revocation_checker
 from app.models.branch import Branch
 from app.models.company import Company
 from app.models.department import Department
@@ -758,7 +761,7 @@ def update_me(
 
     try:
         db.commit()
-        db.refresh(current_user)
+        db.refresh(orm_user(current_user))
 
         # Audit profile update
         create_audit_log(
@@ -1314,18 +1317,9 @@ def logout(
     db.add(blacklist_entry)
     db.commit()
 
-    # Mirror revocation into Redis for fast lookup (non-fatal)
+    # Propagate to the revocation filters and mirror into Redis (non-fatal)
     try:
-        import os as _os
-
-        import redis as _redis
-
-        _redis_url = _os.environ.get("REDIS_URL", "")
-        if _redis_url:
-            _ttl = max(0, int(payload.get("exp", 0)) - int(__import__("time").time()))
-            if _ttl > 0:
-                _r = _redis.from_url(_redis_url, socket_timeout=1)
-                _r.setex(f"blacklist:{jti}", _ttl, "1")
+        revocation_checker.revoke(jti, int(payload.get("exp", 0)) - int(time.time()))
     except Exception:
         pass
 
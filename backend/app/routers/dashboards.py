@@ -7,6 +7,7 @@ from typing import List, Optional
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from app.core.dependencies import get_db, has_permission
@@ -19,6 +20,7 @@ from app.schemas.dashboard import (
     DashboardPageCreate,
     DashboardPageResponse,
     DashboardPageUpdate,
+    DashboardRenderRequest,
     DashboardResponse,
     DashboardShareCreate,
     DashboardShareResponse,
@@ -31,6 +33,7 @@ from app.schemas.dashboard import (
     DashboardWidgetUpdate,
     WidgetDataRequest,
     WidgetDataResponse,
+    WidgetRenderResult,
 )
 from app.services.dashboard_service import DashboardService
 
@@ -319,6 +322,48 @@ def get_widget_data(
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 
+@router.post("/{dashboard_id}/render")
+def render_dashboard(
+    dashboard_id: UUID,
+    render_request: DashboardRenderRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(has_permission("dashboards:read:tenant")),
+):
+    """
+    Render every widget of a dashboard page in one request - requires dashboards:read:tenant
+
+    Streams NDJSON: one WidgetRenderResult per widget, in completion order.
+    Widgets sharing a report and parameters run the report once and distinct
+    reports run concurrently; a failed widget carries ``error`` instead of data.
+    """
+    try:
+        results = DashboardService.render_page(
+            db=db,
+            tenant_id=current_user.tenant_id,
+            user_id=current_user.id,
+            dashboard_id=dashboard_id,
+            page_id=render_request.page_id,
+            parameters=render_request.parameters,
+            widget_parameters=render_request.widget_parameters,
+            use_cache=render_request.use_cache,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+    def _lines():
+        for result in results:
+            yield WidgetRenderResult(
+                widget_id=result["widget_id"],
+                data=result["data"],
+                metadata={"widget_type": result["widget_type"]},
+                cached=result["cached"],
+                execution_time_ms=result["execution_time_ms"],
+                error=result["error"],
+            ).model_dump_json() + "\n"
+
+    return StreamingResponse(_lines(), media_type="application/x-ndjson")
+
+
 # ==================== Dashboard Sharing Endpoints ====================
 
 
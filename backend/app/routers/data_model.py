@@ -358,10 +358,11 @@ async def execute_migration(migration_id: UUID, db: Session = Depends(get_db), c
     """
     Execute a pending migration
 
-    Runs the UP script of a migration that was previously generated.
-    The migration must be in 'pending' status. After successful execution,
-    the entity will be marked as 'published' and the migration status will
-    be updated to 'completed'.
+    Queues the UP script of a migration that was previously generated for
+    online execution by the entity migration worker. The migration must be in
+    'pending' status, or 'failed' to resume it at the step that failed. Poll
+    the migration for 'status' and 'progress'; when it completes, the entity
+    is marked as 'published' and the migration status becomes 'completed'.
     """
     service = DataModelService(db, current_user)
     return await service.execute_migration(migration_id)
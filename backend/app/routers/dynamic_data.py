@@ -7,14 +7,14 @@ All endpoints are prefixed with /api/v1/dynamic-data
 
 import json
 import logging
-from typing import Optional
+from typing import Any, AsyncIterator, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Path, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, status
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 
 from app.core.dependencies import get_current_user, get_db
-from app.core.exceptions import EntityValidationError
+from app.core.exceptions import AppException, EntityValidationError
 from app.schemas.dynamic_data import (
     AggregateResponse,
     DynamicDataBulkCreateRequest,
@@ -182,6 +182,18 @@ async def list_records(
     include_deleted: bool = Query(
         False, description="When true, includes soft-deleted records in results (admin only)"
     ),
+    cursor: Optional[str] = Query(
+        None,
+        description=(
+            "Keyset pagination cursor from a previous response's 'next_cursor'. "
+            "Pass an empty value to start cursor pagination at the first page."
+        ),
+    ),
+    count: Optional[str] = Query(
+        None,
+        pattern="^(exact|estimated|none)$",
+        description="Total count mode: exact (default for page mode), estimated, or none (default for cursor mode)",
+    ),
     db: Session = Depends(get_db),
     current_user=Depends(get_current_user),
 ):
@@ -196,6 +208,9 @@ async def list_records(
     - `sort`: Sort specification (e.g., "name:asc,created_at:desc")
     - `filters`: JSON string with filter specification
     - `search`: Global search term
+    - `cursor`: Keyset cursor (`next_cursor` of the previous page); empty starts at page one.
+      Cursor pages cost the same at any depth, unlike `page`, and ignore `page`.
+    - `count`: `exact`, `estimated` (planner estimate on PostgreSQL) or `none`
 
     **Filter Format:**
     ```json
@@ -221,7 +236,9 @@ async def list_records(
       "total": 150,
       "page": 1,
       "page_size": 25,
-      "pages": 6
+      "pages": 6,
+      "next_cursor": null,
+      "has_more": true
     }
     ```
     """
@@ -258,6 +275,8 @@ async def list_records(
             search=search,
             expand=expand_list,
             include_deleted=include_deleted,
+            cursor=cursor,
+            count=count,
         )
 
         return DynamicDataListResponse(**result)
@@ -475,6 +494,8 @@ async def bulk_create_records(
     try:
         result = await service.bulk_create(entity_name, request.records)
         return DynamicDataBulkResponse(**result)
+    except AppException:
+        raise
     except Exception as e:
         logger.error(f"Error in bulk create for {entity_name}: {e}", exc_info=True)
         missing = _missing_table_error(entity_name, e)
@@ -526,6 +547,8 @@ async def bulk_update_records(
     try:
         result = await service.bulk_update(entity_name, request.records)
         return DynamicDataBulkResponse(**result)
+    except AppException:
+        raise
     except Exception as e:
         logger.error(f"Error in bulk update for {entity_name}: {e}", exc_info=True)
         missing = _missing_table_error(entity_name, e)
@@ -572,6 +595,8 @@ async def bulk_delete_records(
     try:
         result = await service.bulk_delete(entity_name, request.ids)
         return DynamicDataBulkResponse(**result)
+    except AppException:
+        raise
     except Exception as e:
         logger.error(f"Error in bulk delete for {entity_name}: {e}", exc_info=True)
         missing = _missing_table_error(entity_name, e)
@@ -580,6 +605,84 @@ async def bulk_delete_records(
         raise HTTPException(status_code=500, detail=f"Failed to bulk delete {entity_name} records: {str(e)}")
 
 
+async def _iter_ndjson(request: Request) -> AsyncIterator[Any]:
+    """
+    Yield one parsed JSON value per line of a streamed NDJSON request body.
+
+    The body is consumed chunk by chunk, so an import never has to be held in
+    memory as a single list. Lines that are not valid JSON yield a ValueError
+    instead of aborting the stream; the bulk service reports it at that index.
+    """
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield ValueError(f"Invalid JSON line: {e}")
+    if buffer.strip():
+        try:
+            yield json.loads(buffer)
+        except json.JSONDecodeError as e:
+            yield ValueError(f"Invalid JSON line: {e}")
+
+
+@router.post(
+    "/{entity_name}/records/import",
+    response_model=DynamicDataBulkResponse,
+    summary="Import Records (NDJSON)",
+    description="Stream-import records from an NDJSON body (one JSON object per line)",
+)
+async def import_records(
+    request: Request,
+    entity_name: str = Path(..., description="Entity name"),
+    mode: str = Query("create", pattern="^(create|update)$", description="create new records or update by 'id'"),
+    batch_size: Optional[int] = Query(
+        None, ge=1, le=10000, description="Rows per transaction (defaults to DYNAMIC_BULK_BATCH_SIZE)"
+    ),
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    """
+    Import a large number of records from a streamed NDJSON request body.
+
+    **Required Permission:** `{entity_name}:create:tenant` (or `update` when `mode=update`)
+
+    **Request Body** (`Content-Type: application/x-ndjson`):
+    ```
+    {"first_name": "John", "last_name": "Doe"}
+    {"first_name": "Jane", "last_name": "Smith"}
+    ```
+
+    Records are validated and written in batches of `batch_size` rows, one
+    transaction per batch. With `mode=update` each line must include `id`.
+    The response has the same shape as the bulk endpoints; `errors[].index`
+    is the zero-based line number among non-empty lines.
+    """
+    _require_writable_entity(entity_name, db, current_user)
+    service = DynamicEntityService(db, current_user)
+
+    try:
+        if mode == "update":
+            result = await service.bulk_update(entity_name, _iter_ndjson(request), batch_size=batch_size)
+        else:
+            result = await service.bulk_create(entity_name, _iter_ndjson(request), batch_size=batch_size)
+        return DynamicDataBulkResponse(**result)
+    except AppException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error importing {entity_name} records: {e}", exc_info=True)
+        missing = _missing_table_error(entity_name, e)
+        if missing:
+            raise missing
+        raise HTTPException(status_code=500, detail=f"Failed to import {entity_name} records: {str(e)}")
+
+
 # ==============================================================================
 # Soft Delete Restore + Version History Endpoints (Stories 5.4.1, 5.1.5)
 # ==============================================================================
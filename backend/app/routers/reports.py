@@ -2,16 +2,18 @@
 Report API router.
 """
 
-import io
 import logging
 from datetime import datetime
 from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Response, status
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
+from starlette.background import BackgroundTask
 
+from app.core.artifact_storage import get_artifact_storage, parse_byte_range
+from app.core.config import settings
 from app.core.dependencies import get_current_user, get_db, has_permission
 from app.core.exceptions_helpers import not_found_exception
 from app.models.data_model import EntityDefinition, RelationshipDefinition
@@ -26,6 +28,7 @@ from app.schemas.report import (
     ReportDefinitionUpdate,
     ReportExecutionRequest,
     ReportExecutionResponse,
+    ReportExportJobResponse,
     ReportPreviewRequest,
     ReportPreviewResponse,
     ReportScheduleCreate,
@@ -34,11 +37,21 @@ from app.schemas.report import (
     ReportTemplateResponse,
 )
 from app.services.report_export import ReportExporter
+from app.services.report_export_jobs import ReportExportJobService
 from app.services.report_service import ReportQueryValidationError, ReportService
 
 router = APIRouter(prefix="/api/v1/reports", tags=["reports"])
 logger = logging.getLogger(__name__)
 
+_CONTENT_TYPES = {
+    "csv": "text/csv",
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "pdf": "application/pdf",
+    "html": "text/html",
+}
+
 
 # Join Suggestion Endpoint
 
@@ -293,12 +306,18 @@ def execute_report(
 @router.post("/execute/export")
 def execute_and_export_report(
     request: ReportExecutionRequest,
+    mode: str = Query("sync", pattern="^(sync|async)$", description="async: run as a background export job"),
     db: Session = Depends(get_db),
     current_user: User = Depends(has_permission("reports:export:tenant")),
 ):
     """
     Execute a report and return the exported file.
 
+    With ``mode=async`` the export is queued instead and 202 is returned with
+    the job; poll ``GET /exports/{job_id}`` and fetch the file from
+    ``GET /exports/{job_id}/download``. An identical request made while a job
+    is pending or running returns that job.
+
     Requires permission: reports:export:tenant
     """
     try:
@@ -310,41 +329,55 @@ def execute_and_export_report(
         if not report_def:
             raise not_found_exception("Report", str(request.report_definition_id))
 
-        # Build and execute query
-        query_result = ReportService._build_and_execute_query(
-            db=db, tenant_id=current_user.tenant_id, report_def=report_def, parameters=request.parameters
+        if mode == "async":
+            export_format = request.export_format or ExportFormat.PDF
+            # Validate now so query errors reach the caller rather than the job
+            ReportService._build_report_query(db, current_user.tenant_id, report_def, request.parameters)
+            job, _ = ReportExportJobService.submit(
+                db, current_user.tenant_id, current_user.id, report_def, request.parameters, export_format.value
+            )
+            return JSONResponse(
+                status_code=status.HTTP_202_ACCEPTED, content=_export_job_response(job).model_dump(mode="json")
+            )
+
+        # Execute with a server-side cursor and stream rows into the exporter
+        columns, rows = ReportService.stream_report_rows(
+            db=db,
+            tenant_id=current_user.tenant_id,
+            report_def=report_def,
+            parameters=request.parameters,
+            chunk_size=settings.REPORT_EXPORT_CHUNK_SIZE,
         )
 
         # Export to requested format
         export_format = request.export_format or ExportFormat.PDF
-        file_content, file_extension = ReportExporter.export_report(
-            data=query_result["data"],
-            columns=query_result["columns"],
-            export_format=export_format.value,
-            report_name=report_def.name,
-            parameters=request.parameters,
-            formatting_rules=report_def.formatting_rules,
-        )
+        try:
+            body, file_extension = ReportExporter.stream_report(
+                rows=rows,
+                columns=columns,
+                export_format=export_format.value,
+                report_name=report_def.name,
+                parameters=request.parameters,
+                chunk_rows=settings.REPORT_EXPORT_CHUNK_SIZE,
+            )
+        except Exception:
+            rows.close()
+            raise
 
         # Determine content type
-        content_types = {
-            "csv": "text/csv",
-            "json": "application/json",
-            "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            "pdf": "application/pdf",
-            "html": "text/html",
-        }
-        content_type = content_types.get(file_extension, "application/octet-stream")
+        content_type = _CONTENT_TYPES.get(file_extension, "application/octet-stream")
 
         # Generate filename
         timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
         filename = f"{report_def.name.replace(' ', '_')}_{timestamp}.{file_extension}"
 
-        # Return file as streaming response
+        # Return file as streaming response; the rows' connection is released
+        # afterwards even if the client disconnects before the body is read
         return StreamingResponse(
-            io.BytesIO(file_content),
+            body,
             media_type=content_type,
             headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+            background=BackgroundTask(rows.close),
         )
 
     except HTTPException:
@@ -359,6 +392,88 @@ def execute_and_export_report(
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 
+def _export_job_response(job) -> ReportExportJobResponse:
+    response = ReportExportJobResponse.model_validate(job)
+    if job.status == "completed":
+        response.download_url = f"{router.prefix}/exports/{job.id}/download"
+    return response
+
+
+@router.get("/exports/{job_id}", response_model=ReportExportJobResponse)
+def get_export_job(
+    job_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(has_permission("reports:export:tenant")),
+):
+    """
+    Get the status and progress of a background export job.
+
+    Requires permission: reports:export:tenant
+    """
+    job = ReportExportJobService.get_job(db, current_user.tenant_id, job_id)
+    if not job:
+        raise not_found_exception("Export job", str(job_id))
+    return _export_job_response(job)
+
+
+@router.get("/exports/{job_id}/download")
+def download_export(
+    job_id: UUID,
+    range_header: Optional[str] = Header(None, alias="Range"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(has_permission("reports:export:tenant")),
+):
+    """
+    Download the file of a completed export job.
+
+    Supports single ``Range: bytes=...`` requests (206 Partial Content) so
+    interrupted downloads can be resumed.
+
+    Requires permission: reports:export:tenant
+    """
+    job = ReportExportJobService.get_job(db, current_user.tenant_id, job_id)
+    if not job:
+        raise not_found_exception("Export job", str(job_id))
+    if job.status != "completed" or not job.export_file_path:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Export is {job.status}")
+
+    storage = get_artifact_storage()
+    size = storage.size(job.export_file_path)
+    if size is None:
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail="Export file is no longer available")
+
+    try:
+        byte_range = parse_byte_range(range_header, size)
+    except ValueError:
+        return Response(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE, headers={"Content-Range": f"bytes */{size}"}
+        )
+
+    file_extension = job.export_file_path.rsplit(".", 1)[-1]
+    report_name = job.report_definition.name if job.report_definition else "report"
+    filename = f"{report_name.replace(' ', '_')}_{job.executed_at.strftime('%Y%m%d_%H%M%S')}.{file_extension}"
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": f'"{job.id}"',
+        "Content-Disposition": f'attachment; filename="{filename}"',
+    }
+
+    status_code = status.HTTP_200_OK
+    start, end = 0, size - 1
+    if byte_range is not None:
+        start, end = byte_range
+        status_code = status.HTTP_206_PARTIAL_CONTENT
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+
+    return StreamingResponse(
+        storage.read_range(job.export_file_path, start, end),
+        status_code=status_code,
+        media_type=_CONTENT_TYPES.get(file_extension, "application/octet-stream"),
+        headers=headers,
+    )
+
+
 @router.post("/preview", response_model=ReportPreviewResponse)
 def preview_report(
     request: ReportPreviewRequest,
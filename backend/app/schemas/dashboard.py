@@ -348,6 +348,23 @@ class WidgetDataResponse(BaseModel):
     execution_time_ms: Optional[int] = None
 
 
+class DashboardRenderRequest(BaseModel):
+    """Request to render every widget of a dashboard page."""
+
+    page_id: Optional[UUID] = Field(None, description="Page to render; the default page when omitted")
+    parameters: Optional[Dict[str, Any]] = None
+    widget_parameters: Optional[Dict[UUID, Dict[str, Any]]] = Field(
+        None, description="Per-widget parameter overrides, keyed by widget ID"
+    )
+    use_cache: bool = True
+
+
+class WidgetRenderResult(WidgetDataResponse):
+    """One line of a dashboard render stream."""
+
+    error: Optional[str] = None
+
+
 # Dashboard Share Schemas
 
 
@@ -722,6 +722,8 @@ class MigrationResponse(BaseModel):
     execution_time_ms: Optional[int]
     error_message: Optional[str]
     changes: Optional[Dict[str, Any]]
+    progress: Optional[Dict[str, Any]] = None
+    heartbeat_at: Optional[datetime] = None
     created_at: datetime
     created_by: UUID
 
@@ -56,10 +56,12 @@ class DynamicDataListResponse(BaseModel):
     """Response schema for list of records"""
 
     items: List[Dict[str, Any]] = Field(..., description="List of records")
-    total: int = Field(..., description="Total number of records (before pagination)")
+    total: Optional[int] = Field(None, description="Total number of records (before pagination); null when count=none")
     page: int = Field(..., description="Current page number")
     page_size: int = Field(..., description="Number of items per page")
-    pages: int = Field(..., description="Total number of pages")
+    pages: Optional[int] = Field(None, description="Total number of pages; null when total is not counted")
+    next_cursor: Optional[str] = Field(None, description="Opaque cursor for the next page (cursor mode only)")
+    has_more: Optional[bool] = Field(None, description="Whether more records follow this page")
 
     class Config:
         json_schema_extra = {
@@ -72,6 +74,8 @@ class DynamicDataListResponse(BaseModel):
                 "page": 1,
                 "page_size": 25,
                 "pages": 6,
+                "next_cursor": None,
+                "has_more": True,
             }
         }
 
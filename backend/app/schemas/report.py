@@ -31,6 +31,7 @@ class ExportFormat(str, Enum):
     EXCEL_RAW = "excel_raw"
     CSV = "csv"
     JSON = "json"
+    NDJSON = "ndjson"
     HTML = "html"
 
 
@@ -343,6 +344,25 @@ class ReportExecutionResponse(BaseModel):
         from_attributes = True
 
 
+class ReportExportJobResponse(BaseModel):
+    """Background export job status."""
+
+    id: UUID
+    report_definition_id: UUID
+    status: str = Field(..., description="pending, running, completed or failed")
+    export_format: Optional[str]
+    executed_at: datetime
+    progress_rows: Optional[int] = Field(None, description="Rows written so far")
+    row_count: Optional[int]
+    export_file_size: Optional[int]
+    completed_at: Optional[datetime] = None
+    error_message: Optional[str]
+    download_url: Optional[str] = Field(None, description="Set once the export has completed")
+
+    class Config:
+        from_attributes = True
+
+
 # Report Schedule Schemas
 
 
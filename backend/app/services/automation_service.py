@@ -6,12 +6,14 @@ Handles trigger detection and action execution.
 """
 
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 
 from fastapi import HTTPException, status
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
+from app.core.automation_index import automation_trigger_index
 from app.core.scope import apply_tenant_scope
 from app.models.automation import (
     ActionTemplate,
@@ -19,6 +21,7 @@ from app.models.automation import (
     AutomationRule,
     WebhookConfig,
 )
+from app.models.base import generate_uuid
 from app.schemas.automation import (
     AutomationRuleCreate,
     AutomationRuleUpdate,
@@ -63,6 +66,7 @@ class AutomationService:
         self.db.add(rule)
         self.db.commit()
         self.db.refresh(rule)
+        automation_trigger_index.invalidate(rule.tenant_id)
 
         return rule
 
@@ -138,6 +142,7 @@ class AutomationService:
 
         self.db.commit()
         self.db.refresh(rule)
+        automation_trigger_index.invalidate(rule.tenant_id)
 
         return rule
 
@@ -149,6 +154,7 @@ class AutomationService:
         rule.updated_by = self.current_user.id
 
         self.db.commit()
+        automation_trigger_index.invalidate(rule.tenant_id)
 
         return {"message": "Automation rule deleted successfully"}
 
@@ -161,6 +167,7 @@ class AutomationService:
 
         self.db.commit()
         self.db.refresh(rule)
+        automation_trigger_index.invalidate(rule.tenant_id)
 
         return rule
 
@@ -233,6 +240,69 @@ class AutomationService:
         self.db.add(execution)
         self.db.flush()
 
+        return await self._run_execution(rule, execution, context_data)
+
+    def enqueue_executions(self, rules: list, context_data: List[dict]) -> int:
+        """
+        Queue database-trigger executions for the automation worker
+
+        One ``pending`` AutomationExecution per (rule, context) is inserted
+        in a single multi-row INSERT and committed; ``AutomationWorker``
+        claims and runs them outside the request (at-least-once).
+
+        Args:
+            rules: Matched rules (AutomationRule or TriggerRule)
+            context_data: One context dict per affected record
+
+        Returns:
+            Number of executions queued
+        """
+        rows = [
+            {
+                "id": generate_uuid(),
+                "rule_id": rule.id,
+                "tenant_id": self.tenant_id,
+                "trigger_type": "database",
+                "triggered_by_user_id": self.current_user.id,
+                "triggered_at": datetime.utcnow(),
+                "status": "pending",
+                "retry_count": 0,
+                "context_data": context,
+            }
+            for context in context_data
+            for rule in rules
+        ]
+        if rows:
+            self.db.execute(insert(AutomationExecution), rows)
+            self.db.commit()
+        return len(rows)
+
+    async def run_queued_execution(self, execution: AutomationExecution):
+        """Run an execution claimed by the automation worker"""
+        rule = (
+            self.db.query(AutomationRule)
+            .filter(AutomationRule.id == execution.rule_id, AutomationRule.is_deleted == False)
+            .first()
+        )
+        if not rule or not rule.is_active:
+            execution.status = "cancelled"
+            execution.completed_at = datetime.utcnow()
+            self.db.commit()
+            return execution
+
+        execution.total_actions = len(rule.actions or [])
+        # A retry runs every action again; counters describe the latest attempt
+        execution.completed_actions = 0
+        execution.failed_actions = 0
+        execution = await self._run_execution(rule, execution, execution.context_data or {})
+        if execution.failed_actions:
+            # Let the worker mark the row failed and schedule the retry
+            errors = "; ".join(r.get("error", "") for r in execution.action_results or [] if not r.get("success", True))
+            raise RuntimeError(f"{execution.failed_actions} of {execution.total_actions} actions failed: {errors}")
+        return execution
+
+    async def _run_execution(self, rule: AutomationRule, execution: AutomationExecution, context_data: dict):
+        """Evaluate conditions and run the actions of ``rule`` for ``execution``"""
         # Execute in test mode if configured
         if rule.is_test_mode:
             execution.status = "completed"
@@ -4,14 +4,20 @@ Dashboard service - business logic for dashboards.
 Reuses ReportService for data fetching and execution.
 """
 
+import contextvars
 import hashlib
 import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 
 from sqlalchemy import or_
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, sessionmaker
 
+from app.core.config import get_settings
 from app.core.scope import apply_tenant_scope_by_id
 from app.models.dashboard import (
     Dashboard,
@@ -35,6 +41,26 @@ from app.schemas.dashboard import (
 from app.schemas.report import ReportExecutionRequest
 from app.services.report_service import ReportService
 
+logger = logging.getLogger(__name__)
+
+_REPORT_WIDGET_TYPES = (WidgetType.REPORT_TABLE, WidgetType.CHART, WidgetType.KPI_CARD)
+_STATIC_WIDGET_TYPES = (WidgetType.TEXT, WidgetType.IFRAME)
+
+# Shared by all dashboard renders so concurrent page loads cannot exhaust the connection pool
+_render_pool: Optional[ThreadPoolExecutor] = None
+_render_pool_lock = threading.Lock()
+
+
+def _get_render_pool() -> ThreadPoolExecutor:
+    global _render_pool
+    if _render_pool is None:
+        with _render_pool_lock:
+            if _render_pool is None:
+                _render_pool = ThreadPoolExecutor(
+                    max_workers=get_settings().DASHBOARD_RENDER_WORKERS, thread_name_prefix="dashboard-render"
+                )
+    return _render_pool
+
 
 class DashboardService:
     """Service for dashboard operations."""
@@ -396,6 +422,9 @@ class DashboardService:
     ) -> Dict[str, Any]:
         """
         Get data for a widget - REUSES ReportService for report-based widgets.
+
+        Reports with a rollup (``query_config.rollup``) are answered from their
+        summary table, see ``app.services.report_rollup``.
         """
         wq = db.query(DashboardWidget).filter(DashboardWidget.id == widget_id)
         wq = apply_tenant_scope_by_id(wq, DashboardWidget, tenant_id)
@@ -423,12 +452,13 @@ class DashboardService:
             execution = ReportService.execute_report(db, tenant_id, user_id, execution_request)
 
             if execution.status == "completed":
-                # Fetch the actual data from the execution
-                query_result = ReportService._build_and_execute_query(
+                # Fetch the actual data; with use_cache this is the result the execution just cached
+                query_result, _ = ReportService.get_report_results(
                     db,
                     tenant_id,
                     ReportService.get_report_definition(db, tenant_id, widget.report_definition_id, user_id),
                     parameters or {},
+                    use_cache=use_cache,
                 )
                 data = query_result["data"]
                 execution_time_ms = execution.execution_time_ms or 0
@@ -437,7 +467,9 @@ class DashboardService:
             # REUSE ReportService for chart data
             report_def = ReportService.get_report_definition(db, tenant_id, widget.report_definition_id, user_id)
             if report_def:
-                query_result = ReportService._build_and_execute_query(db, tenant_id, report_def, parameters or {})
+                query_result, _ = ReportService.get_report_results(
+                    db, tenant_id, report_def, parameters or {}, use_cache=use_cache
+                )
                 data = DashboardService._transform_data_for_chart(query_result["data"], widget.chart_config)
 
         elif widget.widget_type == WidgetType.KPI_CARD:
@@ -445,7 +477,9 @@ class DashboardService:
             if widget.report_definition_id:
                 report_def = ReportService.get_report_definition(db, tenant_id, widget.report_definition_id, user_id)
                 if report_def:
-                    query_result = ReportService._build_and_execute_query(db, tenant_id, report_def, parameters or {})
+                    query_result, _ = ReportService.get_report_results(
+                        db, tenant_id, report_def, parameters or {}, use_cache=use_cache
+                    )
                     data = DashboardService._transform_data_for_kpi(query_result["data"], widget.widget_config)
 
         elif widget.widget_type == WidgetType.TEXT:
@@ -471,6 +505,152 @@ class DashboardService:
             "widget_type": widget.widget_type,
         }
 
+    @staticmethod
+    def render_page(
+        db: Session,
+        tenant_id,
+        user_id,
+        dashboard_id,
+        page_id=None,
+        parameters: Optional[Dict[str, Any]] = None,
+        widget_parameters: Optional[Dict[Any, Dict[str, Any]]] = None,
+        use_cache: bool = True,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Get data for every widget of a dashboard page, yielded as each is ready.
+
+        The page's widgets and their report definitions are loaded up front
+        (one query each). Widgets that share a (report, parameters) key run the
+        report once; distinct reports run concurrently on the shared render
+        pool (``DASHBOARD_RENDER_WORKERS``), each on its own session, through
+        the report result cache. Static widgets are yielded first, then report
+        widgets in completion order. A failing report yields an ``error`` for
+        its widgets instead of aborting the page.
+
+        All use of ``db`` happens before this returns, so the iterator may be
+        consumed after the request session is closed (streaming responses).
+
+        Args:
+            page_id: Page to render; the dashboard's default (else first) page when omitted
+            parameters: Report parameters for every widget
+            widget_parameters: Per-widget parameter overrides, keyed by widget ID
+
+        Raises:
+            ValueError: Dashboard or page not found
+        """
+        if not DashboardService.get_dashboard(db, tenant_id, dashboard_id, user_id):
+            raise ValueError("Dashboard not found")
+
+        pq = db.query(DashboardPage.id).filter(DashboardPage.dashboard_id == dashboard_id)
+        pq = apply_tenant_scope_by_id(pq, DashboardPage, tenant_id)
+        if page_id:
+            pq = pq.filter(DashboardPage.id == page_id)
+        else:
+            pq = pq.order_by(DashboardPage.is_default.desc(), DashboardPage.order.asc())
+        page = pq.first()
+        if not page:
+            raise ValueError("Page not found")
+
+        wq = db.query(DashboardWidget).filter(DashboardWidget.page_id == page.id).order_by(DashboardWidget.order)
+        wq = apply_tenant_scope_by_id(wq, DashboardWidget, tenant_id)
+        widgets = wq.all()
+
+        report_ids = {w.report_definition_id for w in widgets if w.widget_type in _REPORT_WIDGET_TYPES}
+        reports = ReportService.get_report_definitions(db, tenant_id, report_ids - {None}, user_id)
+
+        # Render threads only read loaded attributes; detach so nothing lazy-loads through db
+        for obj in [*widgets, *reports.values()]:
+            db.expunge(obj)
+
+        ready: List[Dict[str, Any]] = []
+        groups: Dict[tuple, tuple] = {}
+        for widget in widgets:
+            if widget.widget_type in _STATIC_WIDGET_TYPES:
+                ready.append(DashboardService._render_result(widget, data=widget.widget_config))
+            elif widget.widget_type in _REPORT_WIDGET_TYPES and widget.report_definition_id:
+                report = reports.get(widget.report_definition_id)
+                if report is None:
+                    ready.append(
+                        DashboardService._render_result(widget, error="Report definition not found or access denied")
+                    )
+                    continue
+                widget_params = {**(parameters or {}), **((widget_parameters or {}).get(widget.id) or {})}
+                key = (report.id, json.dumps(widget_params, sort_keys=True, default=str))
+                groups.setdefault(key, (report, widget_params, []))[2].append(widget)
+            else:
+                ready.append(DashboardService._render_result(widget))
+
+        session_factory = sessionmaker(bind=db.get_bind(), autoflush=False, autocommit=False)
+
+        def _run(report, widget_params):
+            started = time.monotonic()
+            with session_factory() as session:
+                result, cached = ReportService.get_report_results(
+                    session, tenant_id, report, widget_params, use_cache=use_cache
+                )
+            return result, cached, int((time.monotonic() - started) * 1000)
+
+        def _results() -> Iterator[Dict[str, Any]]:
+            yield from ready
+            if not groups:
+                return
+
+            pool = _get_render_pool()
+            futures = {
+                # Copy the context so tenant scope (a ContextVar) reaches the worker thread
+                pool.submit(contextvars.copy_context().run, _run, report, widget_params): members
+                for report, widget_params, members in groups.values()
+            }
+            try:
+                for future in as_completed(futures):
+                    members = futures[future]
+                    try:
+                        result, cached, execution_time_ms = future.result()
+                    except Exception as e:
+                        logger.warning(f"Dashboard {dashboard_id} widget query failed: {e}")
+                        for widget in members:
+                            yield DashboardService._render_result(widget, error=str(e))
+                        continue
+                    for widget in members:
+                        yield DashboardService._render_result(
+                            widget,
+                            data=DashboardService._widget_data_from_rows(widget, result["data"]),
+                            cached=cached,
+                            execution_time_ms=execution_time_ms,
+                        )
+            finally:
+                # Client went away: drop queries that have not started yet
+                for future in futures:
+                    future.cancel()
+
+        return _results()
+
+    @staticmethod
+    def _widget_data_from_rows(widget: DashboardWidget, rows: List[Dict]) -> Any:
+        """Shape report rows for a report-backed widget, as ``get_widget_data`` does."""
+        if widget.widget_type == WidgetType.CHART:
+            return DashboardService._transform_data_for_chart(rows, widget.chart_config)
+        if widget.widget_type == WidgetType.KPI_CARD:
+            return DashboardService._transform_data_for_kpi(rows, widget.widget_config)
+        return rows
+
+    @staticmethod
+    def _render_result(
+        widget: DashboardWidget,
+        data: Any = None,
+        cached: bool = False,
+        execution_time_ms: int = 0,
+        error: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        return {
+            "widget_id": widget.id,
+            "data": data,
+            "widget_type": widget.widget_type,
+            "cached": cached,
+            "execution_time_ms": execution_time_ms,
+            "error": error,
+        }
+
     @staticmethod
     def _transform_data_for_chart(data: List[Dict], chart_config: Optional[Dict]) -> Dict:
         """Transform report data for chart visualization."""
@@ -10,6 +10,8 @@ from uuid import UUID
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 
+from app.core.model_cache import bump_generation
+from app.core.schema_catalog import invalidate_after_commit as invalidate_schema_after_commit
 from app.core.scope import apply_tenant_scope
 from app.models.base import generate_uuid
 from app.models.data_model import (
@@ -781,7 +783,7 @@ class DataModelService:
         changes = await migration_gen.preview_changes(entity)
 
         # Estimate impact
-        estimated_impact = await self._estimate_impact(entity)
+        estimated_impact = await self._estimate_impact(entity, changes)
 
         return {
             "entity_id": entity.id,
@@ -941,6 +943,7 @@ class DataModelService:
 
             # Execute in transaction
             self.db.execute(text(up_sql))
+            invalidate_schema_after_commit(self.db)
 
             execution_time = int((time.time() - start_time) * 1000)
 
@@ -950,6 +953,7 @@ class DataModelService:
 
             # Update entity status
             entity.status = "published"
+            bump_generation(self.db, entity)
 
             # Auto-generate EntityMetadata for published entity
             try:
@@ -1046,11 +1050,15 @@ class DataModelService:
         return {"migrations": migrations, "total": len(migrations)}
 
     async def execute_migration(self, migration_id: UUID):
-        """Execute a pending migration"""
-        import time
-        from datetime import datetime
+        """
+        Queue a pending (or resume a failed) migration for online execution
 
-        from sqlalchemy import text
+        The entity migration worker runs the UP script as online steps and
+        publishes the entity when it completes; poll the migration for
+        ``status`` and ``progress``.
+        """
+        from app.services.online_migration import plan_online_migration
+        from app.workers.entity_migration_worker import notify_migration_queued
 
         migration = self.db.query(EntityMigration).filter(EntityMigration.id == migration_id).first()
 
@@ -1063,10 +1071,10 @@ class DataModelService:
                 status_code=status.HTTP_403_FORBIDDEN, detail="You don't have permission to execute this migration"
             )
 
-        if migration.status != "pending":
+        if migration.status not in ("pending", "failed"):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Can only execute pending migrations. Current status: {migration.status}",
+                detail=f"Can only execute pending or failed migrations. Current status: {migration.status}",
             )
 
         entity = self.db.query(EntityDefinition).filter(EntityDefinition.id == migration.entity_id).first()
@@ -1076,105 +1084,90 @@ class DataModelService:
                 status_code=status.HTTP_404_NOT_FOUND, detail=f"Entity not found for migration {migration_id}"
             )
 
-        # Execute migration
-        try:
-            migration.status = "running"
-            self.db.commit()
-
-            start_time = time.time()
-
-            # Execute UP script in transaction
-            self.db.execute(text(migration.up_script))
-
-            execution_time = int((time.time() - start_time) * 1000)
-
-            migration.status = "completed"
-            migration.executed_at = datetime.utcnow()
-            migration.execution_time_ms = execution_time
-
-            # Update entity version and status
-            entity.version = migration.to_version
-            entity.status = "published"
-
-            # Auto-generate EntityMetadata for published entity
-            try:
-                from app.services.metadata_sync_service import MetadataSyncService
+        # A failed migration keeps its progress and resumes at the step that failed
+        if not migration.progress:
+            migration.progress = {
+                "steps": plan_online_migration(migration.up_script),
+                "step": 0,
+                "cursor": None,
+                "rows_backfilled": 0,
+            }
+        migration.status = "queued"
+        migration.error_message = None
+        migration.executed_by = self.current_user.id
+        self.db.commit()
+        self.db.refresh(migration)
+        notify_migration_queued()
 
-                metadata_sync = MetadataSyncService(self.db)
-                metadata_sync.auto_generate_metadata(entity_definition=entity, created_by=str(self.current_user.id))
-            except Exception as meta_error:
-                # Log error but don't fail the execution
-                import logging
+        return migration
 
-                logger = logging.getLogger(__name__)
-                logger.error(f"Failed to auto-generate metadata for {entity.name}: {str(meta_error)}")
+    def complete_migration(self, migration: EntityMigration, entity: EntityDefinition, execution_time: int):
+        """Record a successfully executed migration and publish the entity version it creates"""
+        from datetime import datetime
 
-            # Auto-create menu item for published nocode entity
-            try:
-                import logging
+        invalidate_schema_after_commit(self.db)
 
-                from app.services.menu_service import MenuService
+        migration.status = "completed"
+        migration.executed_at = datetime.utcnow()
+        migration.execution_time_ms = execution_time
 
-                logger = logging.getLogger(__name__)
+        # Update entity version and status
+        entity.version = migration.to_version
+        entity.status = "published"
+        bump_generation(self.db, entity)
 
-                # Create menu item with route to dynamic entity list view
-                menu_data = {
-                    "code": f"nocode_entity_{entity.name}",
-                    "title": entity.label or entity.name.replace("_", " ").title(),
-                    "route": f"dynamic/{entity.name}/list",
-                    "icon": entity.icon or "ph-duotone ph-database",
-                    "parent_code": "nocode_entities",
-                    "permission": None,
-                    "required_roles": [],
-                    "is_system": False,
-                    "is_active": True,
-                    "extra_data": {"entity_id": str(entity.id), "is_nocode": True},
-                }
+        # Auto-generate EntityMetadata for published entity
+        try:
+            from app.services.metadata_sync_service import MetadataSyncService
 
-                # Ensure parent "No-Code Entities" menu exists
-                MenuService.get_or_create_nocode_parent(self.db, entity.tenant_id, str(self.current_user.id))
+            metadata_sync = MetadataSyncService(self.db)
+            metadata_sync.auto_generate_metadata(entity_definition=entity, created_by=str(self.current_user.id))
+        except Exception as meta_error:
+            # Log error but don't fail the execution
+            import logging
 
-                # Create menu item
-                MenuService.create_menu_item(db=self.db, user=self.current_user, menu_data=menu_data)
+            logger = logging.getLogger(__name__)
+            logger.error(f"Failed to auto-generate metadata for {entity.name}: {str(meta_error)}")
 
-                logger.info(f"✅ Auto-created menu item for nocode entity: {entity.name}")
+        # Auto-create menu item for published nocode entity
+        try:
+            import logging
+
+            from app.services.menu_service import MenuService
+
+            logger = logging.getLogger(__name__)
+
+            # Create menu item with route to dynamic entity list view
+            menu_data = {
+                "code": f"nocode_entity_{entity.name}",
+                "title": entity.label or entity.name.replace("_", " ").title(),
+                "route": f"dynamic/{entity.name}/list",
+                "icon": entity.icon or "ph-duotone ph-database",
+                "parent_code": "nocode_entities",
+                "permission": None,
+                "required_roles": [],
+                "is_system": False,
+                "is_active": True,
+                "extra_data": {"entity_id": str(entity.id), "is_nocode": True},
+            }
 
-            except Exception as menu_error:
-                import logging
+            # Ensure parent "No-Code Entities" menu exists
+            MenuService.get_or_create_nocode_parent(self.db, entity.tenant_id, str(self.current_user.id))
 
-                logger = logging.getLogger(__name__)
-                logger.warning(f"Failed to auto-create menu item for {entity.name}: {str(menu_error)}")
+            # Create menu item
+            MenuService.create_menu_item(db=self.db, user=self.current_user, menu_data=menu_data)
 
-            self.db.commit()
-            self.db.refresh(migration)
-            self.db.refresh(entity)
+            logger.info(f"✅ Auto-created menu item for nocode entity: {entity.name}")
 
-            return {
-                "id": migration.id,
-                "migration_name": migration.migration_name,
-                "status": migration.status,
-                "executed_at": migration.executed_at,
-                "execution_time_ms": execution_time,
-                "entity_id": str(entity.id),
-                "entity_name": entity.name,
-                "entity_label": entity.label,
-                "entity_status": entity.status,
-                "message": f"Migration executed successfully in {execution_time}ms",
-            }
+        except Exception as menu_error:
+            import logging
 
-        except Exception as e:
-            self.db.rollback()
-            migration.status = "failed"
-            migration.error_message = str(e)
-            self.db.commit()
-
-            import traceback
+            logger = logging.getLogger(__name__)
+            logger.warning(f"Failed to auto-create menu item for {entity.name}: {str(menu_error)}")
 
-            error_details = traceback.format_exc()
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Migration execution failed: {str(e)}\n\n{error_details}",
-            )
+        self.db.commit()
+        self.db.refresh(migration)
+        self.db.refresh(entity)
 
     async def rollback_migration(self, migration_id: UUID):
         """Rollback a migration"""
@@ -1210,6 +1203,7 @@ class DataModelService:
 
             # Execute down script
             self.db.execute(text(migration.down_script))
+            invalidate_schema_after_commit(self.db)
 
             execution_time = int((time.time() - start_time) * 1000)
 
@@ -1223,6 +1217,7 @@ class DataModelService:
                 entity.version = migration.from_version or 0
                 if entity.version == 0:
                     entity.status = "draft"
+                bump_generation(self.db, entity)
 
             self.db.commit()
 
@@ -1239,52 +1234,11 @@ class DataModelService:
 
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Rollback failed: {str(e)}")
 
-    async def _estimate_impact(self, entity: EntityDefinition) -> dict:
-        """Estimate the impact of publishing this entity"""
-        from sqlalchemy import text
-
+    async def _estimate_impact(self, entity: EntityDefinition, changes: Optional[dict] = None) -> dict:
+        """Estimate the impact of publishing this entity (from catalog statistics, no table scan)"""
         from app.services.migration_generator import MigrationGenerator
+        from app.services.migration_impact import estimate_impact
 
-        migration_gen = MigrationGenerator(self.db)
-        table_exists = await migration_gen._table_exists(entity.table_name)
-
-        if not table_exists:
-            return {"risk_level": "low", "affected_records": 0, "breaking_changes": [], "warnings": []}
-
-        # Check for existing data
-        try:
-            result = self.db.execute(text(f"SELECT COUNT(*) FROM {entity.table_name}"))
-            record_count = result.scalar()
-        except:
-            record_count = 0
-
-        # Analyze changes for risk
-        changes = await migration_gen.preview_changes(entity)
-        breaking_changes = []
-        warnings = []
-
-        if changes["operation"] == "ALTER":
-            change_details = changes.get("changes", {})
-
-            # Dropping columns is a breaking change
-            if change_details.get("removed_columns"):
-                breaking_changes.append(f"Dropping columns: {', '.join(change_details['removed_columns'])}")
-
-            # Type changes can be risky
-            if change_details.get("modified_columns"):
-                for mod in change_details["modified_columns"]:
-                    warnings.append(f"Column {mod['name']} type changing from {mod['from_type']} to {mod['to_type']}")
-
-        # Determine risk level
-        risk_level = "low"
-        if breaking_changes:
-            risk_level = "high"
-        elif warnings or record_count > 1000:
-            risk_level = "medium"
-
-        return {
-            "risk_level": risk_level,
-            "affected_records": record_count,
-            "breaking_changes": breaking_changes,
-            "warnings": warnings,
-        }
+        if changes is None:
+            changes = await MigrationGenerator(self.db).preview_changes(entity)
+        return estimate_impact(self.db, entity, changes)
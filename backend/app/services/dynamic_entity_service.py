@@ -5,15 +5,26 @@ This service provides complete CRUD functionality for nocode entities,
 including validation, audit logging, and RBAC enforcement.
 """
 
+import json
 import logging
+import uuid
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple, Union
 
+from sqlalchemy import bindparam, cast
+from sqlalchemy import column as sa_column
+from sqlalchemy import delete as sa_delete
+from sqlalchemy import insert, text, update
+from sqlalchemy import values as sa_values
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+from app.core.automation_index import get_automation_trigger_index
+from app.core.config import get_settings
 from app.core.dynamic_query_builder import DynamicQueryBuilder
 from app.core.exceptions import AppException, EntityValidationError
+from app.core.lookup_options import get_lookup_option_cache
+from app.core.permission_cache import get_user_permissions
 from app.core.scope import apply_tenant_scope  # T-22.007
 from app.services.runtime_model_generator import RuntimeModelGenerator
 from app.utils.field_type_mapper import FieldTypeMapper
@@ -21,6 +32,38 @@ from app.utils.field_type_mapper import FieldTypeMapper
 logger = logging.getLogger(__name__)
 
 
+async def _iter_batches(
+    records: Union[Iterable[Any], AsyncIterable[Any]], batch_size: Optional[int] = None
+) -> AsyncIterator[List[Tuple[int, Any]]]:
+    """
+    Group a list, iterator or async iterator into ``(index, item)`` batches.
+
+    Indexes are global across batches so bulk error reports keep pointing at
+    the caller's original position.
+    """
+    size = batch_size or get_settings().DYNAMIC_BULK_BATCH_SIZE
+    batch: List[Tuple[int, Any]] = []
+    idx = 0
+
+    if hasattr(records, "__aiter__"):
+        async for item in records:
+            batch.append((idx, item))
+            idx += 1
+            if len(batch) >= size:
+                yield batch
+                batch = []
+    else:
+        for item in records:
+            batch.append((idx, item))
+            idx += 1
+            if len(batch) >= size:
+                yield batch
+                batch = []
+
+    if batch:
+        yield batch
+
+
 class DynamicEntityService:
     """
     Service for CRUD operations on dynamic nocode entities
@@ -44,6 +87,9 @@ class DynamicEntityService:
         "department": ["tenant_id", "company_id", "branch_id", "department_id"],
     }
 
+    # System and org hierarchy columns that updates never overwrite
+    PROTECTED_FIELDS = ("id", "created_at", "created_by", "tenant_id", "company_id", "branch_id", "department_id")
+
     def __init__(self, db: Session, current_user):
         """
         Initialize dynamic entity service
@@ -96,7 +142,7 @@ class DynamicEntityService:
                 status_code=403,
             )
 
-        user_roles = self.current_user.get_roles() if hasattr(self.current_user, "get_roles") else set()
+        user_roles = get_user_permissions(self.current_user).roles
         if not user_roles & allowed_roles:
             raise AppException(
                 f"Per-entity permission denied: action '{action}' on entity '{entity_name}'",
@@ -203,6 +249,8 @@ class DynamicEntityService:
             # Audit log
             await self._create_audit_log("CREATE", entity_name, record_dict.get("id"), {"created": record_dict})
 
+            self._data_changed(entity_name)
+
             # Trigger automations
             await self._trigger_automations(entity_name, "onCreate", record_dict)
 
@@ -229,20 +277,30 @@ class DynamicEntityService:
         search: Optional[str] = None,
         expand: Optional[List[str]] = None,
         include_deleted: bool = False,
+        cursor: Optional[str] = None,
+        count: Optional[str] = None,
     ) -> Dict[str, Any]:
         """
         List records with filtering, sorting, and pagination
 
+        Pages are addressed by ``page`` (OFFSET/LIMIT) unless ``cursor`` is
+        given: then the list seeks past the cursor position (keyset
+        pagination), so latency does not grow with page depth. An empty cursor
+        starts cursor pagination at the first page; cursor-mode responses carry
+        a ``next_cursor`` while more rows follow.
+
         Args:
             entity_name: Name of the entity
             filters: Filter specification dict
             sort: List of (field, direction) tuples
-            page: Page number (1-indexed)
+            page: Page number (1-indexed, ignored in cursor mode)
             page_size: Items per page
             search: Global search term
+            cursor: Opaque keyset cursor from a previous response ('' for the first page)
+            count: 'exact', 'estimated' or 'none' (default: exact, or none in cursor mode)
 
         Returns:
-            Dict with items, total, page, page_size, pages
+            Dict with items, total, page, page_size, pages, next_cursor, has_more
         """
         # Get model and field definitions
         tenant_id = str(self.current_user.tenant_id) if self.current_user.tenant_id else None
@@ -270,22 +328,37 @@ class DynamicEntityService:
         if search:
             query = self.query_builder.apply_search(query, model, search)
 
-        # Get total before pagination
-        total = query.count()
-
-        # Apply sorting
-        if sort:
-            query = self.query_builder.apply_sort(query, model, sort)
+        # Default sort by created_at desc if exists
+        if not sort and hasattr(model, "created_at"):
+            sort = [("created_at", "desc")]
+
+        count_mode = count or ("none" if cursor is not None else "exact")
+        next_cursor = None
+
+        if cursor is not None:
+            # Keyset pagination: one page_size + 1 seek, no OFFSET
+            total = self.query_builder.count(query, count_mode)
+            total_pages = (total + page_size - 1) // page_size if total is not None else None
+            records = self.query_builder.apply_keyset(query, model, sort, cursor or None, page_size).all()
+            has_more = len(records) > page_size
+            records = records[:page_size]
+            if has_more:
+                keys = self.query_builder.keyset_keys(model, sort)
+                next_cursor = self.query_builder.build_cursor(keys, records[-1])
         else:
-            # Default sort by created_at desc if exists
-            if hasattr(model, "created_at"):
-                query = query.order_by(model.created_at.desc())
+            # Apply sorting
+            if sort:
+                query = self.query_builder.apply_sort(query, model, sort)
 
-        # Apply pagination
-        query, total, total_pages = self.query_builder.apply_pagination(query, page, page_size)
+            # Apply pagination
+            query, total, total_pages = self.query_builder.apply_pagination(query, page, page_size, count_mode)
 
-        # Execute query
-        records = query.all()
+            # Execute query
+            records = query.all()
+            if total is not None:
+                has_more = page * page_size < total
+            else:
+                has_more = len(records) == page_size
 
         items = [self._model_to_dict(r, field_defs) for r in records]
 
@@ -293,7 +366,15 @@ class DynamicEntityService:
         if expand:
             items = self._apply_expand(items, field_defs, expand)
 
-        return {"items": items, "total": total, "page": page, "page_size": page_size, "pages": total_pages}
+        return {
+            "items": items,
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "pages": total_pages,
+            "next_cursor": next_cursor,
+            "has_more": has_more,
+        }
 
     async def get_record(self, entity_name: str, record_id: str) -> Dict[str, Any]:
         """
@@ -370,9 +451,8 @@ class DynamicEntityService:
         validated_data = self._validate_and_prepare_data(field_defs, data, is_create=False)
 
         # Update fields (exclude system fields and org hierarchy columns)
-        protected_fields = ["id", "created_at", "created_by", "tenant_id", "company_id", "branch_id", "department_id"]
         for key, value in validated_data.items():
-            if key not in protected_fields and hasattr(record, key):
+            if key not in self.PROTECTED_FIELDS and hasattr(record, key):
                 setattr(record, key, value)
 
         # Update system fields
@@ -389,39 +469,13 @@ class DynamicEntityService:
             after = self._model_to_dict(record, field_defs)
 
             # Write to shadow versions table if entity is versioned (Story 5.1.5)
-            try:
-                entity_def = self.model_generator._load_entity_definition(entity_name, tenant_id)
-                if entity_def and getattr(entity_def, "is_versioned", False):
-                    table_prefix = f"t_{str(tenant_id).replace('-', '_')}_" if tenant_id else ""
-                    version_table = f"{table_prefix}{entity_name}_versions"
-                    changed_fields = {
-                        k: v for k, v in after.items() if before.get(k) != v and k not in ("updated_at", "updated_by")
-                    }
-                    import json as _json
-
-                    from sqlalchemy import text as _text
-
-                    self.db.execute(
-                        _text(f"""
-                            INSERT INTO {version_table}
-                                (record_id, record_data, changed_fields, changed_by, changed_at)
-                            VALUES
-                                (:record_id, :before::jsonb, :changed::jsonb, :changed_by, NOW())
-                        """),
-                        {
-                            "record_id": str(record_id),
-                            "before": _json.dumps(before),
-                            "changed": _json.dumps(changed_fields),
-                            "changed_by": str(self.current_user.id),
-                        },
-                    )
-                    self.db.commit()
-            except Exception as _ve:
-                logger.debug(f"Version insert skipped: {_ve}")
+            self._write_record_versions(entity_name, tenant_id, [(record_id, before, after)])
 
             # Audit log
             await self._create_audit_log("UPDATE", entity_name, record_id, {"before": before, "after": after})
 
+            self._data_changed(entity_name)
+
             # Trigger automations
             await self._trigger_automations(entity_name, "onUpdate", after)
 
@@ -487,6 +541,8 @@ class DynamicEntityService:
             "DELETE", entity_name, record_id, {"deleted": before, "deletion_type": deletion_type}
         )
 
+        self._data_changed(entity_name)
+
         # Trigger automations
         await self._trigger_automations(entity_name, "onDelete", before)
 
@@ -514,6 +570,7 @@ class DynamicEntityService:
         if hasattr(record, "is_deleted"):
             record.is_deleted = False
         self.db.commit()
+        self._data_changed(entity_name)
 
         await self._create_audit_log("RESTORE", entity_name, str(record_id))
         return self._model_to_dict(record, field_defs)
@@ -718,96 +775,419 @@ class DynamicEntityService:
             "pages": max(1, -(-total // page_size)),
         }
 
-    async def bulk_create(self, entity_name: str, records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    async def bulk_create(
+        self,
+        entity_name: str,
+        records: Union[Iterable[Any], AsyncIterable[Any]],
+        batch_size: Optional[int] = None,
+    ) -> Dict[str, Any]:
         """
         Bulk create records
 
+        Model, field definitions, permissions and matching automation rules are
+        resolved once. Records are consumed in batches of ``batch_size`` rows
+        (default ``DYNAMIC_BULK_BATCH_SIZE``): each batch is validated up front,
+        written with multi-row INSERTs in a single transaction, then audited and
+        handed to automations in bulk. ``records`` may be a list or a (sync or
+        async) iterator, so streamed NDJSON imports never sit in memory whole.
+
         Args:
             entity_name: Name of the entity
-            records: List of record data dicts
+            records: Record data dicts
+            batch_size: Rows written per transaction
 
         Returns:
             Dict with created, failed, errors, ids
         """
+        tenant_id = str(self.current_user.tenant_id) if self.current_user.tenant_id else None
+        self._check_entity_permission(entity_name, "create")
+        model = self.model_generator.get_model(entity_name, tenant_id)
+        field_defs = self.model_generator.get_field_definitions(entity_name, tenant_id)
+        org_context = self._get_org_context(model)
+        rules = self._get_automation_rules(entity_name, "onCreate")
+
+        table = model.__table__
+        id_column = table.c.get("id")
+        # Pre-generate system ids so inserted rows can be re-read without RETURNING
+        generate_ids = id_column is not None and id_column.default is not None
+
+        def write(rows: List[Dict[str, Any]]):
+            for group in self._group_rows_by_keys(rows):
+                self.db.execute(insert(table), group)
+
+        def describe_error(idx, record_data, exc):
+            if isinstance(exc, IntegrityError):
+                return {"index": idx, "data": record_data, "error": f"Failed to create record: {str(exc)}"}
+            return {"index": idx, "data": record_data, "error": str(exc)}
+
         created = 0
-        failed = 0
         errors = []
         ids = []
 
-        for idx, record_data in enumerate(records):
-            try:
-                result = await self.create_record(entity_name, record_data)
-                created += 1
-                ids.append(result.get("id"))
-            except Exception as e:
-                failed += 1
-                errors.append({"index": idx, "data": record_data, "error": str(e)})
-                logger.error(f"Bulk create error at index {idx}: {e}")
+        async for batch in _iter_batches(records, batch_size):
+            now = datetime.utcnow()
+            entries = []
+            for idx, record_data in batch:
+                try:
+                    record_data = self._ensure_record_dict(record_data)
+                    row = self._validate_and_prepare_data(field_defs, record_data, is_create=True)
+                except Exception as e:
+                    errors.append(describe_error(idx, record_data if isinstance(record_data, dict) else None, e))
+                    logger.error(f"Bulk create error at index {idx}: {e}")
+                    continue
+
+                row.update(org_context)
+                if "created_by" in table.c:
+                    row["created_by"] = str(self.current_user.id)
+                if "created_at" in table.c:
+                    row["created_at"] = now
+                if "updated_at" in table.c:
+                    row["updated_at"] = now
+                if generate_ids and row.get("id") is None:
+                    row["id"] = uuid.uuid4() if getattr(id_column.type, "as_uuid", False) else str(uuid.uuid4())
+                entries.append((idx, record_data, row))
+
+            written = self._write_batch(entries, write, errors, describe_error)
+            if not written:
+                continue
+
+            created += len(written)
+            written_ids = [str(row["id"]) for _, _, row in written if row.get("id") is not None]
+            ids.extend(written_ids)
+
+            stored = self._fetch_record_dicts(model, field_defs, written_ids)
+            record_dicts = [
+                stored.get(str(row.get("id"))) or self._row_to_dict(row, field_defs) for _, _, row in written
+            ]
+
+            await self._create_audit_logs_bulk(
+                "CREATE", entity_name, [(r.get("id"), {"created": r}) for r in record_dicts]
+            )
+            self._data_changed(entity_name)
+            await self._execute_automation_rules(entity_name, "onCreate", rules, record_dicts)
+
+        logger.info(f"Bulk created {created} {entity_name} records ({len(errors)} failed)")
 
-        return {"created": created, "failed": failed, "errors": errors, "ids": ids}
+        return {"created": created, "failed": len(errors), "errors": errors, "ids": ids}
 
-    async def bulk_update(self, entity_name: str, records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    async def bulk_update(
+        self,
+        entity_name: str,
+        records: Union[Iterable[Any], AsyncIterable[Any]],
+        batch_size: Optional[int] = None,
+    ) -> Dict[str, Any]:
         """
         Bulk update records
 
-        Each record must have an 'id' field
+        Each record must have an 'id' field. Batches are validated up front,
+        existing rows are loaded with one ``id IN (...)`` query, and changes are
+        written per transaction with ``UPDATE ... FROM (VALUES ...)`` on
+        PostgreSQL (an executemany UPDATE elsewhere). Repeated ids within a
+        batch are merged, later values winning, as sequential updates would.
 
         Args:
             entity_name: Name of the entity
             records: List of records with id and data to update
+            batch_size: Rows written per transaction
 
         Returns:
             Dict with updated, failed, errors
         """
+        tenant_id = str(self.current_user.tenant_id) if self.current_user.tenant_id else None
+        self._check_entity_permission(entity_name, "update")
+        model = self.model_generator.get_model(entity_name, tenant_id)
+        field_defs = self.model_generator.get_field_definitions(entity_name, tenant_id)
+        org_context = self._get_org_context(model)
+        rules = self._get_automation_rules(entity_name, "onUpdate")
+
+        table = model.__table__
+        pk_column = model.id
+        use_values_join = self.db.get_bind().dialect.name == "postgresql"
+
+        def write(rows: List[Dict[str, Any]]):
+            for group in self._group_rows_by_keys(rows):
+                columns = [key for key in group[0] if key != "_pk"]
+                if use_values_join and len(group) > 1:
+                    data = sa_values(
+                        sa_column("_pk", pk_column.type),
+                        *[sa_column(c, table.c[c].type) for c in columns],
+                        name="v",
+                    ).data([tuple([r["_pk"]] + [r[c] for c in columns]) for r in group])
+                    stmt = (
+                        update(table)
+                        .where(pk_column == cast(data.c._pk, pk_column.type))
+                        .values({c: cast(data.c[c], table.c[c].type) for c in columns})
+                    )
+                    self.db.execute(stmt)
+                else:
+                    stmt = (
+                        update(table)
+                        .where(pk_column == bindparam("_pk"))
+                        .values({c: bindparam(f"v_{c}") for c in columns})
+                    )
+                    self.db.execute(stmt, [{"_pk": r["_pk"], **{f"v_{c}": r[c] for c in columns}} for r in group])
+
+        def describe_error(idx, record_id, exc):
+            if isinstance(exc, IntegrityError):
+                return {"index": idx, "id": record_id, "error": f"Failed to update record: {str(exc)}"}
+            return {"index": idx, "id": record_id, "error": str(exc)}
+
         updated = 0
-        failed = 0
         errors = []
 
-        for idx, record_data in enumerate(records):
-            record_id = record_data.get("id")
-            if not record_id:
-                failed += 1
-                errors.append({"index": idx, "data": record_data, "error": "Missing id field"})
+        async for batch in _iter_batches(records, batch_size):
+            # record_id -> ([indexes], merged column values)
+            pending: Dict[str, Any] = {}
+            for idx, record_data in batch:
+                try:
+                    record_data = self._ensure_record_dict(record_data)
+                except ValueError as e:
+                    errors.append({"index": idx, "data": None, "error": str(e)})
+                    continue
+
+                record_id = record_data.get("id")
+                if not record_id:
+                    errors.append({"index": idx, "data": record_data, "error": "Missing id field"})
+                    continue
+
+                # Remove id from update data
+                update_data = {k: v for k, v in record_data.items() if k != "id"}
+
+                try:
+                    validated = self._validate_and_prepare_data(field_defs, update_data, is_create=False)
+                except Exception as e:
+                    errors.append(describe_error(idx, record_id, e))
+                    logger.error(f"Bulk update error at index {idx}: {e}")
+                    continue
+
+                key = self._normalize_record_id(record_id)
+                indexes, values = pending.setdefault(key, ([], {}))
+                indexes.append(idx)
+                values.update({k: v for k, v in validated.items() if k not in self.PROTECTED_FIELDS and k in table.c})
+
+            before = self._fetch_record_dicts(model, field_defs, list(pending), org_context)
+
+            now = datetime.utcnow()
+            entries = []
+            for record_id, (indexes, values) in pending.items():
+                if record_id not in before:
+                    errors.extend(
+                        {"index": i, "id": record_id, "error": f"Record not found: {record_id}"} for i in indexes
+                    )
+                    continue
+                row = {"_pk": self._bind_record_id(pk_column, record_id), **values}
+                if "updated_by" in table.c:
+                    row["updated_by"] = str(self.current_user.id)
+                if "updated_at" in table.c:
+                    row["updated_at"] = now
+                entries.append((indexes, record_id, row))
+
+            written = self._write_batch(entries, write, errors, describe_error)
+            if not written:
                 continue
 
-            # Remove id from update data
-            update_data = {k: v for k, v in record_data.items() if k != "id"}
+            updated += sum(len(indexes) for indexes, _, _ in written)
+            written_ids = [record_id for _, record_id, _ in written]
+            after = self._fetch_record_dicts(model, field_defs, written_ids)
+            changes = [(record_id, before[record_id], after.get(record_id, {})) for record_id in written_ids]
 
-            try:
-                await self.update_record(entity_name, record_id, update_data)
-                updated += 1
-            except Exception as e:
-                failed += 1
-                errors.append({"index": idx, "id": record_id, "error": str(e)})
-                logger.error(f"Bulk update error at index {idx}: {e}")
+            self._write_record_versions(entity_name, tenant_id, changes)
+            await self._create_audit_logs_bulk(
+                "UPDATE", entity_name, [(rid, {"before": old, "after": new}) for rid, old, new in changes]
+            )
+            self._data_changed(entity_name)
+            await self._execute_automation_rules(entity_name, "onUpdate", rules, [new for _, _, new in changes])
 
-        return {"updated": updated, "failed": failed, "errors": errors}
+        logger.info(f"Bulk updated {updated} {entity_name} records ({len(errors)} failed)")
 
-    async def bulk_delete(self, entity_name: str, ids: List[str]) -> Dict[str, Any]:
+        return {"updated": updated, "failed": len(errors), "errors": errors}
+
+    async def bulk_delete(
+        self,
+        entity_name: str,
+        ids: Union[Iterable[Any], AsyncIterable[Any]],
+        batch_size: Optional[int] = None,
+    ) -> Dict[str, Any]:
         """
         Bulk delete records
 
+        Soft deletes (when the entity has ``deleted_at``) become one
+        ``UPDATE ... WHERE id IN (...)`` per batch, hard deletes one
+        ``DELETE ... WHERE id IN (...)``.
+
         Args:
             entity_name: Name of the entity
             ids: List of record IDs to delete
+            batch_size: Rows written per transaction
 
         Returns:
             Dict with deleted, failed, errors
         """
+        tenant_id = str(self.current_user.tenant_id) if self.current_user.tenant_id else None
+        self._check_entity_permission(entity_name, "delete")
+        model = self.model_generator.get_model(entity_name, tenant_id)
+        field_defs = self.model_generator.get_field_definitions(entity_name, tenant_id)
+        org_context = self._get_org_context(model)
+        rules = self._get_automation_rules(entity_name, "onDelete")
+
+        table = model.__table__
+        pk_column = model.id
+        deletion_type = "soft" if "deleted_at" in table.c else "hard"
+
+        def write(rows: List[Dict[str, Any]]):
+            record_ids = [r["_pk"] for r in rows]
+            if deletion_type == "soft":
+                values = {"deleted_at": datetime.utcnow()}
+                if "deleted_by" in table.c:
+                    values["deleted_by"] = str(self.current_user.id)
+                self.db.execute(update(table).where(pk_column.in_(record_ids)).values(values))
+            else:
+                self.db.execute(sa_delete(table).where(pk_column.in_(record_ids)))
+
+        def describe_error(idx, record_id, exc):
+            return {"index": idx, "id": record_id, "error": str(exc)}
+
         deleted = 0
-        failed = 0
         errors = []
 
-        for idx, record_id in enumerate(ids):
+        async for batch in _iter_batches(ids, batch_size):
+            pending: Dict[str, List[int]] = {}
+            for idx, record_id in batch:
+                if not record_id or not isinstance(record_id, str):
+                    errors.append({"index": idx, "id": record_id, "error": f"Record not found: {record_id}"})
+                    continue
+                pending.setdefault(self._normalize_record_id(record_id), []).append(idx)
+
+            before = self._fetch_record_dicts(model, field_defs, list(pending), org_context)
+
+            entries = []
+            for record_id, indexes in pending.items():
+                if record_id not in before:
+                    errors.extend(
+                        {"index": i, "id": record_id, "error": f"Record not found: {record_id}"} for i in indexes
+                    )
+                    continue
+                entries.append((indexes, record_id, {"_pk": self._bind_record_id(pk_column, record_id)}))
+
+            written = self._write_batch(entries, write, errors, describe_error)
+            if not written:
+                continue
+
+            deleted += sum(len(indexes) for indexes, _, _ in written)
+            removed = [before[record_id] for _, record_id, _ in written]
+
+            await self._create_audit_logs_bulk(
+                "DELETE",
+                entity_name,
+                [(r.get("id"), {"deleted": r, "deletion_type": deletion_type}) for r in removed],
+            )
+            self._data_changed(entity_name)
+            await self._execute_automation_rules(entity_name, "onDelete", rules, removed)
+
+        logger.info(f"Bulk deleted {deleted} {entity_name} records ({deletion_type}, {len(errors)} failed)")
+
+        return {"deleted": deleted, "failed": len(errors), "errors": errors}
+
+    def _write_batch(self, entries: List[tuple], write: Callable, errors: List[Dict], describe_error: Callable) -> list:
+        """
+        Write one bulk batch in a single transaction.
+
+        ``entries`` are ``(index_or_indexes, payload, row)`` tuples and ``write``
+        issues the set-based statement(s) for a list of rows. If the batch
+        fails as a whole (e.g. one unique violation) it is rolled back and
+        replayed row by row inside savepoints, so only the offending rows are
+        reported in ``errors`` (via ``describe_error(index, payload, exc)``).
+
+        Returns:
+            The entries that were written
+        """
+        if not entries:
+            return []
+
+        try:
+            write([row for _, _, row in entries])
+            self.db.commit()
+            return entries
+        except Exception as e:
+            self.db.rollback()
+            logger.warning(f"Bulk batch of {len(entries)} rows failed, retrying row by row: {e}")
+
+        written = []
+        for entry in entries:
+            indexes, payload, row = entry
             try:
-                await self.delete_record(entity_name, record_id)
-                deleted += 1
+                with self.db.begin_nested():
+                    write([row])
+                written.append(entry)
             except Exception as e:
-                failed += 1
-                errors.append({"index": idx, "id": record_id, "error": str(e)})
-                logger.error(f"Bulk delete error at index {idx}: {e}")
+                for idx in indexes if isinstance(indexes, list) else [indexes]:
+                    errors.append(describe_error(idx, payload, e))
+                    logger.error(f"Bulk write error at index {idx}: {e}")
+        self.db.commit()
+
+        return written
+
+    @staticmethod
+    def _group_rows_by_keys(rows: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """Split rows into groups sharing the same column set (one multi-row statement each)."""
+        groups: Dict[tuple, List[Dict[str, Any]]] = {}
+        for row in rows:
+            groups.setdefault(tuple(sorted(row)), []).append(row)
+        return list(groups.values())
+
+    @staticmethod
+    def _ensure_record_dict(record: Any) -> Dict[str, Any]:
+        """Reject stream items that are not JSON objects (e.g. unparsable NDJSON lines)."""
+        if isinstance(record, Exception):
+            raise ValueError(str(record))
+        if not isinstance(record, dict):
+            raise ValueError("Record must be a JSON object")
+        return record
+
+    @staticmethod
+    def _normalize_record_id(record_id: Any) -> str:
+        """Canonical string form of a record id, matching what _model_to_dict returns."""
+        try:
+            return str(uuid.UUID(str(record_id)))
+        except ValueError:
+            return str(record_id)
+
+    @staticmethod
+    def _bind_record_id(column, record_id: str) -> Any:
+        """Convert a normalized record id to what the primary-key column binds (UUID for as_uuid columns)."""
+        if getattr(column.type, "as_uuid", False):
+            try:
+                return uuid.UUID(record_id)
+            except ValueError:
+                return record_id
+        return record_id
+
+    def _fetch_record_dicts(
+        self, model, field_defs: List[Dict], record_ids: List[str], org_context: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """Load records by id with one IN query, keyed by their serialized id."""
+        if not record_ids:
+            return {}
+
+        query = self.db.query(model).filter(model.id.in_([self._bind_record_id(model.id, r) for r in record_ids]))
+        for col_name, col_value in (org_context or {}).items():
+            query = query.filter(getattr(model, col_name) == col_value)
+
+        result = {}
+        for record in query.all():
+            record_dict = self._model_to_dict(record, field_defs)
+            result[str(record_dict.get("id"))] = record_dict
+        return result
 
-        return {"deleted": deleted, "failed": failed, "errors": errors}
+    def _row_to_dict(self, row: Dict[str, Any], field_defs: List[Dict]) -> Dict[str, Any]:
+        """Serialize an inserted row that could not be re-read (no known primary key)."""
+        field_types = {f.get("db_column_name") or f["name"]: f["field_type"] for f in field_defs}
+        return {
+            key: self.field_mapper.serialize_value(
+                field_types.get(key) or self.SYSTEM_FIELD_TYPES.get(key, "string"), value
+            )
+            for key, value in row.items()
+        }
 
     def _apply_expand(
         self, items: List[Dict[str, Any]], field_defs: List[Dict], expand: List[str]
@@ -1118,6 +1498,79 @@ class DynamicEntityService:
             # Don't fail the operation if audit logging fails
             logger.error(f"Failed to create audit log: {e}")
 
+    async def _create_audit_logs_bulk(self, action: str, entity_name: str, entries: List[Tuple[Optional[str], Dict]]):
+        """
+        Create audit log entries for a bulk batch with one multi-row INSERT
+
+        Args:
+            action: Action type (CREATE, UPDATE, DELETE)
+            entity_name: Entity name
+            entries: (entity_id, changes) pairs
+        """
+        try:
+            from app.core.audit import create_audit_logs_bulk
+
+            create_audit_logs_bulk(
+                db=self.db,
+                action=action,
+                entries=entries,
+                user=self.current_user,
+                entity_type=entity_name,
+                status="success",
+            )
+        except Exception as e:
+            # Don't fail the operation if audit logging fails
+            self.db.rollback()
+            logger.error(f"Failed to create bulk audit logs: {e}")
+
+    def _write_record_versions(self, entity_name: str, tenant_id: Optional[str], changes: List[Tuple[str, Dict, Dict]]):
+        """
+        Write (record_id, before, after) changes to the shadow versions table
+        when the entity is versioned (Story 5.1.5). Failures are logged and
+        never fail the update itself.
+        """
+        if not changes:
+            return
+
+        try:
+            entity_def = self.model_generator.get_entity_definition(entity_name, tenant_id)
+            if not entity_def or not getattr(entity_def, "is_versioned", False):
+                return
+
+            table_prefix = f"t_{str(tenant_id).replace('-', '_')}_" if tenant_id else ""
+            version_table = f"{table_prefix}{entity_name}_versions"
+            rows = []
+            for record_id, before, after in changes:
+                changed_fields = {
+                    k: v for k, v in after.items() if before.get(k) != v and k not in ("updated_at", "updated_by")
+                }
+                rows.append(
+                    {
+                        "record_id": str(record_id),
+                        "before": json.dumps(before),
+                        "changed": json.dumps(changed_fields),
+                        "changed_by": str(self.current_user.id),
+                    }
+                )
+
+            self.db.execute(
+                text(f"""
+                    INSERT INTO {version_table}
+                        (record_id, record_data, changed_fields, changed_by, changed_at)
+                    VALUES
+                        (:record_id, CAST(:before AS jsonb), CAST(:changed AS jsonb), :changed_by, NOW())
+                """),
+                rows,
+            )
+            self.db.commit()
+        except Exception as _ve:
+            self.db.rollback()
+            logger.debug(f"Version insert skipped: {_ve}")
+
+    def _data_changed(self, entity_name: str):
+        """Drop cached lookup option lists built from this entity's rows (after commit)"""
+        get_lookup_option_cache().entity_changed(self.current_user.tenant_id, entity_name)
+
     async def _trigger_automations(self, entity_name: str, event: str, record: Dict[str, Any]):
         """
         Trigger automation rules for nocode entity events
@@ -1132,47 +1585,70 @@ class DynamicEntityService:
             - onUpdate: Triggered after record update
             - onDelete: Triggered after record deletion
         """
+        rules = self._get_automation_rules(entity_name, event)
+        await self._execute_automation_rules(entity_name, event, rules, [record])
+
+    def _get_automation_rules(self, entity_name: str, event: str) -> list:
+        """
+        Find active database-trigger automation rules for an entity event
+
+        Served from the per-tenant automation trigger index (no query once the
+        tenant's index is compiled). Bulk operations call this once and reuse
+        the result for every batch.
+        """
         try:
-            from app.models.automation import AutomationRule
-            from app.services.automation_service import AutomationService
+            return get_automation_trigger_index().rules_for(self.db, self.current_user.tenant_id, entity_name, event)
+        except Exception as e:
+            # Don't fail the operation if automation lookup fails
+            self.db.rollback()
+            logger.error(f"Failed to load automation rules for {entity_name}.{event}: {e}")
+            return []
 
-            # Find matching automation rules
-            rules = (
-                self.db.query(AutomationRule)
-                .filter(AutomationRule.trigger_type == "database", AutomationRule.is_active == True)
-                .all()
-            )
+    async def _execute_automation_rules(self, entity_name: str, event: str, rules: list, records: List[Dict[str, Any]]):
+        """
+        Execute already-matched automation rules for each affected record
 
-            # Filter rules by entity and event
-            matching_rules = []
-            for rule in rules:
-                trigger_config = rule.trigger_config or {}
-                if trigger_config.get("entity_name") == entity_name and trigger_config.get("event") == event:
-                    matching_rules.append(rule)
+        With AUTOMATION_QUEUE_ENABLED, async rules (``is_async``) are queued
+        for the automation worker in one INSERT; the rest run inline.
+        """
+        if not rules:
+            logger.debug(f"No automation rules found for {entity_name}.{event}")
+            return
 
-            if not matching_rules:
-                logger.debug(f"No automation rules found for {entity_name}.{event}")
-                return
+        try:
+            from app.services.automation_service import AutomationService
 
-            # Execute each matching rule
             automation_service = AutomationService(self.db, self.current_user)
-            for rule in matching_rules:
-                try:
-                    logger.info(f"Triggering automation rule: {rule.name} for {entity_name}.{event}")
-                    await automation_service.execute_rule(
-                        rule.id,
-                        context={
-                            "entity": entity_name,
-                            "event": event,
-                            "record": record,
-                            "user_id": str(self.current_user.id),
-                            "tenant_id": str(self.current_user.tenant_id) if self.current_user.tenant_id else None,
-                        },
-                    )
-                except Exception as rule_error:
-                    # Log error but continue with other rules
-                    logger.error(f"Failed to execute automation rule {rule.name}: {rule_error}")
+            queue_enabled = get_settings().AUTOMATION_QUEUE_ENABLED
+            queued = [rule for rule in rules if queue_enabled and rule.is_async]
+            inline = [rule for rule in rules if not (queue_enabled and rule.is_async)]
+
+            if queued:
+                count = automation_service.enqueue_executions(
+                    queued, [self._automation_context(entity_name, event, record) for record in records]
+                )
+                logger.info(f"Queued {count} automation executions for {entity_name}.{event}")
+
+            for record in records:
+                for rule in inline:
+                    try:
+                        logger.info(f"Triggering automation rule: {rule.name} for {entity_name}.{event}")
+                        await automation_service.execute_rule(
+                            rule.id, context_data=self._automation_context(entity_name, event, record)
+                        )
+                    except Exception as rule_error:
+                        # Log error but continue with other rules
+                        logger.error(f"Failed to execute automation rule {rule.name}: {rule_error}")
 
         except Exception as e:
             # Don't fail the operation if automation triggering fails
             logger.error(f"Failed to trigger automations for {entity_name}.{event}: {e}")
+
+    def _automation_context(self, entity_name: str, event: str, record: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "entity": entity_name,
+            "event": event,
+            "record": record,
+            "user_id": str(self.current_user.id),
+            "tenant_id": str(self.current_user.tenant_id) if self.current_user.tenant_id else None,
+        }
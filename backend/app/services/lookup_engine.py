@@ -0,0 +1,390 @@
+"""
+Lookup Engine - entity-backed lookup options with indexed typeahead
+
+Serves lookups with ``source_type == "entity"`` from the runtime model of the
+source entity (``RuntimeModelGenerator``), scoped like the entity's own list
+endpoint (tenant and org hierarchy columns, soft-deleted rows excluded).
+
+- Typeahead runs in SQL with LIMIT pushdown: one ``page_size + 1`` query per
+  page, sorted by the configured sort field. Search terms match
+  ``lower(CAST(field AS TEXT))`` by prefix (``LIKE 'term%'``) or, with
+  ``meta_data.search_mode = "contains"``, by substring. On PostgreSQL
+  ``ensure_search_indexes`` builds matching expression indexes
+  (``text_pattern_ops`` b-tree for prefix, ``pg_trgm`` GIN for substring)
+  with ``CREATE INDEX CONCURRENTLY`` in a background thread.
+- Cascading lookups filter on ``parent_value`` in SQL. The child field comes
+  from ``dependency_mapping.filter_field`` or, failing that, from the active
+  ``CascadingLookupRule.child_filter_field`` of the lookup.
+- Small lookups (up to ``LOOKUP_MEMORY_MAX_OPTIONS`` rows) are loaded once into
+  the in-process ``LookupOptionCache`` and paged and searched in memory until
+  the entity's data changes or ``cache_ttl_seconds`` pass.
+
+Totals are exact when the requested page reaches the end of the result;
+otherwise they come from planner statistics (``DynamicQueryBuilder.estimate_count``)
+so deep typeahead never counts a large table.
+"""
+
+import hashlib
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from sqlalchemy import Text, cast, func, or_, text
+from sqlalchemy.orm import Query, Session
+
+from app.core.lookup_options import LookupOptionCache, Option, get_lookup_option_cache
+from app.models.data_model import EntityDefinition
+from app.models.lookup import CascadingLookupRule, LookupConfiguration
+from app.services.dynamic_entity_service import DynamicEntityService
+
+logger = logging.getLogger(__name__)
+
+SEARCH_MODES = ("prefix", "contains")
+LIKE_ESCAPE = "\\"
+
+
+@dataclass
+class _LookupSource:
+    """Resolved columns of an entity lookup"""
+
+    entity_name: str
+    model: Type
+    value: Any
+    label: Any
+    extra: List[Tuple[str, Any]] = field(default_factory=list)
+    search: List[Any] = field(default_factory=list)
+    sort: Any = None
+    descending: bool = False
+    scope: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def columns(self) -> list:
+        """Selected columns: value, label, additional display fields, search fields"""
+        return [self.value, self.label] + [column for _, column in self.extra] + self.search
+
+
+class EntityLookupEngine:
+    """Resolves entity lookups into option pages"""
+
+    def __init__(self, db: Session, current_user, cache: Optional[LookupOptionCache] = None):
+        """
+        Initialize lookup engine
+
+        Args:
+            db: SQLAlchemy database session
+            current_user: Current authenticated user (drives tenant/org scoping)
+            cache: Option cache (defaults to the global instance)
+        """
+        self.db = db
+        self.current_user = current_user
+        self.tenant_id = current_user.tenant_id
+        self.entities = DynamicEntityService(db, current_user)
+        self.cache = cache or get_lookup_option_cache()
+
+    def fetch(
+        self,
+        config: LookupConfiguration,
+        search: Optional[str] = None,
+        filters: Optional[dict] = None,
+        parent_value: Optional[str] = None,
+        page: int = 1,
+        page_size: int = 50,
+    ) -> Dict[str, Any]:
+        """
+        Get one page of options
+
+        Args:
+            config: Entity lookup configuration
+            search: Typeahead term (ignored below ``min_search_length``)
+            filters: Extra filters (DynamicQueryBuilder spec or field -> value map)
+            parent_value: Selected value of the parent lookup
+            page: Page number (1-indexed)
+            page_size: Options per page
+
+        Returns:
+            Dict with items, total_count, page, page_size, has_more
+
+        Raises:
+            ValueError: If the source entity or a configured field does not exist
+        """
+        source = self._resolve(config)
+        term = self._search_term(config, search)
+        mode = self.search_mode(config)
+        parent_column = self._parent_column(config, source) if parent_value is not None else None
+        offset = (page - 1) * page_size
+
+        if config.enable_caching and not filters:
+            options = self._cached_options(config, source, parent_column, parent_value)
+            if options is not None:
+                if term:
+                    options = [option for option in options if self._matches(option[1], term, mode)]
+                items = [item for item, _ in options[offset : offset + page_size]]
+                return self._page(items, len(options), page, page_size, offset + page_size < len(options))
+
+        query = self._base_query(config, source, filters, parent_column, parent_value)
+        if term:
+            query = query.filter(self._search_clause(source.search, term, mode))
+
+        rows = self._sorted(query, source).offset(offset).limit(page_size + 1).all()
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if has_more or (offset and not rows):
+            total = max(self.entities.query_builder.estimate_count(query), offset + len(rows) + int(has_more))
+        else:
+            total = offset + len(rows)
+
+        return self._page([self._item(source, row) for row in rows], total, page, page_size, has_more)
+
+    def ensure_search_indexes(self, config: LookupConfiguration) -> List[str]:
+        """
+        Build the expression indexes typeahead on ``config`` relies on
+
+        PostgreSQL only; a no-op elsewhere. Indexes are created with
+        ``CREATE INDEX CONCURRENTLY`` on a dedicated autocommit connection in a
+        daemon thread, so neither the caller nor writers to the entity table
+        are blocked. Existing valid indexes are kept; invalid leftovers of an
+        interrupted build are dropped and rebuilt. Failures are logged.
+
+        Returns:
+            Names of the indexes scheduled for creation
+        """
+        bind = self.db.get_bind()
+        if bind.dialect.name != "postgresql" or not config.enable_search:
+            return []
+
+        source = self._resolve(config)
+        mode = self.search_mode(config)
+        preparer = bind.dialect.identifier_preparer
+        table = source.model.__table__
+        statements = []
+        if mode == "contains":
+            statements.append((None, None, "CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        for column in source.search:
+            name = self.index_name(table, column, mode)
+            qualified = f"{preparer.quote_schema(table.schema)}.{name}" if table.schema else name
+            expression = f"lower(CAST({preparer.quote(column.name)} AS TEXT))"
+            if mode == "contains":
+                using = f"USING gin ({expression} gin_trgm_ops)"
+            else:
+                using = f"({expression} text_pattern_ops)"
+            statements.append(
+                (
+                    name,
+                    qualified,
+                    f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {preparer.format_table(table)} {using}",
+                )
+            )
+
+        engine = getattr(bind, "engine", bind)
+        threading.Thread(target=_build_indexes, args=(engine, statements), name="lookup-index", daemon=True).start()
+        return [name for name, _, _ in statements if name]
+
+    @staticmethod
+    def search_mode(config: LookupConfiguration) -> str:
+        """Typeahead matching mode of a lookup: 'prefix' (default) or 'contains'"""
+        mode = (config.meta_data or {}).get("search_mode", "prefix")
+        return mode if mode in SEARCH_MODES else "prefix"
+
+    @staticmethod
+    def search_expression(column):
+        """Expression typeahead matches against (and the search indexes are built on)"""
+        return func.lower(cast(column, Text))
+
+    @staticmethod
+    def index_name(table, column, mode: str) -> str:
+        """Stable, length-safe name of the search index for one column"""
+        digest = hashlib.sha1(f"{table.schema}.{table.name}.{column.name}.{mode}".encode()).hexdigest()[:16]
+        return f"ix_lookup_{mode}_{digest}"
+
+    # ==================== Helper Methods ====================
+
+    def _resolve(self, config: LookupConfiguration) -> _LookupSource:
+        if not config.source_entity_id:
+            raise ValueError("Entity lookup has no source entity")
+
+        entity_q = self.db.query(EntityDefinition.name).filter(EntityDefinition.id == config.source_entity_id)
+        if self.tenant_id:
+            entity_q = entity_q.filter(
+                or_(
+                    EntityDefinition.tenant_id == self.tenant_id,  # tenant-scope-ok (or_() tenant branch)
+                    EntityDefinition.tenant_id.is_(None),
+                )
+            )
+        else:
+            entity_q = entity_q.filter(EntityDefinition.tenant_id.is_(None))
+        entity_name = entity_q.scalar()
+        if not entity_name:
+            raise ValueError("Source entity of the lookup not found")
+
+        model = self._source_model(entity_name)
+        value_field = config.value_field or "id"
+        label_field = config.display_field or value_field
+        return _LookupSource(
+            entity_name=entity_name,
+            model=model,
+            value=self._column(model, value_field),
+            label=self._column(model, label_field),
+            extra=[(name, self._column(model, name)) for name in config.additional_display_fields or []],
+            search=[self._column(model, name) for name in config.search_fields or [label_field]],
+            sort=self._column(model, config.default_sort_field or label_field),
+            descending=(config.default_sort_order or "ASC").upper() == "DESC",
+            scope=self.entities._get_org_context(model),
+        )
+
+    def _source_model(self, entity_name: str) -> Type:
+        tenant_id = str(self.tenant_id) if self.tenant_id else None
+        return self.entities.model_generator.get_model(entity_name, tenant_id)
+
+    @staticmethod
+    def _column(model: Type, name: str):
+        column = model.__mapper__.columns.get(name)
+        if column is None:
+            raise ValueError(f"Field '{name}' not found on lookup source entity")
+        return column
+
+    def _parent_column(self, config: LookupConfiguration, source: _LookupSource):
+        field_name = (config.dependency_mapping or {}).get("filter_field")
+        if not field_name:
+            rule_q = self.db.query(CascadingLookupRule.child_filter_field).filter(
+                CascadingLookupRule.child_lookup_id == config.id,
+                CascadingLookupRule.is_active == True,
+                CascadingLookupRule.child_filter_field.isnot(None),
+            )
+            if self.tenant_id:
+                rule_q = rule_q.filter(
+                    or_(
+                        CascadingLookupRule.tenant_id == self.tenant_id,  # tenant-scope-ok (or_() tenant branch)
+                        CascadingLookupRule.tenant_id.is_(None),
+                    )
+                )
+            field_name = rule_q.order_by(CascadingLookupRule.created_at).limit(1).scalar()
+        if not field_name:
+            logger.debug(f"Lookup {config.id} has no parent filter field; parent_value ignored")
+            return None
+        return self._column(source.model, field_name)
+
+    @staticmethod
+    def _search_term(config: LookupConfiguration, search: Optional[str]) -> Optional[str]:
+        term = (search or "").strip().lower()
+        if not term or not config.enable_search or len(term) < (config.min_search_length or 0):
+            return None
+        return term
+
+    def _base_query(
+        self,
+        config: LookupConfiguration,
+        source: _LookupSource,
+        filters: Optional[dict],
+        parent_column,
+        parent_value: Optional[str],
+    ) -> Query:
+        query = self.db.query(*source.columns)
+        for col_name, col_value in source.scope.items():
+            query = query.filter(getattr(source.model, col_name) == col_value)
+        if hasattr(source.model, "deleted_at"):
+            query = query.filter(source.model.deleted_at.is_(None))
+        for spec in (config.default_filter, filters):
+            query = self._apply_filter(query, source.model, spec)
+        if parent_column is not None:
+            query = query.filter(parent_column == parent_value)
+        return query
+
+    def _apply_filter(self, query: Query, model: Type, spec: Optional[dict]) -> Query:
+        if not spec:
+            return query
+        if "conditions" in spec or "field" in spec:
+            return self.entities.query_builder.apply_filters(query, model, spec)
+        for name, value in spec.items():
+            column = self._column(model, name)
+            query = query.filter(column.in_(value) if isinstance(value, list) else column == value)
+        return query
+
+    @classmethod
+    def _search_clause(cls, columns: list, term: str, mode: str):
+        escaped = term.replace(LIKE_ESCAPE, LIKE_ESCAPE * 2).replace("%", "\\%").replace("_", "\\_")
+        pattern = f"{escaped}%" if mode == "prefix" else f"%{escaped}%"
+        return or_(*(cls.search_expression(column).like(pattern, escape=LIKE_ESCAPE) for column in columns))
+
+    @staticmethod
+    def _sorted(query: Query, source: _LookupSource) -> Query:
+        sort = source.sort.desc() if source.descending else source.sort.asc()
+        # The value column breaks ties so OFFSET pages are stable
+        return query.order_by(sort, source.value.asc())
+
+    @staticmethod
+    def _matches(texts: Tuple[str, ...], term: str, mode: str) -> bool:
+        if mode == "prefix":
+            return any(t.startswith(term) for t in texts)
+        return any(term in t for t in texts)
+
+    def _cached_options(
+        self, config: LookupConfiguration, source: _LookupSource, parent_column, parent_value: Optional[str]
+    ) -> Optional[List[Option]]:
+        """Complete option list from memory (loaded on a miss), or None if the lookup is too large"""
+        key = (str(config.id), config.updated_at, tuple(sorted(source.scope.items())), parent_value)
+        hit, options = self.cache.get(key)
+        if hit:
+            return options
+
+        generation = self.cache.generation
+        query = self._base_query(config, source, None, parent_column, parent_value)
+        rows = self._sorted(query, source).limit(self.cache.max_options + 1).all()
+        if len(rows) > self.cache.max_options:
+            options = None
+        else:
+            first_search = 2 + len(source.extra)
+            options = [
+                (
+                    self._item(source, row),
+                    tuple("" if v is None else str(v).lower() for v in row[first_search:]),
+                )
+                for row in rows
+            ]
+        self.cache.set(
+            key,
+            source.scope.get("tenant_id"),
+            source.entity_name,
+            options,
+            config.cache_ttl_seconds or 3600,
+            generation,
+        )
+        return options
+
+    @staticmethod
+    def _item(source: _LookupSource, row) -> Dict[str, Any]:
+        additional = {name: row[2 + i] for i, (name, _) in enumerate(source.extra)}
+        return {
+            "value": row[0],
+            "label": "" if row[1] is None else str(row[1]),
+            "additional_data": additional or None,
+        }
+
+    @staticmethod
+    def _page(items: list, total: int, page: int, page_size: int, has_more: bool) -> Dict[str, Any]:
+        return {"items": items, "total_count": total, "page": page, "page_size": page_size, "has_more": has_more}
+
+
+def _build_indexes(engine, statements: List[Tuple[Optional[str], Optional[str], str]]):
+    """Run search index DDL outside any transaction (CONCURRENTLY requires autocommit)"""
+    for name, qualified, statement in statements:
+        try:
+            with engine.connect() as conn:
+                conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+                if name:
+                    valid = conn.execute(
+                        text(
+                            "SELECT i.indisvalid FROM pg_catalog.pg_index i "
+                            "JOIN pg_catalog.pg_class c ON c.oid = i.indexrelid WHERE c.relname = :name"
+                        ),
+                        {"name": name},
+                    ).scalar()
+                    if valid:
+                        continue
+                    if valid is False:
+                        conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {qualified}"))
+                conn.execute(text(statement))
+            if name:
+                logger.info(f"Built lookup search index {name}")
+        except Exception as e:
+            logger.warning(f"Could not build lookup search index {name or statement}: {e}")
@@ -2,11 +2,14 @@
 Lookup Configuration Service
 
 Business logic for the Lookup Configuration feature.
-Handles dynamic data retrieval and caching.
+Handles dynamic data retrieval and caching. Entity-backed lookups are served
+by ``EntityLookupEngine`` (SQL typeahead plus an in-memory option cache);
+the other sources use the ``lookup_cache`` table.
 """
 
 import hashlib
 import json
+import logging
 from datetime import datetime, timedelta
 from typing import Optional
 from uuid import UUID
@@ -14,6 +17,8 @@ from uuid import UUID
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 
+from app.core.config import get_settings
+from app.core.lookup_options import get_lookup_option_cache
 from app.core.scope import apply_tenant_scope
 from app.models.lookup import (
     CascadingLookupRule,
@@ -25,6 +30,9 @@ from app.schemas.lookup import (
     LookupConfigurationCreate,
     LookupConfigurationUpdate,
 )
+from app.services.lookup_engine import EntityLookupEngine
+
+logger = logging.getLogger(__name__)
 
 
 class LookupService:
@@ -62,6 +70,7 @@ class LookupService:
         self.db.add(config)
         self.db.commit()
         self.db.refresh(config)
+        self._ensure_search_indexes(config)
 
         return config
 
@@ -133,6 +142,7 @@ class LookupService:
 
         self.db.commit()
         self.db.refresh(config)
+        self._ensure_search_indexes(config)
 
         return config
 
@@ -164,6 +174,14 @@ class LookupService:
         """Get lookup data based on configuration"""
         config = await self.get_configuration(config_id)
 
+        if config.source_type == "entity":
+            try:
+                return EntityLookupEngine(self.db, self.current_user).fetch(
+                    config, search=search, filters=filters, parent_value=parent_value, page=page, page_size=page_size
+                )
+            except ValueError as e:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
         # Check cache first
         if config.enable_caching:
             cache_key = self._generate_cache_key(config_id, search, filters, parent_value)
@@ -175,8 +193,6 @@ class LookupService:
         # Fetch data based on source type
         if config.source_type == "static_list":
             data = await self._get_static_list_data(config, search, filters)
-        elif config.source_type == "entity":
-            data = await self._get_entity_data(config, search, filters, parent_value)
         elif config.source_type == "custom_query":
             data = await self._get_custom_query_data(config, search, filters, parent_value)
         elif config.source_type == "api":
@@ -240,15 +256,8 @@ class LookupService:
             .first()
         )
 
-        if cache_entry:
-            # Update hit count
-            cache_entry.hit_count += 1
-            cache_entry.last_accessed_at = datetime.utcnow()
-            self.db.commit()
-
-            return cache_entry.cached_data
-
-        return None
+        # Read-only: no hit_count write (and commit) on every dropdown open
+        return cache_entry.cached_data if cache_entry else None
 
     async def _save_to_cache(self, config: LookupConfiguration, cache_key: str, data: list):
         """Save data to cache"""
@@ -270,6 +279,16 @@ class LookupService:
         """Clear all cache entries for a lookup"""
         self.db.query(LookupCache).filter(LookupCache.lookup_id == lookup_id).delete()
         self.db.commit()
+        get_lookup_option_cache().invalidate_lookup(lookup_id)
+
+    def _ensure_search_indexes(self, config: LookupConfiguration):
+        """Build typeahead indexes for an entity lookup (never fails the save)"""
+        if config.source_type != "entity" or not get_settings().LOOKUP_SEARCH_INDEXES:
+            return
+        try:
+            EntityLookupEngine(self.db, self.current_user).ensure_search_indexes(config)
+        except Exception as e:
+            logger.warning(f"Could not schedule search indexes for lookup {config.id}: {e}")
 
     async def _get_static_list_data(self, config: LookupConfiguration, search: Optional[str], filters: Optional[dict]):
         """Get data from static list"""
@@ -281,17 +300,6 @@ class LookupService:
 
         return data
 
-    async def _get_entity_data(
-        self, config: LookupConfiguration, search: Optional[str], filters: Optional[dict], parent_value: Optional[str]
-    ):
-        """Get data from entity source (simplified)"""
-        # Simplified implementation
-        # In production, query the actual entity table
-        return [
-            {"value": "1", "label": "Option 1"},
-            {"value": "2", "label": "Option 2"},
-        ]
-
     async def _get_custom_query_data(
         self, config: LookupConfiguration, search: Optional[str], filters: Optional[dict], parent_value: Optional[str]
     ):
@@ -37,9 +37,11 @@ class MenuService:
         Returns:
             List of menu items in hierarchical structure
         """
-        # Get user permissions and roles (through groups)
-        permissions = user.get_permissions()
-        roles = list(user.get_roles()) if hasattr(user, "get_roles") else []
+        # Get user permissions and roles (through groups), compiled and cached
+        from app.core.permission_cache import get_user_permissions
+
+        permissions = get_user_permissions(user)
+        roles = list(permissions.roles)
 
         # Get accessible core menu items
         menu_items = MenuService._get_accessible_menu_items(db=db, user=user, permissions=permissions, roles=roles)
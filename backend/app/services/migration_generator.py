@@ -10,6 +10,7 @@ from typing import Any, Dict, Tuple
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
+from app.core.schema_catalog import get_schema_catalog
 from app.models.data_model import (
     EntityDefinition,
     FieldDefinition,
@@ -308,58 +309,12 @@ CREATE INDEX IF NOT EXISTS idx_{versions_table}_changed_at ON {versions_table}(c
         return (up_sql, down_sql)
 
     async def _get_current_columns(self, table_name: str) -> Dict[str, Dict[str, Any]]:
-        """Get current columns from database"""
-        result = self.db.execute(
-            text("""
-            SELECT
-                column_name,
-                data_type,
-                is_nullable,
-                column_default,
-                character_maximum_length
-            FROM information_schema.columns
-            WHERE table_schema = 'public'
-            AND table_name = :table_name
-        """),
-            {"table_name": table_name},
-        )
-
-        columns = {}
-        for row in result:
-            columns[row.column_name] = {
-                "data_type": row.data_type.upper(),
-                "is_nullable": row.is_nullable == "YES",
-                "column_default": row.column_default,
-                "character_maximum_length": row.character_maximum_length,
-            }
-
-        return columns
+        """Get current columns from database (via the shared schema catalog)"""
+        return get_schema_catalog().get_columns(self.db, table_name)
 
     async def _get_current_indexes(self, table_name: str) -> Dict[str, Dict[str, Any]]:
-        """Get current indexes from database"""
-        result = self.db.execute(
-            text("""
-            SELECT
-                i.relname as index_name,
-                a.attname as column_name,
-                ix.indisunique as is_unique
-            FROM pg_class t
-            JOIN pg_index ix ON t.oid = ix.indrelid
-            JOIN pg_class i ON i.oid = ix.indexrelid
-            JOIN pg_attribute a ON a.attrelid = t.oid AND a.attnum = ANY(ix.indkey)
-            WHERE t.relname = :table_name
-            AND t.relkind = 'r'
-        """),
-            {"table_name": table_name},
-        )
-
-        indexes = {}
-        for row in result:
-            if row.index_name not in indexes:
-                indexes[row.index_name] = {"columns": [], "is_unique": row.is_unique}
-            indexes[row.index_name]["columns"].append(row.column_name)
-
-        return indexes
+        """Get current indexes from database (via the shared schema catalog)"""
+        return get_schema_catalog().get_indexes(self.db, table_name)
 
     def _compile_formula(self, formula: str) -> str:
         """
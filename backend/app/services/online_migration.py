@@ -0,0 +1,433 @@
+"""
+Online entity migrations - schema changes without stalling tenant traffic
+
+``DataModelService.execute_migration`` no longer runs a migration's
+``up_script`` inside the request. It queues the migration, and migration
+workers (``app.workers.entity_migration_worker``) turn the
+``MigrationGenerator`` script into a plan of online steps and run them one
+by one:
+
+- DDL runs in short transactions under ``lock_timeout``. If the lock is not
+  granted in time, the statement is retried with exponential backoff, so it
+  never sits in the lock queue blocking every reader of the table behind it.
+- ``CREATE INDEX`` and ``DROP INDEX`` run ``CONCURRENTLY`` on an autocommit
+  connection. An index left invalid by an interrupted build is dropped and
+  built again.
+- ``ADD COLUMN`` with ``DEFAULT``, ``NOT NULL``, ``UNIQUE`` or ``REFERENCES``
+  is split into steps:
+    1. Add the column nullable, without constraints.
+    2. Set the default for new rows.
+    3. Backfill existing rows in throttled, id-ranged batches.
+    4. Add the constraints. Foreign keys are added ``NOT VALID`` and then
+       ``VALIDATE``d. NOT NULL goes through a validated CHECK constraint.
+       UNIQUE attaches an index built concurrently.
+- Statements with no online equivalent (type changes, generated columns,
+  ``CREATE TABLE``) run unchanged under the same lock timeout and retry. A
+  type change that is not binary-coercible still rewrites the table.
+
+The plan, the current step, the backfill cursor and the rows backfilled so far
+are stored in ``EntityMigration.progress`` after every step and batch.
+``heartbeat_at`` is refreshed while a step runs. A migration whose worker
+died is re-queued by the worker's stale check and resumes at the step it was
+on. If that step turns out to be already applied, its "already exists" error
+is ignored.
+"""
+
+import logging
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import get_settings
+from app.models.data_model import EntityDefinition, EntityMigration
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+# PostgreSQL SQLSTATEs
+LOCK_NOT_AVAILABLE = "55P03"
+ALREADY_EXISTS = ("42701", "42710", "42P07")  # duplicate column / object / table
+
+_CREATE_INDEX = re.compile(
+    r"^CREATE\s+(UNIQUE\s+)?INDEX\s+(?:CONCURRENTLY\s+)?(?:IF\s+NOT\s+EXISTS\s+)?(\w+)\s+ON\s+(.+)$", re.I | re.S
+)
+_DROP_INDEX = re.compile(r"^DROP\s+INDEX\s+(?:CONCURRENTLY\s+)?(?:IF\s+EXISTS\s+)?(\w+)$", re.I)
+_ADD_COLUMN = re.compile(r"^ALTER\s+TABLE\s+(\w+)\s+ADD\s+COLUMN\s+(?:IF\s+NOT\s+EXISTS\s+)?(\w+)\s+(.+)$", re.I | re.S)
+_SET_NOT_NULL = re.compile(r"^ALTER\s+TABLE\s+(\w+)\s+ALTER\s+COLUMN\s+(\w+)\s+SET\s+NOT\s+NULL$", re.I)
+# Column definition as emitted by MigrationGenerator._generate_field_definition
+_COLUMN_DEF = re.compile(
+    r"^(?P<type>.+?)(?P<pk>\s+PRIMARY\s+KEY)?(?P<not_null>\s+NOT\s+NULL)?(?P<unique>\s+UNIQUE)?"
+    r"(?:\s+DEFAULT\s+(?P<default>'(?:[^']|'')*'|\S+))?(?:\s+REFERENCES\s+(?P<references>.+))?$",
+    re.I | re.S,
+)
+
+_INDEX_VALID_SQL = text(
+    "SELECT i.indisvalid FROM pg_catalog.pg_index i "
+    "JOIN pg_catalog.pg_class c ON c.oid = i.indexrelid WHERE c.relname = :name"
+)
+
+
+def split_statements(script: str) -> List[str]:
+    """Split a migration script into statements (comment lines dropped, quoted ';' kept)"""
+    body = "\n".join(line for line in (script or "").splitlines() if not line.strip().startswith("--"))
+    statements, current, in_quote = [], [], False
+    for char in body:
+        if char == "'":
+            in_quote = not in_quote
+        if char == ";" and not in_quote:
+            statements.append("".join(current))
+            current = []
+        else:
+            current.append(char)
+    statements.append("".join(current))
+    return [statement.strip() for statement in statements if statement.strip()]
+
+
+def plan_online_migration(up_script: str) -> List[Dict[str, Any]]:
+    """
+    Translate a MigrationGenerator script into online steps
+
+    Returns:
+        Steps in execution order. Each step has a ``kind``: 'ddl' (one
+        statement in a lock-timed transaction), 'concurrent' (autocommit, for
+        CONCURRENTLY index builds and drops) or 'backfill' (batched UPDATE of
+        ``column`` to ``value`` in ``table``).
+    """
+    steps: List[Dict[str, Any]] = []
+    for statement in split_statements(up_script):
+        steps.extend(_plan_statement(statement))
+    return steps
+
+
+def _ddl(sql: str) -> Dict[str, Any]:
+    return {"kind": "ddl", "sql": sql}
+
+
+def _concurrent(sql: str, index: Optional[str] = None) -> Dict[str, Any]:
+    return {"kind": "concurrent", "sql": sql, "index": index}
+
+
+def _plan_statement(sql: str) -> List[Dict[str, Any]]:
+    match = _CREATE_INDEX.match(sql)
+    if match:
+        unique, name, target = match.groups()
+        return [
+            _concurrent(
+                f"CREATE {'UNIQUE ' if unique else ''}INDEX CONCURRENTLY IF NOT EXISTS {name} ON {target}", name
+            )
+        ]
+
+    match = _DROP_INDEX.match(sql)
+    if match:
+        return [_concurrent(f"DROP INDEX CONCURRENTLY IF EXISTS {match.group(1)}")]
+
+    match = _ADD_COLUMN.match(sql)
+    if match:
+        return _plan_add_column(sql, *match.groups())
+
+    match = _SET_NOT_NULL.match(sql)
+    if match:
+        return _plan_set_not_null(*match.groups())
+
+    return [_ddl(sql)]
+
+
+def _plan_add_column(sql: str, table: str, column: str, definition: str) -> List[Dict[str, Any]]:
+    spec = _COLUMN_DEF.match(definition.strip())
+    if not spec or spec.group("pk") or re.search(r"\bGENERATED\b", definition, re.I):
+        # Primary keys and generated (computed) columns have no nullable-first form
+        return [_ddl(sql)]
+
+    steps = [_ddl(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column} {spec.group('type').strip()}")]
+    if spec.group("default"):
+        steps.append(_ddl(f"ALTER TABLE {table} ALTER COLUMN {column} SET DEFAULT {spec.group('default')}"))
+        steps.append({"kind": "backfill", "table": table, "column": column, "value": spec.group("default")})
+    if spec.group("references"):
+        name = f"{table}_{column}_fkey"
+        steps.append(
+            _ddl(
+                f"ALTER TABLE {table} ADD CONSTRAINT {name} FOREIGN KEY ({column}) "
+                f"REFERENCES {spec.group('references').strip()} NOT VALID"
+            )
+        )
+        steps.append(_ddl(f"ALTER TABLE {table} VALIDATE CONSTRAINT {name}"))
+    if spec.group("not_null"):
+        steps.extend(_plan_set_not_null(table, column))
+    if spec.group("unique"):
+        name = f"{table}_{column}_key"
+        steps.append(_concurrent(f"CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({column})", name))
+        steps.append(_ddl(f"ALTER TABLE {table} ADD CONSTRAINT {name} UNIQUE USING INDEX {name}"))
+    return steps
+
+
+def _plan_set_not_null(table: str, column: str) -> List[Dict[str, Any]]:
+    # SET NOT NULL skips its full-table scan when a validated CHECK proves it (PostgreSQL 12+);
+    # the CHECK is validated under SHARE UPDATE EXCLUSIVE, which does not block reads or writes
+    check = f"{table}_{column}_not_null"
+    return [
+        _ddl(f"ALTER TABLE {table} ADD CONSTRAINT {check} CHECK ({column} IS NOT NULL) NOT VALID"),
+        _ddl(f"ALTER TABLE {table} VALIDATE CONSTRAINT {check}"),
+        _ddl(f"ALTER TABLE {table} ALTER COLUMN {column} SET NOT NULL"),
+        _ddl(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {check}"),
+    ]
+
+
+def _sqlstate(exc: DBAPIError) -> Optional[str]:
+    orig = getattr(exc, "orig", None)
+    return getattr(orig, "pgcode", None) or getattr(orig, "sqlstate", None)
+
+
+def _cursor_value(value: Any) -> Any:
+    """JSON-safe backfill cursor (UUID ids are kept as strings)"""
+    return value if isinstance(value, (int, str)) else str(value)
+
+
+class OnlineMigrationExecutor:
+    """Runs the online plan of one entity migration, recording progress on the row"""
+
+    def __init__(
+        self,
+        db: Session,
+        lock_timeout_ms: int = 2000,
+        lock_retries: int = 10,
+        batch_size: int = 5000,
+        batch_pause_seconds: float = 0.1,
+        heartbeat_seconds: float = 30.0,
+        backoff_max_seconds: float = 30.0,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """
+        Initialize executor
+
+        Args:
+            db: Session used to record progress (statements run on their own connections)
+            lock_timeout_ms: How long one DDL attempt may wait for its table lock
+            lock_retries: Attempts after a lock timeout before the step fails
+            batch_size: Rows updated per backfill transaction
+            batch_pause_seconds: Pause between backfill batches (throttling)
+            heartbeat_seconds: Interval of heartbeat_at writes while a step runs
+            backoff_max_seconds: Upper bound of the retry delay
+            sleep: Sleep function (injectable for tests)
+        """
+        self.db = db
+        bind = db.get_bind()
+        self.engine = getattr(bind, "engine", bind)
+        self.is_postgres = self.engine.dialect.name == "postgresql"
+        self.lock_timeout_ms = lock_timeout_ms
+        self.lock_retries = lock_retries
+        self.batch_size = batch_size
+        self.batch_pause_seconds = batch_pause_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.sleep = sleep
+
+    @classmethod
+    def from_settings(cls, db: Session) -> "OnlineMigrationExecutor":
+        """Executor configured from ENTITY_MIGRATION_* settings"""
+        settings = get_settings()
+        return cls(
+            db,
+            lock_timeout_ms=settings.ENTITY_MIGRATION_LOCK_TIMEOUT_MS,
+            lock_retries=settings.ENTITY_MIGRATION_LOCK_RETRIES,
+            batch_size=settings.ENTITY_MIGRATION_BATCH_SIZE,
+            batch_pause_seconds=settings.ENTITY_MIGRATION_BATCH_PAUSE_SECONDS,
+            heartbeat_seconds=max(settings.ENTITY_MIGRATION_STALE_SECONDS / 3, 1.0),
+        )
+
+    def run(self, migration: EntityMigration) -> Dict[str, Any]:
+        """
+        Run (or resume) a migration's online plan
+
+        Args:
+            migration: Claimed migration (status 'running')
+
+        Returns:
+            Final progress dict
+
+        Raises:
+            DBAPIError: If a step fails (progress up to the failing step is kept)
+        """
+        progress = dict(migration.progress or {})
+        if "steps" not in progress:
+            progress.update(steps=plan_online_migration(migration.up_script), step=0, cursor=None, rows_backfilled=0)
+        # A step that was running when the previous worker died may already be applied
+        resumed = bool(progress.get("in_flight"))
+        steps = progress["steps"]
+
+        with self._heartbeat(migration.id):
+            while progress["step"] < len(steps):
+                step = steps[progress["step"]]
+                progress["in_flight"] = True
+                self._save(migration, progress)
+
+                if step["kind"] == "backfill":
+                    self._backfill(migration, progress, step)
+                else:
+                    self._with_lock_retry(lambda: self._execute(step), step["sql"], tolerate_existing=resumed)
+                resumed = False
+
+                progress.update(step=progress["step"] + 1, cursor=None, in_flight=False)
+                self._save(migration, progress)
+                logger.info(f"Migration {migration.migration_name}: step {progress['step']}/{len(steps)} done")
+        return progress
+
+    # ==================== Statements ====================
+
+    def _execute(self, step: Dict[str, Any]):
+        if step["kind"] == "concurrent":
+            self._execute_concurrent(step)
+            return
+        with self.engine.connect() as conn:
+            with conn.begin():
+                if self.is_postgres:
+                    conn.exec_driver_sql(f"SET LOCAL lock_timeout = '{int(self.lock_timeout_ms)}ms'")
+                self._exec_raw(conn, step["sql"])
+
+    def _execute_concurrent(self, step: Dict[str, Any]):
+        sql = step["sql"] if self.is_postgres else step["sql"].replace(" CONCURRENTLY", "")
+        with self.engine.connect() as conn:
+            conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+            if not self.is_postgres:
+                self._exec_raw(conn, sql)
+                return
+            conn.exec_driver_sql(f"SET lock_timeout = '{int(self.lock_timeout_ms)}ms'")
+            try:
+                if step.get("index"):
+                    valid = conn.execute(_INDEX_VALID_SQL, {"name": step["index"]}).scalar()
+                    if valid is False:
+                        logger.warning(f"Dropping invalid index {step['index']} left by an interrupted build")
+                        conn.exec_driver_sql(f"DROP INDEX CONCURRENTLY IF EXISTS {step['index']}")
+                self._exec_raw(conn, sql)
+            finally:
+                conn.exec_driver_sql("RESET lock_timeout")
+
+    @staticmethod
+    def _exec_raw(conn, sql: str):
+        # Generated DDL is executed verbatim: no bind parameters, literal '%' kept
+        if conn.dialect.paramstyle in ("format", "pyformat"):
+            sql = sql.replace("%", "%%")
+        conn.exec_driver_sql(sql)
+
+    def _with_lock_retry(self, fn: Callable[[], Any], description: str, tolerate_existing: bool = False) -> Any:
+        for attempt in range(self.lock_retries + 1):
+            try:
+                return fn()
+            except DBAPIError as e:
+                code = _sqlstate(e)
+                if tolerate_existing and code in ALREADY_EXISTS:
+                    logger.info(f"Step already applied before restart, skipping: {description}")
+                    return None
+                if code != LOCK_NOT_AVAILABLE or attempt == self.lock_retries:
+                    raise
+                delay = min(0.5 * 2**attempt, self.backoff_max_seconds) * (0.5 + random.random() / 2)
+                logger.warning(
+                    f"Lock timeout ({attempt + 1}/{self.lock_retries}) on: {description}; retrying in {delay:.1f}s"
+                )
+                self.sleep(delay)
+
+    # ==================== Backfill ====================
+
+    def _backfill(self, migration: EntityMigration, progress: Dict[str, Any], step: Dict[str, Any]):
+        table, column = step["table"], step["column"]
+        value = step["value"].replace(":", "\\:")
+        first_batch = text(f"SELECT id FROM {table} ORDER BY id LIMIT :limit")
+        next_batch = text(f"SELECT id FROM {table} WHERE id > :after ORDER BY id LIMIT :limit")
+        update_batch = text(
+            f"UPDATE {table} SET {column} = {value} WHERE id >= :low AND id <= :high AND {column} IS NULL"
+        )
+
+        while True:
+            cursor = progress.get("cursor")
+            with self.engine.connect() as conn:
+                if cursor is None:
+                    ids = conn.execute(first_batch, {"limit": self.batch_size}).scalars().all()
+                else:
+                    ids = conn.execute(next_batch, {"after": cursor, "limit": self.batch_size}).scalars().all()
+            if not ids:
+                return
+
+            bounds = {"low": _cursor_value(ids[0]), "high": _cursor_value(ids[-1])}
+            updated = self._with_lock_retry(
+                lambda: self._update_batch(update_batch, bounds), f"backfill {table}.{column}"
+            )
+            progress["cursor"] = bounds["high"]
+            progress["rows_backfilled"] = progress.get("rows_backfilled", 0) + (updated or 0)
+            self._save(migration, progress)
+            if len(ids) < self.batch_size:
+                return
+            self.sleep(self.batch_pause_seconds)
+
+    def _update_batch(self, statement, bounds: Dict[str, Any]) -> int:
+        with self.engine.connect() as conn:
+            with conn.begin():
+                if self.is_postgres:
+                    conn.exec_driver_sql(f"SET LOCAL lock_timeout = '{int(self.lock_timeout_ms)}ms'")
+                return conn.execute(statement, bounds).rowcount
+
+    # ==================== Progress ====================
+
+    def _save(self, migration: EntityMigration, progress: Dict[str, Any]):
+        migration.progress = dict(progress)
+        migration.heartbeat_at = datetime.utcnow()
+        self.db.commit()
+
+    @contextmanager
+    def _heartbeat(self, migration_id):
+        """Refresh heartbeat_at from a side thread while long statements run"""
+        stop = threading.Event()
+        session_factory = sessionmaker(bind=self.engine)
+
+        def beat():
+            while not stop.wait(self.heartbeat_seconds):
+                try:
+                    with session_factory() as session:
+                        session.query(EntityMigration).filter(EntityMigration.id == migration_id).update(
+                            {EntityMigration.heartbeat_at: datetime.utcnow()}, synchronize_session=False
+                        )
+                        session.commit()
+                except Exception as e:
+                    logger.warning(f"Migration heartbeat failed: {e}")
+
+        thread = threading.Thread(target=beat, name="entity-migration-heartbeat", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+
+
+def run_entity_migration(db: Session, migration: EntityMigration) -> EntityMigration:
+    """
+    Execute a claimed migration and publish its entity version
+
+    Called by the migration worker. On failure the migration is marked
+    'failed' with its progress kept; executing it again resumes at the
+    failed step.
+    """
+    from app.services.data_model_service import DataModelService
+
+    started = time.time()
+    try:
+        OnlineMigrationExecutor.from_settings(db).run(migration)
+    except Exception as e:
+        db.rollback()
+        migration.status = "failed"
+        migration.error_message = str(e)
+        db.commit()
+        logger.error(f"Migration {migration.migration_name} failed: {e}")
+        raise
+
+    entity = db.get(EntityDefinition, migration.entity_id)
+    user = db.get(User, migration.executed_by or migration.created_by)
+    execution_time = int((time.time() - started) * 1000)
+    DataModelService(db, user).complete_migration(migration, entity, execution_time)
+    return migration
@@ -1,16 +1,28 @@
 """
 Report export service for generating various output formats.
+
+Every format except PDF is produced by a generator (``stream_*``) that
+consumes rows incrementally, so exports fed from
+``ReportService.stream_report_rows`` keep memory bounded regardless of row
+count. The ``export_to_*`` methods are buffered wrappers for callers that
+already hold the data as a list of dicts.
 """
 
 import csv
+import html
 import io
 import json
-from datetime import datetime
-from typing import Any, Dict, List
+import tempfile
+from datetime import date, datetime, time
+from decimal import Decimal
+from itertools import chain, islice
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Tuple
 
 try:
     from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
     from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+    from openpyxl.utils import get_column_letter
 
     OPENPYXL_AVAILABLE = True
 except ImportError:
@@ -26,6 +38,38 @@ try:
 except ImportError:
     REPORTLAB_AVAILABLE = False
 
+Row = Sequence[Any]
+
+# Rows per yielded chunk for the text formats
+DEFAULT_CHUNK_ROWS = 1000
+# Rows inspected to size XLSX columns (write-only sheets need widths up front)
+XLSX_WIDTH_SAMPLE_ROWS = 200
+_XLSX_MAX_WIDTH = 50
+_XLSX_NATIVE_TYPES = (str, int, float, Decimal, bool, datetime, date, time)
+_FILE_CHUNK_BYTES = 64 * 1024
+
+
+def _chunks(rows: Iterable[Row], size: int) -> Iterator[List[Row]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _dict_rows(data: Iterable[Dict[str, Any]], columns: List[str]) -> Iterator[Row]:
+    return ([row.get(column, "") for column in columns] for row in data)
+
+
+def _xlsx_value(value: Any) -> Any:
+    """openpyxl rejects types like UUID; write those as text"""
+    if value is None or isinstance(value, _XLSX_NATIVE_TYPES):
+        return value
+    return str(value)
+
 
 class ReportExporter:
     """Service for exporting reports to various formats."""
@@ -33,12 +77,7 @@ class ReportExporter:
     @staticmethod
     def export_to_csv(data: List[Dict[str, Any]], columns: List[str]) -> bytes:
         """Export report data to CSV format."""
-        output = io.StringIO()
-        writer = csv.DictWriter(output, fieldnames=columns)
-        writer.writeheader()
-        writer.writerows(data)
-
-        return output.getvalue().encode("utf-8")
+        return b"".join(ReportExporter.stream_csv(_dict_rows(data, columns), columns))
 
     @staticmethod
     def export_to_json(data: List[Dict[str, Any]]) -> bytes:
@@ -48,28 +87,7 @@ class ReportExporter:
     @staticmethod
     def export_to_excel_raw(data: List[Dict[str, Any]], columns: List[str]) -> bytes:
         """Export report data to Excel (unformatted)."""
-        if not OPENPYXL_AVAILABLE:
-            raise ImportError("openpyxl is required for Excel export. Install with: pip install openpyxl")
-
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Report Data"
-
-        # Write headers
-        for col_idx, column in enumerate(columns, start=1):
-            ws.cell(row=1, column=col_idx, value=column)
-
-        # Write data
-        for row_idx, row_data in enumerate(data, start=2):
-            for col_idx, column in enumerate(columns, start=1):
-                value = row_data.get(column, "")
-                ws.cell(row=row_idx, column=col_idx, value=value)
-
-        # Save to bytes
-        output = io.BytesIO()
-        wb.save(output)
-        output.seek(0)
-        return output.getvalue()
+        return b"".join(ReportExporter.stream_excel(_dict_rows(data, columns), columns))
 
     @staticmethod
     def export_to_excel_formatted(
@@ -79,62 +97,10 @@ class ReportExporter:
         formatting_rules: List[Dict[str, Any]] = None,
     ) -> bytes:
         """Export report data to Excel (formatted)."""
-        if not OPENPYXL_AVAILABLE:
-            raise ImportError("openpyxl is required for Excel export. Install with: pip install openpyxl")
-
-        wb = Workbook()
-        ws = wb.active
-        ws.title = report_name[:31]  # Excel sheet name limit
-
-        # Header styling
-        header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-        header_font = Font(color="FFFFFF", bold=True, size=12)
-        header_alignment = Alignment(horizontal="center", vertical="center")
-
-        # Write headers with formatting
-        for col_idx, column in enumerate(columns, start=1):
-            cell = ws.cell(row=1, column=col_idx, value=column)
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = header_alignment
-
-        # Border style
-        thin_border = Border(
-            left=Side(style="thin"), right=Side(style="thin"), top=Side(style="thin"), bottom=Side(style="thin")
+        return b"".join(
+            ReportExporter.stream_excel(_dict_rows(data, columns), columns, report_name=report_name, formatted=True)
         )
 
-        # Write data with formatting
-        for row_idx, row_data in enumerate(data, start=2):
-            for col_idx, column in enumerate(columns, start=1):
-                value = row_data.get(column, "")
-                cell = ws.cell(row=row_idx, column=col_idx, value=value)
-                cell.border = thin_border
-
-                # Apply conditional formatting if rules exist
-                if formatting_rules:
-                    for rule in formatting_rules:
-                        if column in rule.get("applies_to", []):
-                            # Simple condition evaluation (expand as needed)
-                            # This is a placeholder for more complex condition logic
-                            pass
-
-        # Auto-adjust column widths
-        for col_idx, column in enumerate(columns, start=1):
-            max_length = len(column)
-            for row_idx in range(2, len(data) + 2):
-                cell_value = str(ws.cell(row=row_idx, column=col_idx).value or "")
-                max_length = max(max_length, len(cell_value))
-            ws.column_dimensions[chr(64 + col_idx)].width = min(max_length + 2, 50)
-
-        # Freeze header row
-        ws.freeze_panes = "A2"
-
-        # Save to bytes
-        output = io.BytesIO()
-        wb.save(output)
-        output.seek(0)
-        return output.getvalue()
-
     @staticmethod
     def export_to_pdf(
         data: List[Dict[str, Any]], columns: List[str], report_name: str = "Report", parameters: Dict[str, Any] = None
@@ -208,12 +174,129 @@ class ReportExporter:
         data: List[Dict[str, Any]], columns: List[str], report_name: str = "Report", parameters: Dict[str, Any] = None
     ) -> bytes:
         """Export report data to HTML format (print-friendly)."""
-        html = f"""
+        return b"".join(ReportExporter.stream_html(_dict_rows(data, columns), columns, report_name, parameters))
+
+    # ------------------------------------------------------------------
+    # Streaming writers
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def stream_csv(rows: Iterable[Row], columns: List[str], chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Iterator[bytes]:
+        """Yield CSV (header first) in chunks of ``chunk_rows`` rows."""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        yield buffer.getvalue().encode("utf-8")
+
+        for chunk in _chunks(rows, chunk_rows):
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows(chunk)
+            yield buffer.getvalue().encode("utf-8")
+
+    @staticmethod
+    def stream_json(rows: Iterable[Row], columns: List[str], chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Iterator[bytes]:
+        """Yield a JSON array of row objects, one object per line."""
+        yield b"["
+        separator = "\n"
+        for chunk in _chunks(rows, chunk_rows):
+            parts = []
+            for row in chunk:
+                parts.append(separator + json.dumps(dict(zip(columns, row)), default=str))
+                separator = ",\n"
+            yield "".join(parts).encode("utf-8")
+        yield b"\n]"
+
+    @staticmethod
+    def stream_ndjson(rows: Iterable[Row], columns: List[str], chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Iterator[bytes]:
+        """Yield newline-delimited JSON, one row object per line."""
+        for chunk in _chunks(rows, chunk_rows):
+            yield "".join(json.dumps(dict(zip(columns, row)), default=str) + "\n" for row in chunk).encode("utf-8")
+
+    @staticmethod
+    def stream_excel(
+        rows: Iterable[Row],
+        columns: List[str],
+        report_name: str = "Report Data",
+        formatted: bool = False,
+        width_sample_rows: int = XLSX_WIDTH_SAMPLE_ROWS,
+    ) -> Iterator[bytes]:
+        """
+        Yield an XLSX workbook built with openpyxl's write-only mode.
+
+        Rows are written to disk as they arrive, so memory does not grow with
+        the row count. Formatted exports size columns from the first
+        ``width_sample_rows`` rows instead of re-reading every cell. The zip
+        container is only complete once every row is written, so the file is
+        yielded after the last row.
+        """
+        if not OPENPYXL_AVAILABLE:
+            raise ImportError("openpyxl is required for Excel export. Install with: pip install openpyxl")
+
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet(title=report_name[:31] if formatted else "Report Data")  # Excel sheet name limit
+
+        rows = iter(rows)
+        sample = list(islice(rows, width_sample_rows)) if formatted else []
+        if formatted:
+            for col_idx, column in enumerate(columns):
+                width = max([len(str(column))] + [len(str(row[col_idx] or "")) for row in sample])
+                ws.column_dimensions[get_column_letter(col_idx + 1)].width = min(width + 2, _XLSX_MAX_WIDTH)
+            ws.freeze_panes = "A2"
+
+            header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+            header_font = Font(color="FFFFFF", bold=True, size=12)
+            header_alignment = Alignment(horizontal="center", vertical="center")
+            thin_border = Border(
+                left=Side(style="thin"), right=Side(style="thin"), top=Side(style="thin"), bottom=Side(style="thin")
+            )
+
+            header = []
+            for column in columns:
+                cell = WriteOnlyCell(ws, value=column)
+                cell.fill = header_fill
+                cell.font = header_font
+                cell.alignment = header_alignment
+                header.append(cell)
+            ws.append(header)
+
+            for row in chain(sample, rows):
+                cells = []
+                for value in row:
+                    cell = WriteOnlyCell(ws, value=_xlsx_value(value))
+                    cell.border = thin_border
+                    cells.append(cell)
+                ws.append(cells)
+        else:
+            ws.append(columns)
+            for row in rows:
+                ws.append([_xlsx_value(value) for value in row])
+
+        with tempfile.TemporaryFile() as tmp:
+            wb.save(tmp)
+            tmp.seek(0)
+            while True:
+                chunk = tmp.read(_FILE_CHUNK_BYTES)
+                if not chunk:
+                    break
+                yield chunk
+
+    @staticmethod
+    def stream_html(
+        rows: Iterable[Row],
+        columns: List[str],
+        report_name: str = "Report",
+        parameters: Dict[str, Any] = None,
+        chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    ) -> Iterator[bytes]:
+        """Yield a print-friendly HTML page; the record count follows the table."""
+        title = html.escape(str(report_name))
+        head = f"""
 <!DOCTYPE html>
 <html>
 <head>
     <meta charset="UTF-8">
-    <title>{report_name}</title>
+    <title>{title}</title>
     <style>
         body {{
             font-family: Arial, sans-serif;
@@ -259,46 +342,50 @@ class ReportExporter:
     </style>
 </head>
 <body>
-    <h1>{report_name}</h1>
+    <h1>{title}</h1>
     <div class="metadata">
 """
         # Add parameters
         if parameters:
-            html += "        <p><strong>Parameters:</strong> "
-            html += ", ".join([f"{k}: {v}" for k, v in parameters.items()])
-            html += "</p>\n"
+            head += "        <p><strong>Parameters:</strong> "
+            head += html.escape(", ".join([f"{k}: {v}" for k, v in parameters.items()]))
+            head += "</p>\n"
 
         # Add generated date
-        html += f"        <p><strong>Generated:</strong> {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S UTC')}</p>\n"
-        html += f"        <p><strong>Total Records:</strong> {len(data)}</p>\n"
-        html += "    </div>\n"
+        head += f"        <p><strong>Generated:</strong> {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S UTC')}</p>\n"
+        head += "    </div>\n"
 
         # Print button
-        html += '    <button onclick="window.print()">Print Report</button>\n'
+        head += '    <button onclick="window.print()">Print Report</button>\n'
 
         # Table
-        html += "    <table>\n"
-        html += "        <thead>\n"
-        html += "            <tr>\n"
+        head += "    <table>\n"
+        head += "        <thead>\n"
+        head += "            <tr>\n"
         for col in columns:
-            html += f"                <th>{col}</th>\n"
-        html += "            </tr>\n"
-        html += "        </thead>\n"
-        html += "        <tbody>\n"
-
-        for row in data:
-            html += "            <tr>\n"
-            for col in columns:
-                value = row.get(col, "")
-                html += f"                <td>{value}</td>\n"
-            html += "            </tr>\n"
-
-        html += "        </tbody>\n"
-        html += "    </table>\n"
-        html += "</body>\n"
-        html += "</html>"
-
-        return html.encode("utf-8")
+            head += f"                <th>{html.escape(str(col))}</th>\n"
+        head += "            </tr>\n"
+        head += "        </thead>\n"
+        head += "        <tbody>\n"
+        yield head.encode("utf-8")
+
+        total = 0
+        for chunk in _chunks(rows, chunk_rows):
+            parts = []
+            for row in chunk:
+                parts.append("            <tr>\n")
+                for value in row:
+                    parts.append(f"                <td>{html.escape(str('' if value is None else value))}</td>\n")
+                parts.append("            </tr>\n")
+            total += len(chunk)
+            yield "".join(parts).encode("utf-8")
+
+        tail = "        </tbody>\n"
+        tail += "    </table>\n"
+        tail += f'    <div class="metadata"><p><strong>Total Records:</strong> {total}</p></div>\n'
+        tail += "</body>\n"
+        tail += "</html>"
+        yield tail.encode("utf-8")
 
     @staticmethod
     def export_report(
@@ -317,6 +404,8 @@ class ReportExporter:
             return ReportExporter.export_to_csv(data, columns), "csv"
         elif export_format == "json":
             return ReportExporter.export_to_json(data), "json"
+        elif export_format == "ndjson":
+            return b"".join(ReportExporter.stream_ndjson(_dict_rows(data, columns), columns)), "ndjson"
         elif export_format == "excel_raw":
             return ReportExporter.export_to_excel_raw(data, columns), "xlsx"
         elif export_format == "excel_formatted":
@@ -327,3 +416,42 @@ class ReportExporter:
             return ReportExporter.export_to_html(data, columns, report_name, parameters), "html"
         else:
             raise ValueError(f"Unsupported export format: {export_format}")
+
+    @staticmethod
+    def stream_report(
+        rows: Iterable[Row],
+        columns: List[str],
+        export_format: str,
+        report_name: str = "Report",
+        parameters: Dict[str, Any] = None,
+        chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    ) -> Tuple[Iterator[bytes], str]:
+        """
+        Export rows (sequences in ``columns`` order) to the specified format as a byte stream.
+
+        Format and dependency errors are raised here, before any byte is
+        produced. PDF is laid out by reportlab in one pass, so it is still
+        built in memory.
+
+        Returns tuple of (chunk_iterator, file_extension)
+        """
+        if export_format == "csv":
+            return ReportExporter.stream_csv(rows, columns, chunk_rows), "csv"
+        elif export_format == "json":
+            return ReportExporter.stream_json(rows, columns, chunk_rows), "json"
+        elif export_format == "ndjson":
+            return ReportExporter.stream_ndjson(rows, columns, chunk_rows), "ndjson"
+        elif export_format in ("excel_raw", "excel_formatted"):
+            if not OPENPYXL_AVAILABLE:
+                raise ImportError("openpyxl is required for Excel export. Install with: pip install openpyxl")
+            formatted = export_format == "excel_formatted"
+            return ReportExporter.stream_excel(rows, columns, report_name, formatted=formatted), "xlsx"
+        elif export_format == "pdf":
+            if not REPORTLAB_AVAILABLE:
+                raise ImportError("reportlab is required for PDF export. Install with: pip install reportlab")
+            data = [dict(zip(columns, row)) for row in rows]
+            return iter([ReportExporter.export_to_pdf(data, columns, report_name, parameters)]), "pdf"
+        elif export_format == "html":
+            return ReportExporter.stream_html(rows, columns, report_name, parameters, chunk_rows), "html"
+        else:
+            raise ValueError(f"Unsupported export format: {export_format}")
@@ -0,0 +1,264 @@
+"""
+Report export jobs - exports that run outside the HTTP request.
+
+``POST /reports/execute/export?mode=async`` records a ``report_executions``
+row in ``pending`` state (the job) and returns immediately. Export workers
+(``app.workers.report_export_worker``) claim pending jobs, stream the report
+through ``ReportExporter`` into artifact storage and record progress on the
+row, which ``GET /reports/exports/{job_id}`` reports back. The finished file
+is served with HTTP Range support so large downloads can be resumed.
+
+Requests for the same (tenant, report version, parameters, format) while a
+job is pending or running attach to that job instead of starting another
+one; ``dedup_key`` plus a partial unique index enforce this across workers.
+
+The same export routine is registered with ``SchedulerEngine`` as the
+``report_generation`` handler, so scheduled report jobs produce artifacts too.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple
+
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.artifact_storage import get_artifact_storage
+from app.core.config import get_settings
+from app.core.scope import apply_tenant_scope_by_id
+from app.models.report import ReportDefinition, ReportExecution
+from app.services.report_export import ReportExporter
+from app.services.report_service import ReportService
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ("pending", "running")
+
+# Interval between progress/heartbeat writes while an export runs
+PROGRESS_INTERVAL_SECONDS = 2.0
+
+
+def export_dedup_key(report_def: ReportDefinition, parameters: Optional[Dict[str, Any]], export_format: str) -> str:
+    """Identity of an export request: report, definition version, parameters and format."""
+    payload = json.dumps(
+        {"r": str(report_def.id), "v": str(report_def.updated_at), "p": parameters or {}, "f": export_format},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ReportExportJobService:
+    """Service for background report export jobs."""
+
+    @staticmethod
+    def submit(
+        db: Session,
+        tenant_id,
+        user_id,
+        report_def: ReportDefinition,
+        parameters: Optional[Dict[str, Any]],
+        export_format: str,
+    ) -> Tuple[ReportExecution, bool]:
+        """
+        Queue an export, or attach to an identical one that is pending or running.
+
+        Returns:
+            (job, created)
+        """
+        dedup_key = export_dedup_key(report_def, parameters, export_format)
+        existing = ReportExportJobService._active_job(db, tenant_id, dedup_key)
+        if existing is not None:
+            return existing, False
+
+        job = ReportExecution(
+            id=uuid.uuid4(),
+            tenant_id=tenant_id,
+            report_definition_id=report_def.id,
+            executed_by=user_id,
+            parameters_used=parameters,
+            export_format=export_format,
+            status="pending",
+            dedup_key=dedup_key,
+            progress_rows=0,
+        )
+        db.add(job)
+        try:
+            db.commit()
+        except IntegrityError:
+            # Another worker queued the same export between our check and insert
+            db.rollback()
+            existing = ReportExportJobService._active_job(db, tenant_id, dedup_key)
+            if existing is None:
+                raise
+            return existing, False
+
+        from app.workers.report_export_worker import notify_job_queued
+
+        notify_job_queued()
+        return job, True
+
+    @staticmethod
+    def get_job(db: Session, tenant_id, job_id) -> Optional[ReportExecution]:
+        """Get an export job (any report execution with an export) for the tenant."""
+        return (
+            apply_tenant_scope_by_id(db.query(ReportExecution), ReportExecution, tenant_id)
+            .filter(ReportExecution.id == job_id, ReportExecution.export_format.isnot(None))
+            .first()
+        )
+
+    @staticmethod
+    def _active_job(db: Session, tenant_id, dedup_key: str) -> Optional[ReportExecution]:
+        return (
+            apply_tenant_scope_by_id(db.query(ReportExecution), ReportExecution, tenant_id)
+            .filter(ReportExecution.dedup_key == dedup_key, ReportExecution.status.in_(ACTIVE_STATUSES))
+            .first()
+        )
+
+    @staticmethod
+    def run_export(db: Session, job: ReportExecution) -> ReportExecution:
+        """
+        Stream the job's report into artifact storage and mark it completed.
+
+        Progress (rows written) and a heartbeat are committed on a separate
+        connection every ``PROGRESS_INTERVAL_SECONDS`` for the whole job,
+        including the final XLSX save and artifact upload after the last row.
+        Errors are recorded on the job and re-raised.
+        """
+        settings = get_settings()
+        started = time.monotonic()
+        progress = _ProgressTracker(db, job.id)
+        rows = None
+        try:
+            try:
+                report_def = db.get(ReportDefinition, job.report_definition_id)
+                if report_def is None:
+                    raise ValueError(f"Report definition {job.report_definition_id} not found")
+
+                columns, rows = ReportService.stream_report_rows(
+                    db, job.tenant_id, report_def, job.parameters_used, chunk_size=settings.REPORT_EXPORT_CHUNK_SIZE
+                )
+                with progress:
+                    body, extension = ReportExporter.stream_report(
+                        progress.track(rows),
+                        columns,
+                        job.export_format,
+                        report_name=report_def.name,
+                        parameters=job.parameters_used,
+                        chunk_rows=settings.REPORT_EXPORT_CHUNK_SIZE,
+                    )
+                    key = f"report-exports/{job.tenant_id}/{job.id}.{extension}"
+                    size = get_artifact_storage().save(key, body)
+            finally:
+                # Release the rows' connection (also if they were never read) before touching the job
+                if rows is not None:
+                    rows.close()
+        except Exception as e:
+            db.rollback()
+            job.status = "failed"
+            job.error_message = str(e)
+            job.completed_at = datetime.utcnow()
+            db.commit()
+            raise
+
+        job.status = "completed"
+        job.export_file_path = key
+        job.export_file_size = size
+        job.row_count = job.progress_rows = progress.rows
+        job.execution_time_ms = int((time.monotonic() - started) * 1000)
+        job.completed_at = job.heartbeat_at = datetime.utcnow()
+        db.commit()
+        logger.info(f"Report export {job.id} completed: {progress.rows} rows, {size} bytes")
+        return job
+
+
+class _ProgressTracker:
+    """
+    Counts rows flowing into the exporter; while entered, a heartbeat thread
+    records the count on the job every ``PROGRESS_INTERVAL_SECONDS``
+
+    The heartbeat does not depend on rows moving, so a long save or upload
+    after the last row does not make the job look abandoned to other workers.
+    """
+
+    def __init__(self, db: Session, job_id):
+        self._bind = db.get_bind()
+        self._job_id = job_id
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.rows = 0
+
+    def __enter__(self) -> "_ProgressTracker":
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._beat, name=f"report-export-{self._job_id}", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stopped.set()
+        self._thread.join()
+        self._thread = None
+
+    def track(self, rows: Iterator[Sequence[Any]]) -> Iterator[Sequence[Any]]:
+        for row in rows:
+            self.rows += 1
+            yield row
+
+    def _beat(self):
+        while not self._stopped.wait(PROGRESS_INTERVAL_SECONDS):
+            self._write()
+
+    def _write(self):
+        try:
+            with self._bind.begin() as conn:
+                conn.execute(
+                    update(ReportExecution)
+                    .where(ReportExecution.id == self._job_id)
+                    .values(progress_rows=self.rows, heartbeat_at=datetime.utcnow())
+                )
+        except Exception as e:
+            logger.warning(f"Failed to record progress of report export {self._job_id}: {e}")
+
+
+def report_generation_handler(db: Session, job, execution_id) -> Dict[str, Any]:
+    """
+    ``SchedulerEngine`` handler for ``report_generation`` jobs.
+
+    ``job.job_parameters``: ``report_definition_id``, optional ``parameters``
+    and ``export_format`` (default csv). Runs the export synchronously in the
+    scheduler's worker thread and returns the artifact location.
+    """
+    from app.services.scheduler_service import SchedulerService
+
+    params = job.job_parameters or {}
+    if not params.get("report_definition_id"):
+        raise ValueError("report_definition_id not specified in job parameters")
+
+    export = ReportExecution(
+        id=uuid.uuid4(),
+        tenant_id=job.tenant_id,
+        report_definition_id=uuid.UUID(str(params["report_definition_id"])),
+        executed_by=job.created_by,
+        parameters_used=params.get("parameters"),
+        export_format=params.get("export_format", "csv"),
+        status="running",
+        progress_rows=0,
+        heartbeat_at=datetime.utcnow(),
+    )
+    db.add(export)
+    db.commit()
+    SchedulerService.add_execution_log(db, execution_id, "INFO", f"Report export {export.id} started")
+
+    ReportExportJobService.run_export(db, export)
+    return {
+        "report_execution_id": str(export.id),
+        "export_file_path": export.export_file_path,
+        "export_file_size": export.export_file_size,
+        "row_count": export.row_count,
+    }
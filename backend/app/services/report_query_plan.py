@@ -0,0 +1,319 @@
+"""
+Compiled report query plans.
+
+A report definition is validated and compiled once into a ``ReportQueryPlan``:
+a SQLAlchemy Core ``select()`` whose filter values, tenant and limit are bind
+parameters. Executing a report then only resolves parameter values and binds
+them, so the SQL text stays the same across executions (the engine's compiled
+cache and the driver's prepared statements are reused) and no per-execution
+SQL assembly happens.
+
+Plans are cached per report id together with the definition version
+(``updated_at``); saving a definition compiles the new version and replaces
+the old plan. Transient definitions (previews) are compiled on each call.
+
+Validation is unchanged from the string builder it replaces: every identifier
+must be a real column of the base table, aggregations and sort directions
+come from a fixed allow-list, and every filter value is bound.
+"""
+
+import operator
+from collections import OrderedDict
+from threading import RLock
+from typing import Any, Callable, Dict, FrozenSet, Hashable, List, Optional, Tuple
+
+from sqlalchemy import and_, bindparam, column, func, literal_column, or_, select, table
+from sqlalchemy.sql import Select
+
+from app.core.config import get_settings
+
+_ALLOWED_AGGREGATIONS = {"sum", "avg", "count", "min", "max", "none"}
+_ALLOWED_ORDER_DIRECTIONS = {"asc", "desc"}
+
+_COMPARISONS: Dict[str, Callable] = {
+    "eq": operator.eq,
+    "ne": operator.ne,
+    "gt": operator.gt,
+    "lt": operator.lt,
+    "gte": operator.ge,
+    "lte": operator.le,
+}
+
+
+class ReportQueryValidationError(ValueError):
+    """Raised when a report query references an unknown/disallowed table, column, or option.
+
+    Distinct from plain ValueError (used elsewhere for "not found") so routers
+    can map this to 400 instead of 404.
+    """
+
+
+def resolve_report_columns(report_def) -> List[Tuple[Any, str, str]]:
+    """
+    The report's selected columns as (name, label, aggregation).
+
+    Prefers ``columns_config`` (legacy) and falls back to ``columns`` (designer
+    format). Aggregations are lower-cased and checked against the allow-list;
+    names are not validated here.
+    """
+    columns_config = report_def.columns_config or []
+    if not columns_config and getattr(report_def, "columns", None):
+        columns_config = [
+            {
+                "name": c.get("name"),
+                "label": c.get("alias") or c.get("label") or c.get("name"),
+                "aggregation": c.get("aggregate") or c.get("aggregation"),
+            }
+            for c in report_def.columns
+            if c.get("name")
+        ]
+
+    resolved = []
+    for col in columns_config:
+        col_name = col.get("name")
+        aggregation = (col.get("aggregation") or col.get("aggregate") or "none").lower()
+        if aggregation not in _ALLOWED_AGGREGATIONS:
+            raise ReportQueryValidationError(f"Unknown or disallowed aggregation: {aggregation}")
+        resolved.append((col_name, str(col.get("label", col_name) or col_name), aggregation))
+    return resolved
+
+
+class _PlanFilter:
+    """One filter condition: where its value comes from and how it is bound"""
+
+    __slots__ = ("bind_name", "operator", "value", "parameter", "column")
+
+    def __init__(self, bind_name: str, operator_name: str, value: Any, parameter: Optional[str], column_expr):
+        self.bind_name = bind_name
+        self.operator = operator_name
+        self.value = value
+        self.parameter = parameter
+        self.column = column_expr
+
+    def clause(self):
+        bound = bindparam(self.bind_name, expanding=self.operator == "in")
+        if self.operator == "like":
+            return self.column.like(bound)
+        if self.operator == "in":
+            return self.column.in_(bound)
+        return _COMPARISONS[self.operator](self.column, bound)
+
+
+class ReportQueryPlan:
+    """
+    A validated, parameterized report query.
+
+    ``bind`` returns the statement and parameter values for one execution.
+    Statements are built lazily per query shape: tenant-scoped or not, and
+    which ``in`` filters are dropped because their value is not a non-empty
+    list (those conditions are skipped, as before). Most reports only ever
+    use one shape.
+    """
+
+    def __init__(
+        self,
+        base: Select,
+        tenant_column,
+        filter_tree: Optional[Tuple[str, List[Any]]],
+        filters: List[_PlanFilter],
+    ):
+        self._base = base
+        self._tenant_column = tenant_column
+        self._filter_tree = filter_tree
+        self._filters = filters
+        self._statements: Dict[Tuple[bool, FrozenSet[str]], Select] = {}
+
+    @classmethod
+    def compile(cls, report_def, allowed_columns: FrozenSet[str]) -> "ReportQueryPlan":
+        """
+        Validate a report definition against the base table's columns and compile it.
+
+        Raises:
+            ReportQueryValidationError: Unknown table, column, aggregation or sort direction
+        """
+        base_entity = report_def.base_entity
+        if not allowed_columns:
+            raise ReportQueryValidationError(f"Unknown or inaccessible table: {base_entity}")
+        source = table(base_entity, *(column(name) for name in sorted(allowed_columns)))
+
+        def _column(name, context: str):
+            if name not in allowed_columns:
+                raise ReportQueryValidationError(f"Unknown or disallowed {context}: {name}")
+            return source.c[name]
+
+        query_config = report_def.query_config or {}
+
+        select_fields = []
+        for col_name, col_label, aggregation in resolve_report_columns(report_def):
+            expr = _column(col_name, "column")
+            if aggregation != "none":
+                expr = getattr(func, aggregation)(expr)
+            select_fields.append(expr.label(col_label))
+
+        stmt = select(*select_fields) if select_fields else select(literal_column("*"))
+        stmt = stmt.select_from(source)
+
+        filters: List[_PlanFilter] = []
+        filter_tree = None
+        if query_config.get("filters"):
+            filter_tree = cls.compile_filters(query_config["filters"], _column, filters)
+
+        if query_config.get("group_by"):
+            stmt = stmt.group_by(*(_column(f, "group_by field") for f in query_config["group_by"]))
+
+        for order in query_config.get("order_by") or []:
+            direction = (order.get("direction") or "ASC").lower()
+            if direction not in _ALLOWED_ORDER_DIRECTIONS:
+                raise ReportQueryValidationError(f"Unknown or disallowed sort direction: {direction}")
+            field = _column(order.get("field"), "order_by field")
+            stmt = stmt.order_by(field.asc() if direction == "asc" else field.desc())
+
+        if query_config.get("limit"):
+            stmt = stmt.limit(int(query_config["limit"]))
+
+        tenant_column = source.c["tenant_id"] if "tenant_id" in allowed_columns else None
+        return cls(stmt, tenant_column, filter_tree, filters)
+
+    @classmethod
+    def compile_filters(cls, filter_group: Dict[str, Any], resolve, filters: List[_PlanFilter]):
+        """
+        Compile a filter group into (logic, [filter | nested tree]); fields validated, values deferred.
+
+        ``resolve(name, context)`` maps a field to its column expression (raising
+        ``ReportQueryValidationError`` for unknown fields); compiled filters are
+        appended to ``filters`` in bind-name order.
+        """
+        items: List[Any] = []
+        for condition in filter_group.get("conditions", []):
+            field = resolve(condition.get("field"), "filter field")
+            op = condition.get("operator")
+            if op not in _COMPARISONS and op not in ("like", "in"):
+                continue  # unknown operators never produced a condition
+            plan_filter = _PlanFilter(
+                f"f{len(filters) + 1}", op, condition.get("value"), condition.get("parameter"), field
+            )
+            filters.append(plan_filter)
+            items.append(plan_filter)
+
+        for nested_group in filter_group.get("groups", []):
+            nested = cls.compile_filters(nested_group, resolve, filters)
+            if nested is not None:
+                items.append(nested)
+
+        logic = filter_group.get("logic", "AND")
+        if logic not in ("AND", "OR"):
+            logic = "AND"
+        return (logic, items) if items else None
+
+    def bind(self, tenant_id, parameters: Optional[Dict[str, Any]]) -> Tuple[Select, Dict[str, Any]]:
+        """Statement and bind values for one execution (tenant filter only when ``tenant_id`` is set)."""
+        params: Dict[str, Any] = {}
+        skipped = set()
+        for plan_filter in self._filters:
+            value = plan_filter.value
+            if plan_filter.parameter and parameters:
+                value = parameters.get(plan_filter.parameter, value)
+            if plan_filter.operator == "in":
+                if isinstance(value, list) and value:
+                    params[plan_filter.bind_name] = value
+                else:
+                    skipped.add(plan_filter.bind_name)
+            elif plan_filter.operator == "like":
+                params[plan_filter.bind_name] = f"%{value}%"
+            else:
+                params[plan_filter.bind_name] = value
+
+        scoped = tenant_id is not None and self._tenant_column is not None
+        if scoped:
+            params["tenant_id"] = str(tenant_id)
+        return self._statement(scoped, frozenset(skipped)), params
+
+    def _statement(self, scoped: bool, skipped: FrozenSet[str]) -> Select:
+        shape = (scoped, skipped)
+        stmt = self._statements.get(shape)
+        if stmt is None:
+            stmt = self._base
+            if scoped:
+                stmt = stmt.where(self._tenant_column == bindparam("tenant_id"))
+            where = self._filter_clause(self._filter_tree, skipped) if self._filter_tree else None
+            if where is not None:
+                stmt = stmt.where(where)
+            self._statements[shape] = stmt
+        return stmt
+
+    def _filter_clause(self, tree: Tuple[str, List[Any]], skipped: FrozenSet[str]):
+        logic, items = tree
+        clauses = []
+        for item in items:
+            if isinstance(item, _PlanFilter):
+                if item.bind_name not in skipped:
+                    clauses.append(item.clause())
+            else:
+                nested = self._filter_clause(item, skipped)
+                if nested is not None:
+                    clauses.append(nested)
+        if not clauses:
+            return None
+        return or_(*clauses) if logic == "OR" else and_(*clauses)
+
+
+class ReportPlanCache:
+    """
+    Thread-safe LRU of compiled plans, one per report (newest version only)
+
+    Cache Key Format: report_id, stored with the definition version the plan
+    was compiled from; a lookup with any other version is a miss.
+    """
+
+    def __init__(self, max_entries: int = 1000):
+        self._entries: "OrderedDict[Hashable, Tuple[Hashable, ReportQueryPlan]]" = OrderedDict()
+        self._lock = RLock()
+        self._max_entries = max_entries
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, report_id, version) -> Optional[ReportQueryPlan]:
+        """Plan compiled from this version of the report, or None"""
+        with self._lock:
+            entry = self._entries.get(report_id)
+            if entry is None or entry[0] != version:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(report_id)
+            self._hits += 1
+            return entry[1]
+
+    def set(self, report_id, version, plan: ReportQueryPlan):
+        """Cache a plan (replaces the plan of any other version of the report)"""
+        with self._lock:
+            self._entries[report_id] = (version, plan)
+            self._entries.move_to_end(report_id)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, report_id=None):
+        """Drop one report's plan, or all plans"""
+        with self._lock:
+            if report_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(report_id, None)
+
+    def get_stats(self) -> dict:
+        """Get cache statistics"""
+        with self._lock:
+            return {
+                "total_entries": len(self._entries),
+                "max_entries": self._max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+            }
+
+
+# Global plan cache instance
+_plan_cache = ReportPlanCache(max_entries=get_settings().REPORT_PLAN_CACHE_MAX_ENTRIES)
+
+
+def get_report_plan_cache() -> ReportPlanCache:
+    """Get the global report plan cache instance"""
+    return _plan_cache
@@ -0,0 +1,579 @@
+"""
+Materialized report rollups.
+
+A report whose ``query_config`` has a ``rollup`` section is backed by a
+summary table holding its aggregates per tenant, group-by dimension and time
+bucket::
+
+    "rollup": {"time_column": "created_at", "bucket": "day", "watermark_column": "updated_at"}
+
+``bucket`` is one of hour, day, month, year (default day); ``watermark_column``
+(default ``time_column``) must be a timestamp that is set whenever a row is
+inserted or updated, and should be indexed on the base table.
+
+Each report column becomes a re-aggregatable measure (sum, count, min, max;
+avg is stored as sum and count). Executions are answered from the summary
+table whenever the report's filters and ordering only touch group-by
+dimensions, so dashboard widgets over large fact tables read a few thousand
+pre-aggregated rows instead of scanning the fact table. Anything else falls
+back to the live query.
+
+Refreshes run through ``SchedulerEngine`` (a ``custom`` job with
+``handler_class = "report_rollup_refresh"``). A refresh reads the rows whose
+watermark moved since the last refresh, then deletes and recomputes only the
+time buckets those rows fall in. The table is rebuilt from scratch the first
+time, whenever the rollup-relevant part of the definition changes, and on
+``{"full": true}`` jobs — the watermark cannot see deleted rows, so schedule
+an occasional full refresh if the base table has deletes.
+
+When the base table has an ``id`` column, a companion ``<summary>_rows`` table
+records the bucket each row was last counted in, so a row whose time column
+changed is also taken out of the bucket it moved from.
+"""
+
+import hashlib
+import json
+import logging
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from sqlalchemy import Float, and_, cast, column, delete, func, insert, literal_column, or_, select, table, text
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from app.core.config import get_settings
+from app.core.report_cache import get_report_cache
+from app.core.schema_catalog import get_schema_catalog
+from app.core.scope import apply_tenant_scope_by_id
+from app.models.report import ReportDefinition, ReportRollup
+from app.services.report_query_plan import (
+    ReportQueryPlan,
+    ReportQueryValidationError,
+    get_report_plan_cache,
+    resolve_report_columns,
+)
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_REFRESH_HANDLER = "report_rollup_refresh"
+BUCKET_COLUMN = "rollup_bucket"
+
+# strftime/DATE_FORMAT patterns for dialects without date_trunc
+_BUCKET_FORMATS = {
+    "hour": "%Y-%m-%d %H:00:00",
+    "day": "%Y-%m-%d 00:00:00",
+    "month": "%Y-%m-01 00:00:00",
+    "year": "%Y-01-01 00:00:00",
+}
+
+# Stored columns per report aggregation; avg is recombined as sum / count
+_MEASURE_KINDS = {
+    "sum": ("sum",),
+    "count": ("count",),
+    "avg": ("sum", "count"),
+    "min": ("min",),
+    "max": ("max",),
+}
+
+
+def _truncate(value: datetime, bucket: str) -> datetime:
+    """Start of the bucket ``value`` falls in"""
+    value = value.replace(minute=0, second=0, microsecond=0)
+    if bucket == "hour":
+        return value
+    value = value.replace(hour=0)
+    if bucket == "day":
+        return value
+    value = value.replace(day=1)
+    return value if bucket == "month" else value.replace(month=1)
+
+
+def _next_bucket(start: datetime, bucket: str) -> datetime:
+    """Start of the bucket after the one starting at ``start``"""
+    if bucket == "hour":
+        return start + timedelta(hours=1)
+    if bucket == "day":
+        return start + timedelta(days=1)
+    if bucket == "month":
+        return (
+            start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+        )
+    return start.replace(year=start.year + 1)
+
+
+def _as_datetime(value) -> Optional[datetime]:
+    """Timestamps come back as strings from untyped columns on SQLite"""
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value))
+
+
+def _bucket_value(dialect_name: str, start: datetime, bucket: str):
+    """A bucket start as stored in the summary table (strings outside PostgreSQL)"""
+    if dialect_name == "postgresql":
+        return start
+    return start.strftime(_BUCKET_FORMATS[bucket])
+
+
+def _bucket_expression(dialect_name: str, time_column, bucket: str):
+    if dialect_name == "postgresql":
+        # Literal (allow-listed) unit: a bind parameter would differ between SELECT and GROUP BY
+        return func.date_trunc(literal_column(f"'{bucket}'"), time_column)
+    if dialect_name == "sqlite":
+        return func.strftime(literal_column(f"'{_BUCKET_FORMATS[bucket]}'"), time_column)
+    return func.date_format(time_column, literal_column(f"'{_BUCKET_FORMATS[bucket]}'"))
+
+
+class _CreateTableAs(Executable, ClauseElement):
+    """CREATE TABLE <name> AS <select>"""
+
+    inherit_cache = False
+
+    def __init__(self, name: str, query: Select):
+        self.name = name
+        self.query = query
+
+
+@compiles(_CreateTableAs)
+def _compile_create_table_as(element, compiler, **kw):
+    return f"CREATE TABLE {compiler.preparer.quote(element.name)} AS {compiler.process(element.query, **kw)}"
+
+
+class RollupSpec:
+    """
+    What a report's summary table holds, derived from its definition.
+
+    Dimensions are stored as ``d0, d1, ...`` and measures as ``m{i}_{kind}`` so
+    stored names never depend on (or collide with) user column names.
+    """
+
+    def __init__(
+        self,
+        base_entity: str,
+        time_column: str,
+        bucket: str,
+        watermark_column: str,
+        dimensions: List[str],
+        measures: List[Tuple[str, Tuple[str, ...]]],
+        tenant_scoped: bool,
+        key_column: Optional[str] = None,
+    ):
+        self.base_entity = base_entity
+        self.time_column = time_column
+        self.bucket = bucket
+        self.watermark_column = watermark_column
+        self.dimensions = dimensions
+        self.measures = measures
+        self.tenant_scoped = tenant_scoped
+        self.key_column = key_column
+
+    @classmethod
+    def from_report(cls, report_def, allowed_columns: FrozenSet[str]) -> "RollupSpec":
+        """
+        Validate a report's rollup configuration against the base table.
+
+        Raises:
+            ReportQueryValidationError: Missing/unknown columns, unsupported bucket,
+                or a report shape that cannot be pre-aggregated
+        """
+        query_config = report_def.query_config or {}
+        config = query_config.get("rollup") or {}
+        if not allowed_columns:
+            raise ReportQueryValidationError(f"Unknown or inaccessible table: {report_def.base_entity}")
+
+        time_column = config.get("time_column")
+        watermark_column = config.get("watermark_column") or time_column
+        for name, context in ((time_column, "rollup time_column"), (watermark_column, "rollup watermark_column")):
+            if name not in allowed_columns:
+                raise ReportQueryValidationError(f"Unknown or disallowed {context}: {name}")
+        bucket = (config.get("bucket") or "day").lower()
+        if bucket not in _BUCKET_FORMATS:
+            raise ReportQueryValidationError(f"Unknown or disallowed rollup bucket: {bucket}")
+
+        dimensions = []
+        for name in query_config.get("group_by") or []:
+            if name not in allowed_columns:
+                raise ReportQueryValidationError(f"Unknown or disallowed group_by field: {name}")
+            if name not in dimensions:
+                dimensions.append(name)
+
+        measure_kinds: Dict[str, List[str]] = {}
+        columns = resolve_report_columns(report_def)
+        if not columns:
+            raise ReportQueryValidationError("Rollup reports must select columns")
+        for name, _, aggregation in columns:
+            if name not in allowed_columns:
+                raise ReportQueryValidationError(f"Unknown or disallowed column: {name}")
+            if aggregation == "none":
+                if name not in dimensions:
+                    raise ReportQueryValidationError(f"Rollup column {name} must be aggregated or grouped by")
+                continue
+            kinds = measure_kinds.setdefault(name, [])
+            kinds.extend(k for k in _MEASURE_KINDS[aggregation] if k not in kinds)
+
+        measures = [(name, tuple(sorted(kinds))) for name, kinds in sorted(measure_kinds.items())]
+        return cls(
+            report_def.base_entity,
+            time_column,
+            bucket,
+            watermark_column,
+            dimensions,
+            measures,
+            "tenant_id" in allowed_columns,
+            "id" if "id" in allowed_columns else None,
+        )
+
+    @property
+    def signature(self) -> str:
+        """Hash of everything that determines the summary table's shape and content"""
+        payload = json.dumps(
+            [
+                self.base_entity,
+                self.time_column,
+                self.bucket,
+                self.watermark_column,
+                self.dimensions,
+                self.measures,
+                self.tenant_scoped,
+                self.key_column,
+            ]
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def stored_columns(self) -> List[str]:
+        """Summary table columns, in insert order"""
+        names = ["tenant_id"] if self.tenant_scoped else []
+        names.append(BUCKET_COLUMN)
+        names.extend(f"d{i}" for i in range(len(self.dimensions)))
+        names.extend(f"m{i}_{kind}" for i, (_, kinds) in enumerate(self.measures) for kind in kinds)
+        return names
+
+    def base_table(self):
+        names = {self.time_column, self.watermark_column, *self.dimensions, *(m for m, _ in self.measures)}
+        if self.tenant_scoped:
+            names.add("tenant_id")
+        if self.key_column:
+            names.add(self.key_column)
+        return table(self.base_entity, *(column(name) for name in sorted(names)))
+
+    def aggregate(self, dialect_name: str, source) -> Select:
+        """Summary rows computed from the base table (callers add the WHERE)"""
+        groups = [source.c.tenant_id] if self.tenant_scoped else []
+        groups.append(_bucket_expression(dialect_name, source.c[self.time_column], self.bucket))
+        groups.extend(source.c[name] for name in self.dimensions)
+
+        measures = [getattr(func, kind)(source.c[name]) for name, kinds in self.measures for kind in kinds]
+        labelled = [expr.label(name) for expr, name in zip(groups + measures, self.stored_columns())]
+        return select(*labelled).select_from(source).group_by(*groups)
+
+    def row_buckets(self, dialect_name: str, source) -> Select:
+        """(row_id, bucket) of each base row, for the companion rows table (callers add the WHERE)"""
+        return select(
+            source.c[self.key_column].label("row_id"),
+            _bucket_expression(dialect_name, source.c[self.time_column], self.bucket).label(BUCKET_COLUMN),
+        ).select_from(source)
+
+
+class ReportRollupService:
+    """Maintains report summary tables and answers report queries from them."""
+
+    @staticmethod
+    def _table_name(report_id) -> str:
+        return f"rpt_rollup_{uuid.UUID(str(report_id)).hex}"
+
+    @staticmethod
+    def _rows_table_name(table_name: str) -> str:
+        return f"{table_name}_rows"
+
+    @staticmethod
+    def sync_definition(db: Session, report_def: ReportDefinition) -> Optional[ReportRollup]:
+        """
+        Register or drop a report's rollup after its definition was saved.
+
+        The summary table itself is (re)built by the next scheduled refresh;
+        until then executions use the live query.
+        """
+        config = (report_def.query_config or {}).get("rollup") if report_def.is_active else None
+        rollup = db.query(ReportRollup).filter(ReportRollup.report_definition_id == report_def.id).first()
+
+        if config and rollup is None:
+            rollup = ReportRollup(
+                id=uuid.uuid4(),
+                tenant_id=report_def.tenant_id,
+                report_definition_id=report_def.id,
+                table_name=ReportRollupService._table_name(report_def.id),
+                status="pending",
+            )
+            db.add(rollup)
+            db.commit()
+        elif not config and rollup is not None:
+            ReportRollupService._drop_table(db, rollup.table_name)
+            db.delete(rollup)
+            db.commit()
+            get_report_plan_cache().invalidate(("rollup", report_def.id))
+            rollup = None
+        return rollup
+
+    @staticmethod
+    def refresh(db: Session, rollup: ReportRollup, full: bool = False) -> ReportRollup:
+        """
+        Bring a rollup up to date with its base table and commit.
+
+        Incremental unless ``full``, the table was never built, or the
+        definition's rollup spec changed since it was built.
+        """
+        started = time.monotonic()
+        report_def = db.get(ReportDefinition, rollup.report_definition_id)
+        try:
+            spec = RollupSpec.from_report(report_def, get_schema_catalog().get_column_names(db, report_def.base_entity))
+            if full or rollup.status != "ready" or rollup.watermark is None or rollup.spec_hash != spec.signature:
+                ReportRollupService._rebuild(db, rollup, spec)
+            else:
+                ReportRollupService._apply_changes(db, rollup, spec)
+        except Exception as e:
+            db.rollback()
+            rollup.status = "failed"
+            rollup.error_message = str(e)
+            db.commit()
+            raise
+
+        summary = table(rollup.table_name)
+        rollup.row_count = db.execute(select(func.count()).select_from(summary)).scalar()
+        rollup.status = "ready"
+        rollup.error_message = None
+        rollup.last_refreshed_at = datetime.utcnow()
+        rollup.refresh_duration_ms = int((time.monotonic() - started) * 1000)
+        db.commit()
+
+        # In-process cached results of this report predate the refresh
+        get_report_cache().invalidate(f"report_{report_def.tenant_id}_{report_def.id}_")
+        return rollup
+
+    @staticmethod
+    def _rebuild(db: Session, rollup: ReportRollup, spec: RollupSpec):
+        dialect = db.get_bind().dialect
+        source = spec.base_table()
+        watermark = db.execute(select(func.max(source.c[spec.watermark_column]))).scalar()
+
+        quote = dialect.identifier_preparer.quote
+        ReportRollupService._drop_table(db, rollup.table_name)
+        db.execute(_CreateTableAs(rollup.table_name, spec.aggregate(dialect.name, source)))
+        key_columns = ", ".join(quote(name) for name in spec.stored_columns()[: 1 + spec.tenant_scoped])
+        db.execute(
+            text(f"CREATE INDEX {quote('ix_' + rollup.table_name)} ON {quote(rollup.table_name)} ({key_columns})")
+        )
+        if spec.key_column:
+            rows_table = ReportRollupService._rows_table_name(rollup.table_name)
+            db.execute(_CreateTableAs(rows_table, spec.row_buckets(dialect.name, source)))
+            db.execute(text(f"CREATE INDEX {quote('ix_' + rows_table)} ON {quote(rows_table)} (row_id)"))
+
+        rollup.spec_hash = spec.signature
+        rollup.watermark = _as_datetime(watermark)
+        get_report_plan_cache().invalidate(("rollup", rollup.report_definition_id))
+
+    @staticmethod
+    def _apply_changes(db: Session, rollup: ReportRollup, spec: RollupSpec):
+        """Recompute the time buckets touched by rows whose watermark moved since the last refresh."""
+        dialect_name = db.get_bind().dialect.name
+        source = spec.base_table()
+        time_col = source.c[spec.time_column]
+        watermark_col = source.c[spec.watermark_column]
+        since = rollup.watermark - timedelta(seconds=get_settings().REPORT_ROLLUP_WATERMARK_LAG_SECONDS)
+
+        latest, first_time, last_time, untimed = db.execute(
+            select(
+                func.max(watermark_col),
+                func.min(time_col),
+                func.max(time_col),
+                func.count() - func.count(time_col),
+            ).where(watermark_col > since)
+        ).one()
+        if latest is None:
+            return
+
+        summary = table(rollup.table_name, *(column(name) for name in spec.stored_columns()))
+        bucket_col = summary.c[BUCKET_COLUMN]
+        base_ranges, summary_ranges = [], []
+
+        def _add_range(start: datetime, end: datetime):
+            base_ranges.append(and_(time_col >= start, time_col < end))
+            summary_ranges.append(
+                and_(
+                    bucket_col >= _bucket_value(dialect_name, start, spec.bucket),
+                    bucket_col < _bucket_value(dialect_name, end, spec.bucket),
+                )
+            )
+
+        if first_time is not None:
+            start = _truncate(_as_datetime(first_time), spec.bucket)
+            _add_range(start, _next_bucket(_truncate(_as_datetime(last_time), spec.bucket), spec.bucket))
+
+        if spec.key_column:
+            # Buckets the changed rows were counted in before, which they may have moved out of
+            rows = table(
+                ReportRollupService._rows_table_name(rollup.table_name), column("row_id"), column(BUCKET_COLUMN)
+            )
+            changed_ids = select(source.c[spec.key_column]).where(watermark_col > since)
+            for (old_bucket,) in db.execute(
+                select(rows.c[BUCKET_COLUMN]).where(rows.c.row_id.in_(changed_ids)).distinct()
+            ):
+                if old_bucket is None:
+                    untimed = True
+                else:
+                    start = _as_datetime(old_bucket)
+                    _add_range(start, _next_bucket(start, spec.bucket))
+            db.execute(delete(rows).where(rows.c.row_id.in_(changed_ids)))
+            db.execute(
+                insert(rows).from_select(
+                    ["row_id", BUCKET_COLUMN], spec.row_buckets(dialect_name, source).where(watermark_col > since)
+                )
+            )
+
+        if untimed:
+            base_ranges.append(time_col.is_(None))
+            summary_ranges.append(bucket_col.is_(None))
+
+        db.execute(delete(summary).where(or_(*summary_ranges)))
+        db.execute(
+            insert(summary).from_select(
+                spec.stored_columns(), spec.aggregate(dialect_name, source).where(or_(*base_ranges))
+            )
+        )
+        rollup.watermark = max(rollup.watermark, _as_datetime(latest))
+
+    @staticmethod
+    def _drop_table(db: Session, table_name: str):
+        quote = db.get_bind().dialect.identifier_preparer.quote
+        db.execute(text(f"DROP TABLE IF EXISTS {quote(table_name)}"))
+        db.execute(text(f"DROP TABLE IF EXISTS {quote(ReportRollupService._rows_table_name(table_name))}"))
+
+    @staticmethod
+    def build_query(
+        db: Session, tenant_id, report_def: ReportDefinition, parameters: Optional[Dict[str, Any]]
+    ) -> Optional[Tuple[Select, Dict[str, Any]]]:
+        """
+        The report's query against its summary table as (statement, bind parameters).
+
+        None when the report has no ready rollup, or its filters/ordering
+        reference columns the rollup does not keep; callers then run the live query.
+        """
+        report_id = getattr(report_def, "id", None)
+        if report_id is None or not (report_def.query_config or {}).get("rollup"):
+            return None
+        rollup = (
+            db.query(ReportRollup.table_name, ReportRollup.spec_hash)
+            .filter(ReportRollup.report_definition_id == report_id, ReportRollup.status == "ready")
+            .first()
+        )
+        if rollup is None:
+            return None
+
+        cache = get_report_plan_cache()
+        key = ("rollup", report_id)
+        version = (report_def.updated_at, rollup.spec_hash)
+        plan = cache.get(key, version)
+        if plan is None:
+            try:
+                plan = ReportRollupService._compile_plan(db, report_def, rollup.table_name, rollup.spec_hash)
+            except ReportQueryValidationError as e:
+                logger.debug(f"Report {report_id} not answerable from its rollup: {e}")
+                return None
+            cache.set(key, version, plan)
+        return plan.bind(tenant_id, parameters)
+
+    @staticmethod
+    def _compile_plan(db: Session, report_def: ReportDefinition, table_name: str, spec_hash: str) -> ReportQueryPlan:
+        spec = RollupSpec.from_report(report_def, get_schema_catalog().get_column_names(db, report_def.base_entity))
+        if spec.signature != spec_hash:
+            raise ReportQueryValidationError("Rollup was built from another version of the definition")
+
+        summary = table(table_name, *(column(name) for name in spec.stored_columns()))
+        dimension_columns = {name: summary.c[f"d{i}"] for i, name in enumerate(spec.dimensions)}
+        measure_index = {name: i for i, (name, _) in enumerate(spec.measures)}
+
+        def _dimension(name, context: str):
+            if name not in dimension_columns:
+                raise ReportQueryValidationError(f"Rollup has no dimension for {context}: {name}")
+            return dimension_columns[name]
+
+        select_fields = []
+        for name, label, aggregation in resolve_report_columns(report_def):
+            if aggregation == "none":
+                expr = _dimension(name, "column")
+            else:
+                stored = f"m{measure_index[name]}_"
+                if aggregation == "avg":
+                    expr = cast(func.sum(summary.c[stored + "sum"]), Float) / func.nullif(
+                        func.sum(summary.c[stored + "count"]), 0
+                    )
+                elif aggregation in ("sum", "count"):
+                    expr = func.sum(summary.c[stored + aggregation])
+                else:
+                    expr = getattr(func, aggregation)(summary.c[stored + aggregation])
+            select_fields.append(expr.label(label))
+
+        query_config = report_def.query_config or {}
+        stmt = select(*select_fields).select_from(summary)
+        if spec.dimensions:
+            stmt = stmt.group_by(*(dimension_columns[name] for name in spec.dimensions))
+
+        filters = []
+        filter_tree = None
+        if query_config.get("filters"):
+            filter_tree = ReportQueryPlan.compile_filters(query_config["filters"], _dimension, filters)
+
+        for order in query_config.get("order_by") or []:
+            direction = (order.get("direction") or "ASC").lower()
+            if direction not in ("asc", "desc"):
+                raise ReportQueryValidationError(f"Unknown or disallowed sort direction: {direction}")
+            field = _dimension(order.get("field"), "order_by field")
+            stmt = stmt.order_by(field.desc() if direction == "desc" else field.asc())
+
+        if query_config.get("limit"):
+            stmt = stmt.limit(int(query_config["limit"]))
+
+        tenant_column = summary.c.tenant_id if spec.tenant_scoped else None
+        return ReportQueryPlan(stmt, tenant_column, filter_tree, filters)
+
+
+def report_rollup_refresh_handler(db: Session, job, execution_id) -> Dict[str, Any]:
+    """
+    ``SchedulerEngine`` handler for ``custom`` jobs with ``handler_class = "report_rollup_refresh"``.
+
+    ``job.job_parameters``: optional ``report_definition_ids`` (default: every
+    rollup of ``job.tenant_id``, or of all tenants for system jobs) and
+    ``full`` to rebuild instead of refreshing incrementally. Rollups another
+    worker is refreshing are skipped.
+    """
+    from app.services.scheduler_service import SchedulerService
+
+    params = job.job_parameters or {}
+    query = db.query(ReportRollup.id)
+    if job.tenant_id is not None:
+        query = apply_tenant_scope_by_id(query, ReportRollup, job.tenant_id)
+    if params.get("report_definition_ids"):
+        report_ids = [uuid.UUID(str(report_id)) for report_id in params["report_definition_ids"]]
+        query = query.filter(ReportRollup.report_definition_id.in_(report_ids))
+    rollup_ids = [row.id for row in query.all()]
+
+    refreshed, skipped, failed = 0, 0, []
+    for rollup_id in rollup_ids:
+        rollup = db.query(ReportRollup).filter(ReportRollup.id == rollup_id).with_for_update(skip_locked=True).first()
+        if rollup is None:
+            skipped += 1
+            continue
+        try:
+            ReportRollupService.refresh(db, rollup, full=bool(params.get("full")))
+            refreshed += 1
+        except Exception as e:
+            logger.error(f"Rollup {rollup_id} refresh failed: {e}")
+            SchedulerService.add_execution_log(db, execution_id, "ERROR", f"Rollup {rollup_id} refresh failed: {e}")
+            failed.append(str(rollup_id))
+
+    if failed:
+        raise RuntimeError(f"{len(failed)} of {len(rollup_ids)} rollup refreshes failed: {', '.join(failed)}")
+    return {"refreshed": refreshed, "skipped": skipped}
@@ -4,47 +4,83 @@ Report service for business logic.
 
 import hashlib
 import json
-from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Tuple
 
 from sqlalchemy import or_, text
+from sqlalchemy.engine import Connection, CursorResult
 from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
 
+from app.core.report_cache import get_report_cache
+from app.core.schema_catalog import get_schema_catalog
 from app.core.scope import apply_tenant_scope_by_id
-from app.models.report import ReportCache, ReportDefinition, ReportExecution
+from app.models.report import ReportDefinition, ReportExecution
 from app.schemas.report import LookupDataRequest, ReportDefinitionCreate, ReportDefinitionUpdate, ReportExecutionRequest
+from app.services.report_query_plan import ReportQueryPlan, ReportQueryValidationError, get_report_plan_cache
+from app.services.report_rollup import ReportRollupService
 
-_ALLOWED_AGGREGATIONS = {"sum", "avg", "count", "min", "max", "none"}
-_ALLOWED_ORDER_DIRECTIONS = {"asc", "desc"}
+logger = logging.getLogger(__name__)
 
 
-class ReportQueryValidationError(ValueError):
-    """Raised when a report query references an unknown/disallowed table, column, or option.
+class ReportRowStream:
+    """
+    Rows of a streamed report query, read from a dedicated connection.
 
-    Distinct from plain ValueError (used elsewhere for "not found") so routers
-    can map this to 400 instead of 404.
+    The connection is released when the rows are exhausted or on ``close()``,
+    which also works if iteration never started (a generator's ``finally``
+    would not run then). ``close()`` may be called from another thread: it
+    waits for an in-flight fetch instead of closing the cursor under it.
     """
 
+    def __init__(self, conn: Connection, result: CursorResult):
+        self._conn = conn
+        self._result = result
+        self._rows = iter(result)
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def __iter__(self) -> "ReportRowStream":
+        return self
+
+    def __next__(self) -> Sequence[Any]:
+        with self._lock:
+            if self._closed:
+                raise StopIteration
+            try:
+                return next(self._rows)
+            except BaseException:
+                self._release()
+                raise
+
+    def close(self):
+        """Release the connection (idempotent)"""
+        with self._lock:
+            self._release()
+
+    def _release(self):
+        if not self._closed:
+            self._closed = True
+            try:
+                self._result.close()
+            finally:
+                self._conn.close()
+
 
 class ReportService:
     """Service for report operations."""
 
     @staticmethod
-    def _get_table_columns(db: Session, table_name: str) -> set:
+    def _get_table_columns(db: Session, table_name: str) -> FrozenSet[str]:
         """
-        Return the real column names for a physical table, queried via
-        information_schema with a bound parameter (safe regardless of what
-        table_name contains). An empty result means the table doesn't exist
-        and must not be queried.
+        Return the real column names for a physical table, from the shared
+        schema catalog (table_name is only used as a lookup key, so it is safe
+        regardless of what it contains). An empty result means the table
+        doesn't exist and must not be queried.
         """
-        result = db.execute(
-            text(
-                "SELECT column_name FROM information_schema.columns "
-                "WHERE table_schema = 'public' AND table_name = :t"
-            ),
-            {"t": table_name},
-        )
-        return {row[0] for row in result}
+        return get_schema_catalog().get_column_names(db, table_name)
 
     @staticmethod
     def _quote_identifier(name: str) -> str:
@@ -115,6 +151,8 @@ class ReportService:
         db.add(db_report)
         db.commit()
         db.refresh(db_report)
+        ReportService._precompile_plan(db, db_report)
+        ReportRollupService.sync_definition(db, db_report)
         return db_report
 
     @staticmethod
@@ -129,13 +167,31 @@ class ReportService:
         report = query.first()
 
         # Check permissions
-        if report and not report.is_public and user_id:
-            if report.allowed_users and user_id not in report.allowed_users:
-                # TODO: Check role permissions
-                return None
+        if report and not ReportService._can_view(report, user_id):
+            return None
 
         return report
 
+    @staticmethod
+    def get_report_definitions(
+        db: Session, tenant_id, report_ids, user_id: Optional[int] = None
+    ) -> Dict[Any, ReportDefinition]:
+        """Get several report definitions in one query, keyed by ID (inaccessible ones are left out)."""
+        if not report_ids:
+            return {}
+        query = apply_tenant_scope_by_id(db.query(ReportDefinition), ReportDefinition, tenant_id).filter(
+            ReportDefinition.id.in_(list(report_ids)), ReportDefinition.is_active == True
+        )
+        return {report.id: report for report in query.all() if ReportService._can_view(report, user_id)}
+
+    @staticmethod
+    def _can_view(report: ReportDefinition, user_id) -> bool:
+        if not report.is_public and user_id:
+            if report.allowed_users and user_id not in report.allowed_users:
+                # TODO: Check role permissions
+                return False
+        return True
+
     @staticmethod
     def list_report_definitions(
         db: Session,
@@ -188,8 +244,19 @@ class ReportService:
         db_report.updated_at = datetime.utcnow()
         db.commit()
         db.refresh(db_report)
+        ReportService._precompile_plan(db, db_report)
+        ReportRollupService.sync_definition(db, db_report)
         return db_report
 
+    @staticmethod
+    def _precompile_plan(db: Session, report_def: ReportDefinition) -> None:
+        """Compile a saved definition's query plan ahead of its first execution."""
+        try:
+            ReportService.compile_report_plan(db, report_def)
+        except ReportQueryValidationError as e:
+            # Drafts may reference columns that don't exist yet; execution reports the error
+            logger.info(f"Report {report_def.id} query plan not compiled: {e}")
+
     @staticmethod
     def delete_report_definition(db: Session, tenant_id, report_id) -> bool:
         """Soft delete a report definition."""
@@ -204,6 +271,7 @@ class ReportService:
 
         db_report.is_active = False
         db.commit()
+        ReportRollupService.sync_definition(db, db_report)
         return True
 
     @staticmethod
@@ -234,30 +302,11 @@ class ReportService:
         db.refresh(execution)
 
         try:
-            # Check cache if requested
-            cached_data = None
-            if request.use_cache:
-                cached_data = ReportService._get_cached_data(
-                    db, tenant_id, request.report_definition_id, request.parameters
-                )
-
-            if cached_data:
-                # Use cached data
-                execution.status = "completed"
-                execution.row_count = cached_data.get("row_count", 0)
-                execution.execution_time_ms = 0
-            else:
-                # Build and execute query
-                query_result = ReportService._build_and_execute_query(db, tenant_id, report_def, request.parameters)
-
-                execution.status = "completed"
-                execution.row_count = len(query_result.get("data", []))
-
-                # Cache the results
-                if request.use_cache:
-                    ReportService._cache_results(
-                        db, tenant_id, request.report_definition_id, request.parameters, query_result
-                    )
+            query_result, _ = ReportService.get_report_results(
+                db, tenant_id, report_def, request.parameters, use_cache=request.use_cache
+            )
+            execution.status = "completed"
+            execution.row_count = query_result.get("row_count", len(query_result.get("data", [])))
 
             # Calculate execution time
             end_time = datetime.utcnow()
@@ -276,117 +325,14 @@ class ReportService:
         db: Session, tenant_id, report_def: ReportDefinition, parameters: Optional[Dict[str, Any]]
     ) -> Dict[str, Any]:
         """
-        Build and execute the report query.
-
-        Every identifier (table name, column names, group-by/order-by fields)
-        is validated against the table's real columns (via information_schema)
-        before being interpolated, and every filter *value* is passed as a
-        bind parameter — never string-interpolated. This is a hard security
-        boundary: report definitions/preview requests are attacker-reachable
-        (any user with reports:execute:tenant), so nothing from them may reach
-        raw SQL unvalidated/unbound.
-        """
-        base_entity = report_def.base_entity
-        query_config = report_def.query_config or {}
-
-        allowed_columns = ReportService._get_table_columns(db, base_entity)
-        if not allowed_columns:
-            raise ReportQueryValidationError(f"Unknown or inaccessible table: {base_entity}")
-
-        # Resolve columns: prefer columns_config (legacy), fall back to columns (designer format)
-        columns_config = report_def.columns_config or []
-        if not columns_config and hasattr(report_def, "columns") and report_def.columns:
-            columns_config = [
-                {
-                    "name": c.get("name"),
-                    "label": c.get("alias") or c.get("label") or c.get("name"),
-                    "aggregation": c.get("aggregate") or c.get("aggregation"),
-                }
-                for c in report_def.columns
-                if c.get("name")
-            ]
-
-        # Build SELECT clause
-        select_fields = []
-        for col in columns_config:
-            col_name = col.get("name")
-            col_label = col.get("label", col_name) or col_name
-            aggregation = (col.get("aggregation") or col.get("aggregate") or "none").lower()
-
-            if aggregation not in _ALLOWED_AGGREGATIONS:
-                raise ReportQueryValidationError(f"Unknown or disallowed aggregation: {aggregation}")
-
-            quoted_col = ReportService._validate_column(col_name, allowed_columns, "column")
-            quoted_label = ReportService._quote_identifier(str(col_label))
-
-            if aggregation != "none":
-                select_fields.append(f"{aggregation.upper()}({quoted_col}) as {quoted_label}")
-            else:
-                select_fields.append(f"{quoted_col} as {quoted_label}")
-
-        if not select_fields:
-            select_fields = ["*"]
-
-        # Build FROM clause
-        from_clause = ReportService._quote_identifier(base_entity)
-
-        # Build WHERE clause
-        # Only filter by tenant_id when the value is actually set (superusers may have None)
-        where_conditions = []
-        query_params: dict = {}
-        if tenant_id is not None and "tenant_id" in allowed_columns:
-            where_conditions.append('"tenant_id" = :tenant_id')
-            query_params["tenant_id"] = str(tenant_id)
-
-        # Add filter conditions from query config
-        if query_config.get("filters"):
-            filter_sql, filter_params = ReportService._build_filter_sql(
-                query_config["filters"], parameters, allowed_columns
-            )
-            if filter_sql:
-                where_conditions.append(filter_sql)
-                query_params.update(filter_params)
-
-        # Build GROUP BY clause
-        group_by_clause = ""
-        if query_config.get("group_by"):
-            quoted_group_fields = [
-                ReportService._validate_column(f, allowed_columns, "group_by field") for f in query_config["group_by"]
-            ]
-            group_by_clause = f"GROUP BY {', '.join(quoted_group_fields)}"
-
-        # Build ORDER BY clause
-        order_by_clause = ""
-        if query_config.get("order_by"):
-            order_by_parts = []
-            for order in query_config["order_by"]:
-                field = order.get("field")
-                direction = (order.get("direction") or "ASC").lower()
-                if direction not in _ALLOWED_ORDER_DIRECTIONS:
-                    raise ReportQueryValidationError(f"Unknown or disallowed sort direction: {direction}")
-                quoted_field = ReportService._validate_column(field, allowed_columns, "order_by field")
-                order_by_parts.append(f"{quoted_field} {direction.upper()}")
-            order_by_clause = f"ORDER BY {', '.join(order_by_parts)}"
-
-        # Build LIMIT clause
-        limit_clause = ""
-        if query_config.get("limit"):
-            limit_clause = "LIMIT :__limit"
-            query_params["__limit"] = int(query_config["limit"])
-
-        # Construct full query — omit WHERE entirely when there are no conditions
-        where_clause = f"WHERE {' AND '.join(where_conditions)}" if where_conditions else ""
+        Build and execute the report query, returning every row materialized.
 
-        sql = f"""
-            SELECT {', '.join(select_fields)}
-            FROM {from_clause}
-            {where_clause}
-            {group_by_clause}
-            {order_by_clause}
-            {limit_clause}
+        Reports with a ready rollup are answered from their summary table
+        (see ``app.services.report_rollup``) when their filters allow it.
         """
-
-        result = db.execute(text(sql), query_params)
+        rollup_query = ReportRollupService.build_query(db, tenant_id, report_def, parameters)
+        stmt, query_params = rollup_query or ReportService._build_report_query(db, tenant_id, report_def, parameters)
+        result = db.execute(stmt, query_params)
         rows = result.fetchall()
 
         # Convert to list of dicts
@@ -395,149 +341,107 @@ class ReportService:
 
         return {"data": data, "row_count": len(data), "columns": list(columns)}
 
-    _OPERATOR_SQL = {
-        "eq": "=",
-        "ne": "!=",
-        "gt": ">",
-        "lt": "<",
-        "gte": ">=",
-        "lte": "<=",
-    }
-
     @staticmethod
-    def _build_filter_sql(
-        filter_group: Dict[str, Any],
+    def stream_report_rows(
+        db: Session,
+        tenant_id,
+        report_def: ReportDefinition,
         parameters: Optional[Dict[str, Any]],
-        allowed_columns: set,
-        _counter: Optional[List[int]] = None,
-    ) -> tuple:
+        chunk_size: int = 1000,
+    ) -> Tuple[List[str], ReportRowStream]:
         """
-        Build a parameterized SQL WHERE fragment from a filter group.
+        Execute the report query with a server-side cursor for exports.
 
-        Returns (sql_fragment, bind_params). Every field is validated against
-        the table's real columns; every value is bound, never interpolated.
-        """
-        if _counter is None:
-            _counter = [0]
-
-        conditions = []
-        params: dict = {}
-
-        for condition in filter_group.get("conditions", []):
-            field = condition.get("field")
-            operator = condition.get("operator")
-            value = condition.get("value")
-            param_name = condition.get("parameter")
-
-            # Use parameter value if specified
-            if param_name and parameters:
-                value = parameters.get(param_name, value)
-
-            quoted_field = ReportService._validate_column(field, allowed_columns, "filter field")
-
-            _counter[0] += 1
-            bind_name = f"f{_counter[0]}"
-
-            if operator in ReportService._OPERATOR_SQL:
-                conditions.append(f"{quoted_field} {ReportService._OPERATOR_SQL[operator]} :{bind_name}")
-                params[bind_name] = value
-            elif operator == "like":
-                conditions.append(f"{quoted_field} LIKE :{bind_name}")
-                params[bind_name] = f"%{value}%"
-            elif operator == "in":
-                if isinstance(value, list) and value:
-                    bind_names = []
-                    for v in value:
-                        _counter[0] += 1
-                        bn = f"f{_counter[0]}"
-                        bind_names.append(f":{bn}")
-                        params[bn] = v
-                    conditions.append(f"{quoted_field} IN ({', '.join(bind_names)})")
-
-        # Handle nested groups recursively
-        for nested_group in filter_group.get("groups", []):
-            nested_sql, nested_params = ReportService._build_filter_sql(
-                nested_group, parameters, allowed_columns, _counter
-            )
-            if nested_sql:
-                conditions.append(f"({nested_sql})")
-                params.update(nested_params)
+        The query is validated and executed immediately (so errors surface
+        before a response starts) on a dedicated connection of ``db``'s
+        engine, which stays open until the returned rows are exhausted or
+        closed; callers must close them on every path that does not exhaust them. Rows are fetched ``chunk_size`` at a time and yielded as
+        tuples in column order, so memory stays bounded by the chunk size.
 
-        logic = filter_group.get("logic", "AND")
-        if logic not in ("AND", "OR"):
-            logic = "AND"
-        return f" {logic} ".join(conditions), params
+        Returns:
+            (columns, row_iterator)
+        """
+        stmt, query_params = ReportService._build_report_query(db, tenant_id, report_def, parameters)
+        conn = db.get_bind().connect()
+        try:
+            result = conn.execution_options(stream_results=True, yield_per=chunk_size).execute(stmt, query_params)
+        except Exception:
+            conn.close()
+            raise
+        return list(result.keys()), ReportRowStream(conn, result)
 
     @staticmethod
-    def _get_cached_data(
-        db: Session, tenant_id, report_id, parameters: Optional[Dict[str, Any]]
-    ) -> Optional[Dict[str, Any]]:
-        """Get cached report data if available and not expired."""
-        cache_key = ReportService._generate_cache_key(report_id, parameters)
-
-        cache_entry = (
-            apply_tenant_scope_by_id(db.query(ReportCache), ReportCache, tenant_id)
-            .filter(
-                ReportCache.report_definition_id == report_id,
-                ReportCache.cache_key == cache_key,
-                ReportCache.expires_at > datetime.utcnow(),
-            )
-            .first()
-        )
+    def compile_report_plan(db: Session, report_def: ReportDefinition) -> ReportQueryPlan:
+        """
+        Get the compiled query plan of a report definition.
 
-        if cache_entry:
-            cache_entry.hit_count += 1
-            db.commit()
-            return cache_entry.cached_data
+        Saved definitions are compiled once per version (``updated_at``) and
+        cached; transient ones (previews) are compiled on every call. See
+        ``app.services.report_query_plan`` for the validation rules.
+        """
+        report_id = getattr(report_def, "id", None)
+        version = getattr(report_def, "updated_at", None)
+        cache = get_report_plan_cache()
+        if report_id is not None:
+            plan = cache.get(report_id, version)
+            if plan is not None:
+                return plan
+
+        plan = ReportQueryPlan.compile(report_def, ReportService._get_table_columns(db, report_def.base_entity))
+        if report_id is not None:
+            cache.set(report_id, version, plan)
+        return plan
 
-        return None
+    @staticmethod
+    def _build_report_query(
+        db: Session, tenant_id, report_def: ReportDefinition, parameters: Optional[Dict[str, Any]]
+    ) -> Tuple[Select, Dict[str, Any]]:
+        """
+        Build the report query as (statement, bind parameters).
+
+        Identifiers are validated when the plan is compiled and every filter
+        value is a bind parameter — never string-interpolated. This is a hard
+        security boundary: report definitions/preview requests are
+        attacker-reachable (any user with reports:execute:tenant).
+        """
+        return ReportService.compile_report_plan(db, report_def).bind(tenant_id, parameters)
 
     @staticmethod
-    def _cache_results(
+    def get_report_results(
         db: Session,
         tenant_id,
-        report_id,
+        report_def: ReportDefinition,
         parameters: Optional[Dict[str, Any]],
-        data: Dict[str, Any],
-        ttl_minutes: int = 60,
-    ):
-        """Cache report results."""
-        cache_key = ReportService._generate_cache_key(report_id, parameters)
-        params_hash = hashlib.sha256(json.dumps(parameters or {}, sort_keys=True).encode()).hexdigest()
-
-        # Check if cache entry exists
-        cache_entry = db.query(ReportCache).filter(ReportCache.cache_key == cache_key).first()
-
-        expires_at = datetime.utcnow() + timedelta(minutes=ttl_minutes)
-
-        if cache_entry:
-            # Update existing cache
-            cache_entry.cached_data = data
-            cache_entry.row_count = data.get("row_count", 0)
-            cache_entry.expires_at = expires_at
-        else:
-            # Create new cache entry
-            import uuid as _uuid
-
-            cache_entry = ReportCache(
-                id=_uuid.uuid4(),
-                tenant_id=tenant_id,
-                report_definition_id=report_id,
-                cache_key=cache_key,
-                parameters_hash=params_hash,
-                cached_data=data,
-                row_count=data.get("row_count", 0),
-                expires_at=expires_at,
-            )
-            db.add(cache_entry)
+        use_cache: bool = True,
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        Run a report's query, through the tiered report cache when ``use_cache``.
 
-        db.commit()
+        Concurrent callers for the same report and parameters share one
+        execution, and expired results are served while they are refreshed
+        (see ``app.core.report_cache``).
+
+        Returns:
+            (query_result, served_from_cache)
+        """
+        if not use_cache:
+            return ReportService._build_and_execute_query(db, tenant_id, report_def, parameters), False
+
+        report_id = report_def.id
+
+        def _load(session: Session) -> Dict[str, Any]:
+            # Background refreshes get their own session and re-read the definition
+            definition = report_def if session is db else session.get(ReportDefinition, report_id)
+            return ReportService._build_and_execute_query(session, tenant_id, definition, parameters)
+
+        cache_key = ReportService._generate_cache_key(report_id, parameters, tenant_id, report_def.updated_at)
+        return get_report_cache().get_or_load(db, tenant_id, report_id, cache_key, _load)
 
     @staticmethod
-    def _generate_cache_key(report_id: int, parameters: Optional[Dict[str, Any]]) -> str:
-        """Generate a cache key from report ID and parameters."""
-        params_str = json.dumps(parameters or {}, sort_keys=True)
-        return f"report_{report_id}_{hashlib.sha256(params_str.encode()).hexdigest()}"
+    def _generate_cache_key(report_id, parameters: Optional[Dict[str, Any]], tenant_id=None, version=None) -> str:
+        """Generate a cache key from tenant, report ID, definition version and parameters."""
+        params_str = json.dumps({"v": str(version), "p": parameters or {}}, sort_keys=True, default=str)
+        return f"report_{tenant_id}_{report_id}_{hashlib.sha256(params_str.encode()).hexdigest()}"
 
     @staticmethod
     def get_lookup_data(db: Session, tenant_id, request: LookupDataRequest) -> Dict[str, Any]:
@@ -15,6 +15,7 @@ from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import Session
 
 from app.core.model_cache import ModelCache, get_model_cache
+from app.core.schema_catalog import get_schema_catalog
 from app.models.data_model import EntityDefinition
 from app.utils.field_type_mapper import FieldTypeMapper
 
@@ -66,44 +67,45 @@ class RuntimeModelGenerator:
         Raises:
             ValueError: If entity not found or not published
         """
+        cache_tenant_id = str(tenant_id) if tenant_id else "platform"
+
+        # Cache hit: no definition load, no hashing. Past the revalidation
+        # interval, confirm the generation with a one-column SELECT.
+        cached_model = self.cache.get(cache_tenant_id, entity_name)
+        if cached_model is not None:
+            if not self.cache.needs_revalidation(cache_tenant_id, entity_name):
+                return cached_model
+            if self._current_generation(entity_name, tenant_id) == self.cache.generation_of(
+                cache_tenant_id, entity_name
+            ):
+                self.cache.mark_validated(cache_tenant_id, entity_name)
+                return cached_model
+
         # Load entity definition (uses per-instance cache)
         entity_def = self.get_entity_definition(entity_name, tenant_id)
 
         if not entity_def:
             raise ValueError(f"Entity '{entity_name}' not found or not published for tenant '{tenant_id}'")
 
-        # Convert to dict for caching
-        entity_dict = self._entity_to_dict(entity_def)
-
-        # Create hash for cache key
-        entity_hash = self.cache.hash_entity_definition(entity_dict)
-
-        # Check cache
-        cache_tenant_id = str(tenant_id) if tenant_id else "platform"
-        cached_model = self.cache.get(cache_tenant_id, entity_name, entity_hash)
-
-        if cached_model:
-            logger.debug(f"Using cached model for {entity_name}")
-            return cached_model
-
         # Generate new model
         logger.info(f"Generating new model for {entity_name}")
+        entity_dict = self._entity_to_dict(entity_def)
         model = self._generate_model(entity_def, entity_dict)
 
         # Cache it
-        self.cache.set(cache_tenant_id, entity_name, entity_hash, model)
+        self.cache.set(cache_tenant_id, entity_name, self._generation_key(entity_def.id, entity_def.generation), model)
 
         return model
 
     def invalidate_cache(self, entity_name: Optional[str] = None, tenant_id: Optional[str] = None):
         """
-        Invalidate cached models
+        Invalidate cached models in every worker
 
         Args:
             entity_name: If provided, invalidate only this entity
             tenant_id: If provided, invalidate only this tenant's models
         """
-        self.cache.invalidate(tenant_id, entity_name)
+        self.cache.invalidate(tenant_id, entity_name, broadcast=True)
         logger.info(f"Cache invalidated for entity={entity_name}, tenant={tenant_id}")
 
     def get_entity_definition(self, entity_name: str, tenant_id: Optional[str] = None) -> Optional[EntityDefinition]:
@@ -131,11 +133,26 @@ class RuntimeModelGenerator:
         Returns:
             EntityDefinition object or None
         """
+        return self._definition_query(self.db.query(EntityDefinition), entity_name, tenant_id).first()
+
+    def _current_generation(self, entity_name: str, tenant_id: Optional[str]) -> Optional[tuple]:
+        """Generation key of the definition ``get_model`` would load (None if not published)"""
+        row = self._definition_query(
+            self.db.query(EntityDefinition.id, EntityDefinition.generation), entity_name, tenant_id
+        ).first()
+        return self._generation_key(row.id, row.generation) if row else None
+
+    @staticmethod
+    def _generation_key(entity_id, generation) -> tuple:
+        # The id distinguishes a tenant-specific definition from the platform one it shadows
+        return (str(entity_id), generation)
+
+    @staticmethod
+    def _definition_query(query, entity_name: str, tenant_id: Optional[str]):
+        """Restrict ``query`` to the published definition visible to ``tenant_id``"""
         from sqlalchemy import or_
 
-        query = self.db.query(EntityDefinition).filter(
-            EntityDefinition.name == entity_name, EntityDefinition.status == "published"
-        )
+        query = query.filter(EntityDefinition.name == entity_name, EntityDefinition.status == "published")
 
         # Check tenant-specific first, then platform-level
         if tenant_id:
@@ -151,7 +168,7 @@ class RuntimeModelGenerator:
             # Only platform-level
             query = query.filter(EntityDefinition.tenant_id.is_(None))
 
-        return query.first()
+        return query
 
     def _entity_to_dict(self, entity_def: EntityDefinition) -> dict:
         """
@@ -438,14 +455,7 @@ class RuntimeModelGenerator:
             Returns empty set if the table does not exist or on error.
         """
         try:
-            result = self.db.execute(
-                text(
-                    "SELECT column_name FROM information_schema.columns "
-                    "WHERE table_schema = :schema AND table_name = :table"
-                ),
-                {"schema": schema_name, "table": table_name},
-            )
-            return {row[0] for row in result}
+            return set(get_schema_catalog().get_column_names(self.db, table_name, schema_name))
         except Exception as e:
             logger.warning(f"Could not introspect table {schema_name}.{table_name}: {e}")
             return set()
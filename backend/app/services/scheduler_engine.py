@@ -5,11 +5,13 @@ This module provides the background worker that monitors and executes scheduled
 using APScheduler with hierarchical configuration support.
 """
 
-import asyncio
 import logging
 import os
+import socket
 import traceback
-from datetime import datetime
+import uuid
+from concurrent.futures import ThreadPoolExecutor as HandlerPool
+from datetime import datetime, timedelta, timezone
 from typing import Any, Callable, Dict, Optional
 
 from apscheduler.executors.pool import ThreadPoolExecutor
@@ -23,6 +25,9 @@ from sqlalchemy.orm import Session, sessionmaker
 
 from app.core.config import settings
 from app.models.scheduler import JobStatus, JobType, SchedulerJob, SchedulerJobExecution
+from app.services.report_export_jobs import report_generation_handler
+from app.services.report_rollup import ROLLUP_REFRESH_HANDLER, report_rollup_refresh_handler
+from app.services.scheduler_runtime import GLOBAL_SLOT, ConcurrencyLimiter, backoff_delay, claim_fire, tenant_slot
 from app.services.scheduler_service import SchedulerService
 
 logger = logging.getLogger(__name__)
@@ -38,7 +43,13 @@ class SchedulerEngine:
     - One-time scheduled execution
     - Hierarchical configuration (System, Tenant, Company, Branch)
     - Execution tracking and logging
-    - Retry logic
+    - Global and per-tenant concurrency limits shared across replicas
+    - Retries rescheduled as one-shot triggers with exponential backoff
+
+    APScheduler threads only claim fires and take concurrency slots; job
+    handlers run on a separate worker pool (``SCHEDULER_WORKER_THREADS``).
+    Several replicas can run the engine side by side: with Redis available,
+    each fire runs on exactly one of them.
     """
 
     def __init__(self, db_url: Optional[str] = None):
@@ -61,9 +72,15 @@ class SchedulerEngine:
 
         # Job handlers registry
         self.job_handlers: Dict[str, Callable] = {}
+        self.register_handler(JobType.REPORT_GENERATION.value, report_generation_handler)
+        self.register_handler(ROLLUP_REFRESH_HANDLER, report_rollup_refresh_handler)
+
+        # Handler worker pool and concurrency slots
+        self.pool = HandlerPool(max_workers=settings.SCHEDULER_WORKER_THREADS, thread_name_prefix="scheduler-job")
+        self.limiter = ConcurrencyLimiter()
 
-        # Worker ID for tracking
-        self.worker_id = f"worker-{os.getpid()}"
+        # Worker ID for tracking (host-qualified: replicas in containers share PIDs)
+        self.worker_id = f"worker-{socket.gethostname()}-{os.getpid()}"
 
         logger.info(f"Scheduler engine initialized with worker ID: {self.worker_id}")
 
@@ -91,6 +108,7 @@ class SchedulerEngine:
         """Shutdown the scheduler engine gracefully."""
         if self.scheduler.running:
             self.scheduler.shutdown(wait=True)
+            self.pool.shutdown(wait=True)
             logger.info("Scheduler engine stopped")
 
     def _load_jobs_from_database(self):
@@ -173,19 +191,54 @@ class SchedulerEngine:
 
     def _execute_job(self, job_id: int):
         """
-        Execute a scheduled job.
+        Handle a scheduled fire of a job.
+
+        Only the replica that claims the fire runs it. The fire is skipped if
+        the job's concurrency slots are all taken.
 
         Args:
             job_id: Job ID to execute
         """
         db = self.SessionLocal()
-        execution_id = None
+        try:
+            job = SchedulerService.get_job(db, job_id)
+            if not job or not job.is_active:
+                logger.warning(f"Job {job_id} not found or inactive")
+                return
+            window = min(job.interval_seconds / 2, 30) if job.interval_seconds else 30
+            if not claim_fire(job_id, self.worker_id, max(window, 1)):
+                logger.debug(f"Job {job_id} fire claimed by another worker")
+                return
+        finally:
+            db.close()
+
+        self._start_execution(job_id)
+
+    def _retry_execution(self, job_id: int, execution_id: int, attempt: int):
+        """One-shot trigger target: run retry ``attempt`` of an execution."""
+        self._start_execution(job_id, execution_id, attempt)
+
+    def _start_execution(self, job_id: int, execution_id: Optional[int] = None, attempt: int = 0):
+        """
+        Take concurrency slots, record the attempt and hand it to the worker pool.
+
+        Args:
+            job_id: Job ID to execute
+            execution_id: Execution being retried (None for a new fire)
+            attempt: Retry attempt (0 for the first run)
+        """
+        db = self.SessionLocal()
+        holder = uuid.uuid4().hex
+        submitted = False
 
         try:
-            # Get job details
             job = SchedulerService.get_job(db, job_id)
             if not job or not job.is_active:
                 logger.warning(f"Job {job_id} not found or inactive")
+                if execution_id:
+                    SchedulerService.update_execution_status(
+                        db, execution_id, JobStatus.CANCELLED, error_message="Job removed or deactivated"
+                    )
                 return
 
             # Get effective configuration
@@ -197,106 +250,157 @@ class SchedulerEngine:
                 logger.info(f"Scheduler disabled for job {job_id}")
                 return
 
-            # Check concurrent job limit
-            running_count = (
-                db.query(SchedulerJobExecution).filter(SchedulerJobExecution.status == JobStatus.RUNNING).count()
-            )
-
-            if running_count >= config.max_concurrent_jobs:
-                logger.warning(f"Max concurrent jobs ({config.max_concurrent_jobs}) reached, " f"skipping job {job_id}")
+            # Concurrency limits: global and per tenant, held until the attempt finishes
+            timeout = job.max_runtime_seconds or config.job_timeout_seconds or 3600
+            limits = [
+                (GLOBAL_SLOT, settings.SCHEDULER_MAX_CONCURRENT_JOBS),
+                (tenant_slot(job.tenant_id), config.max_concurrent_jobs),
+            ]
+            if not self.limiter.acquire(limits, holder, timeout):
+                if execution_id:
+                    # A retry is owed: try again shortly instead of dropping it
+                    self._schedule_retry(job_id, execution_id, attempt, settings.SCHEDULER_SLOT_WAIT_SECONDS)
+                else:
+                    logger.warning(
+                        f"Max concurrent jobs reached for tenant {job.tenant_id or 'system'}, skipping job {job_id}"
+                    )
                 return
 
-            # Create execution record
-            execution = SchedulerService.create_execution(
-                db,
-                job_id=job_id,
-                tenant_id=job.tenant_id,
-                company_id=job.company_id,
-                branch_id=job.branch_id,
-                scheduled_at=datetime.utcnow(),
-            )
-            execution_id = execution.id
+            if execution_id is None:
+                # Create execution record
+                execution = SchedulerService.create_execution(
+                    db,
+                    job_id=job_id,
+                    tenant_id=job.tenant_id,
+                    company_id=job.company_id,
+                    branch_id=job.branch_id,
+                    scheduled_at=datetime.utcnow(),
+                )
+                execution_id = execution.id
+
+                # Update job last run
+                job.last_run_at = datetime.utcnow()
+                job.run_count += 1
+                db.commit()
+
+                SchedulerService.add_execution_log(
+                    db, execution_id, "INFO", f"Job execution started by worker {self.worker_id}"
+                )
+            else:
+                SchedulerService.add_execution_log(
+                    db, execution_id, "INFO", f"Retry {attempt} started by worker {self.worker_id}"
+                )
 
-            # Update job last run
-            job.last_run_at = datetime.utcnow()
-            job.run_count += 1
+            execution = SchedulerService.update_execution_status(db, execution_id, JobStatus.RUNNING)
+            execution.retry_count = attempt
+            execution.worker_id = self.worker_id
+            execution.process_id = os.getpid()
             db.commit()
 
-            # Add log entry
-            SchedulerService.add_execution_log(
-                db, execution_id, "INFO", f"Job execution started by worker {self.worker_id}"
-            )
+            self.pool.submit(self._run_attempt, job_id, execution_id, attempt, holder)
+            submitted = True
+
+        except Exception as e:
+            logger.error(f"Unexpected error starting job {job_id}: {str(e)}")
+            db.rollback()
+            if execution_id:
+                SchedulerService.update_execution_status(
+                    db, execution_id, JobStatus.FAILED, error_message=str(e), error_traceback=traceback.format_exc()
+                )
+        finally:
+            if not submitted:
+                self.limiter.release(holder)
+            db.close()
 
-            # Update status to running
-            SchedulerService.update_execution_status(db, execution_id, JobStatus.RUNNING)
+    def _run_attempt(self, job_id: int, execution_id: int, attempt: int, holder: str):
+        """
+        Run one attempt of an execution on the worker pool.
 
-            # Execute the job with retry logic
+        A failed attempt is retried later through a one-shot trigger with
+        exponential backoff; no thread sleeps while waiting for it.
+        """
+        db = self.SessionLocal()
+
+        try:
+            job = SchedulerService.get_job(db, job_id)
+            execution = db.get(SchedulerJobExecution, execution_id)
+            config = SchedulerService.get_effective_config(
+                db, tenant_id=job.tenant_id, company_id=job.company_id, branch_id=job.branch_id
+            )
             max_retries = job.max_retries if job.max_retries is not None else config.max_retries
             retry_delay = job.retry_delay_seconds if job.retry_delay_seconds is not None else config.retry_delay_seconds
 
-            result = None
-
-            for attempt in range(max_retries + 1):
-                try:
-                    # Execute the job handler
-                    result = self._run_job_handler(db, job, execution_id)
-
-                    # Success - update status
-                    SchedulerService.update_execution_status(db, execution_id, JobStatus.COMPLETED, result_data=result)
+            try:
+                # Execute the job handler
+                result = self._run_job_handler(db, job, execution_id)
+            except Exception as e:
+                db.rollback()
+                error_trace = traceback.format_exc()
+
+                SchedulerService.add_execution_log(
+                    db,
+                    execution_id,
+                    "ERROR",
+                    f"Attempt {attempt + 1}/{max_retries + 1} failed: {str(e)}",
+                    log_data={"traceback": error_trace},
+                )
 
-                    SchedulerService.add_execution_log(db, execution_id, "INFO", "Job completed successfully")
+                if attempt < max_retries:
+                    delay = backoff_delay(retry_delay, attempt, settings.SCHEDULER_RETRY_MAX_DELAY_SECONDS)
+                    logger.warning(f"Job {job_id} failed (attempt {attempt + 1}), retrying in {delay:.0f} seconds")
+                    SchedulerService.update_execution_status(db, execution_id, JobStatus.PENDING, error_message=str(e))
+                    self._schedule_retry(job_id, execution_id, attempt + 1, delay)
+                else:
+                    # Final failure
+                    SchedulerService.update_execution_status(
+                        db, execution_id, JobStatus.FAILED, error_message=str(e), error_traceback=error_trace
+                    )
 
-                    # Update job success count
-                    job.success_count += 1
-                    job.last_status = JobStatus.COMPLETED
+                    # Update job failure count
+                    job.failure_count += 1
+                    job.last_status = JobStatus.FAILED
                     db.commit()
 
-                    # Send success notification if configured
-                    if config.notify_on_success:
-                        self._send_notification(db, job, execution, config, success=True)
+                    # Send failure notification if configured
+                    if config.notify_on_failure:
+                        self._send_notification(db, job, execution, config, success=False)
+                return
 
-                    break  # Success, exit retry loop
+            # Success - update status
+            SchedulerService.update_execution_status(db, execution_id, JobStatus.COMPLETED, result_data=result)
 
-                except Exception as e:
-                    error_trace = traceback.format_exc()
-
-                    SchedulerService.add_execution_log(
-                        db,
-                        execution_id,
-                        "ERROR",
-                        f"Attempt {attempt + 1}/{max_retries + 1} failed: {str(e)}",
-                        log_data={"traceback": error_trace},
-                    )
+            SchedulerService.add_execution_log(db, execution_id, "INFO", "Job completed successfully")
+
+            # Update job success count
+            job.success_count += 1
+            job.last_status = JobStatus.COMPLETED
+            db.commit()
 
-                    if attempt < max_retries:
-                        logger.warning(
-                            f"Job {job_id} failed (attempt {attempt + 1}), " f"retrying in {retry_delay} seconds"
-                        )
-                        asyncio.sleep(retry_delay)
-                    else:
-                        # Final failure
-                        SchedulerService.update_execution_status(
-                            db, execution_id, JobStatus.FAILED, error_message=str(e), error_traceback=error_trace
-                        )
-
-                        # Update job failure count
-                        job.failure_count += 1
-                        job.last_status = JobStatus.FAILED
-                        db.commit()
-
-                        # Send failure notification if configured
-                        if config.notify_on_failure:
-                            self._send_notification(db, job, execution, config, success=False)
+            # Send success notification if configured
+            if config.notify_on_success:
+                self._send_notification(db, job, execution, config, success=True)
 
         except Exception as e:
             logger.error(f"Unexpected error executing job {job_id}: {str(e)}")
-            if execution_id:
-                SchedulerService.update_execution_status(
-                    db, execution_id, JobStatus.FAILED, error_message=str(e), error_traceback=traceback.format_exc()
-                )
+            db.rollback()
+            SchedulerService.update_execution_status(
+                db, execution_id, JobStatus.FAILED, error_message=str(e), error_traceback=traceback.format_exc()
+            )
         finally:
+            self.limiter.release(holder)
             db.close()
 
+    def _schedule_retry(self, job_id: int, execution_id: int, attempt: int, delay_seconds: float):
+        """Schedule retry ``attempt`` of an execution as a one-shot trigger."""
+        self.scheduler.add_job(
+            func=self._retry_execution,
+            trigger=DateTrigger(run_date=datetime.now(timezone.utc) + timedelta(seconds=delay_seconds)),
+            args=[job_id, execution_id, attempt],
+            id=f"retry_{execution_id}",
+            name=f"retry {attempt} of execution {execution_id}",
+            replace_existing=True,
+        )
+
     def _run_job_handler(self, db: Session, job: SchedulerJob, execution_id: int) -> Dict[str, Any]:
         """
         Execute the actual job handler.
@@ -328,10 +432,8 @@ class SchedulerEngine:
             raise ValueError(f"Unsupported job type: {job.job_type}")
 
     def _handle_report_generation(self, db: Session, job: SchedulerJob, execution_id: int) -> Dict[str, Any]:
-        """Handle report generation jobs."""
-        # This would integrate with the existing report service
-        SchedulerService.add_execution_log(db, execution_id, "INFO", "Report generation job - implementation pending")
-        return {"status": "success", "message": "Report generation placeholder"}
+        """Handle report generation jobs via the registered ``report_generation`` handler."""
+        return self.job_handlers[JobType.REPORT_GENERATION.value](db, job, execution_id)
 
     def _handle_webhook(self, db: Session, job: SchedulerJob, execution_id: int) -> Dict[str, Any]:
         """Handle webhook jobs."""
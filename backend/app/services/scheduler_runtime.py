@@ -0,0 +1,127 @@
+"""
+Scheduler runtime primitives: concurrency slots, fire locks and retry backoff.
+
+``SchedulerEngine`` used to enforce ``max_concurrent_jobs`` by counting
+RUNNING executions on every fire. That costs a query per fire, counts every
+tenant against every limit, and races between replicas. The engine now takes
+slots from counting semaphores instead:
+
+- One global semaphore (``SCHEDULER_MAX_CONCURRENT_JOBS``).
+- One semaphore per tenant, sized by the effective config's
+  ``max_concurrent_jobs``.
+
+With Redis available the semaphores and fire locks are shared by every
+backend replica. Slots expire after the job timeout, so a crashed replica
+cannot leak them. Without Redis they live in process memory, which is
+correct for a single replica.
+"""
+
+import logging
+import random
+import threading
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from app.core.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_SLOT = "scheduler:global"
+
+
+def tenant_slot(tenant_id) -> str:
+    """Semaphore name for a tenant's jobs (system jobs share one)"""
+    return f"scheduler:tenant:{tenant_id or 'system'}"
+
+
+def backoff_delay(base_seconds: float, attempt: int, max_seconds: float) -> float:
+    """
+    Exponential backoff with jitter for retry ``attempt`` (0-based)
+
+    The delay doubles per attempt up to ``max_seconds``. It is then drawn from
+    the upper half of that window, so retries of jobs that failed together
+    (e.g. a shared dependency went down) spread out instead of firing in step.
+    """
+    ceiling = min(max(base_seconds, 1.0) * 2**attempt, max_seconds)
+    return ceiling * (0.5 + random.random() / 2)
+
+
+class ConcurrencyLimiter:
+    """Counting semaphores over Redis, falling back to process memory"""
+
+    def __init__(self):
+        self._local: Dict[str, Set[str]] = {}
+        # (slot, holder) -> True if taken in Redis, False if taken locally
+        self._held: Dict[Tuple[str, str], bool] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, limits: Iterable[Tuple[str, Optional[int]]], holder: str, ttl_seconds: float) -> bool:
+        """
+        Take one slot of every (name, limit) pair, or none of them
+
+        Args:
+            limits: Semaphores to take; a limit of None or <= 0 means unlimited
+            holder: Unique id of the execution taking the slots
+            ttl_seconds: Lifetime of the slots (the job timeout)
+
+        Returns:
+            True if all slots were taken
+        """
+        taken = []
+        for name, limit in limits:
+            if not limit or limit <= 0:
+                continue
+            if not self._acquire_one(name, holder, limit, ttl_seconds):
+                for held in taken:
+                    self._release_one(held, holder)
+                return False
+            taken.append(name)
+        return True
+
+    def release(self, holder: str):
+        """Release every slot held by ``holder``"""
+        with self._lock:
+            names = [name for name, member in self._held if member == holder]
+        for name in names:
+            self._release_one(name, holder)
+
+    def in_use(self, name: str) -> int:
+        """Slots of ``name`` held in this process"""
+        with self._lock:
+            return sum(1 for slot, _ in self._held if slot == name)
+
+    def _acquire_one(self, name: str, holder: str, limit: int, ttl_seconds: float) -> bool:
+        shared = get_redis().acquire_slot(name, holder, limit, ttl_seconds)
+        with self._lock:
+            if shared is None:
+                holders = self._local.setdefault(name, set())
+                if len(holders) >= limit:
+                    return False
+                holders.add(holder)
+            elif not shared:
+                return False
+            self._held[(name, holder)] = shared is not None
+            return True
+
+    def _release_one(self, name: str, holder: str):
+        with self._lock:
+            in_redis = self._held.pop((name, holder), None)
+            if in_redis is False:
+                self._local.get(name, set()).discard(holder)
+        if in_redis:
+            get_redis().release_slot(name, holder)
+
+
+def claim_fire(job_id, owner: str, window_seconds: float) -> bool:
+    """
+    Claim one scheduled fire of a job across replicas
+
+    Every replica's scheduler fires the same job at (almost) the same instant.
+    The first one to take the lock runs it. The lock expires on its own after
+    ``window_seconds``, which must be shorter than the job's period so the next
+    fire is not suppressed.
+
+    Returns:
+        True if this replica should run the fire (always True without Redis)
+    """
+    claimed = get_redis().acquire_lock(f"scheduler:fire:{job_id}", owner, window_seconds)
+    return claimed is None or claimed
@@ -0,0 +1,195 @@
+"""Automation execution worker.
+
+Runs database-trigger automation rules outside the request path. When
+``AUTOMATION_QUEUE_ENABLED`` is on, ``DynamicEntityService`` queues one
+``automation_executions`` row per (async rule, record) in ``pending`` state
+(see ``AutomationService.enqueue_executions``) instead of executing the rules
+inline; this worker claims and runs them.
+
+Delivery is **at-least-once**: a row is only finished by a status update
+after the rule ran, rows stuck in ``running`` (worker crash) are reclaimed,
+and failures are retried after the rule's ``retry_delay_seconds`` up to its
+``max_retries``. Rule actions should therefore be idempotent.
+
+Placement mirrors the notification worker (ADR-002):
+- ``AUTOMATION_WORKER_INPROCESS=true`` → started as a thread in the lifespan
+- otherwise → standalone process via ``python -m app.workers.automation_worker``
+"""
+
+import asyncio
+import logging
+import os
+import signal
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.core.db import SessionLocal
+from app.models.automation import AutomationExecution, AutomationRule
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+
+class AutomationWorker:
+    """Polling worker that runs queued ``automation_executions`` rows.
+
+    State transitions per row:
+        pending -> running -> completed                    (success)
+        pending -> running -> failed (next_retry_at set)   (failure, retries left)
+        failed  -> running -> ...                          (retry once next_retry_at passes)
+        pending -> running -> failed (next_retry_at NULL)  (retries exhausted, dead-letter)
+        pending -> cancelled                               (rule deleted or deactivated)
+    """
+
+    def __init__(self, poll_interval_seconds: float = 2.0, batch_size: int = 20, stuck_after_seconds: int = 300):
+        self.poll_interval_seconds = poll_interval_seconds
+        self.batch_size = batch_size
+        self.stuck_after_seconds = stuck_after_seconds
+        self._stop = False
+
+    # ----- lifecycle ------------------------------------------------------
+
+    def stop(self) -> None:
+        """Request a graceful shutdown after the current batch completes."""
+        self._stop = True
+
+    def run(self, setup_signals: bool = True) -> None:
+        """Block-and-poll until ``stop()`` is called or SIGTERM/SIGINT received.
+
+        Args:
+            setup_signals: install SIGTERM/SIGINT handlers (standalone mode only;
+                pass False when run from a non-main thread)
+        """
+        if setup_signals:
+            signal.signal(signal.SIGTERM, self._handle_signal)
+            signal.signal(signal.SIGINT, self._handle_signal)
+
+        logger.info("automation-worker starting (poll=%ss, batch=%s)", self.poll_interval_seconds, self.batch_size)
+
+        while not self._stop:
+            try:
+                processed = self._tick()
+                if processed == 0 and not self._stop:
+                    time.sleep(self.poll_interval_seconds)
+            except Exception as exc:  # pragma: no cover - top-level safety net
+                logger.exception("automation-worker tick failed: %s", exc)
+                time.sleep(self.poll_interval_seconds)
+
+        logger.info("automation-worker stopped")
+
+    def _handle_signal(self, signum, _frame) -> None:
+        logger.info("automation-worker received signal %s; stopping", signum)
+        self.stop()
+
+    # ----- polling tick --------------------------------------------------
+
+    def _tick(self) -> int:
+        """Process one batch. Returns the number of rows handled."""
+        db: Session = SessionLocal()
+        try:
+            self._reclaim_stuck(db)
+            claimed = self._claim_ready(db)
+            for row in claimed:
+                self._handle_one(db, row)
+            return len(claimed)
+        finally:
+            db.close()
+
+    def _reclaim_stuck(self, db: Session) -> int:
+        """Put ``running`` rows whose worker died back to ``pending``."""
+        cutoff = datetime.utcnow() - timedelta(seconds=self.stuck_after_seconds)
+        reclaimed = (
+            db.query(AutomationExecution)
+            .filter(AutomationExecution.status == "running", AutomationExecution.started_at < cutoff)
+            .update({AutomationExecution.status: "pending"}, synchronize_session=False)
+        )
+        if reclaimed:
+            db.commit()
+            logger.warning("Reclaimed %s stuck automation executions", reclaimed)
+        return reclaimed
+
+    def _claim_ready(self, db: Session) -> List[AutomationExecution]:
+        """Claim up to ``batch_size`` due rows by flipping them to running.
+
+        ``FOR UPDATE SKIP LOCKED`` lets several workers poll concurrently
+        without claiming the same row (ignored on SQLite).
+        """
+        now = datetime.utcnow()
+        candidates = (
+            db.query(AutomationExecution)
+            .filter(
+                AutomationExecution.trigger_type == "database",
+                or_(
+                    AutomationExecution.status == "pending",
+                    and_(AutomationExecution.status == "failed", AutomationExecution.next_retry_at <= now),
+                ),
+            )
+            .order_by(AutomationExecution.triggered_at.asc())
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        for row in candidates:
+            row.status = "running"
+            row.started_at = now
+            row.next_retry_at = None
+        db.commit()
+        return candidates
+
+    # ----- execution -----------------------------------------------------
+
+    def _handle_one(self, db: Session, row: AutomationExecution) -> None:
+        from app.services.automation_service import AutomationService
+
+        try:
+            user = db.get(User, row.triggered_by_user_id) if row.triggered_by_user_id else None
+            if user is None:
+                raise LookupError(f"Triggering user {row.triggered_by_user_id} not found")
+            asyncio.run(AutomationService(db, user).run_queued_execution(row))
+        except Exception as exc:
+            db.rollback()
+            self._mark_failed(db, row, str(exc))
+
+    def _mark_failed(self, db: Session, row: AutomationExecution, error: str) -> None:
+        rule = db.get(AutomationRule, row.rule_id)
+        max_retries = rule.max_retries if rule and rule.max_retries is not None else 3
+        delay = rule.retry_delay_seconds if rule and rule.retry_delay_seconds is not None else 60
+
+        row.retry_count = (row.retry_count or 0) + 1
+        row.status = "failed"
+        row.error_message = error
+        row.completed_at = datetime.utcnow()
+        if row.retry_count <= max_retries:
+            row.next_retry_at = datetime.utcnow() + timedelta(seconds=delay)
+            logger.warning("Automation execution %s failed (attempt %s), retrying: %s", row.id, row.retry_count, error)
+        else:
+            row.next_retry_at = None
+            logger.error("Automation execution %s dead-lettered after %s attempts: %s", row.id, row.retry_count, error)
+        db.commit()
+
+
+def from_settings() -> AutomationWorker:
+    """Worker configured from AUTOMATION_WORKER_* settings"""
+    settings = get_settings()
+    return AutomationWorker(
+        poll_interval_seconds=settings.AUTOMATION_WORKER_POLL_SECONDS,
+        batch_size=settings.AUTOMATION_WORKER_BATCH_SIZE,
+    )
+
+
+def main() -> None:  # pragma: no cover
+    """Entry point for standalone-process mode."""
+    logging.basicConfig(
+        level=os.environ.get("LOG_LEVEL", "INFO"),
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    from_settings().run()
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
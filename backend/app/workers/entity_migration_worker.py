@@ -0,0 +1,180 @@
+"""Entity migration worker.
+
+Runs the nocode entity migrations queued by
+``DataModelService.execute_migration`` (``entity_migrations`` rows in
+``queued`` state) through ``app.services.online_migration``. Each worker
+thread claims one migration at a time with ``FOR UPDATE SKIP LOCKED``, so
+any number of threads and processes can share the queue.
+
+A running migration refreshes ``heartbeat_at`` after every step and backfill
+batch (and periodically while a long statement runs). Migrations whose
+heartbeat is older than ``ENTITY_MIGRATION_STALE_SECONDS`` (worker crashed
+or was restarted) are put back to ``queued`` with their progress kept, and
+resume at the step they were on.
+
+Placement mirrors the other workers (ADR-002):
+- ``ENTITY_MIGRATION_WORKERS > 0`` → that many threads started in the lifespan
+  (woken immediately when this process queues a migration, otherwise polling)
+- ``ENTITY_MIGRATION_WORKERS=0`` → standalone process via
+  ``python -m app.workers.entity_migration_worker``
+"""
+
+import logging
+import os
+import signal
+import threading
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.core.db import SessionLocal
+from app.models.data_model import EntityMigration
+
+logger = logging.getLogger(__name__)
+
+# Set by DataModelService.execute_migration so idle threads in this process start at once
+_migration_queued = threading.Event()
+
+
+def notify_migration_queued() -> None:
+    """Wake idle migration threads in this process."""
+    _migration_queued.set()
+
+
+class EntityMigrationWorker:
+    """Pool of threads running queued entity migrations.
+
+    State transitions per migration:
+        queued -> running -> completed
+        queued -> running -> failed                    (error and progress kept on the row)
+        running (stale heartbeat) -> queued            (reclaimed, resumed from its progress)
+    """
+
+    def __init__(self, threads: int = 1, poll_interval_seconds: float = 5.0, stale_after_seconds: int = 300):
+        self.threads = max(threads, 1)
+        self.poll_interval_seconds = poll_interval_seconds
+        self.stale_after_seconds = stale_after_seconds
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    # ----- lifecycle ------------------------------------------------------
+
+    def start(self) -> None:
+        """Start the worker threads (daemon)."""
+        self._stop.clear()
+        for i in range(self.threads):
+            thread = threading.Thread(target=self._loop, name=f"entity-migration-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info("entity-migration-worker started %s threads (poll=%ss)", self.threads, self.poll_interval_seconds)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop after the migrations in progress finish (or ``timeout`` per thread elapses).
+
+        A migration interrupted by process exit is resumed by the stale check.
+        """
+        self._stop.set()
+        _migration_queued.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        logger.info("entity-migration-worker stopped")
+
+    def run(self, setup_signals: bool = True) -> None:
+        """Standalone mode: start the threads and block until SIGTERM/SIGINT."""
+        if setup_signals:
+            signal.signal(signal.SIGTERM, self._handle_signal)
+            signal.signal(signal.SIGINT, self._handle_signal)
+        self.start()
+        self._stop.wait()
+        self.stop()
+
+    def _handle_signal(self, signum, _frame) -> None:
+        logger.info("entity-migration-worker received signal %s; stopping", signum)
+        self._stop.set()
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            _migration_queued.clear()
+            try:
+                processed = self._tick()
+            except Exception as exc:  # pragma: no cover - top-level safety net
+                logger.exception("entity-migration-worker tick failed: %s", exc)
+                processed = 0
+            if processed == 0:
+                _migration_queued.wait(self.poll_interval_seconds)
+
+    # ----- polling tick --------------------------------------------------
+
+    def _tick(self) -> int:
+        """Run at most one migration. Returns the number of migrations handled."""
+        db: Session = SessionLocal()
+        try:
+            self._reclaim_stale(db)
+            migration = self._claim_next(db)
+            if migration is None:
+                return 0
+            from app.services.online_migration import run_entity_migration
+
+            try:
+                run_entity_migration(db, migration)
+            except Exception as exc:
+                logger.error("Entity migration %s failed: %s", migration.id, exc)
+            return 1
+        finally:
+            db.close()
+
+    def _reclaim_stale(self, db: Session) -> int:
+        """Put ``running`` migrations whose worker stopped heart-beating back to ``queued``."""
+        cutoff = datetime.utcnow() - timedelta(seconds=self.stale_after_seconds)
+        reclaimed = (
+            db.query(EntityMigration)
+            .filter(EntityMigration.status == "running", EntityMigration.heartbeat_at < cutoff)
+            .update({EntityMigration.status: "queued"}, synchronize_session=False)
+        )
+        if reclaimed:
+            db.commit()
+            logger.warning("Reclaimed %s stale entity migrations", reclaimed)
+        return reclaimed
+
+    def _claim_next(self, db: Session) -> Optional[EntityMigration]:
+        migration = (
+            db.query(EntityMigration)
+            .filter(EntityMigration.status == "queued")
+            .order_by(EntityMigration.created_at.asc())
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .first()
+        )
+        if migration is None:
+            db.rollback()
+            return None
+        migration.status = "running"
+        migration.heartbeat_at = datetime.utcnow()
+        db.commit()
+        return migration
+
+
+def from_settings() -> EntityMigrationWorker:
+    """Worker configured from ENTITY_MIGRATION_* settings"""
+    settings = get_settings()
+    return EntityMigrationWorker(
+        threads=settings.ENTITY_MIGRATION_WORKERS or 1,
+        poll_interval_seconds=settings.ENTITY_MIGRATION_POLL_SECONDS,
+        stale_after_seconds=settings.ENTITY_MIGRATION_STALE_SECONDS,
+    )
+
+
+def main() -> None:  # pragma: no cover
+    """Entry point for standalone-process mode."""
+    logging.basicConfig(
+        level=os.environ.get("LOG_LEVEL", "INFO"),
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    from_settings().run()
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
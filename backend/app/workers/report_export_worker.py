@@ -0,0 +1,178 @@
+"""Report export worker.
+
+Runs background report exports queued by ``ReportExportJobService.submit``
+(``report_executions`` rows in ``pending`` state with a ``dedup_key``). Each
+worker thread claims one job at a time with ``FOR UPDATE SKIP LOCKED``, so
+any number of threads and processes can share the queue.
+
+A running job refreshes ``heartbeat_at`` while rows flow; jobs whose
+heartbeat is older than ``REPORT_EXPORT_STALE_SECONDS`` (worker crashed or
+was restarted) are put back to ``pending`` and exported again.
+
+Placement mirrors the other workers (ADR-002):
+- ``REPORT_EXPORT_WORKERS > 0`` → that many threads started in the lifespan
+  (woken immediately when this process queues a job, otherwise polling)
+- ``REPORT_EXPORT_WORKERS=0`` → standalone process via
+  ``python -m app.workers.report_export_worker``
+"""
+
+import logging
+import os
+import signal
+import threading
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.core.db import SessionLocal
+from app.models.report import ReportExecution
+
+logger = logging.getLogger(__name__)
+
+# Set by ReportExportJobService.submit so idle threads in this process start at once
+_job_queued = threading.Event()
+
+
+def notify_job_queued() -> None:
+    """Wake idle export threads in this process."""
+    _job_queued.set()
+
+
+class ReportExportWorker:
+    """Pool of threads exporting queued reports.
+
+    State transitions per job:
+        pending -> running -> completed
+        pending -> running -> failed                   (error recorded on the row)
+        running (stale heartbeat) -> pending           (reclaimed, exported again)
+    """
+
+    def __init__(self, threads: int = 2, poll_interval_seconds: float = 5.0, stale_after_seconds: int = 600):
+        self.threads = max(threads, 1)
+        self.poll_interval_seconds = poll_interval_seconds
+        self.stale_after_seconds = stale_after_seconds
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    # ----- lifecycle ------------------------------------------------------
+
+    def start(self) -> None:
+        """Start the worker threads (daemon)."""
+        self._stop.clear()
+        for i in range(self.threads):
+            thread = threading.Thread(target=self._loop, name=f"report-export-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info("report-export-worker started %s threads (poll=%ss)", self.threads, self.poll_interval_seconds)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop after the exports in progress finish (or ``timeout`` per thread elapses)."""
+        self._stop.set()
+        _job_queued.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        logger.info("report-export-worker stopped")
+
+    def run(self, setup_signals: bool = True) -> None:
+        """Standalone mode: start the threads and block until SIGTERM/SIGINT."""
+        if setup_signals:
+            signal.signal(signal.SIGTERM, self._handle_signal)
+            signal.signal(signal.SIGINT, self._handle_signal)
+        self.start()
+        self._stop.wait()
+        self.stop()
+
+    def _handle_signal(self, signum, _frame) -> None:
+        logger.info("report-export-worker received signal %s; stopping", signum)
+        self._stop.set()
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            _job_queued.clear()
+            try:
+                processed = self._tick()
+            except Exception as exc:  # pragma: no cover - top-level safety net
+                logger.exception("report-export-worker tick failed: %s", exc)
+                processed = 0
+            if processed == 0:
+                _job_queued.wait(self.poll_interval_seconds)
+
+    # ----- polling tick --------------------------------------------------
+
+    def _tick(self) -> int:
+        """Export at most one job. Returns the number of jobs handled."""
+        db: Session = SessionLocal()
+        try:
+            self._reclaim_stale(db)
+            job = self._claim_next(db)
+            if job is None:
+                return 0
+            from app.services.report_export_jobs import ReportExportJobService
+
+            try:
+                ReportExportJobService.run_export(db, job)
+            except Exception as exc:
+                logger.error("Report export %s failed: %s", job.id, exc)
+            return 1
+        finally:
+            db.close()
+
+    def _reclaim_stale(self, db: Session) -> int:
+        """Put ``running`` jobs whose worker stopped heart-beating back to ``pending``."""
+        cutoff = datetime.utcnow() - timedelta(seconds=self.stale_after_seconds)
+        reclaimed = (
+            db.query(ReportExecution)
+            .filter(
+                ReportExecution.dedup_key.isnot(None),
+                ReportExecution.status == "running",
+                ReportExecution.heartbeat_at < cutoff,
+            )
+            .update({ReportExecution.status: "pending", ReportExecution.progress_rows: 0}, synchronize_session=False)
+        )
+        if reclaimed:
+            db.commit()
+            logger.warning("Reclaimed %s stale report export jobs", reclaimed)
+        return reclaimed
+
+    def _claim_next(self, db: Session) -> Optional[ReportExecution]:
+        job = (
+            db.query(ReportExecution)
+            .filter(ReportExecution.dedup_key.isnot(None), ReportExecution.status == "pending")
+            .order_by(ReportExecution.executed_at.asc())
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .first()
+        )
+        if job is None:
+            db.rollback()
+            return None
+        job.status = "running"
+        job.heartbeat_at = datetime.utcnow()
+        db.commit()
+        return job
+
+
+def from_settings() -> ReportExportWorker:
+    """Worker configured from REPORT_EXPORT_* settings"""
+    settings = get_settings()
+    return ReportExportWorker(
+        threads=settings.REPORT_EXPORT_WORKERS or 1,
+        poll_interval_seconds=settings.REPORT_EXPORT_POLL_SECONDS,
+        stale_after_seconds=settings.REPORT_EXPORT_STALE_SECONDS,
+    )
+
+
+def main() -> None:  # pragma: no cover
+    """Entry point for standalone-process mode."""
+    logging.basicConfig(
+        level=os.environ.get("LOG_LEVEL", "INFO"),
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    from_settings().run()
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -0,0 +1,167 @@
+"""Unit tests for the batched audit pipeline behind create_audit_log.
+
+Covers batching into one INSERT, spilling to disk when the database rejects a
+batch and replaying the spill file afterwards, the synchronous path for
+critical actions, and that create_audit_log no longer commits a clean session
+but still commits callers' pending changes.
+
+Runs on a file-backed SQLite database (the writer uses its own thread).
+"""
+
+import json
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core import audit
+from app.core.audit import create_audit_log
+from app.core.audit_writer import AuditWriter
+from app.models.audit import AuditLog
+from app.models.token_blacklist import TokenBlacklist
+
+pytestmark = pytest.mark.unit
+
+NOW = datetime(2026, 1, 1, 12, 0)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'audit.db'}")
+    AuditLog.__table__.create(engine)
+    TokenBlacklist.__table__.create(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def writer(tmp_path, monkeypatch):
+    writer = AuditWriter(batch_size=50, flush_interval_ms=20, spill_path=str(tmp_path / "spill.ndjson"))
+    monkeypatch.setattr(audit, "get_audit_writer", lambda: writer)
+    yield writer
+    writer.stop()
+
+
+@pytest.fixture
+def db(engine):
+    session = sessionmaker(bind=engine)()
+    session.commits = 0
+    event.listen(session, "after_commit", lambda s: setattr(s, "commits", s.commits + 1))
+    yield session
+    session.close()
+
+
+def _row_count(engine):
+    with engine.connect() as conn:
+        return conn.execute(select(func.count()).select_from(AuditLog)).scalar()
+
+
+def test_rows_are_written_in_batches_without_committing_caller(db, engine, writer):
+    inserts = []
+    event.listen(engine, "before_cursor_execute", lambda *a: inserts.append(a[2]) if "INSERT" in a[2] else None)
+
+    for i in range(20):
+        create_audit_log(db, action="record.update", entity_type="widget", changes={"i": i})
+
+    assert db.commits == 0
+    assert writer.flush()
+    assert _row_count(engine) == 20
+    assert len(inserts) < 20
+    assert writer.stats()["written"] == 20
+
+
+def test_pending_caller_changes_are_still_committed(db, engine, writer):
+    db.add(TokenBlacklist(jti="j1", user_id="u1", token_type="access", expires_at=NOW))
+
+    create_audit_log(db, action="logout")
+
+    assert db.commits == 1
+    with engine.connect() as conn:
+        assert conn.execute(select(func.count()).select_from(TokenBlacklist)).scalar() == 1
+
+
+def test_critical_actions_are_written_synchronously(db, engine, writer):
+    create_audit_log(db, action="change_password")
+    create_audit_log(db, action="record.update", sync=True)
+
+    assert db.commits == 2
+    assert _row_count(engine) == 2
+    assert writer.stats()["written"] == 0
+
+
+def test_failed_batch_spills_and_replays(tmp_path, engine, writer):
+    row = {"id": "550e8400-e29b-41d4-a716-446655440001", "action": "x", "status": "success", "created_at": NOW}
+    broken = create_engine(f"sqlite:///{tmp_path / 'missing.db'}")  # no audit_logs table
+
+    writer.submit(dict(row), bind=broken)
+    assert writer.flush()
+
+    spill = tmp_path / "spill.ndjson"
+    assert json.loads(spill.read_text().splitlines()[0])["action"] == "x"
+    assert writer.stats()["spilled"] == 1
+
+    writer._insert = lambda bind, rows, _insert=writer._insert: _insert(engine, rows)
+    writer._replay_spill()
+
+    assert _row_count(engine) == 1
+    assert not spill.exists()
+
+
+def test_invalid_spilled_row_is_rejected_not_retried_forever(tmp_path, engine, writer):
+    good = {"id": "550e8400-e29b-41d4-a716-446655440002", "action": "ok", "status": "success", "created_at": NOW}
+    bad = {"id": "550e8400-e29b-41d4-a716-446655440003", "action": None, "status": "success", "created_at": NOW}
+    writer._spill([good, bad])
+
+    writer._insert = lambda bind, rows, _insert=writer._insert: _insert(engine, rows)
+    writer._replay_spill()
+
+    assert _row_count(engine) == 1
+    assert not (tmp_path / "spill.ndjson.replay").exists()
+    assert "550e8400-e29b-41d4-a716-446655440003" in (tmp_path / "spill.ndjson.rejected").read_text()
+
+
+def test_replay_is_left_to_the_process_holding_the_replay_lock(tmp_path, engine, writer):
+    fcntl = pytest.importorskip("fcntl")
+    row = {"id": "550e8400-e29b-41d4-a716-446655440004", "action": "x", "status": "success", "created_at": NOW}
+    writer._spill([row])
+    writer._insert = lambda bind, rows, _insert=writer._insert: _insert(engine, rows)
+    writer._flush_interval = 0.01
+
+    with open(tmp_path / "spill.ndjson.replay.lock", "a") as other_process:
+        fcntl.flock(other_process.fileno(), fcntl.LOCK_EX)
+        writer._replay_spill()
+        assert _row_count(engine) == 0
+
+    writer._replay_spill()
+    assert _row_count(engine) == 1
+
+
+def test_flusher_survives_a_failing_iteration(engine, writer):
+    row = {"id": "550e8400-e29b-41d4-a716-446655440005", "action": "x", "status": "success", "created_at": NOW}
+    writer._flush_interval = 0.01
+    next_batch = writer._next_batch
+    calls = []
+
+    def _failing_once():
+        calls.append(1)
+        if len(calls) == 1:
+            raise FileNotFoundError("spill.ndjson.replay")
+        return next_batch()
+
+    writer._next_batch = _failing_once
+    writer.submit(dict(row), bind=engine)
+
+    assert writer.flush()
+    assert _row_count(engine) == 1
+
+
+def test_full_queue_spills_instead_of_blocking(tmp_path):
+    writer = AuditWriter(max_queue_size=1, spill_path=str(tmp_path / "spill.ndjson"))
+    writer._ensure_started = lambda: None  # no flusher: the queue stays full
+
+    writer.submit({"action": "a"})
+    writer.submit({"action": "b"})
+
+    assert writer.stats()["queue_depth"] == 1
+    assert writer.stats()["spilled"] == 1
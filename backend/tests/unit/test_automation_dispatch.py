@@ -0,0 +1,200 @@
+"""Unit tests for indexed automation trigger dispatch and the automation worker.
+
+Covers that the trigger index compiles a tenant's rules once (tenant-scoped,
+soft-deleted and inactive rules excluded), that AutomationService rule
+changes invalidate it, and that queued executions are claimed, run, retried
+and reclaimed by AutomationWorker.
+
+Runs on in-memory SQLite.
+"""
+
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.automation_index import AutomationTriggerIndex, automation_trigger_index
+from app.models.automation import AutomationExecution, AutomationRule
+from app.models.user import User
+from app.services.automation_service import AutomationService
+from app.workers import automation_worker
+from app.workers.automation_worker import AutomationWorker
+
+pytestmark = pytest.mark.unit
+
+TENANT = uuid.uuid4()
+OTHER_TENANT = uuid.uuid4()
+
+
+@pytest.fixture
+def factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    for model in (User, AutomationRule, AutomationExecution):
+        model.__table__.create(engine)
+    factory = sessionmaker(bind=engine)
+    factory.statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: factory.statements.append(args[2]))
+    yield factory
+    automation_trigger_index.invalidate(broadcast=False)
+
+
+@pytest.fixture
+def db(factory):
+    session = factory()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def user(db):
+    user = User(email="auto@example.com", hashed_password="x", tenant_id=TENANT)
+    db.add(user)
+    db.commit()
+    return user
+
+
+def _rule(db, name, tenant_id=TENANT, entity="invoice", event_name="onCreate", **kwargs):
+    rule = AutomationRule(
+        name=name,
+        label=name,
+        tenant_id=tenant_id,
+        trigger_type="database",
+        trigger_config={"entity_name": entity, "event": event_name},
+        actions=[{"type": "log"}],
+        **kwargs,
+    )
+    db.add(rule)
+    db.commit()
+    return rule
+
+
+class TestTriggerIndex:
+    def test_rules_are_scoped_and_compiled_once(self, db, factory):
+        _rule(db, "own", execution_order=2)
+        _rule(db, "platform", tenant_id=None, execution_order=1)
+        _rule(db, "other-tenant", tenant_id=OTHER_TENANT)
+        _rule(db, "other-event", event_name="onDelete")
+        _rule(db, "inactive", is_active=False)
+        _rule(db, "deleted", is_deleted=True)
+        index = AutomationTriggerIndex()
+
+        rules = index.rules_for(db, TENANT, "invoice", "onCreate")
+        factory.statements.clear()
+
+        assert [r.name for r in rules] == ["platform", "own"]
+        assert [r.name for r in index.rules_for(db, TENANT, "invoice", "onDelete")] == ["other-event"]
+        assert index.rules_for(db, TENANT, "customer", "onCreate") == []
+        assert factory.statements == []
+
+    def test_service_changes_invalidate_tenant_index(self, db, user):
+        rule = _rule(db, "r1")
+        service = AutomationService(db, user)
+        assert len(automation_trigger_index.rules_for(db, TENANT, "invoice", "onCreate")) == 1
+
+        asyncio.run(service.toggle_rule(rule.id))
+        assert automation_trigger_index.rules_for(db, TENANT, "invoice", "onCreate") == []
+
+        asyncio.run(service.toggle_rule(rule.id))
+        asyncio.run(service.delete_rule(rule.id))
+        assert automation_trigger_index.rules_for(db, TENANT, "invoice", "onCreate") == []
+
+
+def _enqueue(db, user, rule, records=1):
+    rule_ref = SimpleNamespace(id=rule.id, tenant_id=rule.tenant_id)
+    contexts = [{"entity": "invoice", "record": {"n": i}} for i in range(records)]
+    return AutomationService(db, user).enqueue_executions([rule_ref], contexts)
+
+
+@pytest.fixture
+def worker(factory, monkeypatch):
+    monkeypatch.setattr(automation_worker, "SessionLocal", factory)
+    return AutomationWorker(batch_size=10)
+
+
+class TestAutomationWorker:
+    def test_queued_executions_run_to_completion(self, db, user, worker):
+        rule = _rule(db, "r1")
+        assert _enqueue(db, user, rule, records=3) == 3
+
+        assert worker._tick() == 3
+
+        db.expire_all()
+        executions = db.query(AutomationExecution).all()
+        assert {e.status for e in executions} == {"completed"}
+        assert all(e.completed_actions == 1 for e in executions)
+
+    def test_deactivated_rule_cancels_execution(self, db, user, worker):
+        rule = _rule(db, "r1")
+        _enqueue(db, user, rule)
+        rule.is_active = False
+        db.commit()
+
+        worker._tick()
+
+        db.expire_all()
+        assert db.query(AutomationExecution).one().status == "cancelled"
+
+    def test_failure_is_retried_then_dead_lettered(self, db, user, worker, monkeypatch):
+        rule = _rule(db, "r1", max_retries=1, retry_delay_seconds=0)
+        _enqueue(db, user, rule)
+
+        async def boom(self, execution):
+            raise RuntimeError("downstream unavailable")
+
+        monkeypatch.setattr(AutomationService, "run_queued_execution", boom)
+
+        worker._tick()
+        db.expire_all()
+        execution = db.query(AutomationExecution).one()
+        assert (execution.status, execution.retry_count) == ("failed", 1)
+        assert execution.next_retry_at is not None
+
+        worker._tick()  # retry is due immediately
+        db.expire_all()
+        execution = db.query(AutomationExecution).one()
+        assert (execution.status, execution.retry_count, execution.next_retry_at) == ("failed", 2, None)
+        assert worker._tick() == 0
+
+    def test_failing_action_fails_the_execution_for_retry(self, db, user, worker, monkeypatch):
+        rule = _rule(db, "r1", max_retries=1, retry_delay_seconds=0)
+        _enqueue(db, user, rule)
+
+        attempts = []
+
+        async def flaky_action(self, action, context_data):
+            attempts.append(action)
+            if len(attempts) == 1:
+                raise RuntimeError("webhook returned 503")
+            return {"success": True}
+
+        monkeypatch.setattr(AutomationService, "_execute_action", flaky_action)
+
+        worker._tick()
+        db.expire_all()
+        execution = db.query(AutomationExecution).one()
+        assert (execution.status, execution.retry_count) == ("failed", 1)
+        assert "webhook returned 503" in execution.error_message
+        assert execution.next_retry_at is not None
+
+        worker._tick()  # retry is due immediately
+        db.expire_all()
+        execution = db.query(AutomationExecution).one()
+        assert (execution.status, execution.completed_actions, execution.failed_actions) == ("completed", 1, 0)
+
+    def test_stuck_running_rows_are_reclaimed(self, db, user, worker):
+        rule = _rule(db, "r1")
+        _enqueue(db, user, rule)
+        execution = db.query(AutomationExecution).one()
+        execution.status = "running"
+        execution.started_at = datetime.utcnow() - timedelta(hours=1)
+        db.commit()
+
+        assert worker._tick() == 1
+
+        db.expire_all()
+        assert db.query(AutomationExecution).one().status == "completed"
@@ -0,0 +1,149 @@
+"""Unit tests for batched dashboard page renders.
+
+Covers one report execution per distinct (report, parameters) key, shaping
+results per widget type, per-widget parameter overrides, error isolation
+between widgets and page selection. Runs on a file-backed SQLite database.
+"""
+
+import uuid
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.models.dashboard import Dashboard, DashboardPage, DashboardWidget
+from app.models.report import ReportDefinition
+from app.services.dashboard_service import DashboardService
+from app.services.report_service import ReportService
+
+pytestmark = pytest.mark.unit
+
+TENANT_ID = uuid.uuid4()
+USER_ID = uuid.uuid4()
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'dashboards.db'}")
+    for model in (ReportDefinition, Dashboard, DashboardPage, DashboardWidget):
+        model.__table__.create(engine)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE sales (id INTEGER PRIMARY KEY, tenant_id TEXT, region TEXT, amount INTEGER)"))
+        conn.execute(
+            text("INSERT INTO sales (tenant_id, region, amount) VALUES (:t, :r, :a)"),
+            [{"t": str(TENANT_ID), "r": r, "a": a} for r, a in [("north", 10), ("south", 20), ("north", 5)]],
+        )
+    # information_schema lookup is PostgreSQL-specific
+    monkeypatch.setattr(
+        ReportService, "_get_table_columns", staticmethod(lambda db, table: {"id", "tenant_id", "region", "amount"})
+    )
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def _report(db, **query_config):
+    report = ReportDefinition(
+        id=uuid.uuid4(),
+        tenant_id=TENANT_ID,
+        name="Sales by region",
+        base_entity="sales",
+        columns_config=[{"name": "region"}, {"name": "amount", "label": "total", "aggregation": "sum"}],
+        query_config={"group_by": ["region"], "order_by": [{"field": "region", "direction": "asc"}], **query_config},
+        created_by=USER_ID,
+        is_active=True,
+    )
+    db.add(report)
+    return report
+
+
+@pytest.fixture
+def page(db):
+    dashboard = Dashboard(id=uuid.uuid4(), tenant_id=TENANT_ID, name="Sales", created_by=USER_ID, is_active=True)
+    page = DashboardPage(id=uuid.uuid4(), dashboard_id=dashboard.id, tenant_id=TENANT_ID, name="Overview", order=0)
+    db.add_all([dashboard, page])
+    db.commit()
+    return page
+
+
+def _widget(db, page, widget_type, report=None, order=0, **config):
+    widget = DashboardWidget(
+        id=uuid.uuid4(),
+        page_id=page.id,
+        tenant_id=TENANT_ID,
+        title=widget_type,
+        widget_type=widget_type,
+        report_definition_id=report.id if report else None,
+        position={"x": 0, "y": 0, "w": 4, "h": 4},
+        order=order,
+        **config,
+    )
+    db.add(widget)
+    return widget
+
+
+def _render(db, page, **kwargs):
+    results = DashboardService.render_page(db, TENANT_ID, USER_ID, page.dashboard_id, use_cache=False, **kwargs)
+    return {result["widget_id"]: result for result in results}
+
+
+def test_widgets_sharing_a_report_run_it_once(db, page, monkeypatch):
+    report = _report(db)
+    table = _widget(db, page, "report_table", report)
+    chart = _widget(db, page, "chart", report, chart_config={"x_axis": "region", "y_axis": ["total"]})
+    kpi = _widget(db, page, "kpi_card", report, widget_config={"value_field": "total", "label": "Sales"})
+    note = _widget(db, page, "text", widget_config={"html": "<b>Q1</b>"})
+    db.commit()
+
+    calls = []
+    original = ReportService.get_report_results
+
+    def _counting(*args, **kwargs):
+        calls.append(args[3])
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(ReportService, "get_report_results", staticmethod(_counting))
+
+    results = _render(db, page)
+
+    assert len(calls) == 1
+    assert results[table.id]["data"] == [{"region": "north", "total": 15}, {"region": "south", "total": 20}]
+    assert results[chart.id]["data"] == {"labels": ["north", "south"], "datasets": [{"label": "total", "data": [15, 20]}]}
+    assert results[kpi.id]["data"] == {"value": 35, "label": "Sales", "format": "number"}
+    assert results[note.id]["data"] == {"html": "<b>Q1</b>"}
+    assert all(result["error"] is None for result in results.values())
+
+
+def test_widget_parameters_split_queries(db, page):
+    report = _report(db, filters={"conditions": [{"field": "region", "operator": "eq", "parameter": "region"}]})
+    north = _widget(db, page, "report_table", report)
+    south = _widget(db, page, "report_table", report, order=1)
+    db.commit()
+
+    results = _render(db, page, parameters={"region": "north"}, widget_parameters={south.id: {"region": "south"}})
+
+    assert results[north.id]["data"] == [{"region": "north", "total": 15}]
+    assert results[south.id]["data"] == [{"region": "south", "total": 20}]
+
+
+def test_failing_report_only_fails_its_widgets(db, page):
+    good = _widget(db, page, "report_table", _report(db))
+    bad_report = _report(db)
+    bad_report.columns_config = [{"name": "password"}]
+    bad = _widget(db, page, "report_table", bad_report)
+    missing = _widget(db, page, "chart")
+    missing.report_definition_id = uuid.uuid4()
+    db.commit()
+
+    results = _render(db, page)
+
+    assert results[good.id]["error"] is None
+    assert "password" in results[bad.id]["error"]
+    assert results[missing.id]["error"] == "Report definition not found or access denied"
+
+
+def test_unknown_dashboard_or_page_is_rejected(db, page):
+    with pytest.raises(ValueError):
+        DashboardService.render_page(db, TENANT_ID, USER_ID, uuid.uuid4())
+    with pytest.raises(ValueError):
+        DashboardService.render_page(db, TENANT_ID, USER_ID, page.dashboard_id, page_id=uuid.uuid4())
@@ -0,0 +1,101 @@
+"""Unit tests for engine construction in app.core.db.
+
+Covers that the DB_* pool settings reach file-backed engines (in-memory
+SQLite keeps its default pool), that unconfigured roles fall back to the
+primary session factory, async URL derivation, and the checkout-wait and
+saturation reporting.
+"""
+
+import pytest
+from sqlalchemy import text
+
+from app.core import db as db_module
+from app.core.db import (
+    PRIMARY_ROLE,
+    InstrumentedQueuePool,
+    SessionLocal,
+    async_database_url,
+    create_db_engine,
+    get_sessionmaker,
+    pool_status,
+)
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def file_engine(tmp_path, monkeypatch):
+    monkeypatch.setattr(db_module.settings, "DB_POOL_SIZE", 2)
+    monkeypatch.setattr(db_module.settings, "DB_MAX_OVERFLOW", 1)
+    monkeypatch.setattr(db_module.settings, "DB_POOL_TIMEOUT", 5)
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'pool.db'}", role="test")
+    yield engine
+    engine.dispose()
+
+
+def test_pool_settings_applied_to_file_engine(file_engine):
+    pool = file_engine.pool
+
+    assert isinstance(pool, InstrumentedQueuePool)
+    assert (pool.size(), pool._max_overflow, pool._timeout) == (2, 1, 5)
+    assert pool.metrics_label == "test"
+
+
+def test_memory_sqlite_keeps_default_pool():
+    engine = create_db_engine("sqlite://")
+
+    assert not isinstance(engine.pool, InstrumentedQueuePool)
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT 1")).scalar() == 1
+
+
+def test_checkout_wait_and_saturation_are_reported(file_engine):
+    if db_module._CHECKOUT_WAIT is None:
+        pytest.skip("prometheus-client not installed")
+    waits = db_module._CHECKOUT_WAIT.labels("test")
+    before = waits._sum.get()
+
+    with file_engine.connect(), file_engine.connect():
+        assert db_module._CHECKED_OUT.labels("test")._value.get() == 2
+        assert db_module._SATURATION.labels("test")._value.get() == pytest.approx(2 / 3)
+
+    assert waits._sum.get() >= before
+    assert db_module._CHECKED_OUT.labels("test")._value.get() == 0
+
+
+def test_unconfigured_role_uses_primary(monkeypatch):
+    monkeypatch.setattr(db_module.settings, "DB_ROLE_URLS", "")
+
+    assert get_sessionmaker("read") is SessionLocal
+    assert get_sessionmaker(PRIMARY_ROLE) is SessionLocal
+
+
+def test_configured_role_gets_own_engine(tmp_path, monkeypatch):
+    monkeypatch.setattr(db_module.settings, "DB_ROLE_URLS", f"reporting=sqlite:///{tmp_path / 'replica.db'}")
+    monkeypatch.setattr(db_module, "_role_sessionmakers", {PRIMARY_ROLE: SessionLocal})
+
+    factory = get_sessionmaker("reporting")
+
+    assert factory is not SessionLocal
+    assert get_sessionmaker("reporting") is factory
+    assert "reporting" in pool_status()
+    factory.kw["bind"].dispose()
+
+
+def test_role_urls_parsing(monkeypatch):
+    monkeypatch.setattr(db_module.settings, "DB_ROLE_URLS", " read = sqlite:///a.db , bogus, reporting=sqlite:///b.db")
+
+    assert db_module.settings.db_role_urls == {"read": "sqlite:///a.db", "reporting": "sqlite:///b.db"}
+
+
+@pytest.mark.parametrize(
+    "url,expected",
+    [
+        ("postgresql+psycopg2://u:p@h:5432/db", "postgresql+asyncpg://u:p@h:5432/db"),
+        ("postgresql://u:p@h/db", "postgresql+asyncpg://u:p@h/db"),
+        ("mysql+pymysql://u:p@h/db", "mysql+aiomysql://u:p@h/db"),
+        ("sqlite:///./app.db", "sqlite+aiosqlite:///./app.db"),
+    ],
+)
+def test_async_database_url(url, expected):
+    assert async_database_url(url) == expected
@@ -0,0 +1,162 @@
+"""Unit tests for the set-based bulk paths of DynamicEntityService.
+
+Covers what makes a batched import safe: rows are validated up front with a
+per-index error report, a failing row does not take the rest of its batch
+down, audit entries are written in bulk, automation rules are looked up once
+per call, and streamed (async) input is consumed batch by batch.
+
+Uses an in-memory SQLite session and a stub model generator, so no live stack
+is needed.
+"""
+import uuid
+
+import pytest
+from sqlalchemy import Column, DateTime, Integer, String, UniqueConstraint, Uuid, create_engine
+from sqlalchemy.orm import declarative_base, sessionmaker
+
+from app.models.audit import AuditLog
+from app.services.dynamic_entity_service import DynamicEntityService
+
+pytestmark = pytest.mark.unit
+
+_Base = declarative_base()
+
+
+class _Widget(_Base):
+    """Shape of a runtime-generated nocode model (system id + audit columns)."""
+
+    __tablename__ = "widgets"
+    __table_args__ = (UniqueConstraint("name"),)
+
+    id = Column(Uuid, primary_key=True, default=uuid.uuid4)
+    name = Column(String(100), nullable=False)
+    quantity = Column(Integer)
+    created_at = Column(DateTime)
+    created_by = Column(String(36))
+    updated_at = Column(DateTime)
+    updated_by = Column(String(36))
+    deleted_at = Column(DateTime)
+    deleted_by = Column(String(36))
+
+
+FIELD_DEFS = [
+    {"name": "name", "field_type": "string", "label": "Name", "is_required": True},
+    {"name": "quantity", "field_type": "integer", "label": "Quantity", "is_required": False},
+]
+
+
+class _StubGenerator:
+    def get_model(self, entity_name, tenant_id=None):
+        return _Widget
+
+    def get_field_definitions(self, entity_name, tenant_id=None):
+        return FIELD_DEFS
+
+    def get_entity_definition(self, entity_name, tenant_id=None):
+        return None
+
+
+class _User:
+    def __init__(self):
+        self.id = uuid.uuid4()
+        self.tenant_id = None
+        self.email = "bulk@example.com"
+        self.is_superuser = True
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    _Base.metadata.create_all(engine)
+    AuditLog.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def service(db, monkeypatch):
+    svc = DynamicEntityService(db, _User())
+    svc.model_generator = _StubGenerator()
+    svc.rule_lookups = 0
+
+    def _rules(entity_name, event):
+        svc.rule_lookups += 1
+        return []
+
+    monkeypatch.setattr(svc, "_get_automation_rules", _rules)
+    return svc
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_reports_invalid_rows_by_index(service, db):
+    records = [{"name": "a", "quantity": 1}, {"quantity": 2}, {"name": "b"}, "not-an-object", {"name": "c"}]
+
+    result = await service.bulk_create("widget", records, batch_size=2)
+
+    assert result["created"] == 3
+    assert result["failed"] == 2
+    assert sorted(e["index"] for e in result["errors"]) == [1, 3]
+    assert len(result["ids"]) == 3
+    assert db.query(_Widget).count() == 3
+    assert db.query(AuditLog).filter(AuditLog.action == "CREATE").count() == 3
+    assert service.rule_lookups == 1
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_isolates_constraint_violations(service, db):
+    result = await service.bulk_create("widget", [{"name": "dup"}, {"name": "ok"}, {"name": "dup"}])
+
+    assert result["created"] == 2
+    assert [e["index"] for e in result["errors"]] == [2]
+    assert result["errors"][0]["error"].startswith("Failed to create record")
+    assert {w.name for w in db.query(_Widget).all()} == {"dup", "ok"}
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_consumes_async_stream(service, db):
+    async def stream():
+        yield {"name": "s1"}
+        yield ValueError("Invalid JSON line: Expecting value")
+        yield {"name": "s2"}
+
+    result = await service.bulk_create("widget", stream(), batch_size=1)
+
+    assert result["created"] == 2
+    assert result["errors"] == [{"index": 1, "data": None, "error": "Invalid JSON line: Expecting value"}]
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_writes_changes_and_reports_missing(service, db):
+    created = await service.bulk_create("widget", [{"name": "x", "quantity": 1}, {"name": "y", "quantity": 1}])
+    x_id, y_id = created["ids"]
+
+    result = await service.bulk_update(
+        "widget",
+        [
+            {"id": x_id, "quantity": 5},
+            {"quantity": 9},
+            {"id": str(uuid.uuid4()), "quantity": 9},
+            {"id": y_id.upper(), "quantity": 7},
+            {"id": x_id, "quantity": 6},
+        ],
+    )
+
+    assert result["updated"] == 3
+    assert sorted(e["index"] for e in result["errors"]) == [1, 2]
+    quantities = {w.name: w.quantity for w in db.query(_Widget).all()}
+    assert quantities == {"x": 6, "y": 7}
+    assert db.query(AuditLog).filter(AuditLog.action == "UPDATE").count() == 2
+
+
+@pytest.mark.asyncio
+async def test_bulk_delete_soft_deletes_in_one_pass(service, db):
+    created = await service.bulk_create("widget", [{"name": "d1"}, {"name": "d2"}, {"name": "keep"}])
+    d1, d2, _ = created["ids"]
+
+    result = await service.bulk_delete("widget", [d1, d2, str(uuid.uuid4())])
+
+    assert result["deleted"] == 2
+    assert [e["index"] for e in result["errors"]] == [2]
+    deleted = {w.name for w in db.query(_Widget).filter(_Widget.deleted_at.isnot(None)).all()}
+    assert deleted == {"d1", "d2"}
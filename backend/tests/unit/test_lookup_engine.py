@@ -0,0 +1,239 @@
+"""Unit tests for entity-backed lookups.
+
+Covers prefix and substring typeahead pushed down to SQL with LIMIT, escaping
+of LIKE wildcards, cascading filters on the parent value, tenant scoping and
+soft deletes, small lookups answered from the in-memory option cache until
+the entity's data changes, and the cache's "too large" markers.
+
+Uses an in-memory SQLite session and a stub model generator, so no live stack
+is needed.
+"""
+
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy import Column, DateTime, String, Uuid, create_engine, event
+from sqlalchemy.orm import declarative_base, sessionmaker
+
+from app.core.lookup_options import LookupOptionCache
+from app.models.data_model import EntityDefinition
+from app.models.lookup import CascadingLookupRule, LookupConfiguration
+from app.services.lookup_engine import EntityLookupEngine
+
+pytestmark = pytest.mark.unit
+
+TENANT_ID = uuid.uuid4()
+OTHER_TENANT_ID = uuid.uuid4()
+
+_Base = declarative_base()
+
+
+class _City(_Base):
+    """Shape of a runtime-generated, tenant-scoped nocode model."""
+
+    __tablename__ = "cities"
+    __entity_definition__ = {"data_scope": "tenant"}
+
+    id = Column(Uuid, primary_key=True, default=uuid.uuid4)
+    tenant_id = Column(String(36))
+    name = Column(String(100))
+    code = Column(String(10))
+    country = Column(String(2))
+    deleted_at = Column(DateTime)
+
+
+CITIES = [
+    ("Berlin", "BER", "DE"),
+    ("Bern", "BRN", "CH"),
+    ("Bergamo", "BGY", "IT"),
+    ("Hamburg", "HAM", "DE"),
+    ("Basel", "BSL", "CH"),
+    ("b_rno", "BRQ", "CZ"),
+]
+
+
+class _StubGenerator:
+    def get_model(self, entity_name, tenant_id=None):
+        return _City
+
+
+class _User:
+    def __init__(self, tenant_id=TENANT_ID):
+        self.id = uuid.uuid4()
+        self.tenant_id = tenant_id
+        self.is_superuser = False
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    _Base.metadata.create_all(engine)
+    for model in (EntityDefinition, LookupConfiguration, CascadingLookupRule):
+        model.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    for name, code, country in CITIES:
+        session.add(_City(tenant_id=str(TENANT_ID), name=name, code=code, country=country))
+    session.add(_City(tenant_id=str(OTHER_TENANT_ID), name="Bergen", code="BGO", country="NO"))
+    session.add(_City(tenant_id=str(TENANT_ID), name="Bernau", code="BNU", country="DE", deleted_at=datetime.utcnow()))
+    session.commit()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def entity(db):
+    entity_def = EntityDefinition(id=uuid.uuid4(), tenant_id=TENANT_ID, name="city", label="City", table_name="cities")
+    db.add(entity_def)
+    db.commit()
+    return entity_def
+
+
+def _config(entity, **overrides):
+    values = dict(
+        id=uuid.uuid4(),
+        tenant_id=TENANT_ID,
+        name="cities",
+        label="Cities",
+        source_type="entity",
+        source_entity_id=entity.id,
+        value_field="code",
+        display_field="name",
+        additional_display_fields=["country"],
+        search_fields=["name", "code"],
+        default_sort_field="name",
+        default_sort_order="ASC",
+        default_filter={},
+        enable_search=True,
+        min_search_length=1,
+        enable_caching=False,
+        cache_ttl_seconds=3600,
+        dependency_mapping={},
+        meta_data={},
+        updated_at=datetime(2026, 1, 1),
+    )
+    values.update(overrides)
+    return LookupConfiguration(**values)
+
+
+def _engine(db, cache=None, user=None):
+    engine = EntityLookupEngine(db, user or _User(), cache=cache or LookupOptionCache(max_options=100))
+    engine.entities.model_generator = _StubGenerator()
+    return engine
+
+
+def _labels(result):
+    return [item["label"] for item in result["items"]]
+
+
+def test_prefix_search_pages_in_sql(db, entity):
+    engine = _engine(db)
+    config = _config(entity)
+
+    first = engine.fetch(config, search="BER", page=1, page_size=2)
+    second = engine.fetch(config, search="BER", page=2, page_size=2)
+
+    assert _labels(first) == ["Bergamo", "Berlin"]
+    assert first["has_more"] is True and first["total_count"] == 3
+    assert first["items"][0] == {"value": "BGY", "label": "Bergamo", "additional_data": {"country": "IT"}}
+    assert _labels(second) == ["Bern"]
+    assert second["has_more"] is False and second["total_count"] == 3
+    # Search fields other than the label match too
+    assert _labels(engine.fetch(config, search="ham")) == ["Hamburg"]
+
+
+def test_like_wildcards_are_literal_and_contains_mode(db, entity):
+    engine = _engine(db)
+
+    assert _labels(engine.fetch(_config(entity), search="b_r")) == ["b_rno"]
+    assert _labels(engine.fetch(_config(entity), search="%")) == []
+
+    config = _config(entity, meta_data={"search_mode": "contains"})
+    assert _labels(engine.fetch(config, search="er")) == ["Bergamo", "Berlin", "Bern"]
+
+
+def test_short_search_terms_are_ignored(db, entity):
+    result = _engine(db).fetch(_config(entity, min_search_length=3), search="be")
+
+    assert result["total_count"] == len(CITIES)
+
+
+def test_parent_value_filters_in_sql(db, entity):
+    engine = _engine(db)
+
+    mapped = _config(entity, dependency_mapping={"filter_field": "country"})
+    assert _labels(engine.fetch(mapped, parent_value="CH")) == ["Basel", "Bern"]
+
+    ruled = _config(entity)
+    db.add(
+        CascadingLookupRule(
+            tenant_id=TENANT_ID,
+            name="country -> city",
+            parent_lookup_id=uuid.uuid4(),
+            child_lookup_id=ruled.id,
+            parent_field="code",
+            child_filter_field="country",
+            is_active=True,
+        )
+    )
+    db.commit()
+    assert _labels(engine.fetch(ruled, parent_value="DE")) == ["Berlin", "Hamburg"]
+
+
+def test_tenant_scope_and_soft_deletes(db, entity):
+    labels = _labels(_engine(db).fetch(_config(entity), search="ber"))
+
+    assert "Bergen" not in labels and "Bernau" not in labels
+
+
+def test_unknown_fields_are_rejected(db, entity):
+    with pytest.raises(ValueError):
+        _engine(db).fetch(_config(entity, display_field="password"))
+
+
+def test_small_lookups_are_served_from_memory_until_data_changes(db, entity):
+    cache = LookupOptionCache(max_options=100)
+    engine = _engine(db, cache)
+    config = _config(entity, enable_caching=True)
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    assert engine.fetch(config)["total_count"] == len(CITIES)
+    loads = sum("FROM cities" in sql for sql in statements)
+    assert _labels(engine.fetch(config, search="ber", page_size=2)) == ["Bergamo", "Berlin"]
+    assert engine.fetch(config, page=2, page_size=4)["has_more"] is False
+    assert sum("FROM cities" in sql for sql in statements) == loads == 1
+
+    db.add(_City(tenant_id=str(TENANT_ID), name="Berchtesgaden", code="BGD", country="DE"))
+    db.commit()
+    # A write from another tenant leaves this tenant's list alone
+    cache.entity_changed(OTHER_TENANT_ID, "city")
+    assert engine.fetch(config)["total_count"] == len(CITIES)
+
+    cache.entity_changed(TENANT_ID, "city")
+    assert engine.fetch(config, search="berc")["items"][0]["label"] == "Berchtesgaden"
+
+
+def test_large_lookups_fall_back_to_sql(db, entity):
+    cache = LookupOptionCache(max_options=3)
+    engine = _engine(db, cache)
+    config = _config(entity, enable_caching=True)
+
+    result = engine.fetch(config, page_size=2)
+
+    assert _labels(result) == ["Basel", "Bergamo"]
+    assert result["has_more"] is True and result["total_count"] == len(CITIES)
+    assert cache.get_stats()["too_large"] == 1
+    # Too-large markers survive data changes
+    cache.entity_changed(TENANT_ID, "city")
+    assert cache.get_stats()["too_large"] == 1
+
+
+def test_lists_loaded_across_a_data_change_are_not_stored():
+    cache = LookupOptionCache()
+    generation = cache.generation
+
+    cache.entity_changed("t1", "city", broadcast=False)
+    cache.set(("lookup",), "t1", "city", [], ttl_seconds=60, generation=generation)
+
+    assert cache.get(("lookup",)) == (False, None)
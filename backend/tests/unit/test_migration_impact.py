@@ -0,0 +1,121 @@
+"""Unit tests for migration impact estimation.
+
+Covers per-change lock and rewrite costing (type changes rewrite, nullable
+adds are catalog-only, constrained adds validate and backfill online), risk
+levels derived from catalog statistics, and that no table scan runs. Catalog
+statistics are stubbed, so no PostgreSQL is needed.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.services import migration_impact
+from app.services.migration_impact import estimate_change_costs, estimate_impact, get_table_stats
+
+pytestmark = pytest.mark.unit
+
+GB = 1024**3
+
+STATS = {
+    "estimated_rows": 10_000_000,
+    "dead_rows": 0,
+    "table_bytes": 2 * GB,
+    "index_bytes": GB,
+    "total_bytes": 3 * GB,
+    "last_analyzed": None,
+    "statistics_source": "pg_class",
+    "statistics_stale": False,
+}
+
+
+def _field(name, **overrides):
+    values = dict(
+        name=name,
+        default_value=None,
+        reference_table=None,
+        is_required=False,
+        is_nullable=True,
+        is_unique=False,
+        is_calculated=False,
+        calculation_formula=None,
+    )
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+def _entity(*fields):
+    return SimpleNamespace(table_name="orders", fields=list(fields))
+
+
+def _alter(**changes):
+    return {"operation": "ALTER", "table_name": "orders", "changes": changes}
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def test_nullable_column_add_is_catalog_only():
+    (cost,) = estimate_change_costs({"added_columns": ["note"]}, {"note": _field("note")}, STATS)
+
+    assert cost["operations"] == ["add_column"]
+    assert cost["rewrite"] is False
+    assert cost["estimated_seconds"] == 0 and cost["estimated_blocking_seconds"] == 0
+
+
+def test_constrained_column_add_validates_and_backfills_without_blocking():
+    field = _field("status", default_value="new", is_nullable=False, is_unique=True)
+
+    (cost,) = estimate_change_costs({"added_columns": ["status"]}, {"status": field}, STATS)
+
+    assert cost["operations"] == ["add_column", "backfill", "validate_not_null", "build_index_concurrently"]
+    assert cost["rewrite"] is False and cost["estimated_blocking_seconds"] == 0
+    assert cost["estimated_seconds"] > 500
+
+
+def test_type_change_rewrites_under_exclusive_lock():
+    changes = {"modified_columns": [{"name": "qty", "from_type": "integer", "to_type": "BIGINT"}]}
+
+    (cost,) = estimate_change_costs(changes, {}, STATS)
+
+    assert cost["lock"] == "ACCESS EXCLUSIVE" and cost["rewrite"] is True
+    assert cost["estimated_blocking_seconds"] == pytest.approx(3 * GB / migration_impact.REWRITE_BYTES_PER_SECOND, 0.01)
+
+
+def test_risk_levels_follow_catalog_statistics(db, monkeypatch):
+    monkeypatch.setattr(migration_impact, "get_table_stats", lambda db, table_name: dict(STATS))
+    type_change = _alter(modified_columns=[{"name": "qty", "from_type": "integer", "to_type": "BIGINT"}])
+
+    rewrite = estimate_impact(db, _entity(), type_change)
+    assert rewrite["risk_level"] == "high" and rewrite["requires_rewrite"] is True
+    assert rewrite["affected_records"] == 10_000_000
+    assert any("rewrites the table" in warning for warning in rewrite["warnings"])
+
+    nullable = estimate_impact(db, _entity(_field("note")), _alter(added_columns=["note"]))
+    assert nullable["risk_level"] == "low" and nullable["warnings"] == []
+
+    index = estimate_impact(db, _entity(), _alter(added_indexes=["ix_orders_status"]))
+    assert index["risk_level"] == "low" and index["estimated_blocking_seconds"] == 0
+
+    dropped = estimate_impact(db, _entity(), _alter(removed_columns=["legacy"]))
+    assert dropped["risk_level"] == "high" and dropped["breaking_changes"] == ["Dropping columns: legacy"]
+
+
+def test_new_tables_and_missing_statistics_do_not_scan(db):
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    created = estimate_impact(db, _entity(), {"operation": "CREATE", "table_name": "orders", "changes": {}})
+    altered = estimate_impact(db, _entity(_field("note")), _alter(added_columns=["note"]))
+
+    assert created["risk_level"] == "low" and created["affected_records"] == 0
+    assert altered["affected_records"] == 0 and altered["table_stats"]["statistics_source"] == "none"
+    assert get_table_stats(db, "orders") is None
+    assert statements == []
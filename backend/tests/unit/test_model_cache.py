@@ -0,0 +1,139 @@
+"""Unit tests for the generation-keyed runtime model cache.
+
+Covers LRU bounds, per-tenant / per-entity invalidation through the indexes,
+remote (pub/sub) invalidation messages, and that ``RuntimeModelGenerator``
+serves a hit without touching the database while a committed generation bump
+forces a rebuild.
+
+Runs on in-memory SQLite.
+"""
+
+import json
+import uuid
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.core.model_cache import ModelCache, bump_generation, get_model_cache
+from app.models.data_model import EntityDefinition
+from app.services.runtime_model_generator import RuntimeModelGenerator
+
+pytestmark = pytest.mark.unit
+
+
+class TestModelCache:
+    def test_lru_bound_evicts_least_recently_used(self):
+        cache = ModelCache(max_entries=2)
+        cache.set("t1", "a", 1, "A")
+        cache.set("t1", "b", 1, "B")
+        cache.get("t1", "a")
+        cache.set("t1", "c", 1, "C")
+
+        assert cache.get("t1", "b") is None
+        assert cache.get("t1", "a") == "A"
+        assert cache.get_stats()["total_entries"] == 2
+
+    def test_newer_generation_replaces_older(self):
+        cache = ModelCache()
+        cache.set("t1", "a", 1, "A1")
+        cache.set("t1", "a", 2, "A2")
+
+        assert cache.get("t1", "a") == "A2"
+        assert cache.get("t1", "a", generation=1) is None
+        assert cache.get_stats()["total_entries"] == 1
+
+    def test_invalidate_by_tenant_and_by_entity(self):
+        cache = ModelCache()
+        for tenant in ("t1", "t2"):
+            for entity in ("a", "b"):
+                cache.set(tenant, entity, 1, f"{tenant}-{entity}")
+
+        cache.invalidate(tenant_id="t1")
+        assert cache.get("t1", "a") is None and cache.get("t1", "b") is None
+        assert cache.get("t2", "a") == "t2-a"
+
+        cache.invalidate(entity_name="a")
+        assert cache.get("t2", "a") is None
+        assert cache.get("t2", "b") == "t2-b"
+        assert cache.get_stats()["tenants"] == {"t2": 1}
+
+    def test_remote_invalidation_message(self):
+        cache = ModelCache()
+        cache.set("t1", "a", 1, "A")
+        cache.set("t2", "a", 1, "A")
+
+        cache._on_remote_invalidation(json.dumps({"tenant_id": "t1", "entity_name": "a"}))
+
+        assert cache.get("t1", "a") is None
+        assert cache.get("t2", "a") == "A"
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    EntityDefinition.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    session.statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: session.statements.append(args[2]))
+    yield session
+    session.close()
+    get_model_cache().invalidate()
+
+
+@pytest.fixture
+def entity(db):
+    entity = EntityDefinition(
+        name="widget", label="Widget", table_name="widgets", status="published", tenant_id=uuid.uuid4()
+    )
+    db.add(entity)
+    db.commit()
+    return entity
+
+
+@pytest.fixture
+def generator(db, monkeypatch):
+    generator = RuntimeModelGenerator(db)
+    generator.built = 0
+
+    def _generate_model(entity_def, entity_dict):
+        generator.built += 1
+        return type(f"Widget{generator.built}", (), {})
+
+    monkeypatch.setattr(generator, "_generate_model", _generate_model)
+    monkeypatch.setattr(generator, "_entity_to_dict", lambda entity_def: {})
+    return generator
+
+
+def test_cache_hit_needs_no_database_round_trip(db, entity, generator):
+    tenant_id = str(entity.tenant_id)
+    model = generator.get_model("widget", tenant_id)
+    db.statements.clear()
+
+    assert RuntimeModelGenerator(db).get_model("widget", tenant_id) is model
+    assert db.statements == []
+
+
+def test_revalidation_confirms_generation_with_one_select(db, entity, generator, monkeypatch):
+    tenant_id = str(entity.tenant_id)
+    model = generator.get_model("widget", tenant_id)
+    monkeypatch.setattr(get_model_cache(), "_revalidate_seconds", 0)
+    db.statements.clear()
+
+    assert RuntimeModelGenerator(db).get_model("widget", tenant_id) is model
+    assert len(db.statements) == 1
+    assert "generation" in db.statements[0]
+
+
+def test_generation_bump_rebuilds_after_commit(db, entity, generator):
+    tenant_id = str(entity.tenant_id)
+    first = generator.get_model("widget", tenant_id)
+
+    bump_generation(db, entity)
+    assert generator.get_model("widget", tenant_id) is first  # not committed yet
+    db.commit()
+
+    generator._entity_def_cache.clear()
+    second = generator.get_model("widget", tenant_id)
+    assert second is not first
+    assert entity.generation == 2
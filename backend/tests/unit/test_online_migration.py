@@ -0,0 +1,166 @@
+"""Unit tests for online entity migrations.
+
+Covers planning MigrationGenerator scripts into online steps (concurrent
+index builds, nullable-first column adds with batched backfills and
+NOT VALID constraints), lock-timeout retries, and resuming a migration
+whose worker died mid-backfill from the progress stored on the row. Runs on
+a file-backed SQLite database.
+"""
+
+import uuid
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import sessionmaker
+
+from app.models.data_model import EntityMigration
+from app.services.online_migration import OnlineMigrationExecutor, plan_online_migration, split_statements
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrations.db'}")
+    EntityMigration.__table__.create(engine)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)"))
+        conn.execute(text("INSERT INTO items (name) VALUES (:n)"), [{"n": f"item {i}"} for i in range(7)])
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def _migration(db, up_script="", progress=None):
+    migration = EntityMigration(
+        id=uuid.uuid4(),
+        entity_id=uuid.uuid4(),
+        migration_name="items_v2",
+        migration_type="alter",
+        to_version=2,
+        up_script=up_script,
+        status="running",
+        progress=progress,
+    )
+    db.add(migration)
+    db.commit()
+    return migration
+
+
+class _LockError(Exception):
+    def __init__(self, pgcode):
+        super().__init__(pgcode)
+        self.pgcode = pgcode
+
+
+def _db_error(pgcode):
+    return DBAPIError("ALTER TABLE items ...", {}, _LockError(pgcode))
+
+
+def test_split_statements_drops_comments_and_keeps_quoted_semicolons():
+    script = "-- Migration: items\nALTER TABLE items ADD COLUMN note TEXT DEFAULT 'a;b';\n\nDROP INDEX IF EXISTS ix_old;\n"
+
+    assert split_statements(script) == ["ALTER TABLE items ADD COLUMN note TEXT DEFAULT 'a;b'", "DROP INDEX IF EXISTS ix_old"]
+
+
+def test_plan_builds_indexes_concurrently():
+    steps = plan_online_migration(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ix_items_code ON items USING btree (code);\nDROP INDEX IF EXISTS ix_old;"
+    )
+
+    assert steps == [
+        {
+            "kind": "concurrent",
+            "sql": "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ix_items_code ON items USING btree (code)",
+            "index": "ix_items_code",
+        },
+        {"kind": "concurrent", "sql": "DROP INDEX CONCURRENTLY IF EXISTS ix_old", "index": None},
+    ]
+
+
+def test_plan_adds_constrained_columns_nullable_first():
+    steps = plan_online_migration(
+        "ALTER TABLE items ADD COLUMN status VARCHAR(20) NOT NULL UNIQUE DEFAULT 'new' REFERENCES statuses(code);"
+    )
+
+    assert [step.get("sql", step["kind"]) for step in steps] == [
+        "ALTER TABLE items ADD COLUMN IF NOT EXISTS status VARCHAR(20)",
+        "ALTER TABLE items ALTER COLUMN status SET DEFAULT 'new'",
+        "backfill",
+        "ALTER TABLE items ADD CONSTRAINT items_status_fkey FOREIGN KEY (status) REFERENCES statuses(code) NOT VALID",
+        "ALTER TABLE items VALIDATE CONSTRAINT items_status_fkey",
+        "ALTER TABLE items ADD CONSTRAINT items_status_not_null CHECK (status IS NOT NULL) NOT VALID",
+        "ALTER TABLE items VALIDATE CONSTRAINT items_status_not_null",
+        "ALTER TABLE items ALTER COLUMN status SET NOT NULL",
+        "ALTER TABLE items DROP CONSTRAINT IF EXISTS items_status_not_null",
+        "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS items_status_key ON items (status)",
+        "ALTER TABLE items ADD CONSTRAINT items_status_key UNIQUE USING INDEX items_status_key",
+    ]
+    assert steps[2] == {"kind": "backfill", "table": "items", "column": "status", "value": "'new'"}
+
+
+def test_plan_keeps_statements_without_online_form():
+    script = "ALTER TABLE items ALTER COLUMN qty TYPE BIGINT USING qty::BIGINT;\nALTER TABLE items ADD COLUMN id UUID PRIMARY KEY;"
+
+    assert [step["kind"] for step in plan_online_migration(script)] == ["ddl", "ddl"]
+
+
+def test_lock_timeouts_are_retried_with_backoff(db):
+    delays = []
+    executor = OnlineMigrationExecutor(db, lock_retries=3, sleep=delays.append)
+    outcomes = [_db_error("55P03"), _db_error("55P03"), "done"]
+
+    def attempt():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    assert executor._with_lock_retry(attempt, "ALTER TABLE items") == "done"
+    assert len(delays) == 2 and delays[0] <= delays[1]
+
+    def always_locked():
+        raise _db_error("55P03")
+
+    with pytest.raises(DBAPIError):
+        OnlineMigrationExecutor(db, lock_retries=1, sleep=delays.append)._with_lock_retry(always_locked, "ALTER TABLE")
+    assert len(delays) == 3
+
+
+def test_resumed_step_that_already_applied_is_skipped(db):
+    executor = OnlineMigrationExecutor(db, sleep=lambda _: None)
+
+    def duplicate_column():
+        raise _db_error("42701")
+
+    assert executor._with_lock_retry(duplicate_column, "ADD COLUMN", tolerate_existing=True) is None
+    with pytest.raises(DBAPIError):
+        executor._with_lock_retry(duplicate_column, "ADD COLUMN")
+
+
+def test_backfill_resumes_from_cursor_after_worker_death(db):
+    plan = [
+        {"kind": "ddl", "sql": "ALTER TABLE items ADD COLUMN status TEXT"},
+        {"kind": "backfill", "table": "items", "column": "status", "value": "'new'"},
+        {"kind": "concurrent", "sql": "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_items_status ON items (status)"},
+    ]
+    migration = _migration(db, progress={"steps": plan, "step": 0, "cursor": None, "rows_backfilled": 0})
+
+    def die(_seconds):
+        raise RuntimeError("worker killed")
+
+    with pytest.raises(RuntimeError):
+        OnlineMigrationExecutor(db, batch_size=3, sleep=die).run(migration)
+
+    db.expire_all()
+    assert migration.progress["step"] == 1 and migration.progress["in_flight"] is True
+    assert migration.progress["cursor"] == 3 and migration.progress["rows_backfilled"] == 3
+    assert migration.heartbeat_at is not None
+
+    progress = OnlineMigrationExecutor(db, batch_size=3, sleep=lambda _: None).run(migration)
+
+    assert progress["step"] == 3 and progress["in_flight"] is False
+    assert progress["rows_backfilled"] == 7
+    assert db.execute(text("SELECT COUNT(*) FROM items WHERE status = 'new'")).scalar() == 7
+    assert db.execute(text("SELECT name FROM sqlite_master WHERE name = 'ix_items_status'")).scalar() == "ix_items_status"
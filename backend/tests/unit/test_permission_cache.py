@@ -0,0 +1,169 @@
+"""Unit tests for the RBAC permission cache.
+
+Covers the compiled wildcard matcher (same semantics as the old per-call loop in
+``matches_permission``), LRU/TTL/version behaviour of ``PermissionCache``, the
+single-query loader against the real RBAC models, and the commit-time version
+bump that retires cached entries after an RBAC change.
+
+Runs on in-memory SQLite; no live stack is needed.
+"""
+
+import uuid
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401  (register every table on the metadata)
+from app.core.dependencies import matches_permission
+from app.core.permission_cache import CompiledPermissions, PermissionCache, load_permissions, permission_cache
+from app.models.base import Base
+from app.models.group import Group
+from app.models.permission import Permission
+from app.models.rbac_junctions import GroupRole, RolePermission, UserGroup
+from app.models.role import Role
+from app.models.user import User
+
+pytestmark = pytest.mark.unit
+
+
+MATCH_SCENARIOS = [
+    # (granted, required, expected)
+    ({"invoices:create:company"}, "invoices:create:company", True),
+    ({"invoices:create:company"}, "invoices:delete:company", False),
+    ({"*:*:platform"}, "users:create:platform", True),
+    ({"*:*:platform"}, "users:create:tenant", False),
+    ({"invoices:*:company"}, "invoices:approve:company", True),
+    ({"invoices:*"}, "invoices:approve:company", False),  # segment count must match
+    ({"invoices:read:company"}, "invoices:*:company", False),  # wildcard only on the granted side
+    (set(), "anything:read:tenant", False),
+]
+
+
+@pytest.mark.parametrize("granted,required,expected", MATCH_SCENARIOS)
+def test_compiled_matcher_semantics(granted, required, expected):
+    assert CompiledPermissions(granted).matches(required) is expected
+    assert matches_permission(granted, required) is expected
+    assert matches_permission(CompiledPermissions(granted), required) is expected
+
+
+class _Principal:
+    """Unmapped user stand-in: the cache falls back to get_permissions()/get_roles()."""
+
+    def __init__(self, codes, roles=()):
+        self.id = uuid.uuid4()
+        self.codes = set(codes)
+        self.roles = set(roles)
+        self.loads = 0
+
+    def get_permissions(self):
+        self.loads += 1
+        return set(self.codes)
+
+    def get_roles(self):
+        return set(self.roles)
+
+
+def _fresh(user):
+    """Drop the request-scoped stash so the next get() goes through the LRU."""
+    user.__dict__.pop("_compiled_permissions", None)
+    return user
+
+
+class TestPermissionCache:
+    def test_hit_skips_loader_and_stash_is_request_scoped(self):
+        cache = PermissionCache(max_entries=10, ttl_seconds=60)
+        user = _Principal({"a:read:tenant"}, {"manager"})
+
+        first = cache.get(user)
+        assert cache.get(user) is first  # request-scoped stash
+        assert cache.get(_fresh(user)) is first  # cross-request LRU hit
+        assert user.loads == 1
+        assert first.roles == {"manager"}
+
+    def test_lru_evicts_least_recently_used(self):
+        cache = PermissionCache(max_entries=2, ttl_seconds=60)
+        a, b, c = _Principal({"a:x:y"}), _Principal({"b:x:y"}), _Principal({"c:x:y"})
+        cache.get(a)
+        cache.get(b)
+        cache.get(_fresh(a))  # a becomes most recent
+        cache.get(c)  # evicts b
+
+        cache.get(_fresh(a))
+        cache.get(_fresh(b))
+        assert (a.loads, b.loads, c.loads) == (1, 2, 1)
+
+    def test_ttl_expiry_reloads(self):
+        cache = PermissionCache(max_entries=10, ttl_seconds=0)
+        user = _Principal({"a:read:tenant"})
+        cache.get(user)
+        cache.get(_fresh(user))
+        assert user.loads == 2
+
+    def test_version_bump_retires_entries_and_stash(self):
+        cache = PermissionCache(max_entries=10, ttl_seconds=60)
+        user = _Principal({"a:read:tenant"})
+        assert not cache.get(user).matches("b:read:tenant")
+
+        user.codes.add("b:read:tenant")
+        cache.bump_version()
+        assert cache.get(user).matches("b:read:tenant")
+        assert user.loads == 2
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    tables = [m.__table__ for m in (User, Group, Role, Permission, UserGroup, GroupRole, RolePermission)]
+    Base.metadata.create_all(engine, tables=tables)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def _seed(db):
+    tenant_id = uuid.uuid4()
+    user = User(email="rbac@example.com", hashed_password="x", tenant_id=tenant_id)
+    group = Group(tenant_id=tenant_id, name="Ops", code="ops")
+    role = Role(tenant_id=tenant_id, code="operator", name="Operator")
+    inactive_role = Role(tenant_id=tenant_id, code="retired", name="Retired", is_active=False)
+    read = Permission(code="orders:read:tenant", name="Read orders", resource="orders", action="read", scope="tenant")
+    write = Permission(
+        code="orders:update:tenant", name="Update orders", resource="orders", action="update", scope="tenant"
+    )
+    db.add_all([user, group, role, inactive_role, read, write])
+    db.flush()
+    db.add_all(
+        [
+            UserGroup(user_id=user.id, group_id=group.id),
+            GroupRole(group_id=group.id, role_id=role.id),
+            GroupRole(group_id=group.id, role_id=inactive_role.id),
+            RolePermission(role_id=role.id, permission_id=read.id),
+            RolePermission(role_id=inactive_role.id, permission_id=write.id),
+        ]
+    )
+    db.commit()
+    return user, role, write
+
+
+def test_loader_matches_model_resolution(db):
+    user, _, _ = _seed(db)
+
+    compiled = load_permissions(user)
+
+    assert compiled.codes == user.get_permissions() == {"orders:read:tenant"}
+    assert compiled.roles == user.get_roles() == {"operator"}
+
+
+def test_rbac_commit_bumps_global_version(db):
+    user, role, write = _seed(db)
+    before = permission_cache.version
+    assert not permission_cache.get(user).matches("orders:update:tenant")
+
+    db.add(RolePermission(role_id=role.id, permission_id=write.id))
+    db.flush()
+    assert permission_cache.version == before  # not before commit
+
+    db.commit()
+    assert permission_cache.version != before
+    assert permission_cache.get(user).matches("orders:update:tenant")
@@ -0,0 +1,121 @@
+"""Unit tests for the cached authenticated principal behind get_current_user.
+
+Covers that a repeat request with the same token needs no User SELECT, that
+the returned proxy still behaves like the ORM User (lazy load, write-through),
+and that committing a change to the user (e.g. deactivation) or terminating
+sessions drops the cached principal.
+
+Runs on in-memory SQLite.
+"""
+
+import uuid
+
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.core.auth import create_access_token
+from app.core.dependencies import get_current_user
+from app.core.principal import CurrentUser, PrincipalCache, orm_user, principal_cache
+from app.models.token_blacklist import TokenBlacklist
+from app.models.user import User
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    User.__table__.create(engine)
+    TokenBlacklist.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    session.statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: session.statements.append(args[2]))
+    yield session
+    session.close()
+    principal_cache.invalidate(broadcast=False)
+
+
+@pytest.fixture
+def user(db):
+    tenant_id = uuid.uuid4()
+    user = User(email="principal@example.com", hashed_password="x", tenant_id=tenant_id, full_name="Pat")
+    db.add(user)
+    db.commit()
+    return user
+
+
+def _authenticate(db, token):
+    return get_current_user(HTTPAuthorizationCredentials(scheme="Bearer", credentials=token), db)
+
+
+def _user_selects(db):
+    return [s for s in db.statements if s.lstrip().upper().startswith("SELECT") and "FROM users" in s]
+
+
+def _token(user):
+    return create_access_token({"sub": str(user.id), "tenant_id": str(user.tenant_id)})
+
+
+def test_repeat_request_skips_user_select(db, user):
+    token = _token(user)
+    _authenticate(db, token)
+    db.expunge_all()
+    db.statements.clear()
+
+    current = _authenticate(db, token)
+
+    assert isinstance(current, CurrentUser)
+    assert (current.id, current.tenant_id, current.is_active) == (user.id, user.tenant_id, True)
+    assert _user_selects(db) == []
+
+
+def test_proxy_lazy_loads_and_writes_through(db, user):
+    token = _token(user)
+    _authenticate(db, token)
+    db.expunge_all()
+    current = _authenticate(db, token)
+
+    assert current.full_name == "Pat"  # loads the row on demand
+    current.full_name = "Patricia"
+    db.commit()
+    db.refresh(orm_user(current))
+
+    assert db.get(User, user.id).full_name == "Patricia"
+
+
+def test_deactivation_invalidates_cached_principal(db, user):
+    token = _token(user)
+    _authenticate(db, token)
+
+    db.get(User, user.id).is_active = False
+    db.commit()
+
+    with pytest.raises(HTTPException) as exc:
+        _authenticate(db, token)
+    assert exc.value.status_code == 403
+
+
+def test_tenant_mismatch_is_checked_on_cached_principal(db, user):
+    _authenticate(db, _token(user))
+    forged = create_access_token({"sub": str(user.id), "tenant_id": str(uuid.uuid4())})
+
+    with pytest.raises(HTTPException) as exc:
+        _authenticate(db, forged)
+    assert exc.value.status_code == 401
+
+
+def test_cache_is_keyed_by_token_iat_and_invalidated_per_user():
+    cache = PrincipalCache(max_entries=10, ttl_seconds=60)
+    cache.set("u1", 100, "p-old-token")
+    cache.set("u1", 200, "p-new-token")
+    cache.set("u2", 100, "p-other-user")
+
+    assert cache.get("u1", 100) == "p-old-token"
+    cache.invalidate("u1", broadcast=False)
+
+    assert cache.get("u1", 100) is None
+    assert cache.get("u1", 200) is None
+    assert cache.get("u2", 100) == "p-other-user"
@@ -326,3 +326,78 @@ class TestPagination:
         _, total, pages = builder.apply_pagination(query, page=1, page_size=3)
         assert total == 0
         assert pages == 0
+
+
+class TestCountModes:
+    """count() honours exact / estimated / none and rejects anything else."""
+
+    def test_none_skips_the_count(self, builder, sqlite_session):
+        query = sqlite_session.query(_FakeProduct)
+        _, total, pages = builder.apply_pagination(query, page=1, page_size=10, count_mode="none")
+        assert total is None
+        assert pages is None
+
+    def test_estimated_falls_back_to_exact_off_postgres(self, builder, sqlite_session):
+        assert builder.count(sqlite_session.query(_FakeProduct), "estimated") == 0
+
+    def test_invalid_mode_raises(self, builder, sqlite_session):
+        with pytest.raises(ValueError):
+            builder.count(sqlite_session.query(_FakeProduct), "approximate")
+
+
+class TestKeysetPagination:
+    """apply_keyset walks a sorted list page by page without OFFSET."""
+
+    @pytest.fixture
+    def seeded_session(self):
+        engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(engine)
+        with Session(engine) as session:
+            # Duplicate and NULL prices exercise the id tie-breaker and NULL ordering
+            prices = [5, 3, 5, None, 1, 3, 5]
+            session.add_all(
+                [_FakeProduct(id=f"p{i}", name=f"n{i}", price=price) for i, price in enumerate(prices)]
+            )
+            session.commit()
+            yield session
+
+    def _walk(self, builder, session, sort, page_size):
+        seen, cursor = [], None
+        keys = builder.keyset_keys(_FakeProduct, sort)
+        while True:
+            rows = builder.apply_keyset(session.query(_FakeProduct), _FakeProduct, sort, cursor, page_size).all()
+            seen.extend(r.id for r in rows[:page_size])
+            if len(rows) <= page_size:
+                return seen
+            cursor = builder.build_cursor(keys, rows[page_size - 1])
+
+    @pytest.mark.parametrize("direction", ["asc", "desc"])
+    def test_pages_match_a_single_sorted_read(self, builder, seeded_session, direction):
+        sort = [("price", direction)]
+        query = seeded_session.query(_FakeProduct)
+        expected = [r.id for r in builder.apply_keyset(query, _FakeProduct, sort, None, 100)]
+
+        assert self._walk(builder, seeded_session, sort, page_size=2) == expected
+        assert len(expected) == 7
+
+    def test_primary_key_tie_breaker_is_appended(self, builder):
+        keys = builder.keyset_keys(_FakeProduct, [("price", "desc"), ("missing", "asc")])
+        assert [(name, direction) for name, direction, _ in keys] == [("price", "desc"), ("id", "desc")]
+
+    def test_cursor_round_trips_typed_values(self, builder):
+        from datetime import datetime
+        from decimal import Decimal
+
+        values = [Decimal("9.99"), datetime(2026, 1, 11, 10, 30), "p1"]
+        token = builder.decode_cursor(builder.encode_cursor([["price", "asc"]], values))
+        assert token["v"] == values
+
+    def test_invalid_cursor_raises(self, builder, seeded_session):
+        with pytest.raises(ValueError):
+            builder.apply_keyset(seeded_session.query(_FakeProduct), _FakeProduct, [], "not-a-cursor", 10)
+
+    def test_cursor_for_another_sort_is_rejected(self, builder, seeded_session):
+        keys = builder.keyset_keys(_FakeProduct, [("name", "asc")])
+        cursor = builder.encode_cursor([[n, d] for n, d, _ in keys], ["n1", "p1"])
+        with pytest.raises(ValueError):
+            builder.apply_keyset(seeded_session.query(_FakeProduct), _FakeProduct, [("price", "asc")], cursor, 10)
@@ -0,0 +1,85 @@
+"""Unit tests for RedisClient pub/sub subscriptions.
+
+A lost connection must not end the subscriber thread: the exception handler
+passed to ``run_in_thread`` reconnects (which resubscribes the channels) and
+keeps retrying while Redis is down.
+"""
+
+import pytest
+import redis
+
+from app.core import redis_client as rc
+
+pytestmark = pytest.mark.unit
+
+
+class FakeConnection:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.calls = []
+
+    def disconnect(self):
+        self.calls.append("disconnect")
+
+    def connect(self):
+        self.calls.append("connect")
+        if self.fail:
+            raise redis.ConnectionError("still down")
+
+
+class FakePubSub:
+    def __init__(self):
+        self.connection = FakeConnection()
+        self.handlers = {}
+        self.exception_handler = None
+
+    def subscribe(self, **handlers):
+        self.handlers.update(handlers)
+
+    def run_in_thread(self, sleep_time, daemon, exception_handler=None):
+        self.exception_handler = exception_handler
+        return self
+
+
+class FakeRedis:
+    def __init__(self):
+        self.pubsubs = []
+
+    def ping(self):
+        return True
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        self.pubsubs.append(FakePubSub())
+        return self.pubsubs[-1]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    client = rc.RedisClient()
+    client._client = FakeRedis()
+    monkeypatch.setattr(rc.time, "sleep", lambda seconds: None)
+    return client
+
+
+def test_subscription_reconnects_after_a_lost_connection(client):
+    received = []
+    assert client.subscribe("cache-invalidation", received.append)
+    pubsub = client._client.pubsubs[0]
+
+    pubsub.exception_handler(redis.ConnectionError("reset by peer"), pubsub, pubsub)
+
+    assert pubsub.connection.calls == ["disconnect", "connect"]
+    pubsub.handlers["cache-invalidation"]({"data": "key"})
+    assert received == ["key"]
+
+
+def test_failed_reconnect_keeps_the_thread_running(client):
+    client.subscribe("cache-invalidation", lambda message: None)
+    pubsub = client._client.pubsubs[0]
+    pubsub.connection = FakeConnection(fail=True)
+
+    # Raising here would end the worker thread
+    pubsub.exception_handler(redis.ConnectionError("reset by peer"), pubsub, pubsub)
+
+    assert pubsub.connection.calls == ["disconnect", "connect"]
+    assert client._healthy_until == 0.0
@@ -0,0 +1,151 @@
+"""Unit tests for the tiered report result cache.
+
+Covers in-process hits without database writes, hit counts flushed in one
+batch, promotion from the report_cache table, single-flight loads under
+concurrency, stale-while-revalidate and cache keys that change with the
+report definition.
+
+Runs on a file-backed SQLite database (refreshes use their own thread).
+"""
+
+import threading
+import time
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.core.report_cache import ReportResultCache
+from app.models.report import ReportCache
+from app.services.report_service import ReportService
+
+pytestmark = pytest.mark.unit
+
+TENANT = uuid.uuid4()
+REPORT = uuid.uuid4()
+KEY = ReportService._generate_cache_key(REPORT, {"region": "EU"}, TENANT, "v1")
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'reports.db'}", connect_args={"check_same_thread": False})
+    ReportCache.__table__.create(engine)
+    engine.statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: engine.statements.append(args[2]))
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def _cache(**kwargs):
+    kwargs.setdefault("use_redis", False)
+    kwargs.setdefault("hit_flush_seconds", 3600)
+    return ReportResultCache(**kwargs)
+
+
+class _Loader:
+    def __init__(self, delay=0.0, error=None):
+        self.calls = 0
+        self.delay = delay
+        self.error = error
+
+    def __call__(self, session):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return {"data": [{"n": self.calls, "at": datetime(2026, 1, 1)}], "row_count": 1, "columns": ["n", "at"]}
+
+
+def test_hits_are_served_from_memory_and_counted_in_batches(db, engine):
+    cache, loader = _cache(), _Loader()
+
+    first, cached = cache.get_or_load(db, TENANT, REPORT, KEY, loader)
+    assert not cached
+    assert first["data"][0]["at"] == "2026-01-01 00:00:00"  # normalized like the Redis/DB tiers
+
+    engine.statements.clear()
+    for _ in range(5):
+        result, cached = cache.get_or_load(db, TENANT, REPORT, KEY, loader)
+        assert cached and result == first
+    assert loader.calls == 1
+    assert engine.statements == []
+
+    cache.flush_hits()
+    assert len([s for s in engine.statements if s.startswith("UPDATE")]) == 1
+    assert db.query(ReportCache.hit_count).filter(ReportCache.cache_key == KEY).scalar() == 5
+
+
+def test_other_worker_is_served_from_database_tier(db):
+    _cache().get_or_load(db, TENANT, REPORT, KEY, _Loader())
+    other_worker, loader = _cache(), _Loader()
+
+    result, cached = other_worker.get_or_load(db, TENANT, REPORT, KEY, loader)
+
+    assert cached and result["data"][0]["n"] == 1
+    assert loader.calls == 0
+    assert other_worker.get_stats()["db_hits"] == 1
+
+
+def test_concurrent_misses_share_one_execution(engine):
+    cache, loader = _cache(), _Loader(delay=0.2)
+    results = []
+
+    def request():
+        session = sessionmaker(bind=engine)()
+        results.append(cache.get_or_load(session, TENANT, REPORT, KEY, loader)[0])
+        session.close()
+
+    threads = [threading.Thread(target=request) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert loader.calls == 1
+    assert len(results) == 10 and all(r == results[0] for r in results)
+
+
+def test_stale_result_is_served_while_refreshing(db):
+    cache, loader = _cache(ttl_seconds=0, stale_seconds=60), _Loader(delay=0.1)
+    cache.get_or_load(db, TENANT, REPORT, KEY, loader)
+
+    started = time.monotonic()
+    stale, cached = cache.get_or_load(db, TENANT, REPORT, KEY, loader)
+    assert cached and stale["data"][0]["n"] == 1
+    assert time.monotonic() - started < 0.1
+
+    deadline = time.monotonic() + 5
+    while loader.calls < 2 or cache.get_stats()["loads"] < 2:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    refreshed, _ = cache.get_or_load(db, TENANT, REPORT, KEY, loader)
+    assert refreshed["data"][0]["n"] == 2
+
+
+def test_failed_load_is_not_cached(db):
+    cache = _cache()
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_load(db, TENANT, REPORT, KEY, _Loader(error=RuntimeError("boom")))
+
+    loader = _Loader()
+    _, cached = cache.get_or_load(db, TENANT, REPORT, KEY, loader)
+    assert not cached and loader.calls == 1
+
+
+def test_cache_key_changes_with_tenant_and_definition_version():
+    params = {"region": "EU"}
+
+    assert ReportService._generate_cache_key(REPORT, params, TENANT, "v1") == KEY
+    assert ReportService._generate_cache_key(REPORT, params, TENANT, "v2") != KEY
+    assert ReportService._generate_cache_key(REPORT, params, uuid.uuid4(), "v1") != KEY
+    assert ReportService._generate_cache_key(REPORT, {"region": "US"}, TENANT, "v1") != KEY
@@ -0,0 +1,152 @@
+"""Unit tests for the streaming report export path.
+
+Covers that report rows are read lazily from a dedicated connection that is
+released once the stream ends or is closed unread, and that the CSV, JSON, NDJSON, HTML and XLSX
+writers consume rows incrementally and produce the same files as the
+buffered exporters.
+
+Runs on a file-backed SQLite database (pooled, so checkouts are observable).
+"""
+
+import io
+import itertools
+import json
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.services.report_export import ReportExporter
+from app.services.report_service import ReportService
+
+pytestmark = pytest.mark.unit
+
+COLUMNS = ["name", "amount"]
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'reports.db'}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE sales (id INTEGER PRIMARY KEY, name TEXT, amount INTEGER)"))
+        conn.execute(
+            text("INSERT INTO sales (name, amount) VALUES (:name, :amount)"),
+            [{"name": f"item-{i}", "amount": i} for i in range(25)],
+        )
+    # information_schema lookup is PostgreSQL-specific
+    monkeypatch.setattr(ReportService, "_get_table_columns", staticmethod(lambda db, table: {"id", "name", "amount"}))
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def _report(**query_config):
+    return SimpleNamespace(
+        base_entity="sales",
+        columns_config=[{"name": "name"}, {"name": "amount"}],
+        query_config={"order_by": [{"field": "amount", "direction": "asc"}], **query_config},
+    )
+
+
+def _endless_rows():
+    return ([f"row-{i}", i] for i in itertools.count())
+
+
+def test_rows_stream_from_dedicated_connection(db):
+    pool = db.get_bind().pool
+    columns, rows = ReportService.stream_report_rows(db, None, _report(), None, chunk_size=10)
+
+    assert columns == COLUMNS
+    assert tuple(next(rows)) == ("item-0", 0)
+    assert pool.checkedout() == 1
+
+    assert len(list(rows)) == 24
+    assert pool.checkedout() == 0
+
+
+def test_unstarted_rows_release_connection_when_export_fails(db):
+    pool = db.get_bind().pool
+    columns, rows = ReportService.stream_report_rows(db, None, _report(), None)
+    assert pool.checkedout() == 1
+
+    # The export route's error path: the exporter rejects the format before reading a row
+    with pytest.raises(ValueError):
+        try:
+            ReportExporter.stream_report(rows, columns, "docx")
+        except Exception:
+            rows.close()
+            raise
+    assert pool.checkedout() == 0
+
+    rows.close()
+    assert list(rows) == []
+
+
+def test_validation_errors_raise_before_streaming(db):
+    report = _report()
+    report.columns_config = [{"name": "password"}]
+
+    with pytest.raises(ValueError):
+        ReportService.stream_report_rows(db, None, report, None)
+    assert db.get_bind().pool.checkedout() == 0
+
+
+def test_csv_is_streamed_in_chunks(db):
+    columns, rows = ReportService.stream_report_rows(db, None, _report(), None)
+    chunks = list(ReportExporter.stream_csv(rows, columns, chunk_rows=10))
+
+    assert len(chunks) == 4  # header + 3 chunks of at most 10 rows
+    data = ReportService._build_and_execute_query(db, None, _report(), None)["data"]
+    assert b"".join(chunks) == ReportExporter.export_to_csv(data, COLUMNS)
+
+
+def test_writers_do_not_materialize_rows():
+    for writer in (ReportExporter.stream_csv, ReportExporter.stream_json, ReportExporter.stream_ndjson):
+        chunks = list(itertools.islice(writer(_endless_rows(), COLUMNS, chunk_rows=100), 3))
+        assert len(chunks) == 3
+    html_chunks = itertools.islice(ReportExporter.stream_html(_endless_rows(), COLUMNS, chunk_rows=100), 2)
+    assert b"row-99" in list(html_chunks)[1]
+
+
+def test_json_and_ndjson_round_trip():
+    rows = [["a", 1], ["b", None]]
+
+    assert json.loads(b"".join(ReportExporter.stream_json(iter(rows), COLUMNS))) == [
+        {"name": "a", "amount": 1},
+        {"name": "b", "amount": None},
+    ]
+    assert json.loads(b"".join(ReportExporter.stream_json(iter([]), COLUMNS))) == []
+    lines = b"".join(ReportExporter.stream_ndjson(iter(rows), COLUMNS)).decode().splitlines()
+    assert [json.loads(line)["name"] for line in lines] == ["a", "b"]
+
+
+def test_html_escapes_values_and_counts_rows():
+    body = b"".join(ReportExporter.stream_html(iter([["<b>x</b>", 1], ["y", None]]), COLUMNS, "Q&A")).decode()
+
+    assert "&lt;b&gt;x&lt;/b&gt;" in body and "<b>x</b>" not in body
+    assert "<title>Q&amp;A</title>" in body
+    assert "<strong>Total Records:</strong> 2" in body
+
+
+def test_stream_report_rejects_unknown_format_eagerly():
+    with pytest.raises(ValueError):
+        ReportExporter.stream_report(iter([]), COLUMNS, "docx")
+
+
+def test_formatted_xlsx_uses_sampled_widths():
+    openpyxl = pytest.importorskip("openpyxl")
+    ref = uuid.uuid4()
+    rows = [["short", 1], ["a much longer value", 2], ["tail", ref]]
+
+    body, extension = ReportExporter.stream_report(iter(rows), COLUMNS, "excel_formatted", report_name="Sales")
+    content = b"".join(body)
+
+    assert extension == "xlsx"
+    ws = openpyxl.load_workbook(io.BytesIO(content))["Sales"]
+    assert [c.value for c in ws[1]] == COLUMNS
+    assert ws["A3"].value == "a much longer value"
+    assert ws["B4"].value == str(ref)
+    assert ws.column_dimensions["A"].width == len("a much longer value") + 2
+    assert ws.freeze_panes == "A2"
@@ -0,0 +1,229 @@
+"""Unit tests for background report export jobs.
+
+Covers request de-duplication, a worker tick running a queued export into
+artifact storage, releasing the rows' connection on failure, heartbeats during
+the final upload, reclaiming jobs abandoned by a dead worker, ranged artifact
+reads and the ``report_generation`` handler registration in SchedulerEngine.
+
+Runs on a file-backed SQLite database with local artifact storage in tmp_path.
+"""
+
+import json
+import threading
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.core.artifact_storage import LocalArtifactStorage, parse_byte_range
+from app.models.report import ReportDefinition, ReportExecution
+from app.services import report_export_jobs
+from app.services.report_export_jobs import ReportExportJobService
+from app.services.report_service import ReportService
+from app.workers import report_export_worker
+from app.workers.report_export_worker import ReportExportWorker
+
+pytestmark = pytest.mark.unit
+
+TENANT_ID = uuid.uuid4()
+USER_ID = uuid.uuid4()
+
+
+@pytest.fixture
+def session_factory(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'reports.db'}")
+    ReportDefinition.__table__.create(engine)
+    ReportExecution.__table__.create(engine)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE sales (id INTEGER PRIMARY KEY, name TEXT, amount INTEGER)"))
+        conn.execute(
+            text("INSERT INTO sales (name, amount) VALUES (:name, :amount)"),
+            [{"name": f"item-{i}", "amount": i} for i in range(25)],
+        )
+    # information_schema lookup is PostgreSQL-specific
+    monkeypatch.setattr(ReportService, "_get_table_columns", staticmethod(lambda db, table: {"id", "name", "amount"}))
+    factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(report_export_worker, "SessionLocal", factory)
+    return factory
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    local = LocalArtifactStorage(str(tmp_path / "artifacts"))
+    monkeypatch.setattr(report_export_jobs, "get_artifact_storage", lambda: local)
+    return local
+
+
+@pytest.fixture
+def db(session_factory):
+    session = session_factory()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def report(db):
+    report_def = ReportDefinition(
+        id=uuid.uuid4(),
+        tenant_id=TENANT_ID,
+        name="Sales",
+        base_entity="sales",
+        columns_config=[{"name": "name"}, {"name": "amount"}],
+        query_config={"order_by": [{"field": "amount", "direction": "asc"}]},
+        created_by=USER_ID,
+    )
+    db.add(report_def)
+    db.commit()
+    return report_def
+
+
+def test_identical_requests_share_one_job(db, report):
+    job, created = ReportExportJobService.submit(db, TENANT_ID, USER_ID, report, {"x": 1}, "csv")
+    again, created_again = ReportExportJobService.submit(db, TENANT_ID, USER_ID, report, {"x": 1}, "csv")
+    other, created_other = ReportExportJobService.submit(db, TENANT_ID, USER_ID, report, {"x": 1}, "json")
+
+    assert created and not created_again and created_other
+    assert again.id == job.id
+    assert other.id != job.id
+
+
+def test_finished_job_does_not_absorb_new_requests(db, report):
+    job, _ = ReportExportJobService.submit(db, TENANT_ID, USER_ID, report, None, "csv")
+    job.status = "completed"
+    db.commit()
+
+    new_job, created = ReportExportJobService.submit(db, TENANT_ID, USER_ID, report, None, "csv")
+    assert created and new_job.id != job.id
+
+
+def test_worker_tick_exports_job_to_storage(db, report, storage):
+    job, _ = ReportExportJobService.submit(db, TENANT_ID, USER_ID, report, None, "ndjson")
+
+    assert ReportExportWorker()._tick() == 1
+    assert ReportExportWorker()._tick() == 0
+
+    db.refresh(job)
+    assert job.status == "completed"
+    assert job.row_count == job.progress_rows == 25
+    assert job.completed_at is not None
+    assert job.export_file_path == f"report-exports/{TENANT_ID}/{job.id}.ndjson"
+    assert storage.size(job.export_file_path) == job.export_file_size
+    content = b"".join(storage.read_range(job.export_file_path, 0, job.export_file_size - 1))
+    assert json.loads(content.splitlines()[-1]) == {"name": "item-24", "amount": 24}
+
+
+def test_failed_export_is_recorded(db, report, storage):
+    report.columns_config = [{"name": "password"}]
+    db.commit()
+    job, _ = ReportExportJobService.submit(db, TENANT_ID, USER_ID, report, None, "csv")
+
+    assert ReportExportWorker()._tick() == 1
+
+    db.refresh(job)
+    assert job.status == "failed"
+    assert job.error_message
+    assert storage.size(f"report-exports/{TENANT_ID}/{job.id}.csv") is None
+
+
+def test_failed_upload_releases_rows_connection(db, report, storage, monkeypatch):
+    job, _ = ReportExportJobService.submit(db, TENANT_ID, USER_ID, report, None, "csv")
+
+    def failing_save(key, body):
+        raise OSError("bucket unavailable")
+
+    monkeypatch.setattr(storage, "save", failing_save)
+
+    with pytest.raises(OSError):
+        ReportExportJobService.run_export(db, job)
+
+    assert job.status == "failed"
+    db.commit()
+    assert db.get_bind().pool.checkedout() == 0
+
+
+def test_heartbeat_continues_after_the_last_row(db, report, storage, monkeypatch):
+    monkeypatch.setattr(report_export_jobs, "PROGRESS_INTERVAL_SECONDS", 0.01)
+    job, _ = ReportExportJobService.submit(db, TENANT_ID, USER_ID, report, None, "csv")
+    beats = threading.Event()
+    monkeypatch.setattr(report_export_jobs._ProgressTracker, "_write", lambda self: beats.set())
+    save = storage.save
+
+    def slow_save(key, body):
+        size = save(key, body)
+        beats.clear()
+        # Every row is written: only the heartbeat thread can record progress now
+        assert beats.wait(5)
+        return size
+
+    monkeypatch.setattr(storage, "save", slow_save)
+
+    ReportExportJobService.run_export(db, job)
+
+    assert job.status == "completed"
+    db.commit()
+    assert db.get_bind().pool.checkedout() == 0
+
+
+def test_stale_running_job_is_reclaimed(db, report):
+    job, _ = ReportExportJobService.submit(db, TENANT_ID, USER_ID, report, None, "csv")
+    job.status = "running"
+    job.heartbeat_at = datetime.utcnow() - timedelta(hours=1)
+    job.progress_rows = 7
+    db.commit()
+
+    assert ReportExportWorker(stale_after_seconds=600)._reclaim_stale(db) == 1
+
+    db.refresh(job)
+    assert job.status == "pending"
+    assert job.progress_rows == 0
+
+
+def test_artifact_range_reads(tmp_path):
+    storage = LocalArtifactStorage(str(tmp_path))
+    size = storage.save("a/b.bin", iter([b"0123", b"456789"]))
+
+    assert size == 10
+    assert b"".join(storage.read_range("a/b.bin", 2, 5)) == b"2345"
+    assert b"".join(storage.read_range("a/b.bin", 8, 9)) == b"89"
+    with pytest.raises(ValueError):
+        storage.size("../outside.bin")
+
+
+@pytest.mark.parametrize(
+    "header,expected",
+    [
+        (None, None),
+        ("bytes=0-99", (0, 99)),
+        ("bytes=10-", (10, 199)),
+        ("bytes=150-999", (150, 199)),
+        ("bytes=-50", (150, 199)),
+        ("bytes=0-1,5-6", None),
+        ("items=0-1", None),
+    ],
+)
+def test_parse_byte_range(header, expected):
+    assert parse_byte_range(header, 200) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=200-", "bytes=50-10", "bytes=a-b"])
+def test_parse_byte_range_rejects_unsatisfiable(header):
+    with pytest.raises(ValueError):
+        parse_byte_range(header, 200)
+
+
+def test_scheduler_engine_registers_report_generation_handler():
+    from app.services.scheduler_engine import SchedulerEngine
+
+    engine = SchedulerEngine(db_url="sqlite://")
+
+    assert engine.job_handlers["report_generation"] is report_export_jobs.report_generation_handler
+
+
+def test_report_generation_handler_requires_report(db):
+    job = SimpleNamespace(job_parameters={}, tenant_id=TENANT_ID, created_by=USER_ID)
+
+    with pytest.raises(ValueError):
+        report_export_jobs.report_generation_handler(db, job, None)
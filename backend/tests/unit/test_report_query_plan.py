@@ -0,0 +1,148 @@
+"""Unit tests for compiled report query plans.
+
+Checks that a definition compiles to one parameterized statement whose SQL
+text does not change with parameter values, that plans are cached per
+definition version, and that validation still rejects anything that is not a
+real column or an allowed option. Queries run on in-memory SQLite.
+"""
+
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.services.report_query_plan import ReportQueryPlan, ReportQueryValidationError
+from app.services.report_service import ReportService
+
+pytestmark = pytest.mark.unit
+
+COLUMNS = frozenset({"id", "tenant_id", "region", "amount"})
+TENANT_ID = uuid.uuid4()
+
+
+@pytest.fixture
+def db(monkeypatch):
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE sales (id INTEGER PRIMARY KEY, tenant_id TEXT, region TEXT, amount INTEGER)"))
+        conn.execute(
+            text("INSERT INTO sales (tenant_id, region, amount) VALUES (:t, :r, :a)"),
+            [{"t": str(TENANT_ID), "r": r, "a": a} for r, a in [("north", 10), ("south", 20), ("north", 5)]]
+            + [{"t": "other", "r": "north", "a": 1000}],
+        )
+    monkeypatch.setattr(ReportService, "_get_table_columns", staticmethod(lambda db, table: COLUMNS))
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def _report(filters=None, **query_config):
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        updated_at=datetime(2026, 1, 1),
+        base_entity="sales",
+        columns_config=[{"name": "region"}, {"name": "amount", "label": "Total", "aggregation": "sum"}],
+        query_config={
+            "group_by": ["region"],
+            "order_by": [{"field": "region", "direction": "asc"}],
+            **({"filters": filters} if filters else {}),
+            **query_config,
+        },
+    )
+
+
+REGION_FILTER = {
+    "logic": "AND",
+    "conditions": [{"field": "region", "operator": "eq", "value": "north", "parameter": "region"}],
+    "groups": [{"logic": "OR", "conditions": [{"field": "amount", "operator": "in", "parameter": "amounts"}]}],
+}
+
+
+def test_sql_text_is_stable_across_parameter_values(db):
+    report = _report(REGION_FILTER)
+
+    stmt_a, params_a = ReportService._build_report_query(db, TENANT_ID, report, {"region": "north", "amounts": [5]})
+    stmt_b, params_b = ReportService._build_report_query(db, TENANT_ID, report, {"region": "south", "amounts": [1, 2]})
+
+    assert stmt_a is stmt_b
+    assert params_a == {"f1": "north", "f2": [5], "tenant_id": str(TENANT_ID)}
+    assert params_b["f1"] == "south"
+    assert "north" not in str(stmt_a) and "south" not in str(stmt_a)
+
+
+def test_execution_binds_parameters(db):
+    report = _report(REGION_FILTER)
+
+    result = ReportService._build_and_execute_query(db, TENANT_ID, report, {"region": "north", "amounts": [5, 10]})
+    assert result["columns"] == ["region", "Total"]
+    assert result["data"] == [{"region": "north", "Total": 15}]
+
+    # An `in` filter without a non-empty list is skipped, as with the string builder
+    result = ReportService._build_and_execute_query(db, TENANT_ID, report, {"region": "north"})
+    assert result["data"] == [{"region": "north", "Total": 15}]
+
+    unscoped = ReportService._build_and_execute_query(db, None, report, {"region": "north"})
+    assert unscoped["data"] == [{"region": "north", "Total": 1015}]
+
+
+def test_like_filter_and_limit(db):
+    report = _report(
+        {"conditions": [{"field": "region", "operator": "like", "value": "out"}]},
+        group_by=None,
+        limit=1,
+    )
+    report.columns_config = [{"name": "region"}]
+
+    result = ReportService._build_and_execute_query(db, TENANT_ID, report, None)
+    assert result["data"] == [{"region": "south"}]
+
+
+def test_select_star_without_columns(db):
+    report = _report(group_by=None)
+    report.columns_config = []
+
+    result = ReportService._build_and_execute_query(db, TENANT_ID, report, None)
+    assert result["columns"] == ["id", "tenant_id", "region", "amount"]
+    assert result["row_count"] == 3
+
+
+def test_plan_is_cached_per_definition_version(db):
+    report = _report()
+    plan = ReportService.compile_report_plan(db, report)
+    assert ReportService.compile_report_plan(db, report) is plan
+
+    report.updated_at = datetime(2026, 2, 1)
+    assert ReportService.compile_report_plan(db, report) is not plan
+
+
+def test_transient_definitions_are_not_cached(db):
+    report = _report()
+    del report.id
+    assert ReportService.compile_report_plan(db, report) is not ReportService.compile_report_plan(db, report)
+
+
+@pytest.mark.parametrize(
+    "change",
+    [
+        {"columns_config": [{"name": "password"}]},
+        {"columns_config": [{"name": "amount", "aggregation": "stddev"}]},
+        {"query_config": {"order_by": [{"field": "amount", "direction": "sideways"}]}},
+        {"query_config": {"group_by": ["amount; DROP TABLE sales"]}},
+        {"query_config": {"filters": {"conditions": [{"field": "secret", "operator": "eq", "value": 1}]}}},
+    ],
+)
+def test_invalid_definitions_are_rejected(change):
+    report = _report()
+    for attr, value in change.items():
+        setattr(report, attr, value)
+
+    with pytest.raises(ReportQueryValidationError):
+        ReportQueryPlan.compile(report, COLUMNS)
+
+
+def test_unknown_table_is_rejected():
+    with pytest.raises(ReportQueryValidationError):
+        ReportQueryPlan.compile(_report(), frozenset())
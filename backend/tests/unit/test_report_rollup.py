@@ -0,0 +1,232 @@
+"""Unit tests for materialized report rollups.
+
+Covers building a summary table, answering report executions from it with the
+same results as the live query, incremental refresh of the time buckets
+touched since the watermark, falling back to the live query for filters the
+rollup cannot answer, rebuilds after definition changes and the scheduler
+handler. Runs on a file-backed SQLite database.
+"""
+
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import sessionmaker
+
+from app.core.schema_catalog import get_schema_catalog
+from app.models.report import ReportDefinition, ReportRollup
+from app.services import report_rollup
+from app.services.report_query_plan import ReportQueryValidationError
+from app.services.report_rollup import ReportRollupService, RollupSpec
+from app.services.report_service import ReportService
+
+pytestmark = pytest.mark.unit
+
+TENANT_ID = uuid.uuid4()
+USER_ID = uuid.uuid4()
+COLUMNS = frozenset({"id", "tenant_id", "region", "amount", "created_at", "updated_at"})
+
+ROWS = [
+    ("north", 10, "2026-01-01 09:00:00"),
+    ("south", 20, "2026-01-01 17:30:00"),
+    ("north", 5, "2026-01-02 08:00:00"),
+    ("north", None, None),
+]
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'rollups.db'}")
+    ReportDefinition.__table__.create(engine)
+    ReportRollup.__table__.create(engine)
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "CREATE TABLE sales (id INTEGER PRIMARY KEY, tenant_id TEXT, region TEXT, amount INTEGER, "
+                "created_at TIMESTAMP, updated_at TIMESTAMP)"
+            )
+        )
+        for region, amount, created_at in ROWS:
+            _insert(conn, region, amount, created_at)
+        _insert(conn, "north", 1000, "2026-01-01 10:00:00", tenant="other")
+    # information_schema lookup is PostgreSQL-specific
+    monkeypatch.setattr(get_schema_catalog(), "get_column_names", lambda db, table: COLUMNS)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def _insert(conn, region, amount, created_at, tenant=None, updated_at="2026-01-03 00:00:00"):
+    conn.execute(
+        text(
+            "INSERT INTO sales (tenant_id, region, amount, created_at, updated_at) "
+            "VALUES (:tenant, :region, :amount, :created_at, :updated_at)"
+        ),
+        {
+            "tenant": tenant or str(TENANT_ID),
+            "region": region,
+            "amount": amount,
+            "created_at": created_at,
+            "updated_at": updated_at,
+        },
+    )
+
+
+@pytest.fixture
+def report(db):
+    report_def = ReportDefinition(
+        id=uuid.uuid4(),
+        tenant_id=TENANT_ID,
+        name="Sales by region",
+        base_entity="sales",
+        columns_config=[
+            {"name": "region"},
+            {"name": "amount", "label": "Total", "aggregation": "sum"},
+            {"name": "amount", "label": "Average", "aggregation": "avg"},
+            {"name": "id", "label": "Orders", "aggregation": "count"},
+            {"name": "amount", "label": "Largest", "aggregation": "max"},
+        ],
+        query_config={
+            "group_by": ["region"],
+            "order_by": [{"field": "region", "direction": "asc"}],
+            "rollup": {"time_column": "created_at", "bucket": "day", "watermark_column": "updated_at"},
+        },
+        created_by=USER_ID,
+        is_active=True,
+    )
+    db.add(report_def)
+    db.commit()
+    return report_def
+
+
+def _live(db, report_def, parameters=None):
+    stmt, params = ReportService._build_report_query(db, TENANT_ID, report_def, parameters)
+    return [dict(row._mapping) for row in db.execute(stmt, params)]
+
+
+def _refresh(db, report_def, full=False):
+    rollup = ReportRollupService.sync_definition(db, report_def)
+    return ReportRollupService.refresh(db, rollup, full=full)
+
+
+def test_rollup_answers_report_like_the_live_query(db, report):
+    rollup = ReportRollupService.sync_definition(db, report)
+    assert rollup.status == "pending"
+    assert ReportRollupService.build_query(db, TENANT_ID, report, None) is None
+
+    ReportRollupService.refresh(db, rollup)
+
+    assert rollup.status == "ready"
+    assert rollup.row_count == 5  # (tenant, day, region) groups of both tenants, including the untimed row
+    stmt, _ = ReportRollupService.build_query(db, TENANT_ID, report, None)
+    assert rollup.table_name in str(stmt) and "sales" not in str(stmt)
+
+    result = ReportService._build_and_execute_query(db, TENANT_ID, report, None)
+    assert result["data"] == _live(db, report)
+    assert result["data"][0] == {"region": "north", "Total": 15, "Average": 7.5, "Orders": 3, "Largest": 10}
+
+
+def test_incremental_refresh_recomputes_touched_buckets(db, report):
+    rollup = _refresh(db, report)
+    watermark = rollup.watermark
+
+    with db.get_bind().begin() as conn:
+        _insert(conn, "south", 7, "2026-01-05 12:00:00", updated_at="2026-01-05 12:00:00")
+        conn.execute(
+            text("UPDATE sales SET amount = 12, updated_at = '2026-01-05 13:00:00' WHERE amount = 10"),
+        )
+
+    ReportRollupService.refresh(db, rollup)
+
+    assert rollup.watermark > watermark
+    assert rollup.spec_hash == RollupSpec.from_report(report, COLUMNS).signature
+    result = ReportService._build_and_execute_query(db, TENANT_ID, report, None)
+    assert result["data"] == _live(db, report)
+    assert result["data"][0]["Total"] == 17
+
+
+def test_incremental_refresh_recomputes_bucket_a_row_moved_out_of(db, report):
+    rollup = _refresh(db, report)
+
+    with db.get_bind().begin() as conn:
+        conn.execute(
+            text(
+                "UPDATE sales SET created_at = '2026-01-09 08:00:00', updated_at = '2026-01-09 08:00:00' "
+                "WHERE amount = 10"
+            ),
+        )
+
+    ReportRollupService.refresh(db, rollup)
+
+    result = ReportService._build_and_execute_query(db, TENANT_ID, report, None)
+    assert result["data"] == _live(db, report)
+    assert result["data"][0]["Orders"] == 3
+    buckets = db.execute(text(f"SELECT rollup_bucket FROM {rollup.table_name} WHERE d0 = 'north'")).scalars().all()
+    assert "2026-01-09 00:00:00" in buckets
+    assert db.execute(text(f"SELECT count(*) FROM {rollup.table_name}")).scalar() == 5
+
+
+def test_filters_on_dimensions_use_rollup_others_fall_back(db, report):
+    _refresh(db, report)
+    report.query_config = {
+        **report.query_config,
+        "filters": {"conditions": [{"field": "region", "operator": "eq", "value": "north", "parameter": "region"}]},
+    }
+    db.commit()
+
+    assert ReportRollupService.build_query(db, TENANT_ID, report, {"region": "south"}) is not None
+    result = ReportService._build_and_execute_query(db, TENANT_ID, report, {"region": "south"})
+    assert result["data"] == _live(db, report, {"region": "south"})
+
+    report.query_config = {
+        **report.query_config,
+        "filters": {"conditions": [{"field": "amount", "operator": "gt", "value": 6}]},
+    }
+    db.commit()
+    assert ReportRollupService.build_query(db, TENANT_ID, report, None) is None
+
+
+def test_definition_changes_rebuild_or_drop_the_rollup(db, report):
+    rollup = _refresh(db, report)
+    table_name = rollup.table_name
+
+    # Another measure changes the spec: the old table no longer answers the report
+    report.columns_config = report.columns_config + [{"name": "amount", "label": "Smallest", "aggregation": "min"}]
+    db.commit()
+    assert ReportRollupService.build_query(db, TENANT_ID, report, None) is None
+
+    ReportRollupService.refresh(db, rollup)
+    result = ReportService._build_and_execute_query(db, TENANT_ID, report, None)
+    assert result["data"] == _live(db, report)
+
+    report.query_config = {k: v for k, v in report.query_config.items() if k != "rollup"}
+    db.commit()
+    assert ReportRollupService.sync_definition(db, report) is None
+    assert db.query(ReportRollup).count() == 0
+    assert not inspect(db.get_bind()).has_table(table_name)
+
+
+def test_rollup_requires_aggregated_or_grouped_columns(db, report):
+    report.columns_config = [{"name": "region"}, {"name": "amount"}]
+    db.commit()
+
+    with pytest.raises(ReportQueryValidationError):
+        _refresh(db, report)
+    assert db.query(ReportRollup).one().status == "failed"
+
+
+def test_refresh_handler_refreshes_tenant_rollups(db, report):
+    ReportRollupService.sync_definition(db, report)
+    job = SimpleNamespace(tenant_id=TENANT_ID, job_parameters={"full": True})
+
+    assert report_rollup.report_rollup_refresh_handler(db, job, None) == {"refreshed": 1, "skipped": 0}
+    assert db.query(ReportRollup).one().status == "ready"
+
+
+def test_scheduler_engine_registers_rollup_handler():
+    from app.services.scheduler_engine import SchedulerEngine
+
+    engine = SchedulerEngine(db_url="sqlite://")
+
+    assert engine.job_handlers["report_rollup_refresh"] is report_rollup.report_rollup_refresh_handler
@@ -0,0 +1,158 @@
+"""Unit tests for the scheduler job runtime.
+
+Covers retry backoff, all-or-nothing concurrency slots (in memory and over
+Redis), fire claiming across replicas, and SchedulerEngine rescheduling a
+failed attempt as a one-shot trigger instead of sleeping. Runs on a
+file-backed SQLite database with Redis stubbed.
+"""
+
+import pytest
+from apscheduler.triggers.date import DateTrigger
+
+from app.models.scheduler import (
+    ConfigLevel,
+    JobStatus,
+    JobType,
+    SchedulerConfig,
+    SchedulerJob,
+    SchedulerJobExecution,
+    SchedulerJobLog,
+)
+from app.services import scheduler_runtime
+from app.services.scheduler_engine import SchedulerEngine
+from app.services.scheduler_runtime import ConcurrencyLimiter, backoff_delay, claim_fire
+
+pytestmark = pytest.mark.unit
+
+
+class _NoRedis:
+    def acquire_slot(self, key, member, limit, ttl_seconds):
+        return None
+
+    def acquire_lock(self, key, owner, ttl_seconds):
+        return None
+
+
+class _SharedRedis:
+    def __init__(self, free):
+        self.free = free
+        self.released = []
+
+    def acquire_slot(self, key, member, limit, ttl_seconds):
+        return self.free.get(key, True)
+
+    def release_slot(self, key, member):
+        self.released.append(key)
+        return True
+
+    def acquire_lock(self, key, owner, ttl_seconds):
+        return False
+
+
+class _InlinePool:
+    def submit(self, fn, *args):
+        fn(*args)
+
+
+def test_backoff_doubles_with_jitter_up_to_the_cap():
+    for attempt, ceiling in [(0, 10), (1, 20), (3, 80), (10, 300)]:
+        delay = backoff_delay(10, attempt, max_seconds=300)
+        assert ceiling / 2 <= delay <= ceiling
+
+
+def test_local_slots_are_all_or_nothing(monkeypatch):
+    monkeypatch.setattr(scheduler_runtime, "get_redis", lambda: _NoRedis())
+    limiter = ConcurrencyLimiter()
+    limits = [("global", 3), ("tenant:a", 1)]
+
+    assert limiter.acquire(limits, "run-1", 60)
+    assert not limiter.acquire(limits, "run-2", 60)
+    # The global slot taken before the tenant slot was refused is given back
+    assert limiter.in_use("global") == 1
+
+    limiter.release("run-1")
+    assert limiter.acquire(limits, "run-2", 60)
+    assert limiter.acquire([("global", 3), ("tenant:b", None)], "run-3", 60)
+
+
+def test_shared_slots_are_released_in_redis(monkeypatch):
+    redis = _SharedRedis({"tenant:a": False})
+    monkeypatch.setattr(scheduler_runtime, "get_redis", lambda: redis)
+    limiter = ConcurrencyLimiter()
+
+    assert not limiter.acquire([("global", 3), ("tenant:a", 1)], "run-1", 60)
+    assert redis.released == ["global"]
+    assert not claim_fire("job-1", "worker-a", 30)
+
+    monkeypatch.setattr(scheduler_runtime, "get_redis", lambda: _NoRedis())
+    assert claim_fire("job-1", "worker-a", 30)
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    monkeypatch.setattr(scheduler_runtime, "get_redis", lambda: _NoRedis())
+    scheduler_engine = SchedulerEngine(db_url=f"sqlite:///{tmp_path / 'scheduler.db'}")
+    for model in (SchedulerConfig, SchedulerJob, SchedulerJobExecution, SchedulerJobLog):
+        model.__table__.create(scheduler_engine.engine)
+    scheduler_engine.pool = _InlinePool()
+    return scheduler_engine
+
+
+def _job(engine, **overrides):
+    db = engine.SessionLocal()
+    config = SchedulerConfig(config_level=ConfigLevel.SYSTEM, name="system", max_concurrent_jobs=2, retry_delay_seconds=60)
+    db.add(config)
+    db.flush()
+    values = dict(
+        config_id=config.id, job_type=JobType.CUSTOM, name="flaky", handler_class="flaky", max_retries=2, run_count=0
+    )
+    values.update(overrides)
+    job = SchedulerJob(success_count=0, failure_count=0, **values)
+    db.add(job)
+    db.commit()
+    job_id = job.id
+    db.close()
+    return job_id
+
+
+def test_failed_attempt_is_rescheduled_as_a_one_shot_trigger(engine):
+    outcomes = [RuntimeError("upstream down"), {"ok": True}]
+
+    def flaky(db, job, execution_id):
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    engine.register_handler("flaky", flaky)
+    job_id = _job(engine)
+
+    engine._start_execution(job_id)
+
+    db = engine.SessionLocal()
+    execution = db.query(SchedulerJobExecution).one()
+    assert execution.status == JobStatus.PENDING
+    retry = engine.scheduler.get_job(f"retry_{execution.id}")
+    assert isinstance(retry.trigger, DateTrigger) and retry.args == (job_id, execution.id, 1)
+    assert engine.limiter.in_use(scheduler_runtime.GLOBAL_SLOT) == 0
+
+    engine._retry_execution(*retry.args)
+
+    db.expire_all()
+    execution = db.query(SchedulerJobExecution).one()
+    assert execution.status == JobStatus.COMPLETED and execution.retry_count == 1
+    assert execution.result_data == {"ok": True}
+    db.close()
+
+
+def test_fire_is_skipped_when_tenant_slots_are_taken(engine):
+    engine.register_handler("flaky", lambda db, job, execution_id: {"ok": True})
+    job_id = _job(engine)
+    engine.limiter.acquire([(scheduler_runtime.tenant_slot(None), 2)], "other-1", 60)
+    engine.limiter.acquire([(scheduler_runtime.tenant_slot(None), 2)], "other-2", 60)
+
+    engine._execute_job(job_id)
+
+    db = engine.SessionLocal()
+    assert db.query(SchedulerJobExecution).count() == 0
+    db.close()
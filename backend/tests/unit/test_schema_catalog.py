@@ -0,0 +1,91 @@
+"""Unit tests for the schema catalog cache.
+
+Runs on SQLite, which exercises the SQLAlchemy-inspection loader; the
+caching, expiry and commit-time invalidation logic is dialect independent.
+"""
+
+import json
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.core import schema_catalog as schema_catalog_module
+from app.core.schema_catalog import SchemaCatalog, invalidate_after_commit
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    session = sessionmaker(bind=engine)()
+    session.execute(text("CREATE TABLE customers (id INTEGER PRIMARY KEY, name VARCHAR(80) NOT NULL, email TEXT)"))
+    session.execute(text("CREATE UNIQUE INDEX ix_customers_email ON customers (email)"))
+    session.commit()
+    yield session
+    session.close()
+
+
+def test_columns_and_indexes_are_loaded_per_schema(db):
+    catalog = SchemaCatalog(ttl_seconds=300)
+
+    columns = catalog.get_columns(db, "customers")
+    assert list(columns) == ["id", "name", "email"]
+    assert columns["name"]["is_nullable"] is False
+    assert columns["name"]["character_maximum_length"] == 80
+    assert catalog.get_column_names(db, "customers") == {"id", "name", "email"}
+    assert catalog.get_indexes(db, "customers") == {"ix_customers_email": {"columns": ["email"], "is_unique": True}}
+    assert catalog.get_column_names(db, "missing") == frozenset()
+    assert not catalog.table_exists(db, "missing")
+
+    assert catalog.get_stats()["loads"] == 1
+
+
+def test_snapshot_is_reused_until_invalidated(db):
+    catalog = SchemaCatalog(ttl_seconds=300)
+    catalog.get_column_names(db, "customers")
+
+    db.execute(text("ALTER TABLE customers ADD COLUMN phone TEXT"))
+    assert "phone" not in catalog.get_column_names(db, "customers")
+
+    catalog.invalidate("public")
+    assert "phone" in catalog.get_column_names(db, "customers")
+    assert catalog.get_stats()["loads"] == 2
+
+
+def test_expired_snapshot_is_reloaded(db):
+    catalog = SchemaCatalog(ttl_seconds=0)
+    catalog.get_column_names(db, "customers")
+    catalog.get_column_names(db, "customers")
+
+    assert catalog.get_stats()["loads"] == 2
+
+
+def test_invalidation_applies_on_commit_only(db, monkeypatch):
+    catalog = SchemaCatalog(ttl_seconds=300)
+    monkeypatch.setattr(schema_catalog_module, "_schema_catalog", catalog)
+    catalog.get_column_names(db, "customers")
+
+    # pysqlite runs DDL outside the transaction; only the invalidation bookkeeping is under test
+    db.execute(text("CREATE TABLE orders (id INTEGER PRIMARY KEY)"))
+    invalidate_after_commit(db)
+    db.rollback()
+    db.commit()
+    assert not catalog.table_exists(db, "orders")
+
+    invalidate_after_commit(db)
+    assert not catalog.table_exists(db, "orders")
+    db.commit()
+    assert catalog.table_exists(db, "orders")
+
+
+def test_remote_invalidation_message(db):
+    catalog = SchemaCatalog(ttl_seconds=300)
+    catalog.get_column_names(db, "customers")
+
+    catalog._on_remote_invalidation("not json")
+    assert catalog.get_stats()["schemas"] == {"public": 1}
+
+    catalog._on_remote_invalidation(json.dumps({"schema": "public"}))
+    assert catalog.get_stats()["schemas"] == {}
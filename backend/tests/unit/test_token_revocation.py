@@ -0,0 +1,101 @@
+"""Unit tests for the revoked-JTI negative cache used by get_current_user.
+
+Covers the bloom filter (no false negatives), answering "not revoked" without
+touching Redis or the database, the exact fallback for filter hits, periodic
+re-sync from ``token_blacklist`` and immediate local revocation.
+
+Runs on in-memory SQLite with Redis stubbed out as unavailable.
+"""
+
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.core import token_revocation
+from app.core.token_revocation import BloomFilter, RevocationChecker
+from app.models.token_blacklist import TokenBlacklist
+
+pytestmark = pytest.mark.unit
+
+
+class _NoRedis:
+    def is_token_revoked(self, jti):
+        return False
+
+    def revoke_token(self, jti, expires_in):
+        return False
+
+    def subscribe(self, channel, handler):
+        return False
+
+
+@pytest.fixture(autouse=True)
+def no_redis(monkeypatch):
+    monkeypatch.setattr(token_revocation, "get_redis", lambda: _NoRedis())
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    TokenBlacklist.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    session.statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: session.statements.append(args[2]))
+    yield session
+    session.close()
+
+
+def _blacklist(db, jti, expires_in=timedelta(hours=1)):
+    db.add(TokenBlacklist(jti=jti, user_id="u1", token_type="access", expires_at=datetime.utcnow() + expires_in))
+    db.commit()
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000)
+    items = [str(uuid.uuid4()) for _ in range(1000)]
+    for item in items:
+        bloom.add(item)
+
+    assert all(item in bloom for item in items)
+    false_positives = sum(str(uuid.uuid4()) in bloom for _ in range(10000))
+    assert false_positives < 100  # sized for 0.1%
+
+
+def test_unrevoked_token_needs_no_lookup_once_synced(db):
+    checker = RevocationChecker(sync_seconds=60, capacity=100)
+    _blacklist(db, "revoked-jti")
+
+    assert checker.is_revoked("revoked-jti", db) is True
+    db.statements.clear()
+
+    assert checker.is_revoked(str(uuid.uuid4()), db) is False
+    assert db.statements == []
+
+
+def test_expired_rows_are_not_loaded(db):
+    checker = RevocationChecker(sync_seconds=60, capacity=100)
+    _blacklist(db, "old-jti", expires_in=timedelta(hours=-1))
+
+    assert checker.is_revoked("old-jti", db) is False
+
+
+def test_local_revocation_is_immediate(db):
+    checker = RevocationChecker(sync_seconds=60, capacity=100)
+    assert checker.is_revoked("jti-1", db) is False
+
+    _blacklist(db, "jti-1")
+    checker.revoke("jti-1", 3600)
+
+    assert checker.is_revoked("jti-1", db) is True
+
+
+def test_other_workers_revocations_appear_after_resync(db):
+    checker = RevocationChecker(sync_seconds=0, capacity=100)
+    assert checker.is_revoked("jti-2", db) is False
+
+    _blacklist(db, "jti-2")  # committed by another worker, never published
+
+    assert checker.is_revoked("jti-2", db) is True
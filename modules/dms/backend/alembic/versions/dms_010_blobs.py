@@ -0,0 +1,58 @@
+"""Content-addressed, deduplicated blob storage.
+
+Adds dms_blobs (tenant-scoped, RLS): one row per distinct SHA-256 within a
+tenant with the number of version rows referencing it, and records each
+version's (and each document's current) content hash. Existing versions keep
+their per-version objects and a NULL hash; they are not reference-counted.
+
+Revision ID: dms_010
+Revises: dms_009
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "dms_010"
+down_revision = "dms_009"
+branch_labels = None
+depends_on = None
+
+
+def _tenant_rls(table: str) -> None:
+    op.execute(f"ALTER TABLE {table} ENABLE ROW LEVEL SECURITY")
+    op.execute(f"ALTER TABLE {table} FORCE ROW LEVEL SECURITY")
+    op.execute(
+        f"""
+        CREATE POLICY {table}_tenant_isolation ON {table}
+        USING (tenant_id = current_setting('app.tenant_id', true)::uuid)
+        WITH CHECK (tenant_id = current_setting('app.tenant_id', true)::uuid)
+        """
+    )
+
+
+def upgrade() -> None:
+    op.create_table(
+        "dms_blobs",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("tenant_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("sha256", sa.String(length=64), nullable=False),
+        sa.Column("storage_key", sa.Text(), nullable=False),
+        sa.Column("size_bytes", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("ref_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("now()")),
+        # Dedup lookups and ON CONFLICT upserts go through this constraint.
+        sa.UniqueConstraint("tenant_id", "sha256", name="uq_dms_blobs_tenant_sha256"),
+    )
+    op.create_index("ix_dms_blobs_tenant_id", "dms_blobs", ["tenant_id"])
+    _tenant_rls("dms_blobs")
+
+    op.add_column("dms_document_versions", sa.Column("content_sha256", sa.String(length=64), nullable=True))
+    op.add_column("dms_documents", sa.Column("content_sha256", sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("dms_documents", "content_sha256")
+    op.drop_column("dms_document_versions", "content_sha256")
+    op.execute("DROP POLICY IF EXISTS dms_blobs_tenant_isolation ON dms_blobs")
+    op.drop_table("dms_blobs")
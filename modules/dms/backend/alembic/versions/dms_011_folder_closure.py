@@ -0,0 +1,72 @@
+"""Folder closure table for single-query ancestry and subtrees.
+
+Adds dms_folder_closure (tenant-scoped, RLS): one row per (ancestor,
+descendant) pair of dms_folders, each folder included as its own ancestor at
+depth 0. Backfilled from parent_id with a recursive walk; maintained by
+FolderService from here on.
+
+Revision ID: dms_011
+Revises: dms_010
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "dms_011"
+down_revision = "dms_010"
+branch_labels = None
+depends_on = None
+
+
+def _tenant_rls(table: str) -> None:
+    op.execute(f"ALTER TABLE {table} ENABLE ROW LEVEL SECURITY")
+    op.execute(f"ALTER TABLE {table} FORCE ROW LEVEL SECURITY")
+    op.execute(
+        f"""
+        CREATE POLICY {table}_tenant_isolation ON {table}
+        USING (tenant_id = current_setting('app.tenant_id', true)::uuid)
+        WITH CHECK (tenant_id = current_setting('app.tenant_id', true)::uuid)
+        """
+    )
+
+
+def upgrade() -> None:
+    op.create_table(
+        "dms_folder_closure",
+        sa.Column(
+            "ancestor_id", postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("dms_folders.id", ondelete="CASCADE"), nullable=False,
+        ),
+        sa.Column(
+            "descendant_id", postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("dms_folders.id", ondelete="CASCADE"), nullable=False,
+        ),
+        sa.Column("tenant_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("depth", sa.Integer(), nullable=False),
+        # (ancestor, descendant) doubles as the subtree index.
+        sa.PrimaryKeyConstraint("ancestor_id", "descendant_id"),
+    )
+    op.create_index(
+        "ix_dms_folder_closure_descendant", "dms_folder_closure", ["descendant_id", "depth"]
+    )
+    # Backfill before RLS is forced: walk down from every folder. Moves already
+    # refuse cycles, so the recursion terminates.
+    op.execute(
+        """
+        INSERT INTO dms_folder_closure (ancestor_id, descendant_id, tenant_id, depth)
+        WITH RECURSIVE walk(ancestor_id, descendant_id, tenant_id, depth) AS (
+            SELECT id, id, tenant_id, 0 FROM dms_folders
+            UNION ALL
+            SELECT w.ancestor_id, f.id, f.tenant_id, w.depth + 1
+            FROM walk w JOIN dms_folders f ON f.parent_id = w.descendant_id
+        )
+        SELECT ancestor_id, descendant_id, tenant_id, depth FROM walk
+        """
+    )
+    _tenant_rls("dms_folder_closure")
+
+
+def downgrade() -> None:
+    op.execute("DROP POLICY IF EXISTS dms_folder_closure_tenant_isolation ON dms_folder_closure")
+    op.drop_table("dms_folder_closure")
@@ -0,0 +1,67 @@
+"""E2 Search: extracted document content.
+
+Adds dms_document_content (tenant-scoped, RLS): per document, the weighted
+tsvector of its extracted text and the extraction state, doubling as the
+content indexer's work queue. Existing documents are queued with
+`python -m app.workers.content_indexer backfill`.
+
+Revision ID: dms_012
+Revises: dms_011
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "dms_012"
+down_revision = "dms_011"
+branch_labels = None
+depends_on = None
+
+
+def _tenant_rls(table: str) -> None:
+    op.execute(f"ALTER TABLE {table} ENABLE ROW LEVEL SECURITY")
+    op.execute(f"ALTER TABLE {table} FORCE ROW LEVEL SECURITY")
+    op.execute(
+        f"""
+        CREATE POLICY {table}_tenant_isolation ON {table}
+        USING (tenant_id = current_setting('app.tenant_id', true)::uuid)
+        WITH CHECK (tenant_id = current_setting('app.tenant_id', true)::uuid)
+        """
+    )
+
+
+def upgrade() -> None:
+    op.create_table(
+        "dms_document_content",
+        sa.Column(
+            "document_id", postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("dms_documents.id", ondelete="CASCADE"), primary_key=True,
+        ),
+        sa.Column("tenant_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("storage_key", sa.Text(), nullable=False),
+        sa.Column("status", sa.String(length=16), nullable=False, server_default="pending"),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("content_vector", postgresql.TSVECTOR(), nullable=True),
+        sa.Column("content_chars", sa.Integer(), nullable=True),
+        sa.Column("queued_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("now()")),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("indexed_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index("ix_dms_document_content_tenant_id", "dms_document_content", ["tenant_id"])
+    op.create_index(
+        "ix_dms_document_content_search", "dms_document_content", ["content_vector"],
+        postgresql_using="gin",
+    )
+    # The indexer claims the oldest queued (or stale in-flight) rows.
+    op.execute(
+        "CREATE INDEX ix_dms_document_content_queue ON dms_document_content (queued_at) "
+        "WHERE status IN ('pending', 'processing')"
+    )
+    _tenant_rls("dms_document_content")
+
+
+def downgrade() -> None:
+    op.execute("DROP POLICY IF EXISTS dms_document_content_tenant_isolation ON dms_document_content")
+    op.drop_table("dms_document_content")
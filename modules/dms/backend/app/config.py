@@ -48,8 +48,41 @@ class Settings:
     )
     PRESIGN_EXPIRY_SECONDS: int = int(os.getenv("PRESIGN_EXPIRY_SECONDS", "900"))
 
+    # Folder zip downloads stream blobs through in chunks of this size, fetching up
+    # to ZIP_PREFETCH_WINDOW documents ahead (memory per download stays around
+    # window * (ZIP_PREFETCH_CHUNKS + 1) * chunk size, ~3 MB with the defaults).
+    DOWNLOAD_CHUNK_BYTES: int = int(os.getenv("DOWNLOAD_CHUNK_BYTES", str(256 * 1024)))
+    ZIP_PREFETCH_WINDOW: int = int(os.getenv("ZIP_PREFETCH_WINDOW", "4"))
+    ZIP_PREFETCH_CHUNKS: int = int(os.getenv("ZIP_PREFETCH_CHUNKS", "2"))
+
     # Upload limits (E1: admin-configurable per workspace later; global default here)
     MAX_UPLOAD_BYTES: int = int(os.getenv("MAX_UPLOAD_BYTES", str(100 * 1024 * 1024)))
+    # Uploads are hashed in UPLOAD_CHUNK_BYTES reads; bodies larger than
+    # MULTIPART_THRESHOLD_BYTES go to the object store as a multipart upload of
+    # MULTIPART_PART_BYTES parts (S3 minimum 5 MiB), so one part is held in memory.
+    UPLOAD_CHUNK_BYTES: int = int(os.getenv("UPLOAD_CHUNK_BYTES", str(1024 * 1024)))
+    MULTIPART_THRESHOLD_BYTES: int = int(os.getenv("MULTIPART_THRESHOLD_BYTES", str(8 * 1024 * 1024)))
+    MULTIPART_PART_BYTES: int = int(os.getenv("MULTIPART_PART_BYTES", str(8 * 1024 * 1024)))
+
+    # Content indexing: text of uploaded PDF/DOCX/XLSX/plain-text documents is
+    # extracted off the request path by the content indexer and searched alongside
+    # the metadata. Parsing runs in EXTRACT_PROCESSES worker processes. Set
+    # CONTENT_INDEXER_ENABLED=false to run it standalone instead
+    # (`python -m app.workers.content_indexer`).
+    CONTENT_INDEXER_ENABLED: bool = os.getenv("CONTENT_INDEXER_ENABLED", "true").lower() == "true"
+    EXTRACT_PROCESSES: int = int(os.getenv("EXTRACT_PROCESSES", "2"))
+    EXTRACT_BATCH_SIZE: int = int(os.getenv("EXTRACT_BATCH_SIZE", "8"))
+    EXTRACT_POLL_SECONDS: float = float(os.getenv("EXTRACT_POLL_SECONDS", "5"))
+    EXTRACT_STALE_SECONDS: int = int(os.getenv("EXTRACT_STALE_SECONDS", "600"))
+    EXTRACT_MAX_ATTEMPTS: int = int(os.getenv("EXTRACT_MAX_ATTEMPTS", "3"))
+    # A failed extraction is retried after EXTRACT_RETRY_SECONDS x attempts so far
+    EXTRACT_RETRY_SECONDS: float = float(os.getenv("EXTRACT_RETRY_SECONDS", "60"))
+    # Larger blobs are not extracted; text beyond EXTRACT_MAX_CHARS is not indexed
+    # (a tsvector is capped at 1 MB). DOCX/XLSX whose XML parts inflate past
+    # EXTRACT_MAX_XML_BYTES fail instead of being parsed.
+    EXTRACT_MAX_BYTES: int = int(os.getenv("EXTRACT_MAX_BYTES", str(50 * 1024 * 1024)))
+    EXTRACT_MAX_CHARS: int = int(os.getenv("EXTRACT_MAX_CHARS", "500000"))
+    EXTRACT_MAX_XML_BYTES: int = int(os.getenv("EXTRACT_MAX_XML_BYTES", str(100 * 1024 * 1024)))
 
     CORS_ORIGINS: List[str] = ["http://localhost:8080", "http://localhost:3000"]
     DEBUG: bool = os.getenv("DEBUG", "true").lower() == "true"
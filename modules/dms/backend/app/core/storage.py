@@ -1,6 +1,8 @@
 """S3-compatible blob storage (MinIO in dev, S3/Azure/MinIO in prod).
 
-Blobs are addressed by `{tenant_id}/{document_id}/{version}` so a tenant's
+Blobs are content-addressed as `{tenant_id}/sha256/{digest}` (identical uploads
+within a tenant share one object; see BlobService). Versions stored before that
+keep their `{tenant_id}/{document_id}/{version}` key. Either way a tenant's
 objects share a key prefix — isolation is enforced in code (every call is made
 under a resolved tenant) and mirrored by the DB RLS on the metadata rows.
 
@@ -8,6 +10,8 @@ boto3 is synchronous; calls are dispatched to a threadpool so they never block
 the event loop.
 """
 
+from typing import AsyncIterator, BinaryIO
+
 import boto3
 from botocore.client import Config
 from botocore.exceptions import ClientError
@@ -15,6 +19,10 @@ from fastapi.concurrency import run_in_threadpool
 
 from ..config import settings
 
+# S3 limits: parts other than the last are at least 5 MiB; at most 10,000 parts.
+_MIN_PART_BYTES = 5 * 1024 * 1024
+_MAX_PARTS = 10_000
+
 
 def _client(endpoint_url: str):
     return boto3.client(
@@ -47,8 +55,8 @@ class StorageService:
         await run_in_threadpool(self._ensure_bucket_sync)
 
     @staticmethod
-    def object_key(tenant_id: str, document_id: str, version: int) -> str:
-        return f"{tenant_id}/{document_id}/{version}"
+    def content_key(tenant_id: str, sha256: str) -> str:
+        return f"{tenant_id}/sha256/{sha256}"
 
     async def put(self, key: str, data: bytes, content_type: str) -> None:
         await run_in_threadpool(
@@ -57,6 +65,44 @@ class StorageService:
             )
         )
 
+    def _put_file_sync(self, key: str, fileobj: BinaryIO, content_type: str, size: int) -> None:
+        if size <= settings.MULTIPART_THRESHOLD_BYTES:
+            self._s3.put_object(
+                Bucket=self._bucket, Key=key, Body=fileobj.read(), ContentType=content_type
+            )
+            return
+        part_size = max(settings.MULTIPART_PART_BYTES, _MIN_PART_BYTES, -(-size // _MAX_PARTS))
+        upload_id = self._s3.create_multipart_upload(
+            Bucket=self._bucket, Key=key, ContentType=content_type
+        )["UploadId"]
+        parts = []
+        try:
+            while True:
+                data = fileobj.read(part_size)
+                if not data:
+                    break
+                resp = self._s3.upload_part(
+                    Bucket=self._bucket, Key=key, UploadId=upload_id,
+                    PartNumber=len(parts) + 1, Body=data,
+                )
+                parts.append({"PartNumber": len(parts) + 1, "ETag": resp["ETag"]})
+            self._s3.complete_multipart_upload(
+                Bucket=self._bucket, Key=key, UploadId=upload_id,
+                MultipartUpload={"Parts": parts},
+            )
+        except Exception:
+            # Uploaded parts are billed until the upload is aborted.
+            self._s3.abort_multipart_upload(Bucket=self._bucket, Key=key, UploadId=upload_id)
+            raise
+
+    async def put_file(self, key: str, fileobj: BinaryIO, content_type: str, size: int) -> None:
+        """Upload `size` bytes read from `fileobj`'s current position.
+
+        Small bodies go in one put; larger ones as a multipart upload, one part in
+        memory at a time.
+        """
+        await run_in_threadpool(self._put_file_sync, key, fileobj, content_type, size)
+
     async def delete(self, key: str) -> None:
         await run_in_threadpool(
             lambda: self._s3.delete_object(Bucket=self._bucket, Key=key)
@@ -67,9 +113,26 @@ class StorageService:
         return resp["Body"].read()
 
     async def get_bytes(self, key: str) -> bytes:
-        """Fetch a blob's bytes server-side (used to assemble zip archives)."""
+        """Fetch a blob's bytes server-side."""
         return await run_in_threadpool(self._get_bytes_sync, key)
 
+    def _open_body_sync(self, key: str):
+        return self._s3.get_object(Bucket=self._bucket, Key=key)["Body"]
+
+    async def stream(
+        self, key: str, chunk_size: int = settings.DOWNLOAD_CHUNK_BYTES
+    ) -> AsyncIterator[bytes]:
+        """Yield a blob's bytes chunk by chunk (only one chunk is held at a time)."""
+        body = await run_in_threadpool(self._open_body_sync, key)
+        try:
+            while True:
+                chunk = await run_in_threadpool(body.read, chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            body.close()
+
     async def presigned_get_url(
         self, key: str, filename: str, content_type: str
     ) -> str:
@@ -2,8 +2,8 @@
 
 Runs independently on port 9003, behind the platform nginx which forwards
 `/api/v1/dms/...` (and the Authorization header) here. On startup it ensures the
-storage bucket exists and registers its manifest with the core platform so RBAC
-permissions and menu items get seeded.
+storage bucket exists, registers its manifest with the core platform so RBAC
+permissions and menu items get seeded, and starts the content indexer.
 """
 
 import asyncio
@@ -19,6 +19,7 @@ from fastapi.responses import JSONResponse
 from .config import settings
 from .core.storage import storage
 from .routers import acls, approvals, audit, documents, expiry, folders, search, shares
+from .workers.content_indexer import ContentIndexer
 
 MANIFEST_PATH = Path(settings.MANIFEST_PATH)
 
@@ -62,7 +63,13 @@ async def lifespan(app: FastAPI):
         print(f"[dms] WARNING: could not ensure storage bucket: {e}")
     # Fire-and-forget registration so a slow/absent core doesn't block startup.
     asyncio.create_task(register_with_core_platform())
+    # Content extraction for search (parsing itself runs in a process pool).
+    indexer = ContentIndexer.from_settings() if settings.CONTENT_INDEXER_ENABLED else None
+    if indexer is not None:
+        indexer.start()
     yield
+    if indexer is not None:
+        await indexer.stop()
     print("[dms] shutting down")
 
 
@@ -1,12 +1,14 @@
 from .acl import DmsAcl
 from .audit import DmsAuditLog
+from .blob import DmsBlob
+from .content import DmsDocumentContent
 from .document import Document
-from .folder import Folder
+from .folder import Folder, FolderClosure
 from .saved_search import DmsSavedSearch
 from .share import DmsShare
 from .version import DocumentVersion
 
 __all__ = [
-    "Document", "Folder", "DocumentVersion", "DmsAuditLog", "DmsShare", "DmsAcl",
-    "DmsSavedSearch",
+    "Document", "Folder", "FolderClosure", "DocumentVersion", "DmsAuditLog", "DmsShare", "DmsAcl",
+    "DmsSavedSearch", "DmsBlob", "DmsDocumentContent",
 ]
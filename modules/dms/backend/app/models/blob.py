@@ -0,0 +1,30 @@
+"""Content-addressed blob model (deduplicated storage).
+
+One row per distinct file content within a tenant, keyed by its SHA-256. Every
+document version storing that content holds one reference; the object behind
+`storage_key` is shared by all of them. Bookkeeping lives in BlobService.
+"""
+
+import uuid
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Column, DateTime, Integer, String, Text, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
+
+from ..core.database import Base
+
+
+class DmsBlob(Base):
+    __tablename__ = "dms_blobs"
+    __table_args__ = (
+        UniqueConstraint("tenant_id", "sha256", name="uq_dms_blobs_tenant_sha256"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    tenant_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    sha256 = Column(String(64), nullable=False)
+    storage_key = Column(Text, nullable=False)
+    size_bytes = Column(BigInteger, nullable=False, default=0)
+    # Version rows referencing this content; the object is removable at zero.
+    ref_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
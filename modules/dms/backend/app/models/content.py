@@ -0,0 +1,36 @@
+"""Extracted document content for full-text search (and its work queue).
+
+One row per document: the blob the text was (or is to be) extracted from, the
+weighted tsvector of that text, and the extraction state. A row in `pending`
+is a queued job for the content indexer (app/workers/content_indexer.py).
+"""
+
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
+
+from ..core.database import Base
+
+# pending -> processing -> indexed | unsupported | failed (or back to pending to retry)
+CONTENT_STATUSES = ("pending", "processing", "indexed", "unsupported", "failed")
+
+
+class DmsDocumentContent(Base):
+    __tablename__ = "dms_document_content"
+
+    document_id = Column(
+        UUID(as_uuid=True), ForeignKey("dms_documents.id", ondelete="CASCADE"), primary_key=True
+    )
+    tenant_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    # Blob of the document's current version at enqueue time; a newer version
+    # re-queues the row, and a stale extraction is then discarded.
+    storage_key = Column(Text, nullable=False)
+    status = Column(String(16), nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    error = Column(Text, nullable=True)
+    content_vector = Column(TSVECTOR, nullable=True)
+    content_chars = Column(Integer, nullable=True)
+    queued_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    indexed_at = Column(DateTime(timezone=True), nullable=True)
@@ -30,6 +30,8 @@ class Document(Base):
 
     # Blob location in the object store (bucket key of the current version).
     storage_key = Column(Text, nullable=False)
+    # SHA-256 of the current version's content (null if stored before dedup).
+    content_sha256 = Column(String(64), nullable=True)
 
     # Free-form tags (GIN-indexed) and arbitrary custom metadata. `doc_metadata`
     # rather than `metadata` — the latter is reserved by SQLAlchemy's declarative
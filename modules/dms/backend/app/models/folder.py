@@ -1,9 +1,15 @@
-"""Nested folder model (E1 F1.3)."""
+"""Nested folder model (E1 F1.3) and its closure table.
+
+`parent_id` is the source of truth for the tree; `dms_folder_closure` holds one
+row per (ancestor, descendant) pair — including each folder with itself at
+depth 0 — so ancestry, descendant checks and subtrees are single indexed
+queries. FolderService keeps it in step on create and move.
+"""
 
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, String
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, Integer, String
 from sqlalchemy.dialects.postgresql import UUID
 
 from ..core.database import Base
@@ -25,3 +31,20 @@ class Folder(Base):
     updated_at = Column(
         DateTime(timezone=True), nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow
     )
+
+
+class FolderClosure(Base):
+    __tablename__ = "dms_folder_closure"
+    __table_args__ = (
+        # Ancestry of a folder (nearest first); the primary key serves subtrees.
+        Index("ix_dms_folder_closure_descendant", "descendant_id", "depth"),
+    )
+
+    ancestor_id = Column(
+        UUID(as_uuid=True), ForeignKey("dms_folders.id", ondelete="CASCADE"), primary_key=True
+    )
+    descendant_id = Column(
+        UUID(as_uuid=True), ForeignKey("dms_folders.id", ondelete="CASCADE"), primary_key=True
+    )
+    tenant_id = Column(UUID(as_uuid=True), nullable=False)
+    depth = Column(Integer, nullable=False)
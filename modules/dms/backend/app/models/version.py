@@ -22,6 +22,8 @@ class DocumentVersion(Base):
     content_type = Column(String(255), nullable=False)
     size_bytes = Column(BigInteger, nullable=False, default=0)
     storage_key = Column(Text, nullable=False)
+    # SHA-256 of the content (-> dms_blobs); null for versions stored before dedup.
+    content_sha256 = Column(String(64), nullable=True)
     uploaded_by = Column(UUID(as_uuid=True), nullable=True)
     change_comment = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
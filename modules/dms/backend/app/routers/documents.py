@@ -27,16 +27,6 @@ router = APIRouter()
 _DOC_ADMIN = "dms:document:delete:company"
 
 
-def _check_size(data: bytes) -> None:
-    if not data:
-        raise HTTPException(status.HTTP_400_BAD_REQUEST, "Empty file")
-    if len(data) > settings.MAX_UPLOAD_BYTES:
-        raise HTTPException(
-            status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-            f"File exceeds max size of {settings.MAX_UPLOAD_BYTES} bytes",
-        )
-
-
 async def _authorize_doc(db, principal: Principal, document: Document, need: str) -> None:
     """403 if the caller lacks `need` capability on a restricted document."""
     group_ids = await AclService.user_group_ids(db, principal.user_id)
@@ -67,15 +57,15 @@ async def upload_document(
     principal: Principal = Depends(require_permission("dms:document:write:company")),
     db: AsyncSession = Depends(tenant_session),
 ):
-    data = await file.read()
-    _check_size(data)
+    # Authorize before touching the body; size and emptiness are checked while
+    # the upload is hashed in chunks (DocumentError 413/400).
     await _authorize_folder(db, principal, folder_id, "edit")
     try:
         doc = await DocumentService.create(
             db, tenant_id=principal.tenant_id, user_id=principal.user_id,
             filename=file.filename or "untitled",
             content_type=file.content_type or "application/octet-stream",
-            data=data, folder_id=folder_id,
+            fileobj=file.file, folder_id=folder_id,
         )
     except DocumentError as e:
         raise HTTPException(e.status_code, str(e))
@@ -98,28 +88,19 @@ async def list_documents(
 ):
     skip = (page - 1) * page_size
     in_folder = folder_id is not None or root_only
+    # Restricted documents the caller cannot at least view are filtered in the
+    # query, so the page is full and the total exact.
+    visible = await AclService.document_filter(
+        db, tenant_id=principal.tenant_id, user_id=principal.user_id,
+        is_admin=principal.has_permission(_DOC_ADMIN),
+    )
     docs, total = await DocumentService.list(
         db, tenant_id=principal.tenant_id, folder_id=folder_id,
-        in_folder=in_folder, skip=skip, limit=page_size,
+        in_folder=in_folder, skip=skip, limit=page_size, visible=visible,
     )
-    # Hide restricted documents the caller cannot at least view. Filtering happens
-    # on the page after fetch; `total` is reduced by what was hidden here (so the
-    # count is approximate when private docs exist, but a private doc is never
-    # surfaced to an unauthorized caller).
-    group_ids = await AclService.user_group_ids(db, principal.user_id)
-    is_admin = principal.has_permission(_DOC_ADMIN)
-    visible = []
-    for d in docs:
-        allowed = await AclService.authorize_document(
-            db, tenant_id=principal.tenant_id, user_id=principal.user_id,
-            group_ids=group_ids, is_admin=is_admin, document=d, need="view",
-        )
-        if allowed:
-            visible.append(d)
-    total = max(0, total - (len(docs) - len(visible)))
     total_pages = (total + page_size - 1) // page_size if total else 0
     return DocumentListResponse(
-        documents=[DocumentResponse.model_validate(d) for d in visible],
+        documents=[DocumentResponse.model_validate(d) for d in docs],
         total=total, page=page, page_size=page_size, total_pages=total_pages,
     )
 
@@ -184,8 +165,6 @@ async def upload_new_version(
     principal: Principal = Depends(require_permission("dms:document:write:company")),
     db: AsyncSession = Depends(tenant_session),
 ):
-    data = await file.read()
-    _check_size(data)
     existing = await DocumentService.get(db, tenant_id=principal.tenant_id, document_id=document_id)
     if not existing:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Document not found")
@@ -195,7 +174,7 @@ async def upload_new_version(
             db, tenant_id=principal.tenant_id, user_id=principal.user_id,
             document_id=document_id, filename=file.filename or "untitled",
             content_type=file.content_type or "application/octet-stream",
-            data=data, change_comment=change_comment,
+            fileobj=file.file, change_comment=change_comment,
         )
     except DocumentError as e:
         raise HTTPException(e.status_code, str(e))
@@ -69,20 +69,15 @@ async def expiring_soon(
     principal: Principal = Depends(require_permission("dms:document:read:company")),
     db: AsyncSession = Depends(tenant_session),
 ):
+    # Hide restricted docs the caller cannot view.
+    visible = await AclService.document_filter(
+        db, tenant_id=principal.tenant_id, user_id=principal.user_id,
+        is_admin=principal.has_permission(_DOC_ADMIN),
+    )
     docs = await ExpiryService.list_expiring(
-        db, tenant_id=principal.tenant_id, within_days=within_days
+        db, tenant_id=principal.tenant_id, within_days=within_days, visible=visible,
     )
-    # Hide restricted docs the caller cannot view.
-    group_ids = await AclService.user_group_ids(db, principal.user_id)
-    is_admin = principal.has_permission(_DOC_ADMIN)
-    visible = []
-    for d in docs:
-        if await AclService.authorize_document(
-            db, tenant_id=principal.tenant_id, user_id=principal.user_id,
-            group_ids=group_ids, is_admin=is_admin, document=d, need="view",
-        ):
-            visible.append(d)
-    return [DocumentResponse.model_validate(d) for d in visible]
+    return [DocumentResponse.model_validate(d) for d in docs]
 
 
 @router.post("/scan")
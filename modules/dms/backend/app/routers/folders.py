@@ -1,7 +1,5 @@
 """Folder endpoints — mounted at {API_PREFIX}/folders (i.e. /api/v1/dms/folders)."""
 
-import io
-import zipfile
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
@@ -19,6 +17,7 @@ from ..schemas.folder import (
     FolderResponse,
     TemplateListResponse,
 )
+from ..services.acl_service import AclService
 from ..services.audit_service import AuditService
 from ..services.document_service import DocumentService
 from ..services.folder_service import (
@@ -26,9 +25,12 @@ from ..services.folder_service import (
     FolderError,
     FolderService,
 )
+from ..services.zip_stream import ZipEntry, safe_component, stream_zip, unique_name
 
 router = APIRouter()
 
+_DOC_ADMIN = "dms:document:delete:company"
+
 
 @router.get("/templates", response_model=TemplateListResponse)
 async def list_templates(
@@ -97,41 +99,45 @@ async def list_folders(
 @router.get("/{folder_id}/download")
 async def download_folder_zip(
     folder_id: str,
+    recursive: bool = Query(True, description="Include subfolders (as directories in the zip)"),
     principal: Principal = Depends(require_permission("dms:document:read:company")),
     db: AsyncSession = Depends(tenant_session),
 ):
-    """Download every document directly in a folder as a single zip archive."""
+    """Download a folder's documents as a zip archive, streamed while it is built."""
     folder = await FolderService.get(db, tenant_id=principal.tenant_id, folder_id=folder_id)
     if not folder:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Folder not found")
-    docs = await DocumentService.all_in_folder(
-        db, tenant_id=principal.tenant_id, folder_id=folder_id
+    if recursive:
+        folders = await FolderService.subtree(db, tenant_id=principal.tenant_id, folder_id=folder_id)
+    else:
+        folders = [(str(folder_id), [])]
+    paths = {fid: "".join(f"{safe_component(n)}/" for n in names) for fid, names in folders}
+    # Private documents the caller cannot view are left out of the archive.
+    visible = await AclService.document_filter(
+        db, tenant_id=principal.tenant_id, user_id=principal.user_id,
+        is_admin=principal.has_permission(_DOC_ADMIN),
+    )
+    docs = await DocumentService.all_in_folders(
+        db, tenant_id=principal.tenant_id, folder_ids=list(paths), visible=visible,
     )
 
-    buf = io.BytesIO()
+    entries = []
     seen: dict[str, int] = {}
-    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
-        for doc in docs:
-            data = await storage.get_bytes(doc.storage_key)
-            # De-duplicate names within the archive (Windows-friendly).
-            name = doc.filename
-            if name in seen:
-                seen[name] += 1
-                stem, _, ext = name.rpartition(".")
-                name = f"{stem} ({seen[name]}).{ext}" if ext else f"{name} ({seen[name]})"
-            else:
-                seen[name] = 0
-            zf.writestr(name, data)
-    buf.seek(0)
+    for doc in sorted(docs, key=lambda d: (paths[str(d.folder_id)], d.filename)):
+        name = unique_name(paths[str(doc.folder_id)] + safe_component(doc.filename), seen)
+        entries.append(ZipEntry(
+            name=name, storage_key=doc.storage_key, content_type=doc.content_type,
+            size_bytes=doc.size_bytes, modified=doc.updated_at,
+        ))
 
     await AuditService.safe_record(
         db, tenant_id=principal.tenant_id, actor_id=principal.user_id,
         action="folder.download", entity_type="folder", entity_id=str(folder_id),
-        detail={"documents": len(docs)},
+        detail={"documents": len(entries), "recursive": recursive},
     )
     safe = folder.name.replace('"', "")
     return StreamingResponse(
-        buf,
+        stream_zip(entries),
         media_type="application/zip",
         headers={"Content-Disposition": f'attachment; filename="{safe}.zip"'},
     )
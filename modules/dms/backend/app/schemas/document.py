@@ -49,6 +49,7 @@ class VersionResponse(BaseModel):
     filename: str
     content_type: str
     size_bytes: int
+    content_sha256: Optional[str] = None
     uploaded_by: Optional[UUID] = None
     change_comment: Optional[str] = None
     created_at: datetime
@@ -9,22 +9,55 @@ For a restricted resource, access requires one of:
     document or any ancestor folder (grants inherit down the tree).
 
 Capabilities are ordered view < edit < manage; a grant confers itself and below.
+
+`authorize_document` decides for one loaded document. Lists and search use
+`visibility_sql` instead: the same rules as one SQL predicate over a whole
+candidate set, so filtering, ordering and paging happen in the database.
 """
 
-from typing import List, Optional, Set
+from typing import Any, Dict, List, Optional, Tuple
 
 from sqlalchemy import and_, or_, select, text
+from sqlalchemy.sql.elements import TextClause
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..models.acl import CAPABILITY_RANK, DmsAcl
 from ..models.document import Document
-from ..models.folder import Folder
+from ..models.folder import Folder, FolderClosure
 
 VALID_RESOURCE_TYPES = {"folder", "document"}
 VALID_PRINCIPAL_TYPES = {"user", "group"}
 VALID_CAPABILITIES = set(CAPABILITY_RANK)
 
 
+# Capability -> rank as SQL, for comparing a grant against the needed capability.
+_RANK_SQL = "CASE a.capability " + " ".join(
+    f"WHEN '{cap}' THEN {rank}" for cap, rank in CAPABILITY_RANK.items()
+) + " ELSE 0 END"
+
+_PRINCIPAL_SQL = (
+    "((a.principal_type = 'user' AND a.principal_id = CAST(:acl_uid AS uuid)) "
+    "OR (a.principal_type = 'group' AND a.principal_id = ANY(CAST(:acl_gids AS uuid[]))))"
+)
+
+# Folders that are private or lie below a private folder, and folders where the
+# principal holds a sufficient grant on the folder or an ancestor. Each is one
+# indexed join over the folder closure table.
+_RESTRICTED_FOLDERS_SQL = """
+    SELECT c.descendant_id FROM dms_folder_closure c
+    JOIN dms_folders f ON f.id = c.ancestor_id
+    WHERE c.tenant_id = CAST(:acl_tid AS uuid) AND f.is_private
+"""
+_GRANTED_FOLDERS_SQL = f"""
+    SELECT c.descendant_id FROM dms_folder_closure c
+    JOIN dms_acls a
+      ON a.tenant_id = CAST(:acl_tid AS uuid) AND a.resource_type = 'folder'
+     AND a.resource_id = c.ancestor_id AND {_PRINCIPAL_SQL}
+     AND {_RANK_SQL} >= :acl_need
+    WHERE c.tenant_id = CAST(:acl_tid AS uuid)
+"""
+
+
 class AclError(Exception):
     def __init__(self, message: str, status_code: int = 400):
         super().__init__(message)
@@ -46,20 +79,19 @@ class AclService:
     async def ancestor_folder_ids(
         db: AsyncSession, *, tenant_id: str, folder_id: Optional[str]
     ) -> List[str]:
-        """folder_id and every ancestor up to the root (self-first)."""
-        out: List[str] = []
-        seen: Set[str] = set()
-        cur = folder_id
-        while cur and str(cur) not in seen:
-            seen.add(str(cur))
-            out.append(str(cur))
-            cur = await db.scalar(
-                select(Folder.parent_id).where(
-                    Folder.id == cur, Folder.tenant_id == tenant_id
-                )
+        """folder_id and every ancestor up to the root (self-first), in one
+        closure-table query."""
+        if not folder_id:
+            return []
+        rows = (
+            await db.execute(
+                select(FolderClosure.ancestor_id).where(
+                    FolderClosure.tenant_id == tenant_id,
+                    FolderClosure.descendant_id == folder_id,
+                ).order_by(FolderClosure.depth)
             )
-            cur = str(cur) if cur else None
-        return out
+        ).scalars().all()
+        return [str(r) for r in rows]
 
     @staticmethod
     async def _any_private(
@@ -77,6 +109,57 @@ class AclService:
         return found is not None
 
     # -- resolution ----------------------------------------------------------
+    @staticmethod
+    def visibility_sql(
+        *, tenant_id: str, user_id: str, group_ids: List[str], need: str = "view",
+        alias: str = "d",
+    ) -> Tuple[str, Dict[str, Any]]:
+        """SQL predicate (+ params) matching documents `alias` the principal may
+        act on with `need` — `authorize_document` for a whole set at once.
+
+        Admins bypass ACLs: callers skip the predicate for them.
+        """
+        sql = f"""(
+            {alias}.uploaded_by = CAST(:acl_uid AS uuid)
+            OR {alias}.folder_id IN ({_GRANTED_FOLDERS_SQL})
+            OR (NOT {alias}.is_private AND ({alias}.folder_id IS NULL
+                OR {alias}.folder_id NOT IN ({_RESTRICTED_FOLDERS_SQL})))
+            OR EXISTS (
+                SELECT 1 FROM dms_acls a
+                WHERE a.tenant_id = CAST(:acl_tid AS uuid) AND a.resource_type = 'document'
+                  AND a.resource_id = {alias}.id AND {_PRINCIPAL_SQL}
+                  AND {_RANK_SQL} >= :acl_need)
+        )"""
+        params = {
+            "acl_tid": str(tenant_id), "acl_uid": str(user_id),
+            "acl_gids": [str(g) for g in group_ids], "acl_need": CAPABILITY_RANK[need],
+        }
+        return sql, params
+
+    @staticmethod
+    def visibility_clause(
+        *, tenant_id: str, user_id: str, group_ids: List[str], need: str = "view",
+    ) -> TextClause:
+        """`visibility_sql` as a clause for ORM queries over Document."""
+        sql, params = AclService.visibility_sql(
+            tenant_id=tenant_id, user_id=user_id, group_ids=group_ids, need=need,
+            alias=Document.__tablename__,
+        )
+        return text(sql).bindparams(**params)
+
+    @staticmethod
+    async def document_filter(
+        db: AsyncSession, *, tenant_id: str, user_id: str, is_admin: bool,
+        need: str = "view",
+    ) -> Optional[TextClause]:
+        """The caller's `visibility_clause`, or None for admins (no filtering)."""
+        if is_admin:
+            return None
+        group_ids = await AclService.user_group_ids(db, user_id)
+        return AclService.visibility_clause(
+            tenant_id=tenant_id, user_id=user_id, group_ids=group_ids, need=need
+        )
+
     @staticmethod
     async def is_restricted(
         db: AsyncSession, *, tenant_id: str, document: Document
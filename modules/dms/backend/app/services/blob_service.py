@@ -0,0 +1,105 @@
+"""Upload ingest: streaming hash, size limits, deduplicated blob storage.
+
+An upload is read chunk by chunk (never whole into memory) to compute its
+SHA-256 and enforce the size limit as it goes. The content is then stored once
+per tenant under `{tenant_id}/sha256/{digest}`: if the tenant already holds
+that content, only the reference count in dms_blobs moves and nothing is sent
+to the object store; otherwise it is uploaded (multipart for large bodies).
+
+Every DocumentVersion row carrying a `content_sha256` holds one reference.
+Counts change with atomic UPDATE / INSERT .. ON CONFLICT statements, so no row
+lock is held while bytes are in flight. Two concurrent first uploads of the
+same content both write the same object (same key, same bytes) and both land
+on the one row. Version rows are never hard-deleted today (documents are
+soft-deleted), so references only grow; a purge would decrement them and may
+remove the object once a count reaches zero.
+"""
+
+import hashlib
+from dataclasses import dataclass
+from typing import BinaryIO, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..core.storage import storage
+from ..models.blob import DmsBlob
+
+
+class BlobError(Exception):
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+@dataclass
+class StoredBlob:
+    """Where an ingested upload's content lives."""
+
+    sha256: str
+    storage_key: str
+    size_bytes: int
+    deduplicated: bool
+
+
+def _hash_file(fileobj: BinaryIO, chunk_size: int, max_bytes: int) -> Tuple[str, int]:
+    """SHA-256 and size of a file, failing as soon as it grows past `max_bytes`."""
+    fileobj.seek(0)
+    digest = hashlib.sha256()
+    size = 0
+    while True:
+        chunk = fileobj.read(chunk_size)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > max_bytes:
+            raise BlobError(f"File exceeds max size of {max_bytes} bytes", 413)
+        digest.update(chunk)
+    if not size:
+        raise BlobError("Empty file", 400)
+    fileobj.seek(0)
+    return digest.hexdigest(), size
+
+
+class BlobService:
+    @staticmethod
+    async def ingest(
+        db: AsyncSession, *, tenant_id: str, fileobj: BinaryIO, content_type: str,
+    ) -> StoredBlob:
+        """Store an upload (deduplicated) and take one reference to its content.
+
+        `fileobj` is the upload's spooled file (`UploadFile.file`); it is read
+        twice at most — once to hash, once to upload content the tenant lacks.
+        """
+        sha256, size = await run_in_threadpool(
+            _hash_file, fileobj, settings.UPLOAD_CHUNK_BYTES, settings.MAX_UPLOAD_BYTES
+        )
+        existing = await BlobService.retain(db, tenant_id=tenant_id, sha256=sha256)
+        if existing is not None:
+            return StoredBlob(sha256, existing, size, deduplicated=True)
+
+        key = storage.content_key(str(tenant_id), sha256)
+        await storage.put_file(key, fileobj, content_type, size)
+        stmt = insert(DmsBlob).values(
+            tenant_id=tenant_id, sha256=sha256, storage_key=key, size_bytes=size, ref_count=1,
+        )
+        # A concurrent upload of the same content may have created the row meanwhile.
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_dms_blobs_tenant_sha256",
+            set_={"ref_count": DmsBlob.ref_count + 1},
+        ).returning(DmsBlob.storage_key)
+        key = (await db.execute(stmt)).scalar_one()
+        return StoredBlob(sha256, key, size, deduplicated=False)
+
+    @staticmethod
+    async def retain(db: AsyncSession, *, tenant_id: str, sha256: str) -> Optional[str]:
+        """Take one more reference to stored content; its key, or None if unknown."""
+        return await db.scalar(
+            update(DmsBlob)
+            .where(DmsBlob.tenant_id == tenant_id, DmsBlob.sha256 == sha256)
+            .values(ref_count=DmsBlob.ref_count + 1)
+            .returning(DmsBlob.storage_key)
+        )
@@ -0,0 +1,39 @@
+"""Queueing documents for content extraction (E2 search over content).
+
+Uploads, new versions and restores only record that the document's current blob
+needs (re-)indexing — a `pending` dms_document_content row written in the same
+transaction. Extraction itself runs in the content indexer, so it never slows
+the request down.
+"""
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.content import DmsDocumentContent
+from ..workers.content_indexer import notify_content_queued
+
+
+class ContentIndexService:
+    @staticmethod
+    async def enqueue(
+        db: AsyncSession, *, tenant_id: str, document_id, storage_key: str
+    ) -> None:
+        """Queue the document's blob at `storage_key` for extraction.
+
+        Re-queuing replaces the previous job; the indexed text of the older blob
+        stays searchable until the new one is indexed.
+        """
+        stmt = insert(DmsDocumentContent).values(
+            document_id=document_id, tenant_id=tenant_id, storage_key=storage_key,
+            status="pending", attempts=0,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[DmsDocumentContent.document_id],
+            set_={
+                "storage_key": storage_key, "status": "pending", "attempts": 0,
+                "error": None, "queued_at": func.now(),
+            },
+        )
+        await db.execute(stmt)
+        notify_content_queued()
@@ -6,15 +6,18 @@ and additionally filters by `tenant_id` in code (defense-in-depth — the platfo
 """
 
 import uuid
-from typing import List, Optional, Tuple
+from typing import BinaryIO, List, Optional, Tuple
 
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
 
 from ..core.storage import storage
 from ..models.document import Document
 from ..models.folder import Folder
 from ..models.version import DocumentVersion
+from .blob_service import BlobError, BlobService, StoredBlob
+from .content_service import ContentIndexService
 
 
 def _dedupe(tags: List[str]) -> List[str]:
@@ -35,13 +38,27 @@ class DocumentError(Exception):
         self.status_code = status_code
 
 
+async def _ingest(db: AsyncSession, tenant_id: str, fileobj: BinaryIO, content_type: str) -> StoredBlob:
+    try:
+        return await BlobService.ingest(
+            db, tenant_id=tenant_id, fileobj=fileobj, content_type=content_type
+        )
+    except BlobError as e:
+        raise DocumentError(str(e), e.status_code)
+
+
 class DocumentService:
     # -- creation ------------------------------------------------------------
     @staticmethod
     async def create(
         db: AsyncSession, *, tenant_id: str, user_id: Optional[str], filename: str,
-        content_type: str, data: bytes, folder_id: Optional[str] = None,
+        content_type: str, fileobj: BinaryIO, folder_id: Optional[str] = None,
     ) -> Document:
+        """Store an upload as a new document (version 1).
+
+        `fileobj` is read in chunks: the content is hashed, size-checked and
+        stored once per tenant (see BlobService), never held whole in memory.
+        """
         if folder_id is not None:
             exists = await db.scalar(
                 select(Folder.id).where(
@@ -53,23 +70,27 @@ class DocumentService:
             if not exists:
                 raise DocumentError("Target folder not found", 404)
 
-        doc_id = uuid.uuid4()
-        key = storage.object_key(str(tenant_id), str(doc_id), 1)
-        await storage.put(key, data, content_type)
-
         ct = content_type or "application/octet-stream"
+        blob = await _ingest(db, tenant_id, fileobj, ct)
+
+        doc_id = uuid.uuid4()
         doc = Document(
             id=doc_id, tenant_id=tenant_id, folder_id=folder_id, filename=filename,
-            content_type=ct, size_bytes=len(data), current_version=1,
-            storage_key=key, uploaded_by=user_id, is_active=True,
+            content_type=ct, size_bytes=blob.size_bytes, current_version=1,
+            storage_key=blob.storage_key, content_sha256=blob.sha256,
+            uploaded_by=user_id, is_active=True,
         )
         db.add(doc)
         db.add(DocumentVersion(
             id=uuid.uuid4(), tenant_id=tenant_id, document_id=doc_id, version_no=1,
-            filename=filename, content_type=ct, size_bytes=len(data), storage_key=key,
+            filename=filename, content_type=ct, size_bytes=blob.size_bytes,
+            storage_key=blob.storage_key, content_sha256=blob.sha256,
             uploaded_by=user_id, change_comment="Initial version",
         ))
         await db.flush()
+        await ContentIndexService.enqueue(
+            db, tenant_id=tenant_id, document_id=doc_id, storage_key=blob.storage_key
+        )
         return doc
 
     # -- reads ---------------------------------------------------------------
@@ -77,10 +98,18 @@ class DocumentService:
     async def list(
         db: AsyncSession, *, tenant_id: str, folder_id: Optional[str] = None,
         in_folder: bool = False, skip: int = 0, limit: int = 50,
+        visible: Optional[ColumnElement] = None,
     ) -> Tuple[List[Document], int]:
+        """A page of active documents and the total.
+
+        `visible` (AclService.visibility_clause) restricts both to what the caller
+        may see, so the total is exact.
+        """
         base = select(Document).where(
             Document.tenant_id == tenant_id, Document.is_active.is_(True)
         )
+        if visible is not None:
+            base = base.where(visible)
         # `in_folder` distinguishes "root (folder_id IS NULL)" from "all folders".
         if in_folder:
             base = base.where(
@@ -112,6 +141,25 @@ class DocumentService:
         ).scalars().all()
         return list(rows)
 
+    @staticmethod
+    async def all_in_folders(
+        db: AsyncSession, *, tenant_id: str, folder_ids: List[str],
+        visible: Optional[ColumnElement] = None,
+    ) -> List[Document]:
+        """Every active document directly in any of the folders, in one query
+        (optionally only those matching the `visible` ACL clause)."""
+        if not folder_ids:
+            return []
+        stmt = select(Document).where(
+            Document.tenant_id == tenant_id,
+            Document.is_active.is_(True),
+            Document.folder_id.in_(folder_ids),
+        )
+        if visible is not None:
+            stmt = stmt.where(visible)
+        rows = (await db.execute(stmt.order_by(Document.filename))).scalars().all()
+        return list(rows)
+
     @staticmethod
     async def get(
         db: AsyncSession, *, tenant_id: str, document_id: str
@@ -157,26 +205,30 @@ class DocumentService:
     @staticmethod
     async def add_version(
         db: AsyncSession, *, tenant_id: str, user_id: Optional[str], document_id: str,
-        filename: str, content_type: str, data: bytes, change_comment: Optional[str],
+        filename: str, content_type: str, fileobj: BinaryIO, change_comment: Optional[str],
     ) -> Document:
         doc = await DocumentService._require(db, tenant_id=tenant_id, document_id=document_id)
         next_no = doc.current_version + 1
-        key = storage.object_key(str(tenant_id), str(document_id), next_no)
-        await storage.put(key, data, content_type)
         ct = content_type or "application/octet-stream"
+        blob = await _ingest(db, tenant_id, fileobj, ct)
 
         db.add(DocumentVersion(
             id=uuid.uuid4(), tenant_id=tenant_id, document_id=document_id,
             version_no=next_no, filename=filename, content_type=ct,
-            size_bytes=len(data), storage_key=key, uploaded_by=user_id,
+            size_bytes=blob.size_bytes, storage_key=blob.storage_key,
+            content_sha256=blob.sha256, uploaded_by=user_id,
             change_comment=change_comment,
         ))
         doc.current_version = next_no
         doc.filename = filename
         doc.content_type = ct
-        doc.size_bytes = len(data)
-        doc.storage_key = key
+        doc.size_bytes = blob.size_bytes
+        doc.storage_key = blob.storage_key
+        doc.content_sha256 = blob.sha256
         await db.flush()
+        await ContentIndexService.enqueue(
+            db, tenant_id=tenant_id, document_id=doc.id, storage_key=blob.storage_key
+        )
         return doc
 
     @staticmethod
@@ -211,11 +263,14 @@ class DocumentService:
             raise DocumentError("Version not found", 404)
         # Restoring makes the old content the new current version — recorded as a
         # fresh version row (reusing the existing blob) so history stays append-only.
+        if src.content_sha256:
+            await BlobService.retain(db, tenant_id=tenant_id, sha256=src.content_sha256)
         next_no = doc.current_version + 1
         db.add(DocumentVersion(
             id=uuid.uuid4(), tenant_id=tenant_id, document_id=document_id,
             version_no=next_no, filename=src.filename, content_type=src.content_type,
-            size_bytes=src.size_bytes, storage_key=src.storage_key, uploaded_by=user_id,
+            size_bytes=src.size_bytes, storage_key=src.storage_key,
+            content_sha256=src.content_sha256, uploaded_by=user_id,
             change_comment=f"Restored from v{version_no}",
         ))
         doc.current_version = next_no
@@ -223,7 +278,11 @@ class DocumentService:
         doc.content_type = src.content_type
         doc.size_bytes = src.size_bytes
         doc.storage_key = src.storage_key
+        doc.content_sha256 = src.content_sha256
         await db.flush()
+        await ContentIndexService.enqueue(
+            db, tenant_id=tenant_id, document_id=doc.id, storage_key=src.storage_key
+        )
         return doc
 
     # -- move / delete -------------------------------------------------------
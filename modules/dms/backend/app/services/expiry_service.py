@@ -11,6 +11,7 @@ from typing import Any, Dict, List, Optional
 
 from sqlalchemy import and_, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
 
 from ..models.document import Document
 from .audit_service import AuditService
@@ -61,18 +62,18 @@ class ExpiryService:
 
     @staticmethod
     async def list_expiring(
-        db: AsyncSession, *, tenant_id: str, within_days: int = 30
+        db: AsyncSession, *, tenant_id: str, within_days: int = 30,
+        visible: Optional[ColumnElement] = None,
     ) -> List[Document]:
         cutoff = _now().timestamp() + within_days * 86400
-        rows = (
-            await db.execute(
-                select(Document).where(
-                    Document.tenant_id == tenant_id,
-                    Document.is_active.is_(True),
-                    Document.expires_at.isnot(None),
-                ).order_by(Document.expires_at)
-            )
-        ).scalars().all()
+        stmt = select(Document).where(
+            Document.tenant_id == tenant_id,
+            Document.is_active.is_(True),
+            Document.expires_at.isnot(None),
+        )
+        if visible is not None:
+            stmt = stmt.where(visible)  # AclService.visibility_clause
+        rows = (await db.execute(stmt.order_by(Document.expires_at))).scalars().all()
         # Filter in Python to keep tz handling simple + include already-expired.
         return [d for d in rows if d.expires_at and d.expires_at.timestamp() <= cutoff]
 
@@ -1,14 +1,24 @@
-"""Folder business logic (E1 F1.3): nested, tenant-scoped folders."""
+"""Folder business logic (E1 F1.3): nested, tenant-scoped folders.
+
+Every structural change (create, move) also updates the folder closure table
+in the same transaction, so ancestry and subtree reads never walk parent_id.
+Deletes are soft (is_active=False) and leave the tree, and thus the closure,
+unchanged.
+"""
 
 import uuid
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
-from sqlalchemy import and_, func, select
+from sqlalchemy import and_, delete, func, insert, literal, select, true
+from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
 from ..models.document import Document
-from ..models.folder import Folder
+from ..models.folder import Folder, FolderClosure
+
+_CLOSURE_COLUMNS = ["ancestor_id", "descendant_id", "tenant_id", "depth"]
 
 
 # Predefined workspace templates (F1.3): a starter folder tree per team type so
@@ -63,6 +73,21 @@ class FolderService:
             await db.flush()
         except IntegrityError:
             raise FolderError("A folder with that name already exists here", 409)
+        # Closure: the folder itself, then each of the parent's ancestors one level further.
+        await db.execute(insert(FolderClosure).values(
+            ancestor_id=folder.id, descendant_id=folder.id, tenant_id=tenant_id, depth=0,
+        ))
+        if parent_id is not None:
+            await db.execute(insert(FolderClosure).from_select(
+                _CLOSURE_COLUMNS,
+                select(
+                    FolderClosure.ancestor_id, literal(folder.id, UUID(as_uuid=True)),
+                    FolderClosure.tenant_id, FolderClosure.depth + 1,
+                ).where(
+                    FolderClosure.tenant_id == tenant_id,
+                    FolderClosure.descendant_id == parent_id,
+                ),
+            ))
         return folder
 
     @staticmethod
@@ -92,24 +117,51 @@ class FolderService:
             raise FolderError("A folder with that name already exists here", 409)
         return folder
 
+    @staticmethod
+    async def subtree(
+        db: AsyncSession, *, tenant_id: str, folder_id: str
+    ) -> List[Tuple[str, List[str]]]:
+        """The folder and every active descendant as (id, names below the folder).
+
+        One closure-table query; folders below an inactive one are left out.
+        """
+        rows = (
+            await db.execute(
+                select(Folder.id, Folder.parent_id, Folder.name)
+                .join(FolderClosure, FolderClosure.descendant_id == Folder.id)
+                .where(
+                    FolderClosure.tenant_id == tenant_id,
+                    FolderClosure.ancestor_id == folder_id,
+                    FolderClosure.depth > 0,
+                    Folder.is_active.is_(True),
+                )
+                .order_by(FolderClosure.depth, Folder.name)
+            )
+        ).all()
+        result: List[Tuple[str, List[str]]] = [(str(folder_id), [])]
+        names = {str(folder_id): []}
+        # Parents come before children (ordered by depth).
+        for child_id, parent_id, name in rows:
+            parent_names = names.get(str(parent_id))
+            if parent_names is None:
+                continue
+            names[str(child_id)] = parent_names + [name]
+            result.append((str(child_id), names[str(child_id)]))
+        return result
+
     @staticmethod
     async def _is_descendant(
         db: AsyncSession, *, tenant_id: str, folder_id: str, maybe_ancestor_id: str
     ) -> bool:
-        """True if maybe_ancestor_id is folder_id or one of its ancestors."""
-        cur: Optional[str] = maybe_ancestor_id
-        seen = set()
-        while cur is not None and cur not in seen:
-            if str(cur) == str(folder_id):
-                return True
-            seen.add(cur)
-            row = await db.scalar(
-                select(Folder.parent_id).where(
-                    Folder.id == cur, Folder.tenant_id == tenant_id
-                )
+        """True if maybe_ancestor_id is folder_id or one of its descendants."""
+        depth = await db.scalar(
+            select(FolderClosure.depth).where(
+                FolderClosure.tenant_id == tenant_id,
+                FolderClosure.ancestor_id == folder_id,
+                FolderClosure.descendant_id == maybe_ancestor_id,
             )
-            cur = str(row) if row else None
-        return False
+        )
+        return depth is not None
 
     @staticmethod
     async def move(
@@ -123,11 +175,43 @@ class FolderService:
                 db, tenant_id=tenant_id, folder_id=folder_id, maybe_ancestor_id=new_parent_id
             ):
                 raise FolderError("Cannot move a folder into itself or its descendant", 400)
+        if str(folder.parent_id or "") == str(new_parent_id or ""):
+            return folder
         folder.parent_id = new_parent_id
         try:
             await db.flush()
         except IntegrityError:
             raise FolderError("A folder with that name already exists there", 409)
+
+        # Closure: cut the subtree from its old ancestors, then hang it under every
+        # ancestor of the new parent (two set statements, whatever the subtree size).
+        subtree = select(FolderClosure.descendant_id).where(
+            FolderClosure.tenant_id == tenant_id, FolderClosure.ancestor_id == folder_id
+        )
+        await db.execute(
+            delete(FolderClosure).where(
+                FolderClosure.tenant_id == tenant_id,
+                FolderClosure.descendant_id.in_(subtree),
+                FolderClosure.ancestor_id.not_in(subtree),
+            )
+        )
+        if new_parent_id is not None:
+            above, below = aliased(FolderClosure), aliased(FolderClosure)
+            await db.execute(insert(FolderClosure).from_select(
+                _CLOSURE_COLUMNS,
+                select(
+                    above.ancestor_id, below.descendant_id, below.tenant_id,
+                    above.depth + below.depth + 1,
+                )
+                .select_from(above)
+                .join(below, true())
+                .where(
+                    above.tenant_id == tenant_id,
+                    above.descendant_id == new_parent_id,
+                    below.tenant_id == tenant_id,
+                    below.ancestor_id == folder_id,
+                ),
+            ))
         return folder
 
     @staticmethod
@@ -1,8 +1,13 @@
 """Full-text search over documents (E2).
 
-Searches filename + tags + custom metadata (content/OCR extraction is deferred).
-Ranked by ts_rank with an html <mark> snippet from ts_headline. Results are
-ACL-filtered (a caller only sees documents they can at least *view*).
+Searches filename + tags + custom metadata and the extracted text of the content
+(dms_document_content, filled asynchronously by the content indexer; images are
+not OCR'd). Ranked by ts_rank — metadata terms weigh A, content terms D — with an
+html <mark> snippet of filename + tags from ts_headline. Matching ids are taken
+from the two GIN indexes separately (a UNION: an OR across the outer join could
+use neither) and only that set is joined for ranking. Results are ACL-filtered
+(a caller only sees documents they can at least *view*) inside the ranking
+query, so totals and paging are exact and only the page is loaded.
 """
 
 from datetime import datetime
@@ -14,8 +19,18 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from ..models.document import Document
 from .acl_service import AclService
 
-# Cap the candidate set we rank+ACL-filter in one pass (MVP; tune if needed).
-_CANDIDATE_CAP = 500
+# Documents whose metadata or content match, each side from its own GIN index
+_MATCHED = """(
+        SELECT id FROM dms_documents
+        WHERE tenant_id = :tid AND search_vector @@ plainto_tsquery('english', :q)
+        UNION
+        SELECT document_id FROM dms_document_content
+        WHERE tenant_id = :tid AND content_vector @@ plainto_tsquery('english', :q)
+    ) m
+    JOIN dms_documents d ON d.id = m.id"""
+
+_JOINS = """LEFT JOIN dms_document_content c ON c.document_id = d.id
+    CROSS JOIN plainto_tsquery('english', :q) query"""
 
 _SORTS = {
     "relevance": "rank DESC, created_at DESC",
@@ -38,8 +53,6 @@ class SearchService:
         has_q = bool(q and q.strip())
         clauses = ["d.tenant_id = :tid", "d.is_active"]
         params: Dict[str, Any] = {"tid": tenant_id, "q": q or ""}
-        if has_q:
-            clauses.append("d.search_vector @@ query")
         if tag:
             clauses.append(":tag = ANY(d.tags)")
             params["tag"] = tag
@@ -58,51 +71,67 @@ class SearchService:
         if date_to:
             clauses.append("d.created_at <= :dto")
             params["dto"] = date_to
+        if not is_admin:
+            acl_sql, acl_params = AclService.visibility_sql(
+                tenant_id=tenant_id, user_id=user_id, group_ids=group_ids, need="view",
+            )
+            clauses.append(acl_sql)
+            params.update(acl_params)
 
+        source = f"{_MATCHED if has_q else 'dms_documents d'}\n    {_JOINS}"
         order = _SORTS.get(sort, _SORTS["relevance"])
         if sort == "relevance" and not has_q:
             order = _SORTS["date"]  # rank is 0 without a query
 
+        # The total comes from a window count over the filtered set; headlines are
+        # computed for the page only.
         sql = text(
             f"""
-            SELECT d.id,
-                   ts_rank(d.search_vector, query) AS rank,
+            SELECT p.id, p.total, p.rank,
                    ts_headline('english',
-                       coalesce(d.filename,'') || ' ' || coalesce(array_to_string(d.tags,' '),''),
-                       query,
+                       coalesce(p.filename,'') || ' ' || coalesce(array_to_string(p.tags,' '),''),
+                       p.query,
                        'StartSel=<mark>,StopSel=</mark>,MaxWords=12,MinWords=3,ShortWord=2') AS snippet
-            FROM dms_documents d, plainto_tsquery('english', :q) query
-            WHERE {' AND '.join(clauses)}
-            ORDER BY {order}
-            LIMIT :cap
+            FROM (
+                SELECT d.id, d.filename, d.tags, d.created_at, d.size_bytes, query,
+                       count(*) OVER () AS total,
+                       ts_rank(
+                           setweight(coalesce(d.search_vector, CAST('' AS tsvector)), 'A')
+                           || coalesce(c.content_vector, CAST('' AS tsvector)),
+                           query) AS rank
+                FROM {source}
+                WHERE {' AND '.join(clauses)}
+                ORDER BY {order}, d.id
+                LIMIT :limit OFFSET :offset
+            ) p
+            ORDER BY {order}, p.id
             """
         )
-        params["cap"] = _CANDIDATE_CAP
+        params["limit"] = page_size
+        params["offset"] = (page - 1) * page_size
         rows = (await db.execute(sql, params)).mappings().all()
         if not rows:
-            return [], 0
+            # Past the last page the window count is unavailable; count directly.
+            if page == 1:
+                return [], 0
+            count_sql = text(
+                f"""
+                SELECT count(*) FROM {source}
+                WHERE {' AND '.join(clauses)}
+                """
+            )
+            return [], int(await db.scalar(count_sql, params) or 0)
+        total = int(rows[0]["total"])
 
-        # Preserve ranked order while loading the ORM rows for ACL checks.
+        # Preserve ranked order while loading the ORM rows of the page.
         order_index = {str(r["id"]): i for i, r in enumerate(rows)}
         meta = {str(r["id"]): r for r in rows}
-        docs = (
+        page_docs = (
             await db.execute(
                 select(Document).where(Document.id.in_(list(order_index.keys())))
             )
         ).scalars().all()
-        docs.sort(key=lambda d: order_index.get(str(d.id), 1 << 30))
-
-        visible: List[Document] = []
-        for d in docs:
-            if await AclService.authorize_document(
-                db, tenant_id=tenant_id, user_id=user_id, group_ids=group_ids,
-                is_admin=is_admin, document=d, need="view",
-            ):
-                visible.append(d)
-
-        total = len(visible)
-        start = (page - 1) * page_size
-        page_docs = visible[start:start + page_size]
+        page_docs.sort(key=lambda d: order_index.get(str(d.id), 1 << 30))
 
         results: List[Dict[str, Any]] = []
         for d in page_docs:
@@ -0,0 +1,124 @@
+"""Plain-text extraction from stored documents (for content search).
+
+Runs in the content indexer's process pool: every function here is a pure,
+top-level function of the blob's bytes, so it pickles and never touches the DB
+or the event loop. DOCX and XLSX are zip containers of XML and are read with
+the standard library; PDF needs `pypdf`. Their XML parts are checked against
+`max_xml_bytes` before being inflated, so a small blob cannot expand into
+gigabytes of markup.
+"""
+
+import io
+import zipfile
+from typing import Iterable, List, Optional
+from xml.etree import ElementTree
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_S = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+
+_DOCX = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+_XLSX = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+_TEXT_TYPES = {"application/json", "application/xml", "application/csv", "application/x-yaml"}
+
+MAX_XML_BYTES = 100 * 1024 * 1024
+
+
+def kind_of(content_type: Optional[str], filename: str) -> Optional[str]:
+    """pdf | docx | xlsx | text, or None if the format is not extracted."""
+    ctype = (content_type or "").split(";")[0].strip().lower()
+    _, dot, ext = filename.rpartition(".")
+    ext = ext.lower() if dot else ""
+    if ctype == "application/pdf" or ext == "pdf":
+        return "pdf"
+    if ctype == _DOCX or ext == "docx":
+        return "docx"
+    if ctype == _XLSX or ext == "xlsx":
+        return "xlsx"
+    if ctype.startswith("text/") or ctype in _TEXT_TYPES or ext in ("txt", "csv", "md", "json", "xml"):
+        return "text"
+    return None
+
+
+def _capped(parts: Iterable[str], max_chars: int) -> str:
+    out: List[str] = []
+    total = 0
+    for part in parts:
+        if not part:
+            continue
+        out.append(part)
+        total += len(part) + 1
+        if total >= max_chars:
+            break
+    return "\n".join(out)[:max_chars]
+
+
+def _check_xml_size(zf: zipfile.ZipFile, names: Iterable[str], max_xml_bytes: int) -> None:
+    """Raise if the parts to be parsed inflate to more than `max_xml_bytes` in
+    total. zipfile stops reading a member at its declared size (and fails the
+    CRC check), so the central directory cannot understate it."""
+    total = sum(zf.getinfo(name).file_size for name in names)
+    if total > max_xml_bytes:
+        raise ValueError(f"XML parts expand to {total} bytes (limit {max_xml_bytes})")
+
+
+def _pdf(data: bytes) -> Iterable[str]:
+    from pypdf import PdfReader
+
+    for page in PdfReader(io.BytesIO(data)).pages:
+        yield page.extract_text() or ""
+
+
+def _docx(data: bytes, max_xml_bytes: int) -> Iterable[str]:
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        _check_xml_size(zf, ["word/document.xml"], max_xml_bytes)
+        root = ElementTree.fromstring(zf.read("word/document.xml"))
+    for para in root.iter(f"{_W}p"):
+        yield "".join(t.text or "" for t in para.iter(f"{_W}t"))
+
+
+def _xlsx(data: bytes, max_xml_bytes: int) -> Iterable[str]:
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        names = zf.namelist()
+        sheets = sorted(n for n in names if n.startswith("xl/worksheets/sheet") and n.endswith(".xml"))
+        parts = sheets + [n for n in names if n == "xl/sharedStrings.xml"]
+        _check_xml_size(zf, parts, max_xml_bytes)
+        shared: List[str] = []
+        if "xl/sharedStrings.xml" in names:
+            root = ElementTree.fromstring(zf.read("xl/sharedStrings.xml"))
+            shared = ["".join(t.text or "" for t in si.iter(f"{_S}t")) for si in root.iter(f"{_S}si")]
+        for name in sheets:
+            root = ElementTree.fromstring(zf.read(name))
+            for row in root.iter(f"{_S}row"):
+                cells = []
+                for cell in row.iter(f"{_S}c"):
+                    kind = cell.get("t")
+                    if kind == "inlineStr":
+                        cells.append("".join(t.text or "" for t in cell.iter(f"{_S}t")))
+                        continue
+                    value = cell.find(f"{_S}v")
+                    if value is None or value.text is None:
+                        continue
+                    if kind == "s":
+                        index = int(value.text)
+                        cells.append(shared[index] if index < len(shared) else "")
+                    else:
+                        cells.append(value.text)
+                yield " ".join(cells)
+
+
+def extract_text(
+    data: bytes, content_type: Optional[str], filename: str, max_chars: int,
+    max_xml_bytes: int = MAX_XML_BYTES,
+) -> Optional[str]:
+    """The document's text (at most `max_chars`), or None if the format is not
+    extracted. Raises on a corrupt file or oversized XML parts."""
+    kind = kind_of(content_type, filename)
+    if kind == "pdf":
+        return _capped(_pdf(data), max_chars)
+    if kind == "docx":
+        return _capped(_docx(data, max_xml_bytes), max_chars)
+    if kind == "xlsx":
+        return _capped(_xlsx(data, max_xml_bytes), max_chars)
+    if kind == "text":
+        return data[: max_chars * 4].decode("utf-8", errors="replace")[:max_chars]
+    return None
@@ -0,0 +1,307 @@
+"""Content indexer: extracts document text for full-text search.
+
+Works off the dms_document_content queue (rows in `pending`, written by
+ContentIndexService.enqueue on upload / new version / restore). Each tick
+claims a batch with FOR UPDATE SKIP LOCKED, so several indexers — in-process or
+standalone — can share the queue. Blobs are fetched from the object store and
+parsed in a process pool: PDF/DOCX/XLSX parsing is CPU-bound and would
+otherwise hold the GIL of the API process. The text is stored as a tsvector
+with weight D (below filename/tags/metadata), which search matches and ranks
+alongside the document's own search_vector.
+
+Jobs in `processing` for longer than EXTRACT_STALE_SECONDS (indexer crashed or
+restarted) are claimed again. A failed job is retried after EXTRACT_RETRY_SECONDS
+times its attempts so far; one failing EXTRACT_MAX_ATTEMPTS times is left
+`failed` with the error recorded. Rows of deleted (inactive) documents are not
+claimed. A worker process dying breaks the whole pool: the pool is rebuilt and
+the batch's jobs are queued again without using up an attempt.
+
+Placement:
+- CONTENT_INDEXER_ENABLED=true → started in the API lifespan (woken at once
+  when this process queues a document, otherwise polling)
+- standalone: `python -m app.workers.content_indexer`
+- existing documents: `python -m app.workers.content_indexer backfill`
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import signal
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+
+from ..config import settings
+from ..core.database import AsyncSessionLocal
+from ..core.storage import storage
+from ..services.text_extraction import extract_text, kind_of
+
+logger = logging.getLogger(__name__)
+
+# Set by ContentIndexService.enqueue so an idle indexer in this process starts at once
+_content_queued = asyncio.Event()
+
+
+def notify_content_queued() -> None:
+    """Wake the idle indexer in this process."""
+    _content_queued.set()
+
+
+_CLAIM_SQL = text("""
+    UPDATE dms_document_content c
+    SET status = 'processing', started_at = now(), attempts = c.attempts + 1
+    FROM dms_documents d
+    WHERE d.id = c.document_id AND c.document_id IN (
+        SELECT q.document_id FROM dms_document_content q
+        JOIN dms_documents qd ON qd.id = q.document_id
+        WHERE qd.is_active
+          AND ((q.status = 'pending' AND q.queued_at <= now())
+               OR (q.status = 'processing' AND q.started_at < now() - make_interval(secs => :stale)))
+        ORDER BY q.queued_at
+        LIMIT :limit
+        FOR UPDATE OF q SKIP LOCKED
+    )
+    RETURNING c.document_id, c.storage_key, c.attempts, d.filename, d.content_type, d.size_bytes
+""")
+
+# Only the claimed blob's result is written: a newer version re-queues the row
+# (new storage_key, status pending) and this extraction is then discarded.
+_FINISH_SQL = text("""
+    UPDATE dms_document_content
+    SET status = :status, error = :error, indexed_at = now(), content_chars = :chars,
+        content_vector = CASE WHEN CAST(:body AS text) IS NULL THEN NULL
+                              ELSE setweight(to_tsvector('english', CAST(:body AS text)), 'D') END
+    WHERE document_id = :document_id AND storage_key = :storage_key AND status = 'processing'
+""")
+
+# A retry waits retry_seconds per attempt made, so a failing store or blob is
+# not claimed again at once
+_FAIL_SQL = text("""
+    UPDATE dms_document_content
+    SET status = CASE WHEN attempts >= :max_attempts THEN 'failed' ELSE 'pending' END,
+        error = :error,
+        queued_at = now() + make_interval(secs => CAST(:retry_seconds AS double precision) * attempts)
+    WHERE document_id = :document_id AND storage_key = :storage_key AND status = 'processing'
+""")
+
+# The pool broke under the job, not the job itself: retry without the attempt
+_REQUEUE_SQL = text("""
+    UPDATE dms_document_content
+    SET status = 'pending', attempts = greatest(attempts - 1, 0), queued_at = now()
+    WHERE document_id = :document_id AND storage_key = :storage_key AND status = 'processing'
+""")
+
+_BACKFILL_SQL = text("""
+    INSERT INTO dms_document_content (document_id, tenant_id, storage_key, status, attempts, queued_at)
+    SELECT d.id, d.tenant_id, d.storage_key, 'pending', 0, now()
+    FROM dms_documents d
+    WHERE d.is_active
+      AND (:requeue OR NOT EXISTS (
+          SELECT 1 FROM dms_document_content c WHERE c.document_id = d.id))
+    ON CONFLICT (document_id) DO UPDATE
+    SET storage_key = EXCLUDED.storage_key, status = 'pending', attempts = 0,
+        error = NULL, queued_at = now()
+""")
+
+
+class ContentIndexer:
+    """Claims queued documents and indexes their text.
+
+    State transitions per row:
+        pending -> processing -> indexed | unsupported
+        pending -> processing -> pending (retry) | failed
+        processing (stale) -> processing (claimed again)
+    """
+
+    def __init__(
+        self,
+        processes: int = 2,
+        batch_size: int = 8,
+        poll_interval_seconds: float = 5.0,
+        stale_after_seconds: int = 600,
+        max_attempts: int = 3,
+        retry_seconds: float = 60.0,
+        max_bytes: int = 50 * 1024 * 1024,
+        max_chars: int = 500_000,
+        max_xml_bytes: int = 100 * 1024 * 1024,
+    ):
+        self.processes = max(processes, 1)
+        self.batch_size = max(batch_size, 1)
+        self.poll_interval_seconds = poll_interval_seconds
+        self.stale_after_seconds = stale_after_seconds
+        self.max_attempts = max_attempts
+        self.retry_seconds = retry_seconds
+        self.max_bytes = max_bytes
+        self.max_chars = max_chars
+        self.max_xml_bytes = max_xml_bytes
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    @classmethod
+    def from_settings(cls) -> "ContentIndexer":
+        return cls(
+            processes=settings.EXTRACT_PROCESSES,
+            batch_size=settings.EXTRACT_BATCH_SIZE,
+            poll_interval_seconds=settings.EXTRACT_POLL_SECONDS,
+            stale_after_seconds=settings.EXTRACT_STALE_SECONDS,
+            max_attempts=settings.EXTRACT_MAX_ATTEMPTS,
+            retry_seconds=settings.EXTRACT_RETRY_SECONDS,
+            max_bytes=settings.EXTRACT_MAX_BYTES,
+            max_chars=settings.EXTRACT_MAX_CHARS,
+            max_xml_bytes=settings.EXTRACT_MAX_XML_BYTES,
+        )
+
+    # ----- lifecycle ------------------------------------------------------
+
+    def start(self) -> None:
+        """Start the polling loop on the running event loop."""
+        self._stopping = False
+        self._pool = self._new_pool()
+        self._task = asyncio.create_task(self._loop())
+        logger.info("content-indexer started %s processes (poll=%ss)", self.processes, self.poll_interval_seconds)
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        # Spawned, not forked: children of a running event loop (and its threads)
+        # only import text_extraction.
+        return ProcessPoolExecutor(max_workers=self.processes, mp_context=multiprocessing.get_context("spawn"))
+
+    def _replace_broken_pool(self, pool: ProcessPoolExecutor) -> None:
+        """Swap in a fresh pool, once for all the jobs that saw `pool` break."""
+        if self._pool is not pool or self._stopping:
+            return
+        logger.warning("content-indexer process pool broke; starting a new one")
+        pool.shutdown(wait=False, cancel_futures=True)
+        self._pool = self._new_pool()
+
+    async def stop(self) -> None:
+        """Stop polling; jobs cut short are reclaimed once stale."""
+        self._stopping = True
+        _content_queued.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        logger.info("content-indexer stopped")
+
+    async def _loop(self) -> None:
+        while not self._stopping:
+            try:
+                claimed = await self._tick()
+            except Exception:
+                logger.exception("content-indexer tick failed")
+                claimed = 0
+            if claimed:
+                continue
+            try:
+                await asyncio.wait_for(_content_queued.wait(), self.poll_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            _content_queued.clear()
+
+    # ----- work -----------------------------------------------------------
+
+    async def _tick(self) -> int:
+        """Claim and index one batch; returns how many were claimed."""
+        async with AsyncSessionLocal() as db:
+            async with db.begin():
+                jobs = (
+                    await db.execute(
+                        _CLAIM_SQL, {"stale": float(self.stale_after_seconds), "limit": self.batch_size}
+                    )
+                ).mappings().all()
+        await asyncio.gather(*(self._index(dict(job)) for job in jobs))
+        return len(jobs)
+
+    async def _index(self, job: Dict[str, Any]) -> None:
+        if job["attempts"] > self.max_attempts:
+            await self._write(
+                _FAIL_SQL, job, error="Gave up after repeated interruptions", max_attempts=0, retry_seconds=0.0
+            )
+            return
+        if kind_of(job["content_type"], job["filename"]) is None:
+            await self._finish(job, "unsupported", None, None)
+            return
+        if (job["size_bytes"] or 0) > self.max_bytes:
+            await self._finish(job, "unsupported", None, f"Larger than {self.max_bytes} bytes")
+            return
+        try:
+            data = await storage.get_bytes(job["storage_key"])
+            pool = self._pool
+            body = await asyncio.get_running_loop().run_in_executor(
+                pool, extract_text, data, job["content_type"], job["filename"], self.max_chars, self.max_xml_bytes
+            )
+        except BrokenProcessPool:
+            self._replace_broken_pool(pool)
+            await self._write(_REQUEUE_SQL, job)
+            return
+        except Exception as e:
+            logger.warning("content extraction failed for %s: %s", job["document_id"], e)
+            await self._write(
+                _FAIL_SQL, job, error=str(e)[:1000], max_attempts=self.max_attempts, retry_seconds=self.retry_seconds
+            )
+            return
+        if body is None:
+            await self._finish(job, "unsupported", None, None)
+            return
+        # PostgreSQL text cannot hold NUL bytes
+        await self._finish(job, "indexed", body.replace("\x00", " "), None)
+
+    async def _finish(self, job: Dict[str, Any], status: str, body: Optional[str], error: Optional[str]) -> None:
+        await self._write(
+            _FINISH_SQL, job, status=status, body=body, error=error,
+            chars=len(body) if body is not None else None,
+        )
+
+    @staticmethod
+    async def _write(sql, job: Dict[str, Any], **params) -> None:
+        async with AsyncSessionLocal() as db:
+            async with db.begin():
+                await db.execute(
+                    sql, {"document_id": job["document_id"], "storage_key": job["storage_key"], **params}
+                )
+
+    # ----- backfill -------------------------------------------------------
+
+    @staticmethod
+    async def backfill(requeue: bool = False) -> int:
+        """Queue every active document without indexed content (all of them
+        with `requeue`); returns the number of rows queued."""
+        async with AsyncSessionLocal() as db:
+            async with db.begin():
+                result = await db.execute(_BACKFILL_SQL, {"requeue": requeue})
+        return result.rowcount or 0
+
+
+async def _run_standalone(indexer: ContentIndexer) -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+    indexer.start()
+    await stop.wait()
+    await indexer.stop()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """`python -m app.workers.content_indexer [backfill [--all]]`"""
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    args = sys.argv[1:] if argv is None else argv
+    if args and args[0] == "backfill":
+        queued = asyncio.run(ContentIndexer.backfill(requeue="--all" in args))
+        logger.info("queued %s documents for content indexing", queued)
+        return
+    asyncio.run(_run_standalone(ContentIndexer.from_settings()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""Tests for the content indexer's queue handling.
+
+A worker process dying breaks every job in flight on the pool. The pool is
+replaced once, and those jobs are queued again without using up an attempt.
+On PostgreSQL (TEST_DATABASE_URL): the claim skips rows of inactive documents
+and retries that are not yet due, and a failed job is pushed back by
+retry_seconds per attempt.
+"""
+
+import asyncio
+import uuid
+from datetime import timedelta
+from concurrent.futures import Executor, Future
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+from sqlalchemy import select, text
+
+from app.models.content import DmsDocumentContent
+from app.models.document import Document
+from app.workers import content_indexer
+from app.workers.content_indexer import ContentIndexer
+
+TENANT = uuid.uuid4()
+
+
+class BrokenPool(Executor):
+    """Breaks, failing every pending future, once `in_flight` jobs are submitted."""
+
+    def __init__(self, in_flight):
+        self.in_flight = in_flight
+        self.futures = []
+        self.shut_down = False
+
+    def submit(self, fn, *args, **kwargs):
+        self.futures.append(Future())
+        if len(self.futures) == self.in_flight:
+            for future in self.futures:
+                future.set_exception(BrokenProcessPool("A child process terminated abruptly"))
+        return self.futures[-1]
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        self.shut_down = True
+
+
+class StubStorage:
+    async def get_bytes(self, key):
+        return b"hello"
+
+
+def _job(**overrides):
+    job = {
+        "document_id": uuid.uuid4(), "storage_key": "key", "attempts": 1,
+        "filename": "notes.txt", "content_type": "text/plain", "size_bytes": 5,
+    }
+    job.update(overrides)
+    return job
+
+
+@pytest.mark.unit
+def test_broken_pool_is_replaced_once_and_jobs_requeued(monkeypatch):
+    writes = []
+
+    async def record(sql, job, **params):
+        writes.append((sql, job["document_id"], params))
+
+    monkeypatch.setattr(content_indexer, "storage", StubStorage())
+    monkeypatch.setattr(ContentIndexer, "_write", staticmethod(record))
+    indexer = ContentIndexer()
+    broken = indexer._pool = BrokenPool(in_flight=2)
+    fresh = []
+
+    def new_pool():
+        fresh.append(object())
+        return fresh[-1]
+
+    monkeypatch.setattr(indexer, "_new_pool", new_pool)
+    jobs = [_job(), _job()]
+
+    async def run():
+        await asyncio.gather(*(indexer._index(job) for job in jobs))
+
+    asyncio.run(run())
+
+    assert broken.shut_down
+    assert len(fresh) == 1 and indexer._pool is fresh[0]
+    assert writes == [(content_indexer._REQUEUE_SQL, job["document_id"], {}) for job in jobs]
+
+
+async def _queue(db, name, *, active=True, queued_in="-1 second"):
+    doc = Document(
+        id=uuid.uuid4(), tenant_id=TENANT, filename=f"{name}.txt", content_type="text/plain",
+        storage_key=name, is_active=active,
+    )
+    db.add(doc)
+    await db.flush()
+    db.add(DmsDocumentContent(
+        document_id=doc.id, tenant_id=TENANT, storage_key=name, status="pending",
+        queued_at=await db.scalar(text(f"SELECT now() + interval '{queued_in}'")),
+    ))
+    await db.flush()
+    return doc.id
+
+
+async def _claim(db):
+    rows = await db.execute(content_indexer._CLAIM_SQL, {"stale": 600.0, "limit": 10})
+    return {row["storage_key"]: row["attempts"] for row in rows.mappings()}
+
+
+async def _content(db, document_id):
+    db.expire_all()
+    return await db.scalar(select(DmsDocumentContent).where(DmsDocumentContent.document_id == document_id))
+
+
+@pytest.mark.pg
+def test_claim_skips_inactive_documents_and_retries_not_yet_due(pg_run):
+    async def scenario(db):
+        await _queue(db, "due")
+        await _queue(db, "deleted", active=False)
+        await _queue(db, "later", queued_in="1 hour")
+
+        assert await _claim(db) == {"due": 1}
+        assert await _claim(db) == {}
+
+    pg_run(scenario)
+
+
+@pytest.mark.pg
+def test_failed_job_is_retried_after_a_backoff_scaled_by_attempts(pg_run):
+    async def scenario(db):
+        document_id = await _queue(db, "flaky")
+        job = {"document_id": document_id, "storage_key": "flaky"}
+        fail = {"error": "store unavailable", "max_attempts": 3, "retry_seconds": 30.0, **job}
+        now = await db.scalar(text("SELECT now()"))
+
+        assert await _claim(db) == {"flaky": 1}
+        await db.execute(content_indexer._FAIL_SQL, fail)
+        row = await _content(db, document_id)
+        assert row.status == "pending" and row.queued_at - now == timedelta(seconds=30)
+        assert await _claim(db) == {}
+
+        await db.execute(text("UPDATE dms_document_content SET queued_at = now()"))
+        assert await _claim(db) == {"flaky": 2}
+        await db.execute(content_indexer._FAIL_SQL, fail)
+        assert (await _content(db, document_id)).queued_at - now == timedelta(seconds=60)
+
+        # A broken pool hands the attempt back
+        await db.execute(text("UPDATE dms_document_content SET queued_at = now()"))
+        assert await _claim(db) == {"flaky": 3}
+        await db.execute(content_indexer._REQUEUE_SQL, job)
+        row = await _content(db, document_id)
+        assert (row.status, row.attempts) == ("pending", 2)
+
+    pg_run(scenario)
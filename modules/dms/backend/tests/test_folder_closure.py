@@ -0,0 +1,115 @@
+"""Tests for folder closure maintenance in `FolderService`.
+
+After every create and move, dms_folder_closure must hold exactly the
+(ancestor, descendant, depth) rows found by walking parent_id up from each
+folder — including when a subtree with children is moved, or moved to the
+root. A move into the folder's own subtree is rejected and leaves the tree
+untouched. Runs on PostgreSQL (TEST_DATABASE_URL).
+"""
+
+import uuid
+
+import pytest
+from sqlalchemy import select
+
+from app.models.folder import Folder, FolderClosure
+from app.services.folder_service import FolderError, FolderService
+
+pytestmark = pytest.mark.pg
+
+TENANT = str(uuid.uuid4())
+
+
+async def _assert_closure_matches_tree(db):
+    parents = dict((await db.execute(select(Folder.id, Folder.parent_id))).all())
+    expected = set()
+    for folder_id in parents:
+        ancestor, depth = folder_id, 0
+        while ancestor is not None:
+            expected.add((ancestor, folder_id, depth))
+            ancestor, depth = parents[ancestor], depth + 1
+    actual = set(
+        (await db.execute(
+            select(FolderClosure.ancestor_id, FolderClosure.descendant_id, FolderClosure.depth)
+        )).all()
+    )
+    assert actual == expected
+
+
+async def _tree(db):
+    """a/b/c with a sibling a/d, and a separate root e."""
+    folders = {}
+    for path in ("a", "a/b", "a/b/c", "a/d", "e"):
+        parent, _, name = path.rpartition("/")
+        folders[path] = await FolderService.create(
+            db, tenant_id=TENANT, user_id=None, name=name,
+            parent_id=str(folders[parent].id) if parent else None,
+        )
+        await _assert_closure_matches_tree(db)
+    return {path: str(folder.id) for path, folder in folders.items()}
+
+
+async def _move(db, ids, path, new_parent):
+    await FolderService.move(
+        db, tenant_id=TENANT, folder_id=ids[path],
+        new_parent_id=ids[new_parent] if new_parent else None,
+    )
+    await _assert_closure_matches_tree(db)
+
+
+async def _subtree_paths(db, ids, path):
+    rows = await FolderService.subtree(db, tenant_id=TENANT, folder_id=ids[path])
+    return {"/".join(names) for _, names in rows[1:]}
+
+
+def test_create_builds_closure_rows(pg_run):
+    async def scenario(db):
+        ids = await _tree(db)
+        assert await _subtree_paths(db, ids, "a") == {"b", "b/c", "d"}
+
+    pg_run(scenario)
+
+
+def test_move_to_root(pg_run):
+    async def scenario(db):
+        ids = await _tree(db)
+        await _move(db, ids, "a/b/c", None)
+        assert await _subtree_paths(db, ids, "a") == {"b", "d"}
+
+    pg_run(scenario)
+
+
+def test_move_under_new_parent(pg_run):
+    async def scenario(db):
+        ids = await _tree(db)
+        await _move(db, ids, "a/d", "e")
+        await _move(db, ids, "a/d", "a/b/c")
+        assert await _subtree_paths(db, ids, "e") == set()
+        assert await _subtree_paths(db, ids, "a/b") == {"c", "c/d"}
+
+    pg_run(scenario)
+
+
+def test_move_subtree_with_children(pg_run):
+    async def scenario(db):
+        ids = await _tree(db)
+        await _move(db, ids, "a/b", "e")
+        assert await _subtree_paths(db, ids, "e") == {"b", "b/c"}
+        assert await _subtree_paths(db, ids, "a") == {"d"}
+        await _move(db, ids, "e", "a/d")
+        assert await _subtree_paths(db, ids, "a") == {"d", "d/e", "d/e/b", "d/e/b/c"}
+
+    pg_run(scenario)
+
+
+def test_move_into_own_subtree_is_rejected(pg_run):
+    async def scenario(db):
+        ids = await _tree(db)
+        for target in ("a", "a/b", "a/b/c"):
+            with pytest.raises(FolderError) as exc:
+                await FolderService.move(db, tenant_id=TENANT, folder_id=ids["a"], new_parent_id=ids[target])
+            assert exc.value.status_code == 400
+        await _assert_closure_matches_tree(db)
+        assert await _subtree_paths(db, ids, "a") == {"b", "b/c", "d"}
+
+    pg_run(scenario)
@@ -0,0 +1,110 @@
+"""Unit tests for text extraction from DOCX, XLSX and plain-text blobs.
+
+Containers are built in memory with zipfile. Covers paragraph text, shared
+and inline spreadsheet strings, the max_chars cap, unsupported formats,
+corrupt archives and XML parts inflating past max_xml_bytes.
+"""
+
+import io
+import zipfile
+
+import pytest
+
+from app.services.text_extraction import extract_text, kind_of
+
+pytestmark = pytest.mark.unit
+
+_W = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+_S = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+
+
+def _zip(parts, compression=zipfile.ZIP_DEFLATED):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", compression) as zf:
+        for name, body in parts.items():
+            zf.writestr(name, body)
+    return buf.getvalue()
+
+
+def _docx(*paragraphs):
+    body = "".join(
+        "<w:p>" + "".join(f"<w:r><w:t>{run}</w:t></w:r>" for run in runs) + "</w:p>" for runs in paragraphs
+    )
+    return _zip({"word/document.xml": f'<w:document xmlns:w="{_W}"><w:body>{body}</w:body></w:document>'})
+
+
+def _sheet(*rows):
+    cells = "".join(f"<row>{row}</row>" for row in rows)
+    return f'<worksheet xmlns="{_S}"><sheetData>{cells}</sheetData></worksheet>'
+
+
+def _xlsx(sheets, shared=None):
+    parts = {f"xl/worksheets/sheet{i}.xml": sheet for i, sheet in enumerate(sheets, 1)}
+    if shared is not None:
+        items = "".join(f"<si><t>{value}</t></si>" for value in shared)
+        parts["xl/sharedStrings.xml"] = f'<sst xmlns="{_S}">{items}</sst>'
+    return _zip(parts)
+
+
+def test_docx_paragraphs_join_their_runs():
+    data = _docx(["Quarterly ", "report"], [], ["Revenue grew"])
+
+    assert extract_text(data, None, "report.docx", 1000) == "Quarterly report\nRevenue grew"
+
+
+def test_xlsx_reads_shared_inline_and_literal_cells():
+    data = _xlsx(
+        [
+            _sheet(
+                '<c t="s"><v>1</v></c><c><v>42</v></c>',
+                '<c t="inlineStr"><is><t>inline note</t></is></c><c t="s"><v>0</v></c><c t="s"><v>9</v></c>',
+            ),
+            _sheet('<c t="s"><v>0</v></c>'),
+        ],
+        shared=["north", "Region"],
+    )
+
+    assert extract_text(data, None, "sales.xlsx", 1000) == "Region 42\ninline note north \nnorth"
+
+
+def test_xlsx_without_shared_strings():
+    data = _xlsx([_sheet('<c t="inlineStr"><is><t>only inline</t></is></c>')])
+
+    assert extract_text(data, None, "sheet.xlsx", 1000) == "only inline"
+
+
+def test_max_chars_caps_the_text():
+    paragraphs = [[f"paragraph {i}"] for i in range(1000)]
+
+    text = extract_text(_docx(*paragraphs), None, "long.docx", 50)
+
+    assert len(text) == 50 and text.startswith("paragraph 0\nparagraph 1\n")
+    assert extract_text("é".encode() * 100, "text/plain", "notes.txt", 10) == "é" * 10
+
+
+@pytest.mark.parametrize("content_type, filename", [("image/png", "scan.png"), (None, "archive.zip"), (None, "noext")])
+def test_unsupported_formats_return_none(content_type, filename):
+    assert kind_of(content_type, filename) is None
+    assert extract_text(b"\x89PNG", content_type, filename, 1000) is None
+
+
+def test_corrupt_zip_raises():
+    with pytest.raises(zipfile.BadZipFile):
+        extract_text(b"PK\x03\x04 not really a zip", None, "broken.docx", 1000)
+    with pytest.raises(KeyError):
+        extract_text(_zip({"other.xml": "<x/>"}), None, "empty.docx", 1000)
+
+
+@pytest.mark.parametrize("compression", [zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED])
+def test_xml_parts_larger_than_max_xml_bytes_are_rejected(compression):
+    padding = " " * 10_000
+    document = f'<w:document xmlns:w="{_W}"><w:p><w:r><w:t>hi</w:t></w:r></w:p>{padding}</w:document>'
+    docx = _zip({"word/document.xml": document}, compression)
+    sheet = _sheet() + padding[:6000]  # each sheet is under the limit, both are not
+    xlsx = _zip({"xl/worksheets/sheet1.xml": sheet, "xl/worksheets/sheet2.xml": sheet}, compression)
+
+    assert extract_text(docx, None, "big.docx", 1000, max_xml_bytes=20_000) == "hi"
+    with pytest.raises(ValueError, match="limit 5000"):
+        extract_text(docx, None, "big.docx", 1000, max_xml_bytes=5000)
+    with pytest.raises(ValueError):
+        extract_text(xlsx, None, "big.xlsx", 1000, max_xml_bytes=10_000)
@@ -0,0 +1,136 @@
+"""Unit tests for streaming folder zip archives.
+
+Covers that the streamed bytes form a valid archive (checked with zipfile),
+that entries whose blob cannot be fetched are left out, which entries are
+stored rather than deflated, and archive name sanitising / de-duplication.
+Blobs come from an in-memory stub of the object store.
+"""
+
+import asyncio
+import io
+import zipfile
+from datetime import datetime
+
+import pytest
+
+from app.services.zip_stream import ZipEntry, is_precompressed, safe_component, stream_zip, unique_name
+
+pytestmark = pytest.mark.unit
+
+TEXT = b"quarterly numbers\n" * 500
+PDF = b"%PDF-1.4 not really compressed" * 20
+
+
+class StubStore:
+    """Serves blobs from a dict; unknown keys fail like a missing S3 object."""
+
+    def __init__(self, blobs):
+        self.blobs = blobs
+
+    async def stream(self, key, chunk_size):
+        if key not in self.blobs:
+            raise FileNotFoundError(key)
+        data = self.blobs[key]
+        for start in range(0, len(data), chunk_size):
+            yield data[start : start + chunk_size]
+
+
+def _entry(name, key, content_type, size):
+    return ZipEntry(name, key, content_type, size, modified=datetime(2026, 1, 2, 3, 4, 5))
+
+
+def _archive(entries, blobs, **kwargs):
+    async def collect():
+        chunks = []
+        async for chunk in stream_zip(entries, store=StubStore(blobs), **kwargs):
+            chunks.append(chunk)
+        return chunks
+
+    chunks = asyncio.run(collect())
+    return zipfile.ZipFile(io.BytesIO(b"".join(chunks))), chunks
+
+
+def test_streamed_archive_is_valid():
+    entries = [
+        _entry("reports/q1.txt", "k/q1", "text/plain", len(TEXT)),
+        _entry("reports/q1.pdf", "k/pdf", "application/pdf", len(PDF)),
+        _entry("empty.txt", "k/empty", "text/plain", 0),
+    ]
+    blobs = {"k/q1": TEXT, "k/pdf": PDF, "k/empty": b""}
+
+    zf, chunks = _archive(entries, blobs, window=2, chunk_size=64, queue_chunks=1)
+
+    assert len(chunks) > len(entries)  # sent while being built, not in one piece
+    assert zf.testzip() is None
+    assert zf.namelist() == ["reports/q1.txt", "reports/q1.pdf", "empty.txt"]
+    assert zf.read("reports/q1.txt") == TEXT
+    assert zf.read("reports/q1.pdf") == PDF
+    assert zf.read("empty.txt") == b""
+    assert zf.getinfo("reports/q1.txt").date_time == (2026, 1, 2, 3, 4, 4)  # DOS time has 2 s resolution
+
+
+def test_blob_that_fails_to_fetch_is_skipped():
+    entries = [
+        _entry("a.txt", "k/a", "text/plain", 3),
+        _entry("gone.txt", "k/missing", "text/plain", 10),
+        _entry("b.txt", "k/b", "text/plain", 3),
+    ]
+
+    zf, _ = _archive(entries, {"k/a": b"aaa", "k/b": b"bbb"}, window=3, chunk_size=2)
+
+    assert zf.testzip() is None
+    assert zf.namelist() == ["a.txt", "b.txt"]
+    assert zf.read("b.txt") == b"bbb"
+
+
+def test_precompressed_entries_are_stored_others_deflated():
+    entries = [
+        _entry("q1.txt", "k/q1", "text/plain", len(TEXT)),
+        _entry("q1.pdf", "k/pdf", "application/pdf", len(PDF)),
+        _entry("scan", "k/pdf", "image/png", len(PDF)),
+        _entry("logo.svg", "k/q1", "image/svg+xml", len(TEXT)),
+    ]
+
+    zf, _ = _archive(entries, {"k/q1": TEXT, "k/pdf": PDF})
+
+    types = {info.filename: info.compress_type for info in zf.infolist()}
+    assert types == {
+        "q1.txt": zipfile.ZIP_DEFLATED,
+        "q1.pdf": zipfile.ZIP_STORED,
+        "scan": zipfile.ZIP_STORED,
+        "logo.svg": zipfile.ZIP_DEFLATED,
+    }
+    assert zf.getinfo("q1.txt").compress_size < len(TEXT)
+
+
+@pytest.mark.parametrize(
+    "content_type,filename,expected",
+    [
+        ("application/pdf", "x.bin", True),
+        ("application/octet-stream", "photo.JPG", True),
+        ("application/vnd.openxmlformats-officedocument.wordprocessingml.document", "x", True),
+        ("image/bmp", "x.bmp", False),
+        ("text/csv; charset=utf-8", "data.csv", False),
+        (None, "notes", False),
+    ],
+)
+def test_is_precompressed(content_type, filename, expected):
+    assert is_precompressed(content_type, filename) is expected
+
+
+@pytest.mark.parametrize(
+    "name,expected",
+    [("a/b\\c.txt", "a_b_c.txt"), ("..", "_"), (".", "_"), ("  ", "_"), ("../etc", ".._etc"), (" ok ", "ok")],
+)
+def test_safe_component(name, expected):
+    assert safe_component(name) == expected
+
+
+def test_unique_name_never_repeats_a_name():
+    seen = {}
+    names = ["a.txt", "a.txt", "a (1).txt", "a.txt", "README", "README", "dir/a.txt"]
+
+    unique = [unique_name(name, seen) for name in names]
+
+    assert unique == ["a.txt", "a (1).txt", "a (1) (1).txt", "a (2).txt", "README", "README (1)", "dir/a.txt"]
+    assert len(set(unique)) == len(unique)